@@ -1,7 +1,8 @@
 """Strands Agent for Cloud Architecture Recommendations"""
 
 import os
-from typing import Optional
+import json
+from typing import Dict, List, Optional, Tuple
 from strands import Agent
 from strands.models import BedrockModel
 from backend.tools.cloud_tools import (
@@ -11,6 +12,14 @@ from backend.tools.cloud_tools import (
     get_service_alternatives,
     validate_architecture
 )
+from backend.prompts.registry import get_prompt_registry
+from backend.utils.usage_metrics import get_usage_metrics
+from backend.utils.conversation_store import format_transcript
+from backend.utils.structured_output import (
+    get_architecture_schema,
+    parse_architecture_document,
+    to_architecture_json
+)
 
 
 class ArchitectureAgent:
@@ -30,111 +39,34 @@ class ArchitectureAgent:
         )
         self.region = region or os.getenv("AWS_DEFAULT_REGION", "us-east-1")
 
-        # Initialize Bedrock model
+        # Initialize Bedrock model. Cache points after the system prompt and the
+        # tool specs let Bedrock reuse that static prefix across calls.
+        cache_config = {}
+        self.prompt_caching = os.getenv("BEDROCK_PROMPT_CACHING", "true").lower() == "true"
+        if self.prompt_caching:
+            cache_config = {"cache_prompt": "default", "cache_tools": "default"}
+
         self.model = BedrockModel(
             model_id=self.model_id,
             region_name=self.region,
             temperature=0.7,
-            streaming=False
+            streaming=False,
+            **cache_config
         )
 
-        # System prompt for architecture agent
-        system_prompt = """You are an expert cloud architecture AI agent specialized in AWS, Azure, and Google Cloud Platform.
-
-Your role is to help users design optimal, secure, and cost-effective cloud architectures.
-
-Key Responsibilities:
-1. Analyze user requirements and recommend appropriate cloud services
-2. Design complete architectures with proper service connections
-3. Estimate costs accurately using your tools
-4. Suggest cost optimizations and alternatives
-5. Validate architectures for best practices and security
-6. Provide clear reasoning for your recommendations
-
-Available Tools:
-- get_aws_service_info: Get details about AWS services
-- calculate_architecture_cost: Calculate total architecture cost
-- suggest_cost_optimization: Find cost-saving alternatives
-- get_service_alternatives: Get equivalent services across cloud providers
-- validate_architecture: Check architecture for best practices
-
-Guidelines:
-- Always use tools to get accurate service information and costs
-- Provide specific, actionable recommendations
-- Consider security, scalability, and cost in all designs
-- Explain trade-offs between different approaches
-- Follow cloud best practices (high availability, disaster recovery, monitoring)
-
-CRITICAL OUTPUT FORMAT:
-You MUST return your response in this EXACT JSON structure, followed by detailed markdown reasoning:
-
-```json
-{
-  "architecture": {
-    "title": "Project Title",
-    "description": "Brief project description",
-    "provider": "aws|azure|gcp",
-    "total_cost": 229.00,
-    "services": [
-      {
-        "id": "service-1",
-        "name": "EC2 Instance",
-        "type": "compute",
-        "cost": 29.20,
-        "description": "Primary application server",
-        "icon": "server",
-        "position": {"x": 300, "y": 200}
-      }
-    ],
-    "connections": [
-      {"from": "service-1", "to": "service-2", "type": "HTTP/HTTPS"}
-    ],
-    "alternatives": [
-      {
-        "service_id": "service-1",
-        "alternative_name": "EC2 t3.small",
-        "cost": 14.60,
-        "savings": 14.60,
-        "performance": 70,
-        "description": "Smaller instance size"
-      }
-    ]
-  }
-}
-```
-
-IMPORTANT NODE POSITIONING RULES:
-- Space nodes FAR APART to prevent visual clutter and make connections clearly visible
-- Minimum horizontal spacing between nodes: 400 pixels
-- Minimum vertical spacing between nodes: 300 pixels
-- Arrange nodes in logical layers (e.g., frontend at top, backend in middle, data at bottom)
-- Example positions for a 5-node architecture:
-  * Node 1 (frontend): {"x": 100, "y": 100}
-  * Node 2 (app server): {"x": 100, "y": 500}
-  * Node 3 (database): {"x": 100, "y": 900}
-  * Node 4 (storage): {"x": 600, "y": 500}
-  * Node 5 (cache): {"x": 600, "y": 900}
-- This generous spacing ensures connection lines are easily visible and the diagram remains readable
-
-Then provide detailed markdown explanation with:
-- Architecture overview
-- Security best practices
-- Cost breakdown
-- Optimization recommendations
-- Implementation steps"""
-
-        # Create agent with tools
-        self.agent = Agent(
-            model=self.model,
-            system_prompt=system_prompt,
-            tools=[
-                get_aws_service_info,
-                calculate_architecture_cost,
-                suggest_cost_optimization,
-                get_service_alternatives,
-                validate_architecture
-            ]
-        )
+        # System prompt for architecture agent (static, so it can be cached as a prefix)
+        self.prompts = get_prompt_registry()
+        self.system_prompt = self.prompts.system_prompt(compact=False)
+        self.last_usage = {}
+
+        # Tools for the Strands agents (one short-lived agent per call, see _session_agent)
+        self.tools = [
+            get_aws_service_info,
+            calculate_architecture_cost,
+            suggest_cost_optimization,
+            get_service_alternatives,
+            validate_architecture
+        ]
 
     def generate_architecture(self, requirements: str) -> str:
         """
@@ -146,21 +78,138 @@ Then provide detailed markdown explanation with:
         Returns:
             Agent's architecture recommendation
         """
-        prompt = f"""Design a cloud architecture based on these requirements:
+        prompt = self.prompts.render("generate_architecture", requirements=requirements)
+
+        return self._invoke("generate_architecture", prompt)
+
+    def generate_architecture_structured(self, requirements: str) -> Tuple[Optional[Dict], str]:
+        """
+        Generate an architecture as schema-validated JSON
+
+        Claude is forced to call a single tool whose input schema is the
+        architecture JSON Schema, so the reply is structured by construction
+        and the long format instructions are left out of the prompt.
+
+        Args:
+            requirements: User's architecture requirements
+
+        Returns:
+            Tuple of (architecture_json or None, markdown reasoning or raw reply)
+        """
+        prompt = self.prompts.render("generate_architecture_structured", requirements=requirements)
+        response = self.model.client.converse(
+            modelId=self.model_id,
+            system=self._system_blocks(self.prompts.system_prompt(compact=False, structured=True)),
+            messages=[{"role": "user", "content": [{"text": prompt}]}],
+            toolConfig={
+                "tools": self._cache_point([{
+                    "toolSpec": {
+                        "name": "submit_architecture",
+                        "description": "Submit the designed cloud architecture",
+                        "inputSchema": {"json": get_architecture_schema()}
+                    }
+                }]),
+                "toolChoice": {"tool": {"name": "submit_architecture"}}
+            },
+            inferenceConfig={"maxTokens": 4096}
+        )
+        self.last_usage = get_usage_metrics().record_bedrock(
+            "generate_architecture_structured",
+            response.get("usage", {})
+        )
+
+        content = response["output"]["message"]["content"]
+        tool_input = next((block["toolUse"]["input"] for block in content if "toolUse" in block), None)
+        document = parse_architecture_document(tool_input) if tool_input else None
+        if document is None:
+            return None, "".join(block.get("text", "") for block in content)
+
+        return to_architecture_json(document)
+
+    def generate_architecture_json(self, requirements: str) -> str:
+        """
+        Phase one of two-phase generation: architecture JSON only
+
+        No tools and a small output budget, so the diagram is ready after a
+        single short call. The system prompt is unchanged, keeping the
+        cached prefix valid.
+
+        Args:
+            requirements: User's architecture requirements
+
+        Returns:
+            Model response containing the architecture JSON block
+        """
+        prompt = self.prompts.render("generate_architecture_json", requirements=requirements)
+        return self._converse(
+            "generate_architecture_json",
+            prompt,
+            int(os.getenv("FAST_JSON_MAX_TOKENS", "1536"))
+        )
+
+    def explain_architecture(self, requirements: str, architecture_json: Dict) -> str:
+        """
+        Phase two of two-phase generation: markdown reasoning for an architecture
+
+        Args:
+            requirements: Requirements the architecture was generated for
+            architecture_json: Architecture JSON returned by phase one
+
+        Returns:
+            Markdown explanation
+        """
+        prompt = self.prompts.render(
+            "explain_architecture",
+            requirements=requirements,
+            architecture=json.dumps(architecture_json, separators=(",", ":"))
+        )
+        return self._converse("explain_architecture", prompt, 4096)
+
+    def _cache_point(self, blocks: List[Dict]) -> List[Dict]:
+        """Append a Bedrock cache point to system or tool blocks when BEDROCK_PROMPT_CACHING is on"""
+        if self.prompt_caching:
+            return blocks + [{"cachePoint": {"type": "default"}}]
+        return blocks
+
+    def _system_blocks(self, system_prompt: str) -> List[Dict]:
+        """Converse system blocks for a static system prompt, cached as a prefix"""
+        return self._cache_point([{"text": system_prompt}])
+
+    def _converse(self, operation: str, prompt: str, max_tokens: int) -> str:
+        """Single tool-free Bedrock call with the agent's system prompt; records usage"""
+        response = self.model.client.converse(
+            modelId=self.model_id,
+            system=self._system_blocks(self.system_prompt),
+            messages=[{"role": "user", "content": [{"text": prompt}]}],
+            inferenceConfig={"maxTokens": max_tokens}
+        )
+        self.last_usage = get_usage_metrics().record_bedrock(operation, response.get("usage", {}))
+        return response["output"]["message"]["content"][0]["text"]
 
-{requirements}
+    def refine_draft(self, requirements: str, draft_json: Dict) -> str:
+        """
+        Adapt a retrieved architecture to new requirements
 
-Please:
-1. Recommend specific AWS services (use get_aws_service_info for details)
-2. Calculate the total cost (use calculate_architecture_cost)
-3. Suggest how services should connect
-4. Validate the architecture (use validate_architecture)
-5. Provide security best practices
-6. Suggest cost optimizations if possible
+        The model returns only the changes (see utils/architecture_delta.py),
+        which is far less output than a full architecture.
 
-Be specific and provide a complete, production-ready architecture."""
+        Args:
+            requirements: User's architecture requirements
+            draft_json: Closest previous architecture ({"architecture": {...}})
 
-        return self.agent(prompt)
+        Returns:
+            Model response containing the delta JSON block
+        """
+        prompt = self.prompts.render(
+            "refine_draft",
+            requirements=requirements,
+            draft=json.dumps(draft_json, separators=(",", ":"))
+        )
+        return self._converse(
+            "refine_draft",
+            prompt,
+            int(os.getenv("DRAFT_DELTA_MAX_TOKENS", "1024"))
+        )
 
     def optimize_architecture(self, current_architecture: str, optimization_goal: str) -> str:
         """
@@ -173,22 +222,13 @@ Be specific and provide a complete, production-ready architecture."""
         Returns:
             Optimization recommendations
         """
-        prompt = f"""Analyze and optimize this architecture with goal: {optimization_goal}
-
-Current Architecture:
-{current_architecture}
-
-Please:
-1. Identify optimization opportunities using suggest_cost_optimization
-2. Calculate potential savings
-3. Suggest alternative services where beneficial
-4. Maintain or improve performance
-5. Ensure security is not compromised
-6. Provide implementation steps
-
-Focus on practical, high-impact optimizations."""
+        prompt = self.prompts.render(
+            "optimize_architecture",
+            optimization_goal=optimization_goal,
+            current_architecture=current_architecture
+        )
 
-        return self.agent(prompt)
+        return self._invoke("optimize_architecture", prompt)
 
     def validate_design(self, architecture_description: str) -> str:
         """
@@ -200,19 +240,9 @@ Focus on practical, high-impact optimizations."""
         Returns:
             Validation results with recommendations
         """
-        prompt = f"""Validate this cloud architecture design:
-
-{architecture_description}
-
-Use the validate_architecture tool and provide:
-1. Validation results
-2. Security concerns
-3. Scalability issues
-4. Best practice violations
-5. Recommended improvements
-6. Priority of each issue"""
+        prompt = self.prompts.render("validate_design", architecture_description=architecture_description)
 
-        return self.agent(prompt)
+        return self._invoke("validate_design", prompt)
 
     def compare_providers(self, service_name: str) -> str:
         """
@@ -224,16 +254,9 @@ Use the validate_architecture tool and provide:
         Returns:
             Comparison across AWS, Azure, GCP
         """
-        prompt = f"""Compare the service "{service_name}" across AWS, Azure, and Google Cloud.
+        prompt = self.prompts.render("compare_providers", service_name=service_name)
 
-Use get_service_alternatives tool and provide:
-1. Equivalent services in each cloud
-2. Key feature differences
-3. Cost comparison (if available)
-4. When to choose each provider
-5. Migration considerations"""
-
-        return self.agent(prompt)
+        return self._invoke("compare_providers", prompt)
 
     def answer_question(self, question: str, context: Optional[str] = None) -> str:
         """
@@ -247,15 +270,122 @@ Use get_service_alternatives tool and provide:
             Agent's answer
         """
         if context:
-            prompt = f"""Context: {context}
+            prompt = self.prompts.render("answer_question", context=context, question=question)
+        else:
+            prompt = question
 
-Question: {question}
+        return self._invoke("answer_question", prompt)
+
+    def chat(self, question: str, history: List[Dict[str, str]], context: Optional[str] = None) -> str:
+        """
+        Answer a chat question against an explicit, bounded history
+
+        Nothing is kept between calls: a short-lived Strands agent is built
+        around the history.
+
+        Args:
+            question: User's question
+            history: Prior messages [{"role", "content"}], summary included
+            context: Optional context about their architecture
 
-Provide a clear, practical answer using tools if needed."""
+        Returns:
+            Agent's answer
+        """
+        if context:
+            prompt = self.prompts.render("answer_question", context=context, question=question)
         else:
             prompt = question
 
-        return self.agent(prompt)
+        result = self._session_agent(history)(prompt)
+        self.last_usage = get_usage_metrics().record_bedrock("chat", result.metrics.accumulated_usage)
+        return result
+
+    def summarize_conversation(self, summary: str, messages: List[Dict[str, str]]) -> str:
+        """
+        Fold messages into a rolling conversation summary (no tools, short output)
+
+        Args:
+            summary: Previous summary (may be empty)
+            messages: Messages to fold in
+
+        Returns:
+            Updated summary
+        """
+        prompt = self.prompts.render(
+            "summarize_conversation",
+            summary=summary or "(none)",
+            transcript=format_transcript(messages)
+        )
+        response = self.model.client.converse(
+            modelId=self.model_id,
+            messages=[{"role": "user", "content": [{"text": prompt}]}],
+            inferenceConfig={"maxTokens": 512, "temperature": 0.2}
+        )
+        get_usage_metrics().record_bedrock("summarize_conversation", response.get("usage", {}))
+        return response["output"]["message"]["content"][0]["text"]
+
+    def continue_generation(self, requirements: str, partial: str) -> str:
+        """
+        Request only the missing tail of a truncated architecture response
+
+        The partial response is sent as a prefilled assistant turn, so Claude
+        resumes mid-token instead of regenerating the whole answer.
+
+        Args:
+            requirements: Requirements the response was generated for
+            partial: Truncated response text
+
+        Returns:
+            Continuation text (to be appended to partial)
+        """
+        prompt = self.prompts.render("generate_architecture", requirements=requirements)
+        response = self.model.client.converse(
+            modelId=self.model_id,
+            system=self._system_blocks(self.system_prompt),
+            messages=[
+                {"role": "user", "content": [{"text": prompt}]},
+                # Bedrock rejects assistant prefills ending in whitespace
+                {"role": "assistant", "content": [{"text": partial.rstrip()}]}
+            ],
+            inferenceConfig={"maxTokens": int(os.getenv("CONTINUE_MAX_TOKENS", "2048"))}
+        )
+        self.last_usage = get_usage_metrics().record_bedrock("continue_generation", response.get("usage", {}))
+        return response["output"]["message"]["content"][0]["text"]
+
+    def _session_agent(self, history: Optional[List[Dict[str, str]]] = None) -> Agent:
+        """
+        Short-lived Strands agent for one call
+
+        Agents keep their conversation in agent.messages and are not safe to
+        share between concurrent requests, so every call gets its own; the
+        model (and its thread-safe boto3 client) is shared.
+        """
+        return Agent(
+            model=self.model,
+            system_prompt=self.system_prompt,
+            tools=self.tools,
+            messages=[{"role": m["role"], "content": [{"text": m["content"]}]} for m in history or []],
+            callback_handler=None
+        )
+
+    def _invoke(self, operation: str, prompt: str):
+        """Call a fresh Strands agent and record this call's token usage"""
+        result = self._session_agent()(prompt)
+        self.last_usage = get_usage_metrics().record_bedrock(operation, result.metrics.accumulated_usage)
+        return result
+
+    def warm_up(self):
+        """
+        Send a one-token request to Bedrock so the first user request
+        does not pay for connection setup and credential resolution
+
+        Bypasses the Strands agent (no tools, one-token output).
+        """
+        self.model.client.converse(
+            modelId=self.model_id,
+            messages=[{"role": "user", "content": [{"text": "ping"}]}],
+            inferenceConfig={"maxTokens": 1}
+        )
 
 
 # Singleton instance
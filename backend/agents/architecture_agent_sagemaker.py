@@ -1,22 +1,23 @@
-"""Strands Agent for Cloud Architecture - SageMaker/NVIDIA NIM Version
+"""Architecture Agent for Cloud Architecture - SageMaker/NVIDIA NIM Version
 
 This version uses:
 - Llama 3.1 Nemotron Nano 8B (NVIDIA NIM on SageMaker)
-- Custom cloud architecture tools
+- Direct chat-completion calls (SageMakerNIMModel does not implement the
+  Strands streaming model interface, so it cannot drive a Strands Agent)
 
 Required for NVIDIA-AWS Hackathon.
 """
 
 import os
-from typing import Optional
-from strands import Agent
+import json
+from typing import Dict, List, Optional, Tuple
 from backend.models.sagemaker_model import SageMakerNIMModel
-from backend.tools.cloud_tools import (
-    get_aws_service_info,
-    calculate_architecture_cost,
-    suggest_cost_optimization,
-    get_service_alternatives,
-    validate_architecture
+from backend.prompts.registry import get_prompt_registry
+from backend.utils.conversation_store import format_transcript
+from backend.utils.structured_output import (
+    get_architecture_schema,
+    parse_architecture_document,
+    to_architecture_json
 )
 
 
@@ -26,7 +27,7 @@ class ArchitectureAgentSageMaker:
 
     Features:
     - Llama 3.1 Nemotron Nano 8B for architecture generation
-    - Custom tools for cloud service information and cost calculation
+    - System prompt sent as a cacheable prefix on every call
     """
 
     def __init__(
@@ -47,107 +48,24 @@ class ArchitectureAgentSageMaker:
         print(f"🚀 Initializing Architecture Agent (NVIDIA-AWS Hackathon Version)")
         print(f"{'='*80}")
 
-        # Initialize NVIDIA Llama 3.1 Nemotron NIM on SageMaker
+        # System prompt for architecture agent (static, so it can be cached as a prefix).
+        # The NIM runs without tools, so the prompt must not advertise any.
+        self.prompts = get_prompt_registry()
+        self.system_prompt = self.prompts.system_prompt(compact=True, tools=False)
+        self.last_usage = {}
+
+        # Initialize NVIDIA Llama 3.1 Nemotron NIM on SageMaker. The system
+        # prompt is sent as an identical leading message on every call so the
+        # NIM can reuse its KV cache for that prefix.
         self.model = SageMakerNIMModel(
             endpoint_name=llm_endpoint or os.getenv("SAGEMAKER_ENDPOINT_NAME"),
             region_name=self.region,
             temperature=0.7,
-            streaming=False
-        )
-
-        # System prompt for architecture agent
-        system_prompt = """You are an expert cloud architecture AI agent specialized in AWS, Azure, and Google Cloud Platform.
-
-Your role is to help users design optimal, secure, and cost-effective cloud architectures.
-
-Key Responsibilities:
-1. Analyze user requirements and recommend appropriate cloud services
-2. Design complete architectures with proper service connections
-3. Estimate costs accurately using your tools
-4. Suggest cost optimizations and alternatives
-5. Validate architectures for best practices and security
-6. Provide clear reasoning for your recommendations
-
-Available Tools:
-- get_aws_service_info: Get details about AWS services
-- calculate_architecture_cost: Calculate total architecture cost
-- suggest_cost_optimization: Find cost-saving alternatives
-- get_service_alternatives: Get equivalent services across cloud providers
-- validate_architecture: Check architecture for best practices
-
-Guidelines:
-- Always use tools to get accurate service information and costs
-- Provide specific, actionable recommendations
-- Consider security, scalability, and cost in all designs
-- Explain trade-offs between different approaches
-- Follow cloud best practices (high availability, disaster recovery, monitoring)
-
-CRITICAL OUTPUT FORMAT:
-You MUST return your response in this EXACT JSON structure, followed by detailed markdown reasoning:
-
-```json
-{
-  "architecture": {
-    "title": "Project Title",
-    "description": "Brief project description",
-    "provider": "aws|azure|gcp",
-    "total_cost": 229.00,
-    "services": [
-      {
-        "id": "service-1",
-        "name": "EC2 Instance",
-        "type": "compute",
-        "cost": 29.20,
-        "description": "Primary application server",
-        "icon": "server",
-        "position": {"x": 300, "y": 200}
-      }
-    ],
-    "connections": [
-      {"from": "service-1", "to": "service-2", "type": "HTTP/HTTPS"}
-    ],
-    "alternatives": [
-      {
-        "service_id": "service-1",
-        "alternative_name": "EC2 t3.small",
-        "cost": 14.60,
-        "savings": 14.60,
-        "performance": 70,
-        "description": "Smaller instance size"
-      }
-    ]
-  }
-}
-```
-
-IMPORTANT NODE POSITIONING RULES:
-- Space nodes FAR APART to prevent visual clutter
-- Minimum horizontal spacing: 400 pixels
-- Minimum vertical spacing: 300 pixels
-- Arrange in logical layers (frontend, backend, data)
-
-Then provide detailed markdown explanation with:
-- Architecture overview
-- Security best practices
-- Cost breakdown
-- Optimization recommendations
-- Implementation steps"""
-
-        # Create agent with SageMaker model and tools
-        self.agent = Agent(
-            model=self.model,
-            system_prompt=system_prompt,
-            tools=[
-                get_aws_service_info,
-                calculate_architecture_cost,
-                suggest_cost_optimization,
-                get_service_alternatives,
-                validate_architecture
-            ]
+            streaming=False,
+            system_prompt=self.system_prompt
         )
 
         print(f"✅ Agent initialized with NVIDIA Llama 3.1 Nemotron Nano 8B")
-        print(f"   - Tools: 5 cloud architecture tools")
         print(f"{'='*80}\n")
 
     def generate_architecture(self, requirements: str) -> str:
@@ -165,30 +83,116 @@ Then provide detailed markdown explanation with:
         print(f"{'='*60}")
         print(f"Requirements: {requirements[:100]}...")
 
-        prompt = f"""Design a cloud architecture based on these requirements:
-
-{requirements}
-
-Please:
-1. Recommend specific AWS services (use get_aws_service_info for details)
-2. Calculate the total cost (use calculate_architecture_cost)
-3. Suggest how services should connect
-4. Validate the architecture (use validate_architecture)
-5. Provide security best practices
-6. Suggest cost optimizations if possible
-
-Be specific and provide a complete, production-ready architecture."""
+        prompt = self.prompts.render("generate_architecture", requirements=requirements)
 
         print(f"\n🤖 Calling Llama 3.1 Nemotron on SageMaker...")
 
         # Call agent
-        response = self.agent(prompt)
+        response = self._invoke("generate_architecture", prompt)
 
         print(f"✅ Architecture generated successfully")
         print(f"{'='*60}\n")
 
         return response
 
+    def generate_architecture_structured(self, requirements: str) -> Tuple[Optional[Dict], str]:
+        """
+        Generate an architecture as schema-validated JSON
+
+        The NIM decodes against the architecture JSON Schema (guided_json),
+        so the reply always parses and the prompt needs no format
+        instructions. Tools are not used in this mode.
+
+        Args:
+            requirements: User's architecture requirements
+
+        Returns:
+            Tuple of (architecture_json or None, markdown reasoning or raw reply)
+        """
+        print(f"\n🧩 Structured architecture generation (guided JSON)")
+
+        prompt = self.prompts.render("generate_architecture_structured", requirements=requirements)
+        text = self.model.invoke_with_messages(
+            [
+                {"role": "system", "content": self.prompts.system_prompt(compact=True, structured=True)},
+                {"role": "user", "content": prompt}
+            ],
+            guided_json=get_architecture_schema(),
+            operation="generate_architecture_structured"
+        )
+
+        document = parse_architecture_document(text)
+        if document is None:
+            return None, text
+
+        return to_architecture_json(document)
+
+    def generate_architecture_json(self, requirements: str) -> str:
+        """
+        Phase one of two-phase generation: architecture JSON only
+
+        No tools and a small output budget, so the diagram is ready after a
+        single short call.
+
+        Args:
+            requirements: User's architecture requirements
+
+        Returns:
+            Model response containing the architecture JSON block
+        """
+        prompt = self.prompts.render("generate_architecture_json", requirements=requirements)
+        return self.model.invoke_with_messages(
+            [{"role": "user", "content": prompt}],
+            max_tokens=int(os.getenv("FAST_JSON_MAX_TOKENS", "1536")),
+            operation="generate_architecture_json"
+        )
+
+    def explain_architecture(self, requirements: str, architecture_json: Dict) -> str:
+        """
+        Phase two of two-phase generation: markdown reasoning for an architecture
+
+        Args:
+            requirements: Requirements the architecture was generated for
+            architecture_json: Architecture JSON returned by phase one
+
+        Returns:
+            Markdown explanation
+        """
+        prompt = self.prompts.render(
+            "explain_architecture",
+            requirements=requirements,
+            architecture=json.dumps(architecture_json, separators=(",", ":"))
+        )
+        return self.model.invoke_with_messages(
+            [{"role": "user", "content": prompt}],
+            operation="explain_architecture"
+        )
+
+    def refine_draft(self, requirements: str, draft_json: Dict) -> str:
+        """
+        Adapt a retrieved architecture to new requirements
+
+        The model returns only the changes (see utils/architecture_delta.py),
+        which is far less output than a full architecture.
+
+        Args:
+            requirements: User's architecture requirements
+            draft_json: Closest previous architecture ({"architecture": {...}})
+
+        Returns:
+            Model response containing the delta JSON block
+        """
+        prompt = self.prompts.render(
+            "refine_draft",
+            requirements=requirements,
+            draft=json.dumps(draft_json, separators=(",", ":"))
+        )
+        return self.model.invoke_with_messages(
+            [{"role": "user", "content": prompt}],
+            max_tokens=int(os.getenv("DRAFT_DELTA_MAX_TOKENS", "1024")),
+            operation="refine_draft"
+        )
+
     def optimize_architecture(self, current_architecture: str, optimization_goal: str) -> str:
         """
         Optimize existing architecture
@@ -205,23 +209,14 @@ Be specific and provide a complete, production-ready architecture."""
         print(f"{'='*60}")
         print(f"Goal: {optimization_goal}")
 
-        prompt = f"""Analyze and optimize this architecture with goal: {optimization_goal}
-
-Current Architecture:
-{current_architecture}
-
-Please:
-1. Identify optimization opportunities using suggest_cost_optimization
-2. Calculate potential savings
-3. Suggest alternative services where beneficial
-4. Maintain or improve performance
-5. Ensure security is not compromised
-6. Provide implementation steps
-
-Focus on practical, high-impact optimizations."""
+        prompt = self.prompts.render(
+            "optimize_architecture",
+            optimization_goal=optimization_goal,
+            current_architecture=current_architecture
+        )
 
         print(f"\n🤖 Calling Llama 3.1 Nemotron on SageMaker...")
-        response = self.agent(prompt)
+        response = self._invoke("optimize_architecture", prompt)
 
         print(f"✅ Optimization completed")
         print(f"{'='*60}\n")
@@ -238,19 +233,9 @@ Focus on practical, high-impact optimizations."""
         Returns:
             Validation results with recommendations
         """
-        prompt = f"""Validate this cloud architecture design:
-
-{architecture_description}
-
-Use the validate_architecture tool and provide:
-1. Validation results
-2. Security concerns
-3. Scalability issues
-4. Best practice violations
-5. Recommended improvements
-6. Priority of each issue"""
+        prompt = self.prompts.render("validate_design", architecture_description=architecture_description)
 
-        return self.agent(prompt)
+        return self._invoke("validate_design", prompt)
 
     def compare_providers(self, service_name: str) -> str:
         """
@@ -262,16 +247,9 @@ Use the validate_architecture tool and provide:
         Returns:
             Comparison across AWS, Azure, GCP
         """
-        prompt = f"""Compare the service "{service_name}" across AWS, Azure, and Google Cloud.
+        prompt = self.prompts.render("compare_providers", service_name=service_name)
 
-Use get_service_alternatives tool and provide:
-1. Equivalent services in each cloud
-2. Key feature differences
-3. Cost comparison (if available)
-4. When to choose each provider
-5. Migration considerations"""
-
-        return self.agent(prompt)
+        return self._invoke("compare_providers", prompt)
 
     def answer_question(self, question: str, context: Optional[str] = None) -> str:
         """
@@ -285,15 +263,104 @@ Use get_service_alternatives tool and provide:
             Agent's answer
         """
         if context:
-            prompt = f"""Context: {context}
+            prompt = self.prompts.render("answer_question", context=context, question=question)
+        else:
+            prompt = question
 
-Question: {question}
+        return self._invoke("answer_question", prompt)
 
-Provide a clear, practical answer using tools if needed."""
+    def chat(self, question: str, history: List[Dict[str, str]], context: Optional[str] = None) -> str:
+        """
+        Answer a chat question against an explicit, bounded history
+
+        Nothing accumulates between calls: the history is sent as prior
+        messages of a single request.
+
+        Args:
+            question: User's question
+            history: Prior messages [{"role", "content"}], summary included
+            context: Optional context about their architecture
+
+        Returns:
+            Agent's answer
+        """
+        if context:
+            prompt = self.prompts.render("answer_question", context=context, question=question)
         else:
             prompt = question
 
-        return self.agent(prompt)
+        messages = [{"role": m["role"], "content": m["content"]} for m in history]
+        messages.append({"role": "user", "content": prompt})
+        result = self.model.invoke_with_messages(messages, operation="chat")
+        self.last_usage = self.model.last_usage
+        return result
+
+    def summarize_conversation(self, summary: str, messages: List[Dict[str, str]]) -> str:
+        """
+        Fold messages into a rolling conversation summary (no tools, short output)
+
+        Args:
+            summary: Previous summary (may be empty)
+            messages: Messages to fold in
+
+        Returns:
+            Updated summary
+        """
+        prompt = self.prompts.render(
+            "summarize_conversation",
+            summary=summary or "(none)",
+            transcript=format_transcript(messages)
+        )
+        summary = self.model.invoke_with_messages(
+            [{"role": "user", "content": prompt}],
+            max_tokens=512,
+            temperature=0.2,
+            operation="summarize_conversation"
+        )
+        return summary
+
+    def continue_generation(self, requirements: str, partial: str) -> str:
+        """
+        Request only the missing tail of a truncated architecture response
+
+        Args:
+            requirements: Requirements the response was generated for
+            partial: Truncated response text
+
+        Returns:
+            Continuation text (to be appended to partial)
+        """
+        print(f"✂️ Response truncated at {len(partial)} chars, requesting the remainder...")
+
+        prompt = self.prompts.render("generate_architecture", requirements=requirements)
+        return self.model.invoke_with_messages(
+            [
+                {"role": "user", "content": prompt},
+                {"role": "assistant", "content": partial},
+                {"role": "user", "content": self.prompts.render("continue_generation")}
+            ],
+            max_tokens=int(os.getenv("CONTINUE_MAX_TOKENS", "2048")),
+            operation="continue_generation"
+        )
+
+    def _invoke(self, operation: str, prompt: str) -> str:
+        """Call the NIM with a single user message (usage is recorded by the model)"""
+        result = self.model.invoke_with_messages([{"role": "user", "content": prompt}], operation=operation)
+        self.last_usage = self.model.last_usage
+        return result
+
+    def warm_up(self):
+        """
+        Send a one-token request to the NIM endpoint so the first user
+        request does not pay for connection setup and a cold endpoint.
+        The request carries the system prompt, so it also primes the NIM's
+        prefix cache.
+        """
+        self.model.invoke_with_messages(
+            [{"role": "user", "content": "ping"}],
+            max_tokens=1,
+            operation="warm_up"
+        )
 
 
 # Singleton instance
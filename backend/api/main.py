@@ -1,9 +1,14 @@
 """FastAPI Backend for Skyrchitect AI Agent"""
 
 import os
+import re
 import sys
+import json
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException, Depends
+from typing import TYPE_CHECKING, Any, Dict, Optional
+from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, File, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse, FileResponse
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 import logging
@@ -15,16 +20,43 @@ from backend.models.schemas import (
     ArchitectureRequirement,
     ComponentOptimizationRequest,
     DiagramAnalysisRequest,
+    ChatRequest,
+    CodeGenerationRequest,
+    DeploymentRequest,
+    ArchitectureUpdate,
     ArchitectureRecommendation,
     OptimizationSuggestion,
     AgentResponse,
     HealthCheck
 )
-from backend.agents.architecture_agent import get_architecture_agent, ArchitectureAgent
 from backend.utils.response_parser import (
+    architecture_fingerprint,
     parse_claude_architecture_response,
+    stitch_continuation,
     transform_to_ui_format
 )
+from backend.utils.json_repair import is_truncated_json
+from backend.utils.architecture_delta import parse_delta, apply_delta
+from backend.utils.readiness import get_readiness, get_model_id
+from backend.utils.usage_metrics import get_usage_metrics
+from backend.utils.endpoint_scaling import capacity_control_enabled, capacity_snapshots
+from backend.models.endpoint_pool import get_endpoint_pool
+from backend.models.embedding_model import embedding_metrics
+from backend.utils.conversation_store import get_conversation_manager, build_chat_messages
+from backend.utils.reasoning_cache import get_reasoning_cache
+from backend.utils.cache import cache_stats
+from backend.utils.architecture_store import get_architecture_store
+from backend.utils.rate_limit import rate_limit_enabled, get_tenant_limiter
+from backend.utils.payload_metrics import get_payload_metrics
+from backend.api.middleware import TenantRateLimitMiddleware, LeanResponseMiddleware, ResponseCompressionMiddleware
+from backend.api.responses import LeanJSONResponse
+from backend.api.request_body import json_body, json_body_openapi, install_body_schemas
+from backend.retrieval.retriever import rag_enabled, query_text, get_architecture_retriever
+
+if TYPE_CHECKING:
+    # Agent modules import strands, boto3 and the system prompts; they are
+    # loaded lazily by backend.utils.readiness on first use
+    from backend.agents.architecture_agent import ArchitectureAgent
 
 # Load environment variables
 load_dotenv()
@@ -41,21 +73,25 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """Application lifespan events"""
     # Startup
+    readiness = get_readiness()
     logger.info("🚀 Starting Skyrchitect AI Backend...")
     logger.info(f"   AWS Region: {os.getenv('AWS_DEFAULT_REGION', 'us-west-2')}")
-    logger.info(f"   Bedrock Model: {os.getenv('BEDROCK_MODEL_ID', 'claude-3-5-sonnet')}")
+    logger.info(f"   Model: {get_model_id(readiness.model_type)}")
 
-    try:
-        # Initialize agent
-        agent = get_architecture_agent()
-        logger.info("✅ Architecture Agent initialized successfully")
-    except Exception as e:
-        logger.error(f"❌ Failed to initialize agent: {e}")
-        logger.warning("   Agent will be initialized on first request")
+    # Build the agent and warm the endpoint in the background so the server
+    # accepts connections (and answers liveness probes) immediately
+    if os.getenv("AGENT_WARMUP", "true").lower() == "true":
+        readiness.start_warm_up()
+
+    readiness.mark_phase("startup_complete")
+    logger.info(f"⏱️ Startup complete in {readiness.phases['startup_complete']:.3f}s "
+                f"(app import: {readiness.phases.get('app_import', 0):.3f}s)")
 
     yield
 
     # Shutdown
+    if "backend.utils.diagram_preprocessing" in sys.modules:
+        sys.modules["backend.utils.diagram_preprocessing"].get_diagram_preprocessor().shutdown()
     logger.info("👋 Shutting down Skyrchitect AI Backend")
 
 
@@ -64,9 +100,21 @@ app = FastAPI(
     title="Skyrchitect AI Backend",
     description="AI-powered cloud architecture design and optimization API using AWS Bedrock and Strands Agents",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=LeanJSONResponse
 )
 
+# Per-tenant rate limits and token budgets (added first so CORS wraps its rejections)
+if rate_limit_enabled():
+    app.add_middleware(TenantRateLimitMiddleware)
+
+# Lean responses (Prefer: return=minimal or LEAN_RESPONSES)
+app.add_middleware(LeanResponseMiddleware)
+
+# gzip/brotli and payload-size metrics
+if os.getenv("RESPONSE_COMPRESSION", "true").lower() == "true":
+    app.add_middleware(ResponseCompressionMiddleware)
+
 # Configure CORS for frontend
 app.add_middleware(
     CORSMiddleware,
@@ -81,6 +129,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Document the bodies of routes that validate raw JSON (json_body)
+install_body_schemas(app)
+
 
 # Dependency to get agent (supports both Bedrock and SageMaker)
 def get_agent():
@@ -91,25 +142,12 @@ def get_agent():
     - 'sagemaker': NVIDIA NIMs on SageMaker (NVIDIA-AWS Hackathon)
     - 'bedrock': AWS Bedrock Claude (AWS AI Agent Hackathon)
 
-    Set MODEL_TYPE environment variable to choose backend.
+    Set MODEL_TYPE environment variable to choose backend. The agent is
+    constructed once (in the background at startup, or on first request)
+    and cached afterwards.
     """
     try:
-        model_type = os.getenv("MODEL_TYPE", "sagemaker").lower()
-
-        logger.info(f"🔧 Using model type: {model_type}")
-
-        if model_type == "sagemaker":
-            # NVIDIA-AWS Hackathon: Use Llama 3.1 Nemotron + Embedding NIM on SageMaker
-            from backend.agents.architecture_agent_sagemaker import get_architecture_agent_sagemaker
-            logger.info("✅ Loading SageMaker agent (NVIDIA NIMs)")
-            return get_architecture_agent_sagemaker()
-        elif model_type == "bedrock":
-            # AWS AI Agent Hackathon: Use Claude Sonnet 4 on Bedrock
-            from backend.agents.architecture_agent import get_architecture_agent
-            logger.info("✅ Loading Bedrock agent (Claude Sonnet 4)")
-            return get_architecture_agent()
-        else:
-            raise ValueError(f"Unknown MODEL_TYPE: {model_type}. Use 'sagemaker' or 'bedrock'")
+        return get_readiness().get_agent()
 
     except Exception as e:
         logger.error(f"❌ Failed to get agent: {e}")
@@ -120,33 +158,67 @@ def get_agent():
         )
 
 
-# Health check endpoint
-@app.get("/", response_model=HealthCheck)
-async def root():
-    """API root and health check"""
-    model_type = os.getenv("MODEL_TYPE", "sagemaker").lower()
+def resolve_architecture(architecture_id: str, version: Optional[int] = None) -> Dict[str, Any]:
+    """Load a stored architecture (UI format) or raise 404"""
+    stored = get_architecture_store().get(architecture_id, version)
+    if stored is None:
+        suffix = f" version {version}" if version else ""
+        raise HTTPException(status_code=404, detail=f"Architecture not found: {architecture_id}{suffix}")
+    return stored["data"]
+
 
+def request_architecture(req: Any) -> Optional[Dict[str, Any]]:
+    """
+    Architecture of a code generation or deployment request
+
+    The inline architecture is already a plain dict; otherwise the stored
+    one is loaded (404 if missing).
+    """
+    if req.architecture is not None:
+        return req.architecture
+    if req.architecture_id:
+        return resolve_architecture(req.architecture_id, req.version)
+    return None
+
+
+def index_generated_architecture(architecture_id: str, architecture_json: Dict[str, Any], provider: str):
+    """Add a generated architecture to the retrieval index (runs off the event loop; failures are logged)"""
     try:
-        agent = get_agent()
-        agent_ready = True
-        bedrock_connected = (model_type == "bedrock")
+        get_architecture_retriever().add_generated(architecture_id, architecture_json, provider)
     except Exception as e:
-        logger.warning(f"Agent not ready: {e}")
-        agent_ready = False
-        bedrock_connected = False
+        logger.warning(f"⚠️ Could not index architecture {architecture_id} for retrieval: {e}")
+
+
+def complete_truncated_response(agent: "ArchitectureAgent", requirements_text: str, response_text: str) -> str:
+    """
+    Fetch the missing tail of a response cut off by max_tokens
+
+    Only the remainder is generated (at most JSON_CONTINUATIONS extra calls);
+    whatever is still missing afterwards is closed by the JSON repair parser.
+    """
+    for _ in range(int(os.getenv("JSON_CONTINUATIONS", "1"))):
+        if not is_truncated_json(response_text):
+            break
+        logger.warning(f"✂️ Architecture JSON truncated at {len(response_text)} chars, requesting the remainder")
+        tail = agent.continue_generation(requirements_text, response_text)
+        response_text = stitch_continuation(response_text, str(tail))
+
+    return response_text
+
 
-    # Determine model ID based on type
-    if model_type == "sagemaker":
-        model_id = f"sagemaker:{os.getenv('SAGEMAKER_ENDPOINT_NAME', 'llama-nemotron-endpoint')}"
-    else:
-        model_id = os.getenv("BEDROCK_MODEL_ID", "anthropic.claude-3-5-sonnet-20241022-v2:0")
+# Health check endpoint
+@app.get("/", response_model=HealthCheck)
+async def root():
+    """API root and health check (reads cached agent state, never builds the agent)"""
+    readiness = get_readiness()
+    agent_ready = readiness.ready
 
     return HealthCheck(
         status="healthy" if agent_ready else "degraded",
         version="1.0.0-nvidia-aws-hackathon",
         agent_ready=agent_ready,
-        bedrock_connected=bedrock_connected,
-        model_id=model_id
+        bedrock_connected=agent_ready and readiness.model_type == "bedrock",
+        model_id=get_model_id(readiness.model_type)
     )
 
 
@@ -156,12 +228,105 @@ async def health_check():
     return {"status": "ok", "service": "Skyrchitect AI Backend"}
 
 
+@app.get("/health/live")
+async def liveness():
+    """Liveness probe: the process is up and serving requests"""
+    return {"status": "ok"}
+
+
+@app.get("/health/ready")
+async def readiness_probe():
+    """Readiness probe: 200 once the agent is built, 503 while cold/warming/failed"""
+    readiness = get_readiness()
+    return JSONResponse(
+        status_code=200 if readiness.ready else 503,
+        content={"status": readiness.status, "agent_ready": readiness.ready}
+    )
+
+
+@app.get("/health/startup")
+async def startup_report():
+    """Startup phase timings and current agent state"""
+    return get_readiness().startup_report()
+
+
+@app.get("/api/metrics/usage")
+async def usage_metrics():
+    """Model token usage, including input tokens served from the prompt cache"""
+    return get_usage_metrics().snapshot()
+
+
+@app.get("/api/metrics/capacity")
+async def capacity_metrics():
+    """NIM endpoint capacity, in-flight and queued requests (NIM_CAPACITY_CONTROL)"""
+    return {"enabled": capacity_control_enabled(), "endpoints": capacity_snapshots()}
+
+
+@app.get("/api/metrics/endpoints")
+async def endpoint_pool_metrics():
+    """Per-endpoint load, latency and ejection state of the NIM endpoint pool (NIM_ENDPOINT_POOL)"""
+    pool = get_endpoint_pool()
+    return {"enabled": pool is not None, "targets": pool.snapshot() if pool else []}
+
+
+@app.get("/api/metrics/tenants")
+async def tenant_metrics():
+    """Per-tenant limits, admitted/rejected requests and model tokens used today (RATE_LIMIT_ENABLED)"""
+    if not rate_limit_enabled():
+        return {"enabled": False, "tenants": {}}
+    return {"enabled": True, **get_tenant_limiter().snapshot()}
+
+
+@app.get("/api/metrics/caches")
+async def cache_metrics():
+    """Backend and hit/miss counters of each cache (reasoning, codegen, embedding) in this worker"""
+    return cache_stats()
+
+
+@app.get("/api/metrics/embeddings")
+async def embedding_client_metrics():
+    """Embedding NIM client throughput, batches and cache hit rate"""
+    return embedding_metrics()
+
+
+@app.get("/api/metrics/payloads")
+async def payload_metrics():
+    """Response bytes per route before and after compression (RESPONSE_COMPRESSION)"""
+    return get_payload_metrics().snapshot()
+
+
 # AI Agent Endpoints
 
+def format_requirements(req: ArchitectureRequirement) -> str:
+    """Requirements text sent to the model for a generation request"""
+    requirements_text = f"""
+Title: {req.title}
+Description: {req.description}
+Cloud Provider: {req.provider.value}
+Optimization Goal: {req.optimization_goal.value}
+"""
+
+    # Add requirements only if they exist and are not empty
+    if req.requirements and len(req.requirements) > 0:
+        requirements_text += f"""
+Requirements:
+{chr(10).join(f"- {r}" for r in req.requirements)}
+"""
+
+    if req.budget:
+        requirements_text += f"\nBudget: ${req.budget}/month"
+
+    if req.expected_users:
+        requirements_text += f"\nExpected Users: {req.expected_users:,}"
+
+    return requirements_text
+
+
 @app.post("/api/architecture/generate", response_model=AgentResponse)
 async def generate_architecture(
     req: ArchitectureRequirement,
-    agent: ArchitectureAgent = Depends(get_agent)
+    background_tasks: BackgroundTasks,
+    agent: "ArchitectureAgent" = Depends(get_agent)
 ):
     """
     Generate cloud architecture based on requirements using AI agent
@@ -175,37 +340,55 @@ async def generate_architecture(
         logger.info(f"Optimization Goal: {req.optimization_goal.value}")
 
         # Format requirements for agent
-        requirements_text = f"""
-Title: {req.title}
-Description: {req.description}
-Cloud Provider: {req.provider.value}
-Optimization Goal: {req.optimization_goal.value}
-"""
-
-        # Add requirements only if they exist and are not empty
-        if req.requirements and len(req.requirements) > 0:
-            requirements_text += f"""
-Requirements:
-{chr(10).join(f"- {r}" for r in req.requirements)}
-"""
-
-        if req.budget:
-            requirements_text += f"\nBudget: ${req.budget}/month"
-
-        if req.expected_users:
-            requirements_text += f"\nExpected Users: {req.expected_users:,}"
+        requirements_text = format_requirements(req)
 
         logger.info(f"\n📤 Sending to AI:\n{requirements_text}")
 
-        # Get agent recommendation
-        response = agent.generate_architecture(requirements_text)
+        # Ground the prompt in the most similar reference/previous designs
+        prompt_requirements = requirements_text
+        if rag_enabled():
+            try:
+                # The first call builds the index (embedding probe, corpus seeding): keep it off the loop
+                retriever = await run_in_threadpool(get_architecture_retriever)
+                examples = await run_in_threadpool(
+                    retriever.few_shot_context,
+                    query_text(req.title, req.description, req.requirements), req.provider.value
+                )
+                if examples:
+                    prompt_requirements = f"{requirements_text}\n\n{examples}"
+            except Exception as e:
+                logger.warning(f"⚠️ Retrieval failed, generating without references: {e}")
+
+        if req.defer_reasoning:
+            # Two-phase generation, phase one: JSON only, explanation on demand
+            response = await run_in_threadpool(agent.generate_architecture_json, prompt_requirements)
+            # A long architecture can still hit the small output budget: fetch the rest
+            response = await run_in_threadpool(
+                complete_truncated_response, agent, prompt_requirements, str(response)
+            )
+            architecture_json, _ = parse_claude_architecture_response(response)
+            markdown_reasoning = None
+        elif os.getenv("STRUCTURED_OUTPUT", "false").lower() == "true":
+            # Schema-constrained decoding: validated JSON, no regex parsing
+            architecture_json, markdown_reasoning = await run_in_threadpool(
+                agent.generate_architecture_structured, prompt_requirements
+            )
+            response = markdown_reasoning
+        else:
+            # Get agent recommendation
+            response = await run_in_threadpool(agent.generate_architecture, prompt_requirements)
+
+            logger.info(f"\n📥 AI Response received (length: {len(str(response))} chars)")
+            logger.info(f"✅ Architecture generated successfully")
+            logger.info(f"{'='*80}\n")
 
-        logger.info(f"\n📥 AI Response received (length: {len(str(response))} chars)")
-        logger.info(f"✅ Architecture generated successfully")
-        logger.info(f"{'='*80}\n")
+            # Continue truncated output instead of paying for a full retry
+            response = await run_in_threadpool(
+                complete_truncated_response, agent, prompt_requirements, str(response)
+            )
 
-        # Parse hybrid response (JSON + markdown)
-        architecture_json, markdown_reasoning = parse_claude_architecture_response(str(response))
+            # Parse hybrid response (JSON + markdown)
+            architecture_json, markdown_reasoning = parse_claude_architecture_response(response)
 
         if architecture_json:
             logger.info(f"📊 Parsed Architecture JSON:")
@@ -213,8 +396,35 @@ Requirements:
             logger.info(f"   - Connections: {len(architecture_json.get('architecture', {}).get('connections', []))}")
             logger.info(f"   - Total Cost: ${architecture_json.get('architecture', {}).get('total_cost', 0)}/mo")
 
-            # Transform to UI format
-            ui_architecture = transform_to_ui_format(architecture_json, req.provider.value)
+            # Transform to UI format, under the content-derived id
+            ui_architecture = transform_to_ui_format(
+                architecture_json, req.provider.value, f"arch-{architecture_fingerprint(architecture_json)}"
+            )
+
+            # Persist under the content-derived id so follow-up calls can reference it
+            saved = get_architecture_store().save(
+                ui_architecture["id"],
+                ui_architecture,
+                document=architecture_json,
+                requirements=requirements_text,
+                reasoning=markdown_reasoning
+            )
+            ui_architecture["version"] = saved["version"]
+
+            if rag_enabled():
+                # Later requests can retrieve this design as a reference
+                background_tasks.add_task(
+                    index_generated_architecture, ui_architecture["id"], architecture_json, req.provider.value
+                )
+
+            if req.defer_reasoning:
+                reasoning_id = ui_architecture["id"]
+                get_reasoning_cache().register(reasoning_id, requirements_text, architecture_json)
+                ui_architecture["reasoning_id"] = reasoning_id
+                if os.getenv("REASONING_PREFETCH", "false").lower() == "true":
+                    background_tasks.add_task(
+                        get_reasoning_cache().get_or_generate, reasoning_id, agent.explain_architecture
+                    )
 
             return AgentResponse(
                 success=True,
@@ -241,29 +451,213 @@ Requirements:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/architecture/generate/draft")
+async def generate_architecture_from_draft(
+    req: ArchitectureRequirement,
+    agent: "ArchitectureAgent" = Depends(get_agent)
+):
+    """
+    Speculative generation: the closest known architecture now, the refined one when ready
+
+    Streams NDJSON events:
+    - {"event": "draft", "source", "score", "data"}: the nearest reference or
+      previously generated architecture, as a provisional result
+    - {"event": "final", "mode", "changes", "data"}: the model's edit of the
+      draft applied to it (mode "delta"), or an architecture generated from
+      scratch (mode "full") when no draft scored DRAFT_MIN_SCORE or the
+      edit could not be parsed. Carries a reasoning_id like defer_reasoning.
+    - {"event": "error", "detail"}
+    """
+    requirements_text = format_requirements(req)
+    provider = req.provider.value
+    try:
+        retriever = await run_in_threadpool(get_architecture_retriever)
+        draft = await run_in_threadpool(
+            retriever.nearest,
+            query_text(req.title, req.description, req.requirements),
+            provider,
+            float(os.getenv("DRAFT_MIN_SCORE", "0.5"))
+        )
+    except Exception as e:
+        logger.warning(f"⚠️ Retrieval failed, generating without a draft: {e}")
+        draft = None
+    draft_note = f"{draft['id']} (score {draft['score']})" if draft else "none"
+    logger.info(f"📝 Draft for '{req.title}': {draft_note}")
+
+    async def events():
+        try:
+            architecture_json, changes, mode = None, None, "full"
+            if draft:
+                ui_draft = transform_to_ui_format(draft["architecture_json"], provider, draft["id"])
+                yield json.dumps({
+                    "event": "draft",
+                    "source": draft["id"],
+                    "score": draft["score"],
+                    "data": ui_draft
+                }) + "\n"
+
+                response = await run_in_threadpool(agent.refine_draft, requirements_text, draft["architecture_json"])
+                delta = parse_delta(str(response))
+                if delta is not None:
+                    try:
+                        architecture_json, changes = apply_delta(draft["architecture_json"], delta)
+                        mode = "delta"
+                    except Exception as e:
+                        logger.warning(f"⚠️ Could not apply draft delta ({e}), generating from scratch")
+                else:
+                    logger.warning("⚠️ Could not parse draft delta, generating from scratch")
+
+            if architecture_json is None:
+                response = await run_in_threadpool(agent.generate_architecture_json, requirements_text)
+                architecture_json, _ = parse_claude_architecture_response(str(response))
+            if not architecture_json:
+                yield json.dumps({"event": "error", "detail": "Could not extract architecture JSON from response"}) + "\n"
+                return
+
+            ui_architecture = transform_to_ui_format(
+                architecture_json, provider, f"arch-{architecture_fingerprint(architecture_json)}"
+            )
+            saved = get_architecture_store().save(
+                ui_architecture["id"],
+                ui_architecture,
+                document=architecture_json,
+                requirements=requirements_text
+            )
+            ui_architecture["version"] = saved["version"]
+            get_reasoning_cache().register(ui_architecture["id"], requirements_text, architecture_json)
+            ui_architecture["reasoning_id"] = ui_architecture["id"]
+
+            yield json.dumps({"event": "final", "mode": mode, "changes": changes, "data": ui_architecture}) + "\n"
+
+            # The result becomes a draft candidate for later requests
+            await run_in_threadpool(index_generated_architecture, ui_architecture["id"], architecture_json, provider)
+        except Exception as e:
+            logger.error(f"❌ Error generating architecture from draft: {e}")
+            yield json.dumps({"event": "error", "detail": str(e)}) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+@app.get("/api/architecture/{reasoning_id}/reasoning", response_model=AgentResponse)
+async def get_architecture_reasoning(
+    reasoning_id: str,
+    agent: "ArchitectureAgent" = Depends(get_agent)
+):
+    """
+    Phase two of two-phase generation: the markdown explanation of an
+    architecture generated with defer_reasoning (generated once, then cached)
+    """
+    cache = get_reasoning_cache()
+    store = get_architecture_store()
+
+    if cache.get(reasoning_id) is None:
+        # Generated by another worker or before a restart: use the stored copy
+        stored = store.get(reasoning_id)
+        if stored and stored["reasoning"]:
+            return AgentResponse(
+                success=True,
+                message="Reasoning generated successfully",
+                data={"reasoning_id": reasoning_id},
+                reasoning=stored["reasoning"]
+            )
+        if stored and stored["document"]:
+            cache.register(reasoning_id, stored["requirements"] or "", stored["document"])
+
+    try:
+        reasoning = await cache.get_or_generate(reasoning_id, agent.explain_architecture)
+    except Exception as e:
+        logger.error(f"Error generating reasoning: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if reasoning is None:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired reasoning id: {reasoning_id}")
+
+    store.set_reasoning(reasoning_id, reasoning)
+
+    return AgentResponse(
+        success=True,
+        message="Reasoning generated successfully",
+        data={"reasoning_id": reasoning_id},
+        reasoning=reasoning
+    )
+
+
+@app.get("/api/architectures/{architecture_id}", response_model=AgentResponse)
+async def get_architecture(architecture_id: str, version: Optional[int] = None):
+    """Fetch a stored architecture (latest version unless `version` is given)"""
+    stored = get_architecture_store().get(architecture_id, version)
+    if stored is None:
+        raise HTTPException(status_code=404, detail=f"Architecture not found: {architecture_id}")
+
+    return AgentResponse(
+        success=True,
+        message=f"Architecture {architecture_id} version {stored['version']}",
+        data={**stored["data"], "version": stored["version"]},
+        reasoning=stored["reasoning"]
+    )
+
+
+@app.get("/api/architectures/{architecture_id}/versions")
+async def list_architecture_versions(architecture_id: str):
+    """Version history of a stored architecture"""
+    versions = get_architecture_store().versions(architecture_id)
+    if not versions:
+        raise HTTPException(status_code=404, detail=f"Architecture not found: {architecture_id}")
+
+    return {"architecture_id": architecture_id, "versions": versions}
+
+
+@app.put("/api/architectures/{architecture_id}", response_model=AgentResponse)
+async def update_architecture(architecture_id: str, update: ArchitectureUpdate):
+    """Save an edited architecture as a new version (no-op if unchanged)"""
+    store = get_architecture_store()
+    if store.get(architecture_id) is None:
+        raise HTTPException(status_code=404, detail=f"Architecture not found: {architecture_id}")
+
+    data = {k: v for k, v in update.data.items() if k not in ("version", "reasoning_id")}
+    data["id"] = architecture_id
+    saved = store.save(architecture_id, data, source="update")
+
+    return AgentResponse(
+        success=True,
+        message="Architecture saved" if saved["created"] else "Architecture unchanged",
+        data={**data, "version": saved["version"]}
+    )
+
+
 @app.post("/api/architecture/optimize", response_model=AgentResponse)
 async def optimize_architecture(
     req: ComponentOptimizationRequest,
-    agent: ArchitectureAgent = Depends(get_agent)
+    agent: "ArchitectureAgent" = Depends(get_agent)
 ):
     """
     Optimize existing architecture for cost or performance
     """
+    components, current_cost = req.components, req.current_cost
+    if req.architecture_id:
+        stored = resolve_architecture(req.architecture_id, req.version)
+        components = components or stored.get("components", [])
+        if current_cost is None:
+            current_cost = round(sum(c.get("cost", 0) for c in components), 2)
+    if not components:
+        raise HTTPException(status_code=422, detail="Provide components or an architecture_id")
+
     try:
         logger.info(f"Optimizing architecture (goal: {req.optimization_goal.value})")
 
         # Format current architecture
         arch_description = f"""
 Provider: {req.provider.value}
-Current Monthly Cost: ${req.current_cost}
+Current Monthly Cost: ${current_cost}
 Optimization Goal: {req.optimization_goal.value}
 
 Current Components:
-{chr(10).join(f"- {c}" for c in req.components)}
+{chr(10).join(f"- {c}" for c in components)}
 """
 
         # Get optimization recommendations
-        response = agent.optimize_architecture(
+        response = await run_in_threadpool(
+            agent.optimize_architecture,
             arch_description,
             req.optimization_goal.value
         )
@@ -275,7 +669,7 @@ Current Components:
             message="Optimization recommendations generated",
             data={
                 "optimizations": str(response),
-                "current_cost": req.current_cost,
+                "current_cost": current_cost,
                 "goal": req.optimization_goal.value
             },
             reasoning=str(response)
@@ -286,10 +680,14 @@ Current Components:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/api/architecture/validate", response_model=AgentResponse)
+@app.post(
+    "/api/architecture/validate",
+    response_model=AgentResponse,
+    openapi_extra=json_body_openapi(DiagramAnalysisRequest)
+)
 async def validate_architecture(
-    req: DiagramAnalysisRequest,
-    agent: ArchitectureAgent = Depends(get_agent)
+    req: DiagramAnalysisRequest = Depends(json_body(DiagramAnalysisRequest)),
+    agent: "ArchitectureAgent" = Depends(get_agent)
 ):
     """
     Validate architecture design and provide best practice recommendations
@@ -312,7 +710,7 @@ Connections:
             arch_description += f"\nRequirements: {req.requirements}"
 
         # Validate with agent
-        response = agent.validate_design(arch_description)
+        response = await run_in_threadpool(agent.validate_design, arch_description)
 
         logger.info("✅ Validation completed")
 
@@ -331,7 +729,7 @@ Connections:
 @app.get("/api/cloud/compare/{service_name}", response_model=AgentResponse)
 async def compare_cloud_services(
     service_name: str,
-    agent: ArchitectureAgent = Depends(get_agent)
+    agent: "ArchitectureAgent" = Depends(get_agent)
 ):
     """
     Compare a service across AWS, Azure, and GCP
@@ -339,7 +737,7 @@ async def compare_cloud_services(
     try:
         logger.info(f"Comparing service: {service_name}")
 
-        response = agent.compare_providers(service_name)
+        response = await run_in_threadpool(agent.compare_providers, service_name)
 
         return AgentResponse(
             success=True,
@@ -355,25 +753,38 @@ async def compare_cloud_services(
 
 @app.post("/api/chat", response_model=AgentResponse)
 async def chat_with_agent(
-    question: dict,
-    agent: ArchitectureAgent = Depends(get_agent)
+    req: ChatRequest,
+    background_tasks: BackgroundTasks,
+    agent: "ArchitectureAgent" = Depends(get_agent)
 ):
     """
     Ask the AI agent a question about cloud architecture
+
+    Conversations are persisted per session_id. Each turn sends only the
+    rolling summary plus a bounded window of recent messages; older
+    messages are summarized in the background after the response.
     """
     try:
-        user_question = question.get("question", "")
-        context = question.get("context", None)
+        conversations = get_conversation_manager()
+        session_id = req.session_id or conversations.new_session_id()
 
-        logger.info(f"Chat question: {user_question[:50]}...")
+        logger.info(f"Chat question [{session_id[:8]}]: {req.question[:50]}...")
 
-        response = agent.answer_question(user_question, context)
+        window = conversations.get_context(session_id)
+        history = build_chat_messages(window["summary"], window["messages"])
+
+        response = await run_in_threadpool(agent.chat, req.question, history, req.context)
+        answer = str(response)
+
+        conversations.record_turn(session_id, req.question, answer)
+        if conversations.needs_summary(session_id):
+            background_tasks.add_task(conversations.compact, session_id, agent.summarize_conversation)
 
         return AgentResponse(
             success=True,
             message="Response from AI agent",
-            data={"answer": str(response)},
-            reasoning=str(response)
+            data={"answer": answer, "session_id": session_id},
+            reasoning=answer
         )
 
     except Exception as e:
@@ -381,19 +792,112 @@ async def chat_with_agent(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/api/code/generate", response_model=AgentResponse)
+@app.delete("/api/chat/{session_id}")
+async def delete_chat_session(session_id: str):
+    """Forget a chat session"""
+    get_conversation_manager().store.delete(session_id)
+    return {"success": True, "session_id": session_id}
+
+
+@app.post("/api/diagrams/upload", response_model=AgentResponse)
+async def upload_diagram(file: UploadFile = File(...)):
+    """
+    Upload an architecture diagram (image or PDF) to S3
+
+    The file is streamed from the spooled upload (never read into memory as
+    a whole) and stored under its SHA-256, so duplicate uploads are skipped.
+    """
+    from backend.utils.s3_storage import get_s3_storage
+
+    try:
+        storage = await run_in_threadpool(get_s3_storage)
+        result = await run_in_threadpool(
+            storage.upload_diagram_stream,
+            file.file,
+            file.filename or "diagram",
+            file.content_type or "application/octet-stream"
+        )
+    finally:
+        await file.close()
+
+    if result is None:
+        raise HTTPException(status_code=503, detail="Diagram storage unavailable")
+
+    return AgentResponse(
+        success=True,
+        message="Diagram already stored" if result["deduplicated"] else "Diagram uploaded",
+        data=result
+    )
+
+
+@app.post("/api/diagrams/preprocess")
+async def preprocess_diagram(file: UploadFile = File(...)):
+    """
+    Rasterize/normalize an uploaded diagram and stream page results as NDJSON
+
+    PDFs are rendered page by page in a process pool; each line is emitted
+    as soon as its page is ready. Results are cached by content hash.
+    """
+    from backend.utils.diagram_preprocessing import get_diagram_preprocessor
+
+    preprocessor = get_diagram_preprocessor()
+
+    async def events():
+        try:
+            async for event in preprocessor.process(
+                file.file,
+                file.filename or "diagram",
+                file.content_type or "application/octet-stream"
+            ):
+                yield json.dumps(event) + "\n"
+        except Exception as e:
+            logger.error(f"❌ Diagram preprocessing failed: {e}")
+            yield json.dumps({"event": "error", "detail": str(e)}) + "\n"
+        finally:
+            await file.close()
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+@app.get("/api/diagrams/{digest}/pages/{page}")
+async def get_diagram_page(digest: str, page: int, thumbnail: bool = False):
+    """Serve a preprocessed page image (or its thumbnail)"""
+    from backend.utils.diagram_preprocessing import get_diagram_preprocessor
+
+    if not re.fullmatch(r"[0-9a-f]{64}", digest):
+        raise HTTPException(status_code=400, detail="Invalid diagram hash")
+
+    preprocessor = get_diagram_preprocessor()
+    manifest = preprocessor.load_manifest(digest)
+    if manifest is None or not 1 <= page <= len(manifest["pages"]):
+        raise HTTPException(status_code=404, detail="Page not found")
+
+    entry = manifest["pages"][page - 1]
+    filename = entry["thumbnail"] if thumbnail else entry["image"]
+    media_type = "image/jpeg" if thumbnail else "image/png"
+    return FileResponse(preprocessor.output_dir(digest) / filename, media_type=media_type)
+
+
+@app.post(
+    "/api/code/generate",
+    response_model=AgentResponse,
+    openapi_extra=json_body_openapi(CodeGenerationRequest)
+)
 async def generate_infrastructure_code(
-    request: dict
+    req: CodeGenerationRequest = Depends(json_body(CodeGenerationRequest))
 ):
     """
     Generate Infrastructure as Code (Terraform or CloudFormation) based on architecture
+
+    The architecture is sent inline ("architecture") or referenced by
+    "architecture_id" (and optional "version") from the architecture store.
     """
-    try:
-        import boto3
-        import json
+    architecture = request_architecture(req)
+    if architecture is None:
+        raise HTTPException(status_code=400, detail="architecture or architecture_id is required")
 
-        architecture = request.get("architecture")
-        code_type = request.get("code_type", "terraform")  # "terraform" or "cloudformation"
+    try:
+        code_type = req.code_type  # "terraform" or "cloudformation"
 
         logger.info(f"\n{'='*80}")
         logger.info(f"💻 CODE GENERATION REQUEST")
@@ -402,56 +906,12 @@ async def generate_infrastructure_code(
         logger.info(f"Provider: {architecture.get('provider', 'aws')}")
         logger.info(f"Components: {len(architecture.get('components', []))}")
 
-        # Create prompt for code generation
-        components_desc = "\n".join([
-            f"- {comp.get('name', 'Unknown')}: {comp.get('description', '')}"
-            for comp in architecture.get('components', [])
-        ])
-
-        prompt = f"""Generate complete, production-ready {code_type.upper()} code for this cloud architecture:
-
-Provider: {architecture.get('provider', 'aws')}
-Architecture: {architecture.get('name', 'Cloud Architecture')}
-
-Components:
-{components_desc}
-
-Requirements:
-- Include all necessary resources
-- Add proper security configurations
-- Include networking setup (VPC, subnets, security groups)
-- Add resource tags for organization
-- Include output variables for important endpoints
-- Follow best practices for {architecture.get('provider', 'aws')}
-- Keep the code concise and well-commented
-
-Return ONLY the {code_type} code, no additional explanation."""
-
-        # Use direct Bedrock API call to avoid conversation history buildup
-        bedrock = boto3.client('bedrock-runtime', region_name=os.getenv('AWS_DEFAULT_REGION', 'us-west-2'))
-
-        model_id = os.getenv('BEDROCK_MODEL_ID', 'us.anthropic.claude-sonnet-4-20250514-v1:0')
-
-        request_body = {
-            "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 4096,  # Limit response length
-            "messages": [
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ]
-        }
-
-        response = bedrock.invoke_model(
-            modelId=model_id,
-            body=json.dumps(request_body)
-        )
-
-        response_body = json.loads(response['body'].read())
-        code_response = response_body['content'][0]['text']
+        # Templates for known components, one small cached LLM call per unknown one
+        from backend.codegen.engine import get_codegen_engine
+        result = await run_in_threadpool(get_codegen_engine().generate, architecture, code_type)
+        code_response = result["code"]
 
-        logger.info(f"✅ Code generated successfully (length: {len(code_response)} chars)")
+        logger.info(f"✅ Code generated successfully (length: {len(code_response)} chars, {result['stats']})")
         logger.info(f"{'='*80}\n")
 
         return AgentResponse(
@@ -460,7 +920,9 @@ Return ONLY the {code_type} code, no additional explanation."""
             data={
                 "code": str(code_response),
                 "code_type": code_type,
-                "provider": architecture.get('provider', 'aws')
+                "provider": architecture.get('provider', 'aws'),
+                "components": result["components"],
+                "stats": result["stats"]
             },
             reasoning=str(code_response)
         )
@@ -470,79 +932,142 @@ Return ONLY the {code_type} code, no additional explanation."""
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/api/deploy", response_model=AgentResponse)
-async def deploy_architecture(
-    request: dict,
-    agent: ArchitectureAgent = Depends(get_agent)
+@app.post("/api/code/generate/stream", openapi_extra=json_body_openapi(CodeGenerationRequest))
+async def stream_infrastructure_code(
+    req: CodeGenerationRequest = Depends(json_body(CodeGenerationRequest))
 ):
     """
-    Deploy architecture to cloud provider (simulation for hackathon)
+    Generate Infrastructure as Code group by group and stream files as NDJSON
+
+    Components are split into networking, data, compute and edge groups that
+    are generated concurrently; each group's file is emitted as soon as it is
+    ready, followed by the merged providers/variables/outputs files.
+    Accepts the same body as /api/code/generate.
+    """
+    from backend.codegen.engine import get_codegen_engine
+
+    architecture = request_architecture(req)
+    if architecture is None:
+        raise HTTPException(status_code=400, detail="architecture or architecture_id is required")
+
+    code_type = req.code_type
+    logger.info(f"💻 Streaming {code_type.upper()} generation ({len(architecture.get('components', []))} components)")
+
+    async def events():
+        try:
+            async for event in get_codegen_engine().generate_stream(architecture, code_type):
+                yield json.dumps(event) + "\n"
+        except Exception as e:
+            logger.error(f"❌ Error generating code: {e}")
+            yield json.dumps({"event": "error", "detail": str(e)}) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+def prepare_deployment(req: DeploymentRequest):
     """
+    Resolve the architecture, plan the deployment and create the driver
+
+    Returns:
+        Tuple of (plan, driver, provider, region)
+    """
+    from backend.deploy.drivers import check_request_options, get_driver
+    from backend.deploy.planner import plan_deployment
+
+    architecture = request_architecture(req)
+    if architecture is None:
+        raise HTTPException(status_code=400, detail="architecture or architecture_id is required")
+
+    config = req.config
+    provider = config.provider or architecture.get("provider", "aws")
+    region = config.region
+    stack_name = config.stack_name
+
+    driver_name = config.driver or os.getenv("DEPLOY_DRIVER", "fake")
     try:
-        architecture = request.get("architecture")
-        config = request.get("config", {})
+        # Only whitelisted options come from the request (timing and failure injection stay server-side)
+        check_request_options(driver_name, config.driver_options)
+        driver = get_driver(
+            driver_name,
+            region=region,
+            stack_name=stack_name,
+            **config.driver_options
+        )
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        provider = config.get("provider", architecture.get("provider", "aws"))
-        region = config.get("region", "us-west-2")
-        stack_name = config.get("stack_name", "skyrchitect-stack")
+    return plan_deployment(architecture, stack_name), driver, provider, region
 
-        logger.info(f"Deploying to {provider} in {region}...")
 
-        # For hackathon: simulate deployment with AI-generated deployment plan
-        deployment_prompt = f"""
-Create a detailed deployment plan for the following architecture:
+@app.post("/api/deploy/plan", response_model=AgentResponse, openapi_extra=json_body_openapi(DeploymentRequest))
+async def plan_architecture_deployment(req: DeploymentRequest = Depends(json_body(DeploymentRequest))):
+    """
+    Dependency-ordered deployment plan without executing it
 
-Provider: {provider}
-Region: {region}
-Stack Name: {stack_name}
-Architecture: {architecture.get('name', 'Cloud Architecture')}
+    Returns the resource DAG, parallel waves and estimated durations.
+    """
+    plan, driver, provider, region = prepare_deployment(req)
+    return AgentResponse(
+        success=True,
+        message=f"{len(plan['resources'])} resources in {len(plan['waves'])} waves, ~{plan['estimated_seconds']}s",
+        data={**plan, "provider": provider, "region": region, "driver": driver.name}
+    )
 
-Components: {len(architecture.get('components', []))} resources
 
-Generate a step-by-step deployment plan including:
-1. Pre-deployment checks
-2. Resource creation order
-3. Configuration steps
-4. Post-deployment validation
-5. Estimated deployment time
+@app.post("/api/deploy", response_model=AgentResponse, openapi_extra=json_body_openapi(DeploymentRequest))
+async def deploy_architecture(req: DeploymentRequest = Depends(json_body(DeploymentRequest))):
+    """
+    Deploy architecture to cloud provider
 
-Format as deployment logs with timestamps.
-"""
+    The architecture is sent inline ("architecture") or referenced by
+    "architecture_id" (and optional "version"). Resources are created in
+    dependency order by the configured driver (config.driver, default
+    DEPLOY_DRIVER or "fake"); the response carries the full log.
+    """
+    from backend.deploy.executor import execute_plan, format_event
 
-        deployment_plan = agent.answer_question(deployment_prompt)
+    plan, driver, provider, region = prepare_deployment(req)
+    logger.info(f"Deploying {len(plan['resources'])} resources to {provider} in {region} ({driver.name} driver)...")
 
-        # Simulate deployment logs
+    try:
         logs = [
             f"[INFO] Initializing deployment to {provider}...",
             f"[INFO] Region: {region}",
-            f"[INFO] Stack: {stack_name}",
-            "[INFO] Validating architecture configuration...",
-            "[SUCCESS] Configuration validated",
-            "[INFO] Creating VPC and networking resources...",
-            "[SUCCESS] Network infrastructure created",
-            "[INFO] Deploying compute resources...",
-            "[SUCCESS] Compute resources deployed",
-            "[INFO] Configuring storage services...",
-            "[SUCCESS] Storage configured",
-            "[INFO] Setting up databases...",
-            "[SUCCESS] Database instances created",
-            "[INFO] Finalizing deployment...",
-            "[SUCCESS] Deployment completed successfully!",
-            f"[INFO] Access URL: https://{provider}-app-{stack_name}.example.com"
+            f"[INFO] Stack: {plan['stack_name']}",
+            f"[INFO] Plan: {len(plan['resources'])} resources in {len(plan['waves'])} waves, "
+            f"estimated {plan['estimated_seconds']}s (sequential {plan['sequential_seconds']}s)"
         ]
+        result = None
+        async for event in execute_plan(plan, driver):
+            line = format_event(event)
+            if line:
+                logs.append(line)
+            if event["event"] == "done":
+                result = event
+
+        endpoint = next(
+            (result["outputs"][r["id"]]["url"] for r in sorted(plan["resources"], key=lambda r: -r["wave"])
+             if "url" in result["outputs"].get(r["id"], {})),
+            None
+        )
+        if endpoint:
+            logs.append(f"[INFO] Access URL: {endpoint}")
 
         return AgentResponse(
-            success=True,
-            message="Deployment completed successfully",
+            success=result["status"] == "succeeded",
+            message=f"Deployment {result['status']}",
             data={
-                "status": "success",
+                "status": "success" if result["status"] == "succeeded" else "failed",
                 "deployment_logs": logs,
-                "deployment_plan": str(deployment_plan),
-                "endpoint": f"https://{provider}-app-{stack_name}.example.com",
+                "deployment_plan": plan,
+                "resources": result["outputs"],
+                "failed": result["failed"],
+                "skipped": result["skipped"],
+                "elapsed": result["elapsed"],
+                "endpoint": endpoint,
                 "provider": provider,
                 "region": region
-            },
-            reasoning=str(deployment_plan)
+            }
         )
 
     except Exception as e:
@@ -550,6 +1075,37 @@ Format as deployment logs with timestamps.
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/deploy/stream", openapi_extra=json_body_openapi(DeploymentRequest))
+async def stream_deployment(req: DeploymentRequest = Depends(json_body(DeploymentRequest))):
+    """
+    Deploy and stream progress as Server-Sent Events
+
+    Emits a "plan" event, then started/completed/failed/skipped per
+    resource as they happen, and a final "done" event.
+    """
+    from backend.deploy.executor import execute_plan
+
+    plan, driver, provider, region = prepare_deployment(req)
+
+    async def events():
+        yield f"event: plan\ndata: {json.dumps({**plan, 'provider': provider, 'region': region, 'driver': driver.name})}\n\n"
+        try:
+            async for event in execute_plan(plan, driver):
+                yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+        except Exception as e:
+            logger.error(f"Error deploying architecture: {e}")
+            yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+get_readiness().mark_phase("app_import")
+
+
 # Run with: uvicorn backend.api.main:app --reload --port 8000
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,215 @@
+"""
+ASGI middleware for Skyrchitect AI
+Tenant identification and admission control in front of every API route,
+and lean-response selection, compression and payload metrics around it
+"""
+
+import os
+import gzip
+import json
+from typing import Optional, Tuple
+
+from backend.api.responses import lean_response, wants_lean
+from backend.utils.payload_metrics import get_payload_metrics
+from backend.utils.rate_limit import RateLimitExceeded, current_tenant, get_tenant_limiter
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+# Probes, docs and CORS preflights are never limited
+EXEMPT_PREFIXES: Tuple[str, ...] = ("/health", "/docs", "/redoc", "/openapi.json")
+
+
+class TenantRateLimitMiddleware:
+    """
+    Identify the tenant of each request and enforce its limits
+
+    Rejected requests get 401 (bad or missing API key) or 429 with a
+    Retry-After header, before any route code runs. Admitted requests run
+    with current_tenant set, so their model tokens are charged to it.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS" or scope["path"] == "/" or (
+            scope["path"].startswith(EXEMPT_PREFIXES)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        limiter = get_tenant_limiter()
+        headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+        try:
+            policy = limiter.identify(headers)
+            limiter.admit(policy)
+        except RateLimitExceeded as e:
+            await self._reject(send, e)
+            return
+
+        token = current_tenant.set(policy.name)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_tenant.reset(token)
+
+    @staticmethod
+    async def _reject(send, error: RateLimitExceeded):
+        body = json.dumps({"detail": error.detail}).encode()
+        headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        if error.retry_after is not None:
+            headers.append((b"retry-after", str(error.retry_after).encode()))
+        await send({"type": "http.response.start", "status": error.status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+
+# Content types worth compressing (images and zip bundles are already compressed)
+COMPRESSIBLE_TYPES: Tuple[str, ...] = (
+    "application/json", "application/x-ndjson", "application/javascript",
+    "application/xml", "application/yaml", "text/"
+)
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick the response encoding from an Accept-Encoding header
+
+    Brotli is preferred when the brotli package is installed, then gzip.
+    Codings listed with q=0 are refused.
+    """
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip()] = quality
+
+    for coding in (("br", "gzip") if brotli is not None else ("gzip",)):
+        if accepted.get(coding, accepted.get("*", 0.0)) > 0:
+            return coding
+    return None
+
+
+class LeanResponseMiddleware:
+    """
+    Lean-response selection
+
+    Sets lean_response from the Prefer header (or LEAN_RESPONSES) for
+    LeanJSONResponse to pick up, and confirms it on JSON responses with
+    Preference-Applied.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        prefer = next((value.decode("latin-1") for key, value in scope["headers"] if key.lower() == b"prefer"), "")
+        lean = wants_lean(prefer)
+
+        async def send_wrapper(message):
+            if lean and message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                content_type = next((value for key, value in headers if key.lower() == b"content-type"), b"")
+                if content_type.startswith(b"application/json"):
+                    message = {**message, "headers": headers + [(b"preference-applied", b"return=minimal")]}
+            await send(message)
+
+        token = lean_response.set(lean)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            lean_response.reset(token)
+
+
+class ResponseCompressionMiddleware:
+    """
+    Response compression and payload-size metrics
+
+    Compresses single-message bodies of at least COMPRESSION_MIN_BYTES
+    with the best coding the client accepts. Streaming responses (NDJSON
+    progress, chat streams) pass through untouched so every event is
+    flushed as soon as it is produced. Raw and sent sizes of every
+    response are recorded per route.
+    """
+
+    def __init__(self, app, minimum_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = minimum_size or int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+        self.gzip_level = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+        self.brotli_quality = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+    def _compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = {key.decode("latin-1").lower(): value.decode("latin-1") for key, value in scope["headers"]}
+        encoding = negotiate_encoding(request_headers.get("accept-encoding", ""))
+        pending_start = None
+        sizes = {"raw": 0, "sent": 0, "encoding": None, "streamed": False}
+
+        async def send_wrapper(message):
+            nonlocal pending_start
+            if message["type"] == "http.response.start":
+                # Held back until the first body message shows whether the response streams
+                pending_start = message
+                return
+            if message["type"] != "http.response.body" or pending_start is None:
+                if message["type"] == "http.response.body":
+                    sizes["raw"] += len(message.get("body", b""))
+                    sizes["sent"] += len(message.get("body", b""))
+                await send(message)
+                return
+
+            start, pending_start = pending_start, None
+            body = message.get("body", b"")
+            headers = [(key.lower(), value) for key, value in start.get("headers", [])]
+            content_type = next((value.decode("latin-1") for key, value in headers if key == b"content-type"), "")
+
+            sizes["streamed"] = message.get("more_body", False)
+            if (
+                encoding is None
+                or sizes["streamed"]
+                or len(body) < self.minimum_size
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+                or any(key == b"content-encoding" for key, _ in headers)
+            ):
+                sizes["raw"] += len(body)
+                sizes["sent"] += len(body)
+                await send({**start, "headers": headers})
+                await send(message)
+                return
+
+            compressed = self._compress(body, encoding)
+            headers = [(key, value) for key, value in headers if key != b"content-length"]
+            headers += [
+                (b"content-encoding", encoding.encode()),
+                (b"content-length", str(len(compressed)).encode()),
+                (b"vary", b"Accept-Encoding")
+            ]
+            sizes.update(raw=len(body), sent=len(compressed), encoding=encoding)
+            await send({**start, "headers": headers})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
+        route = getattr(scope.get("route"), "path", None) or "<unmatched>"
+        get_payload_metrics().record(
+            route, sizes["raw"], sizes["sent"], encoding=sizes["encoding"], streamed=sizes["streamed"]
+        )
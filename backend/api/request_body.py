@@ -0,0 +1,76 @@
+"""
+Request body validation for Skyrchitect AI
+Validates large JSON bodies straight from the raw bytes, with one
+TypeAdapter per body type built at import and reused for every request
+"""
+
+from typing import Any, Callable, Dict, List
+
+from fastapi import FastAPI, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import TypeAdapter, ValidationError
+from pydantic.json_schema import models_json_schema
+
+# Body models of json_body routes, added to the OpenAPI components
+_body_models: List[type] = []
+
+
+def json_body(model: type) -> Callable:
+    """
+    FastAPI dependency that parses and validates the request body as `model`
+
+    pydantic-core parses the bytes and validates them in one pass
+    (validate_json), instead of json.loads into Python objects followed by
+    a second walk to validate them. Errors are reported like FastAPI's own
+    body errors (422, locations under "body").
+
+    Args:
+        model: Pydantic model of the body
+
+    Returns:
+        Dependency for Depends()
+    """
+    adapter = TypeAdapter(model)
+    if model not in _body_models:
+        _body_models.append(model)
+
+    async def dependency(request: Request):
+        body = await request.body()
+        try:
+            return adapter.validate_json(body)
+        except ValidationError as e:
+            raise RequestValidationError(
+                [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)],
+                body=body
+            )
+
+    return dependency
+
+
+def json_body_openapi(model: type) -> Dict[str, Any]:
+    """openapi_extra documenting `model` as the request body of a json_body route"""
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": {"$ref": f"#/components/schemas/{model.__name__}"}}}
+        }
+    }
+
+
+def install_body_schemas(app: FastAPI):
+    """Add the json_body models to the app's OpenAPI components"""
+    default_openapi = app.openapi
+
+    def openapi() -> Dict[str, Any]:
+        if app.openapi_schema is None:
+            schema = default_openapi()
+            _, definitions = models_json_schema(
+                [(model, "validation") for model in _body_models],
+                ref_template="#/components/schemas/{model}"
+            )
+            components = schema.setdefault("components", {}).setdefault("schemas", {})
+            for name, definition in definitions.get("$defs", {}).items():
+                components.setdefault(name, definition)
+        return app.openapi_schema
+
+    app.openapi = openapi
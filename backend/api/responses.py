@@ -0,0 +1,101 @@
+"""
+Response serialization for Skyrchitect AI
+orjson-rendered JSON responses with an opt-in lean mode that drops
+duplicated text, unset fields and diagram defaults
+"""
+
+import os
+import json
+from contextvars import ContextVar
+from typing import Any, Dict
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to compact stdlib json
+    orjson = None
+
+# True while handling a request that asked for lean responses
+lean_response: ContextVar[bool] = ContextVar("lean_response", default=False)
+
+# Diagram node fields whose values are the same for every node the backend produces
+NODE_DEFAULTS = {"width": 200, "height": 100, "isDragging": False}
+
+
+def lean_responses_default() -> bool:
+    """True if LEAN_RESPONSES makes lean the default for every request"""
+    return os.getenv("LEAN_RESPONSES", "false").lower() == "true"
+
+
+def wants_lean(prefer_header: str) -> bool:
+    """Lean for `Prefer: return=minimal`, full for `Prefer: return=representation`, else the default"""
+    preferences = {part.strip().lower() for part in prefer_header.split(",")}
+    if "return=minimal" in preferences:
+        return True
+    if "return=representation" in preferences:
+        return False
+    return lean_responses_default()
+
+
+def _lean_architecture(architecture: Dict[str, Any]) -> Dict[str, Any]:
+    """UI architecture without per-node defaults or a provider repeated on every node"""
+    provider = architecture.get("provider")
+    lean = dict(architecture)
+
+    if isinstance(architecture.get("components"), list):
+        lean["components"] = [
+            {k: v for k, v in component.items() if not (k == "provider" and v == provider)}
+            for component in architecture["components"]
+        ]
+
+    diagram = architecture.get("diagram")
+    if isinstance(diagram, dict) and isinstance(diagram.get("nodes"), list):
+        lean["diagram"] = {
+            **diagram,
+            "nodes": [
+                {
+                    k: v for k, v in node.items()
+                    if NODE_DEFAULTS.get(k, ...) != v and not (k == "provider" and v == provider)
+                }
+                for node in diagram["nodes"]
+            ]
+        }
+    return lean
+
+
+def lean_content(content: Any) -> Any:
+    """
+    Lean form of an AgentResponse-shaped payload
+
+    - null fields are omitted
+    - reasoning is omitted when data already carries the same text
+      (chat answers, optimize/validate/compare text, generated code)
+    - diagram nodes omit width/height/isDragging defaults, and nodes and
+      components omit a provider equal to the architecture's
+
+    Other payloads only lose their null fields.
+    """
+    if not isinstance(content, dict):
+        return content
+
+    lean = {key: value for key, value in content.items() if value is not None}
+    data = lean.get("data")
+    if isinstance(data, dict):
+        reasoning = lean.get("reasoning")
+        if isinstance(reasoning, str) and any(value == reasoning for value in data.values()):
+            del lean["reasoning"]
+        if isinstance(data.get("diagram"), dict):
+            lean["data"] = _lean_architecture(data)
+    return lean
+
+
+class LeanJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson, in lean form when the request asked for it"""
+
+    def render(self, content: Any) -> bytes:
+        if lean_response.get():
+            content = lean_content(content)
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
@@ -0,0 +1,117 @@
+"""
+Corpus of realistic model outputs for parser benchmarks
+
+Each case is a raw model response as produced by the architecture agents.
+Cases are generated deterministically so runs are comparable.
+"""
+
+import json
+import random
+from typing import Dict
+
+from backend.benchmarks.fake_model_server import ARCHITECTURE_RESPONSE
+
+SERVICE_TYPES = ["compute", "storage", "database", "network", "security", "serverless", "analytics", "ml", "monitoring", "cdn"]
+
+REASONING = """
+## Architecture Overview
+Traffic enters through the CDN and load balancer; compute is stateless and
+scales horizontally, state lives in managed data stores.
+
+## Security Best Practices
+- Private subnets for compute and data tiers
+- Encryption at rest (KMS) and in transit (TLS 1.2+)
+- Least-privilege IAM roles per service
+
+## Cost Breakdown
+| Tier | Monthly |
+|------|---------|
+| Compute | $420 |
+| Data | $310 |
+
+## Implementation Steps
+1. Provision networking
+2. Deploy data stores
+3. Deploy compute and wire up the load balancer
+"""
+
+
+def build_architecture(service_count: int, seed: int = 0) -> Dict:
+    """Build an architecture JSON document with the given number of services"""
+    rng = random.Random(seed)
+    services = []
+    for idx in range(service_count):
+        service_type = SERVICE_TYPES[idx % len(SERVICE_TYPES)]
+        services.append({
+            "id": f"service-{idx+1}",
+            "name": f"{service_type.title()} Service {idx+1}",
+            "type": service_type,
+            "cost": round(rng.uniform(1, 120), 2),
+            "description": f"{service_type} component number {idx+1} handling part of the workload",
+            "icon": "server",
+            "position": {"x": 100 + (idx % 5) * 400, "y": 100 + (idx // 5) * 300}
+        })
+
+    connections = [
+        {"from": f"service-{idx+1}", "to": f"service-{idx+2}", "type": "HTTPS"}
+        for idx in range(service_count - 1)
+    ]
+    alternatives = [
+        {
+            "service_id": f"service-{idx+1}",
+            "alternative_name": f"Alternative {idx+1}",
+            "cost": 10.0,
+            "savings": 5.0,
+            "performance": 80,
+            "description": "Cheaper option"
+        }
+        for idx in range(0, service_count, 4)
+    ]
+
+    return {
+        "architecture": {
+            "title": f"Generated Architecture ({service_count} services)",
+            "description": "Benchmark architecture",
+            "provider": "aws",
+            "total_cost": round(sum(s["cost"] for s in services), 2),
+            "services": services,
+            "connections": connections,
+            "alternatives": alternatives
+        }
+    }
+
+
+def fenced(document: Dict, prose: str = REASONING) -> str:
+    """Model-style response: fenced JSON followed by markdown"""
+    return f"```json\n{json.dumps(document, indent=2)}\n```\n{prose}"
+
+
+def build_corpus() -> Dict[str, str]:
+    """
+    Build the benchmark corpus
+
+    Returns:
+        Case name -> raw model response
+    """
+    large = build_architecture(200)
+    medium = fenced(build_architecture(20))
+    cut = medium.index("handling part", 3000)
+    return {
+        "small": ARCHITECTURE_RESPONSE,
+        "large_200_services": fenced(large),
+        "malformed": fenced(build_architecture(20)).replace('"cost": ', '"cost": ,', 1),
+        "no_fence": "Here is the architecture:\n" + json.dumps(build_architecture(20), indent=2) + "\n" + REASONING,
+        "trailing_prose_braces": (
+            fenced(build_architecture(20))
+            + "\nExample IAM policy: {\"Effect\": \"Allow\", \"Action\": \"s3:GetObject\"}"
+            + "\nTerraform: resource \"aws_s3_bucket\" \"b\" { bucket = \"assets\" }\n"
+        ),
+        "truncated": fenced(build_architecture(20))[:6000],
+        "no_fence_trailing_braces": (
+            json.dumps(build_architecture(20))
+            + "\n\nNote: set tags like {\"env\": \"prod\"} on every resource {see docs}."
+        ),
+        "truncated_after_backslash": medium[:cut] + "\\",
+        "truncated_in_unicode_escape": medium[:cut] + "\\u00",
+        "invalid_unicode_escape": medium.replace("handling part", "reading C:\\uploads as part", 1)
+    }
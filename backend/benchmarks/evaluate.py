@@ -0,0 +1,409 @@
+"""
+Offline evaluation of architecture generation across model backends
+
+Replays a dataset of ArchitectureRequirements through each backend
+(Bedrock Claude, the Nemotron NIM on SageMaker) and scores every response:
+latency, tokens, parse success (parse_claude_architecture_response), schema
+validity, cost accuracy against calculate_architecture_cost, the
+validate_architecture best-practices score and budget adherence. Responses
+can be recorded and re-scored later without calling any model, and the
+comparison report recommends the fastest backend whose quality is within a
+tolerance of the best.
+
+Usage:
+    python -m backend.benchmarks.evaluate --backends sagemaker,bedrock --record runs.jsonl
+    python -m backend.benchmarks.evaluate --replay runs.jsonl --report report.json
+    python -m backend.benchmarks.evaluate --fake --backends sagemaker,bedrock
+"""
+
+import os
+import re
+import json
+import time
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from backend.benchmarks.load_test import percentile
+from backend.models.schemas import ArchitectureDocument, ArchitectureRequirement
+
+DATASET_PATH = Path(__file__).parent / "eval_dataset.json"
+
+
+def load_dataset(path: Path) -> List[Dict[str, Any]]:
+    """
+    Evaluation cases from a JSON list of ArchitectureRequirement objects
+
+    Each object also carries an "id". Requirements are validated here, so
+    a malformed dataset fails before any model is called.
+    """
+    cases = []
+    for index, item in enumerate(json.loads(Path(path).read_text())):
+        fields = {key: value for key, value in item.items() if key != "id"}
+        requirement = ArchitectureRequirement.model_validate(fields)
+        cases.append({"id": item.get("id", f"case-{index + 1}"), "requirement": requirement.model_dump(mode="json")})
+    return cases
+
+
+def backend_target(backend: str) -> str:
+    """Backend plus the model/endpoint it calls, e.g. 'sagemaker:llama-nemotron-endpoint'"""
+    from backend.utils.readiness import get_model_id
+
+    model_id = get_model_id(backend)
+    return model_id if model_id.startswith(f"{backend}:") else f"{backend}:{model_id}"
+
+
+def run_backend(backend: str, cases: List[Dict[str, Any]], mode: str, repeat: int) -> List[Dict[str, Any]]:
+    """
+    Generate an architecture for every case with one backend
+
+    Calls run one at a time, so latency is not skewed by queueing and the
+    token usage recorded between two snapshots belongs to one case. Full
+    mode mirrors /api/architecture/generate (JSON + reasoning, truncated
+    output continued); json mode mirrors its defer_reasoning path.
+
+    Returns:
+        One raw run record per case and repetition
+    """
+    from backend.api.main import complete_truncated_response, format_requirements
+    from backend.utils.readiness import load_agent
+    from backend.utils.usage_metrics import get_usage_metrics, usage_delta
+
+    agent = load_agent(backend)
+    target = backend_target(backend)
+    usage = get_usage_metrics()
+
+    def generate(requirements_text: str) -> str:
+        if mode == "json":
+            return str(agent.generate_architecture_json(requirements_text))
+        response = str(agent.generate_architecture(requirements_text))
+        return complete_truncated_response(agent, requirements_text, response)
+
+    # One unrecorded call so the first case does not pay for connection setup
+    if cases:
+        try:
+            generate(format_requirements(ArchitectureRequirement.model_validate(cases[0]["requirement"])))
+        except Exception as e:
+            print(f"⚠️ {target}: warm-up call failed: {e}")
+
+    records = []
+    for run in range(repeat):
+        for case in cases:
+            requirements_text = format_requirements(ArchitectureRequirement.model_validate(case["requirement"]))
+            before = usage.snapshot()["totals"]
+            started = time.perf_counter()
+            try:
+                response, error = generate(requirements_text), None
+            except Exception as e:
+                response, error = "", str(e)
+            latency = time.perf_counter() - started
+            tokens = usage_delta(before, usage.snapshot()["totals"])
+
+            records.append({
+                "backend": backend,
+                "target": target,
+                "mode": mode,
+                "case_id": case["id"],
+                "run": run,
+                "requirement": case["requirement"],
+                "response": response,
+                "error": error,
+                "latency_s": round(latency, 4),
+                "model_calls": tokens.get("calls", 0),
+                "input_tokens": tokens.get("input_tokens", 0),
+                "cached_input_tokens": tokens.get("cached_input_tokens", 0),
+                "output_tokens": tokens.get("output_tokens", 0)
+            })
+            status = "❌ " + error[:60] if error else f"{latency:.2f}s, {tokens.get('output_tokens', 0)} output tokens"
+            print(f"   {target:<40} {case['id']:<22} {status}")
+    return records
+
+
+def catalog_service(service: Dict[str, Any]) -> Optional[Dict[str, str]]:
+    """
+    Price-catalog entry (category, service key) of a generated service
+
+    Matched by the catalog key as a word of the service name ('Amazon RDS
+    PostgreSQL' -> rds) or by the catalog display name ('Application Load
+    Balancer' -> alb). The service's own category is tried first.
+    """
+    from backend.tools.cloud_tools import AWS_SERVICES
+
+    name = str(service.get("name", "")).lower()
+    words = set(re.findall(r"[a-z0-9]+", name))
+    category = str(service.get("type", "")).lower()
+    categories = sorted(AWS_SERVICES, key=lambda c: c != category)
+
+    for candidate in categories:
+        for key, entry in AWS_SERVICES[candidate].items():
+            if key in words or entry["name"].lower() in name:
+                return {"category": candidate, "service": key}
+    return None
+
+
+def cost_accuracy(architecture: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Model-stated costs versus calculate_architecture_cost
+
+    Returns:
+        cost_error: |stated - catalog| / catalog over the services found in
+            the price catalog (None when none are priced)
+        catalog_coverage: Share of services found in the catalog
+        total_consistency_error: |total_cost - sum of service costs| / sum
+    """
+    from backend.tools.cloud_tools import calculate_architecture_cost
+
+    services = architecture.get("services", [])
+    priced = [(service, catalog_service(service)) for service in services]
+    priced = [(service, match) for service, match in priced if match is not None]
+
+    cost_error = None
+    if priced:
+        catalog = json.loads(calculate_architecture_cost(json.dumps([{**match, "quantity": 1} for _, match in priced])))
+        catalog_total = catalog.get("total_monthly_cost", 0)
+        stated_total = sum(float(service.get("cost", 0) or 0) for service, _ in priced)
+        if catalog_total > 0:
+            cost_error = round(abs(stated_total - catalog_total) / catalog_total, 4)
+
+    services_total = sum(float(service.get("cost", 0) or 0) for service in services)
+    stated = float(architecture.get("total_cost", 0) or 0)
+    return {
+        "cost_error": cost_error,
+        "catalog_coverage": round(len(priced) / len(services), 4) if services else 0.0,
+        "total_consistency_error": round(abs(stated - services_total) / services_total, 4) if services_total else None
+    }
+
+
+def validation_score(architecture: Dict[str, Any]) -> int:
+    """validate_architecture best-practices score (0-100) of the services and connections"""
+    from backend.tools.cloud_tools import validate_architecture
+
+    services = architecture.get("services", [])
+    names = {service.get("id"): service.get("name", "") for service in services}
+    description = "Services:\n" + "\n".join(
+        f"- {service.get('name', '')} ({service.get('type', '')}): {service.get('description', '')}"
+        for service in services
+    )
+    description += "\nConnections:\n" + "\n".join(
+        f"- {names.get(c.get('from'), c.get('from'))} -> {names.get(c.get('to'), c.get('to'))} ({c.get('type', '')})"
+        for c in architecture.get("connections", [])
+    )
+    return json.loads(validate_architecture(description))["best_practices_score"]
+
+
+def score_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Quality metrics of one run record
+
+    quality is 0 for an error or unparseable response; otherwise the mean
+    of validation_score / 100 and 1 - cost_error (capped at 1), over the
+    ones that apply.
+    """
+    from backend.utils.response_parser import parse_claude_architecture_response
+
+    scores = {
+        "parsed": False, "schema_valid": False, "services": 0, "cost_error": None, "catalog_coverage": 0.0,
+        "total_consistency_error": None, "validation_score": None, "within_budget": None, "quality": 0.0
+    }
+    if record.get("error") or not record.get("response"):
+        return scores
+
+    parsed, _ = parse_claude_architecture_response(record["response"])
+    architecture = (parsed or {}).get("architecture") or {}
+    if not architecture.get("services"):
+        return scores
+
+    try:
+        ArchitectureDocument.model_validate(parsed)
+        scores["schema_valid"] = True
+    except Exception:
+        pass
+
+    scores.update(parsed=True, services=len(architecture["services"]))
+    scores["validation_score"] = validation_score(architecture)
+    if record["requirement"].get("provider", "aws") == "aws":
+        scores.update(cost_accuracy(architecture))
+    else:
+        scores["catalog_coverage"] = None  # the price catalog only covers AWS
+
+    budget = record["requirement"].get("budget")
+    if budget:
+        scores["within_budget"] = float(architecture.get("total_cost", 0) or 0) <= budget
+
+    parts = [scores["validation_score"] / 100]
+    if scores["cost_error"] is not None:
+        parts.append(1 - min(scores["cost_error"], 1.0))
+    scores["quality"] = round(sum(parts) / len(parts), 4)
+    return scores
+
+
+def _mean(values: List[Any]) -> Optional[float]:
+    values = [float(v) for v in values if v is not None]
+    return round(sum(values) / len(values), 4) if values else None
+
+
+def summarize(records: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Per-target aggregates of scored run records"""
+    by_target: Dict[str, List[Dict[str, Any]]] = {}
+    for record in records:
+        by_target.setdefault(record["target"], []).append(record)
+
+    summary = {}
+    for target, runs in by_target.items():
+        ok = [r for r in runs if not r.get("error")]
+        latencies = [r["latency_s"] for r in ok]
+        output_tokens = sum(r["output_tokens"] for r in ok)
+        summary[target] = {
+            "backend": runs[0]["backend"],
+            "mode": runs[0]["mode"],
+            "runs": len(runs),
+            "errors": len(runs) - len(ok),
+            "parse_success_rate": round(sum(r["scores"]["parsed"] for r in runs) / len(runs), 4),
+            "schema_valid_rate": round(sum(r["scores"]["schema_valid"] for r in runs) / len(runs), 4),
+            "latency_p50_s": round(percentile(latencies, 50), 3),
+            "latency_p95_s": round(percentile(latencies, 95), 3),
+            "latency_mean_s": _mean(latencies),
+            "input_tokens_mean": _mean([r["input_tokens"] for r in ok]),
+            "output_tokens_mean": _mean([r["output_tokens"] for r in ok]),
+            "output_tokens_per_s": round(output_tokens / sum(latencies), 1) if sum(latencies) else None,
+            "model_calls_mean": _mean([r["model_calls"] for r in ok]),
+            "cost_error_mean": _mean([r["scores"]["cost_error"] for r in runs]),
+            "catalog_coverage_mean": _mean([r["scores"]["catalog_coverage"] for r in runs]),
+            "total_consistency_error_mean": _mean([r["scores"]["total_consistency_error"] for r in runs]),
+            "validation_score_mean": _mean([r["scores"]["validation_score"] for r in runs]),
+            "within_budget_rate": _mean([r["scores"]["within_budget"] for r in runs]),
+            "quality_mean": _mean([r["scores"]["quality"] for r in runs]) or 0.0
+        }
+    return summary
+
+
+def recommend(summary: Dict[str, Dict[str, Any]], tolerance: float) -> Dict[str, Any]:
+    """
+    Routing recommendation: the fastest target within `tolerance` of the best quality
+
+    Targets whose every run failed are not considered.
+    """
+    eligible = {target: stats for target, stats in summary.items() if stats["errors"] < stats["runs"]}
+    if not eligible:
+        return {"recommended": None, "reason": "every target failed"}
+
+    best_quality = max(eligible, key=lambda t: eligible[t]["quality_mean"])
+    fastest = min(eligible, key=lambda t: eligible[t]["latency_p50_s"])
+    threshold = eligible[best_quality]["quality_mean"] - tolerance
+    candidates = [t for t, stats in eligible.items() if stats["quality_mean"] >= threshold]
+    recommended = min(candidates, key=lambda t: eligible[t]["latency_p50_s"])
+    return {
+        "recommended": recommended,
+        "best_quality": best_quality,
+        "fastest": fastest,
+        "quality_tolerance": tolerance,
+        "reason": f"fastest p50 latency among targets with quality >= {threshold:.3f}"
+    }
+
+
+def print_report(summary: Dict[str, Dict[str, Any]], routing: Dict[str, Any]):
+    """Comparison table and routing recommendation"""
+    def fmt(value, spec=""):
+        return "-" if value is None else format(value, spec)
+
+    width = max([len("target")] + [len(target) for target in summary])
+    print(f"\n{'target':<{width}} {'runs':>5} {'err':>4} {'parse':>6} {'schema':>7} {'p50 s':>7} {'p95 s':>7} "
+          f"{'out tok':>8} {'tok/s':>7} {'cost err':>9} {'valid':>6} {'budget':>7} {'quality':>8}")
+    print("-" * (width + 97))
+    for target, s in summary.items():
+        print(f"{target:<{width}} {s['runs']:>5} {s['errors']:>4} {s['parse_success_rate']:>6.0%} "
+              f"{s['schema_valid_rate']:>7.0%} {s['latency_p50_s']:>7.2f} {s['latency_p95_s']:>7.2f} "
+              f"{fmt(s['output_tokens_mean'], '.0f'):>8} {fmt(s['output_tokens_per_s']):>7} "
+              f"{fmt(s['cost_error_mean'], '.1%'):>9} {fmt(s['validation_score_mean'], '.0f'):>6} "
+              f"{fmt(s['within_budget_rate'], '.0%'):>7} {s['quality_mean']:>8.3f}")
+
+    if routing["recommended"]:
+        print(f"\n🧭 Recommended: {routing['recommended']} ({routing['reason']})")
+        print(f"   best quality: {routing['best_quality']}, fastest: {routing['fastest']}")
+    else:
+        print(f"\n⚠️  No recommendation: {routing['reason']}")
+
+
+def main():
+    """Main evaluation function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Quality vs latency evaluation of architecture generation backends')
+    parser.add_argument('--dataset', default=str(DATASET_PATH), help='JSON list of requirements (with "id")')
+    parser.add_argument('--backends', default=os.getenv("MODEL_TYPE", "sagemaker"),
+                        help='Comma-separated backends: sagemaker, bedrock')
+    parser.add_argument('--mode', default='full', choices=['full', 'json'],
+                        help='full: JSON + reasoning; json: JSON only (defer_reasoning)')
+    parser.add_argument('--repeat', type=int, default=1, help='Runs per case')
+    parser.add_argument('--record', help='Append raw run records (JSONL) to this file')
+    parser.add_argument('--replay', nargs='+', help='Score recorded runs instead of calling models')
+    parser.add_argument('--fake', action='store_true', help='Call the local fake model server instead of AWS')
+    parser.add_argument('--quality-tolerance', type=float, default=0.05, help='Quality given up for lower latency')
+    parser.add_argument('--report', help='Write the JSON report to this file')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+
+    if args.replay:
+        records = [
+            json.loads(line)
+            for path in args.replay
+            for line in Path(path).read_text().splitlines() if line.strip()
+        ]
+        print(f"\n📼 Scoring {len(records)} recorded runs from {', '.join(args.replay)}")
+    else:
+        backends = [name.strip().lower() for name in args.backends.split(",") if name.strip()]
+        unknown = set(backends) - {"sagemaker", "bedrock"}
+        if unknown:
+            parser.error(f"Unknown backends: {sorted(unknown)}. Choose from sagemaker, bedrock")
+        cases = load_dataset(Path(args.dataset))
+
+        fake = None
+        if args.fake:
+            from backend.benchmarks.fake_model_server import FakeModelConfig, FakeModelServer
+            fake = FakeModelServer(FakeModelConfig(latency_ms=20, seed=0)).start()
+            os.environ.update(fake.environment())
+        os.environ.setdefault("SKYRCHITECT_DATA_DIR", tempfile.mkdtemp(prefix="skyrchitect-eval-"))
+
+        print(f"\n{'='*70}")
+        print(f"🧪 Evaluating {', '.join(backends)} on {len(cases)} cases x {args.repeat} ({args.mode} mode)")
+        print(f"{'='*70}")
+        records = []
+        try:
+            for backend in backends:
+                records += run_backend(backend, cases, args.mode, args.repeat)
+        finally:
+            if fake:
+                fake.stop()
+
+        if args.record:
+            with open(args.record, "a") as f:
+                for record in records:
+                    f.write(json.dumps(record) + "\n")
+            print(f"\n💾 {len(records)} runs recorded to {args.record}")
+
+    for record in records:
+        record["scores"] = score_record(record)
+
+    summary = summarize(records)
+    routing = recommend(summary, args.quality_tolerance)
+    report = {
+        "summary": summary,
+        "routing": routing,
+        "cases": [
+            {key: record[key] for key in ("target", "case_id", "run", "latency_s", "output_tokens", "error", "scores")}
+            for record in records
+        ]
+    }
+
+    if args.report:
+        Path(args.report).write_text(json.dumps(report, indent=2))
+        print(f"\n💾 Report written to {args.report}")
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(summary, routing)
+
+
+if __name__ == "__main__":
+    main()
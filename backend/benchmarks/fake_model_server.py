@@ -0,0 +1,367 @@
+"""
+Fake SageMaker/Bedrock model server for benchmarks
+
+Speaks just enough of the SageMaker Runtime and Bedrock Runtime REST APIs
+for boto3 to talk to it (point AWS_ENDPOINT_URL_SAGEMAKER_RUNTIME and
+AWS_ENDPOINT_URL_BEDROCK_RUNTIME at it), with configurable latency, token
+rate and error injection.
+
+Run standalone:
+    python -m backend.benchmarks.fake_model_server --port 9999 --latency-ms 200 --tokens-per-second 80
+"""
+
+import json
+import base64
+import random
+import asyncio
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+# Canned architecture response: JSON fence followed by markdown reasoning
+ARCHITECTURE_RESPONSE = """```json
+{
+  "architecture": {
+    "title": "E-commerce Platform",
+    "description": "Highly available web store",
+    "provider": "aws",
+    "total_cost": 161.30,
+    "services": [
+      {"id": "service-1", "name": "CloudFront", "type": "cdn", "cost": 15.0, "description": "CDN for static assets", "icon": "globe", "position": {"x": 100, "y": 100}},
+      {"id": "service-2", "name": "Application Load Balancer", "type": "network", "cost": 18.0, "description": "Distributes traffic", "icon": "network", "position": {"x": 100, "y": 500}},
+      {"id": "service-3", "name": "EC2 Auto Scaling Group", "type": "compute", "cost": 58.4, "description": "Application servers", "icon": "server", "position": {"x": 600, "y": 500}},
+      {"id": "service-4", "name": "RDS PostgreSQL", "type": "database", "cost": 45.8, "description": "Primary database", "icon": "database", "position": {"x": 100, "y": 900}},
+      {"id": "service-5", "name": "S3", "type": "storage", "cost": 12.5, "description": "Product images", "icon": "storage", "position": {"x": 600, "y": 900}},
+      {"id": "service-6", "name": "CloudWatch", "type": "monitoring", "cost": 11.6, "description": "Metrics and alarms", "icon": "monitoring", "position": {"x": 1100, "y": 500}}
+    ],
+    "connections": [
+      {"from": "service-1", "to": "service-2", "type": "HTTPS"},
+      {"from": "service-2", "to": "service-3", "type": "HTTP"},
+      {"from": "service-3", "to": "service-4", "type": "PostgreSQL"},
+      {"from": "service-3", "to": "service-5", "type": "HTTPS"},
+      {"from": "service-3", "to": "service-6", "type": "Metrics"}
+    ],
+    "alternatives": [
+      {"service_id": "service-3", "alternative_name": "Lambda", "cost": 8.3, "savings": 50.1, "performance": 75, "description": "Serverless compute"}
+    ]
+  }
+}
+```
+
+## Architecture Overview
+A CDN fronts an Application Load Balancer that spreads traffic across an
+auto-scaling group; state lives in RDS and S3.
+
+## Security Best Practices
+- Private subnets for compute and database
+- Encryption at rest and in transit
+
+## Cost Breakdown
+Total estimated cost: $161.30/month.
+"""
+
+
+def structured_response() -> Dict[str, Any]:
+    """Canned architecture as a structured-output document (JSON + reasoning field)"""
+    document = json.loads(ARCHITECTURE_RESPONSE.split("```json", 1)[1].split("```", 1)[0])
+    document["reasoning"] = ARCHITECTURE_RESPONSE.rsplit("```", 1)[1].strip()
+    return document
+
+
+TEXT_RESPONSE = (
+    "Use managed services where possible, keep compute stateless behind a load balancer, "
+    "and store state in a managed database with automated backups. Monitor with CloudWatch."
+)
+
+CODE_RESPONSE = """resource "aws_vpc" "main" {
+  cidr_block = "10.0.0.0/16"
+  tags = { Name = "main" }
+}
+"""
+
+
+DELTA_RESPONSE = """```json
+{"delta": {"add_services": [{"id": "service-90", "name": "CloudWatch", "type": "monitoring", "cost": 10.00, "description": "Metrics and alarms"}]}}
+```"""
+
+
+class FakeModelConfig:
+    """Behaviour of the fake model server"""
+
+    def __init__(
+        self,
+        latency_ms: float = 50.0,
+        tokens_per_second: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        seed: Optional[int] = None,
+        embedding_dim: int = 384
+    ):
+        """
+        Args:
+            latency_ms: Fixed time to first token
+            tokens_per_second: Output token rate (0 = instant generation)
+            error_rate: Fraction of requests answered with a 500 error
+            throttle_rate: Fraction of requests answered with a 429 throttle
+            seed: Random seed for reproducible error injection
+            embedding_dim: Dimension of fake embedding vectors
+        """
+        self.latency_ms = latency_ms
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.random = random.Random(seed)
+        self.embedding_dim = embedding_dim
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (4 chars per token)"""
+    return max(1, len(text) // 4)
+
+
+def pick_response(prompt: str) -> str:
+    """Choose a canned response that fits the prompt"""
+    if "Draft architecture:" in prompt:
+        return DELTA_RESPONSE
+    if "Skip the markdown explanation" in prompt:
+        return ARCHITECTURE_RESPONSE.rsplit("```", 1)[0] + "```"
+    if "Design a cloud architecture" in prompt or "architecture JSON" in prompt:
+        return ARCHITECTURE_RESPONSE
+    if "TERRAFORM" in prompt or "CLOUDFORMATION" in prompt:
+        return CODE_RESPONSE
+    return TEXT_RESPONSE
+
+
+def create_fake_model_app(config: FakeModelConfig) -> FastAPI:
+    """
+    Build the fake model server
+
+    Routes:
+        POST /endpoints/{name}/invocations  SageMaker InvokeEndpoint (NIM chat format, guided_json aware;
+                                            embedding NIM format when the payload has "input")
+        POST /model/{model_id}/invoke       Bedrock InvokeModel (Anthropic messages format)
+        POST /model/{model_id}/converse     Bedrock Converse (Strands BedrockModel; forced tool choice)
+    """
+    app = FastAPI(title="Fake model server")
+    app.state.config = config
+    app.state.requests = 0
+
+    async def simulate(text: str, max_tokens: Optional[int]) -> Optional[JSONResponse]:
+        """Sleep for the simulated generation time; maybe return an injected error"""
+        app.state.requests += 1
+        roll = config.random.random()
+        if roll < config.throttle_rate:
+            return JSONResponse(
+                status_code=429,
+                content={"message": "Rate exceeded"},
+                headers={"x-amzn-ErrorType": "ThrottlingException"}
+            )
+        if roll < config.throttle_rate + config.error_rate:
+            return JSONResponse(
+                status_code=500,
+                content={"message": "Injected failure"},
+                headers={"x-amzn-ErrorType": "InternalServerException"}
+            )
+
+        output_tokens = min(estimate_tokens(text), max_tokens or 1 << 30)
+        delay = config.latency_ms / 1000
+        if config.tokens_per_second > 0:
+            delay += output_tokens / config.tokens_per_second
+        await asyncio.sleep(delay)
+        return None
+
+    async def embed(endpoint_name: str, payload: Dict[str, Any]):
+        """Embedding NIM: deterministic hashing vectors, base64 float32 if requested"""
+        from backend.retrieval.embeddings import HashingEmbedder
+
+        texts = payload["input"] if isinstance(payload["input"], list) else [payload["input"]]
+        error = await simulate("", None)
+        if error:
+            return error
+
+        vectors = HashingEmbedder(config.embedding_dim).embed(texts)
+        as_base64 = payload.get("encoding_format") == "base64"
+        tokens = sum(estimate_tokens(text) for text in texts)
+        return {
+            "object": "list",
+            "model": payload.get("model", endpoint_name),
+            "data": [
+                {
+                    "index": index,
+                    "object": "embedding",
+                    "embedding": (
+                        base64.b64encode(vector.astype("<f4").tobytes()).decode()
+                        if as_base64 else vector.tolist()
+                    )
+                }
+                for index, vector in enumerate(vectors)
+            ],
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens}
+        }
+
+    @app.post("/endpoints/{endpoint_name}/invocations")
+    async def sagemaker_invoke(endpoint_name: str, request: Request):
+        payload = await request.json()
+        if "input" in payload and "messages" not in payload:
+            return await embed(endpoint_name, payload)
+
+        messages = payload.get("messages", [])
+        prompt = "\n".join(str(m.get("content", "")) for m in messages)
+        text = pick_response(prompt)
+        if "nvext" in payload or "response_format" in payload:
+            # Guided decoding: the reply is exactly the schema-shaped JSON
+            text = json.dumps(structured_response())
+        max_tokens = payload.get("max_tokens")
+        if max_tokens:
+            text = text[:max_tokens * 4]
+
+        error = await simulate(text, max_tokens)
+        if error:
+            return error
+
+        return {
+            "id": f"cmpl-{app.state.requests}",
+            "object": "chat.completion",
+            "model": endpoint_name,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": {
+                "prompt_tokens": estimate_tokens(prompt),
+                "completion_tokens": estimate_tokens(text),
+                "total_tokens": estimate_tokens(prompt) + estimate_tokens(text)
+            }
+        }
+
+    @app.post("/model/{model_id}/invoke")
+    async def bedrock_invoke(model_id: str, request: Request):
+        payload = json.loads(await request.body())
+        prompt = "\n".join(str(m.get("content", "")) for m in payload.get("messages", []))
+        text = pick_response(prompt)
+
+        error = await simulate(text, payload.get("max_tokens"))
+        if error:
+            return error
+
+        return {
+            "id": f"msg-{app.state.requests}",
+            "type": "message",
+            "role": "assistant",
+            "model": model_id,
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "usage": {"input_tokens": estimate_tokens(prompt), "output_tokens": estimate_tokens(text)}
+        }
+
+    @app.post("/model/{model_id}/converse")
+    async def bedrock_converse(model_id: str, request: Request):
+        payload = await request.json()
+        prompt = "\n".join(
+            block.get("text", "")
+            for message in payload.get("messages", [])
+            for block in message.get("content", [])
+        )
+        text = pick_response(prompt)
+        max_tokens = payload.get("inferenceConfig", {}).get("maxTokens")
+
+        started = time.perf_counter()
+        error = await simulate(text, max_tokens)
+        if error:
+            return error
+
+        input_tokens = estimate_tokens(prompt)
+        output_tokens = estimate_tokens(text)
+        content = [{"text": text}]
+        stop_reason = "end_turn"
+        forced_tool = payload.get("toolConfig", {}).get("toolChoice", {}).get("tool")
+        if forced_tool:
+            content = [{"toolUse": {"toolUseId": f"tool-{app.state.requests}", "name": forced_tool["name"],
+                                    "input": structured_response()}}]
+            stop_reason = "tool_use"
+        return {
+            "output": {"message": {"role": "assistant", "content": content}},
+            "stopReason": stop_reason,
+            "usage": {
+                "inputTokens": input_tokens,
+                "outputTokens": output_tokens,
+                "totalTokens": input_tokens + output_tokens
+            },
+            "metrics": {"latencyMs": int((time.perf_counter() - started) * 1000)}
+        }
+
+    return app
+
+
+class FakeModelServer:
+    """Runs the fake model server with uvicorn on a background thread"""
+
+    def __init__(self, config: Optional[FakeModelConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        import uvicorn
+
+        self.config = config or FakeModelConfig()
+        self.app = create_fake_model_app(self.config)
+        self.server = uvicorn.Server(uvicorn.Config(
+            self.app,
+            host=host,
+            port=port,
+            log_level="warning",
+            lifespan="off"
+        ))
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL of the running server"""
+        host, port = self.server.servers[0].sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeModelServer":
+        """Start serving and wait until the socket is bound"""
+        self.thread = threading.Thread(target=self.server.run, name="fake-model-server", daemon=True)
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def stop(self):
+        """Stop the server"""
+        self.server.should_exit = True
+        if self.thread:
+            self.thread.join(timeout=5)
+
+    def environment(self) -> Dict[str, Any]:
+        """Environment variables that point boto3 at this server"""
+        return {
+            "AWS_ENDPOINT_URL_SAGEMAKER_RUNTIME": self.url,
+            "AWS_ENDPOINT_URL_BEDROCK_RUNTIME": self.url,
+            "AWS_ACCESS_KEY_ID": "benchmark",
+            "AWS_SECRET_ACCESS_KEY": "benchmark",
+            "AWS_DEFAULT_REGION": "us-west-2"
+        }
+
+
+def main():
+    """Run the fake model server in the foreground"""
+    import argparse
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description='Fake SageMaker/Bedrock model server')
+    parser.add_argument('--port', type=int, default=9999)
+    parser.add_argument('--latency-ms', type=float, default=50.0)
+    parser.add_argument('--tokens-per-second', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    config = FakeModelConfig(
+        latency_ms=args.latency_ms,
+        tokens_per_second=args.tokens_per_second,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate
+    )
+    uvicorn.run(create_fake_model_app(config), host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
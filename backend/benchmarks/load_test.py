@@ -0,0 +1,289 @@
+"""
+Load test and latency benchmark for the Skyrchitect API
+
+Boots backend.api.main:app in-process against the fake model server, drives
+each endpoint at a fixed concurrency and reports throughput, p50/p95/p99
+latency, event-loop lag and peak memory. Reports can be saved as baselines
+and compared against later runs to catch regressions.
+
+Usage:
+    python -m backend.benchmarks.load_test --concurrency 8 --requests 200
+    python -m backend.benchmarks.load_test --save-baseline
+    python -m backend.benchmarks.load_test --compare          # exit 1 on regression
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import resource
+import platform
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.benchmarks.fake_model_server import FakeModelConfig, FakeModelServer
+
+BASELINE_PATH = Path(__file__).parent / "baselines" / "load_test.json"
+
+SAMPLE_COMPONENTS = [
+    {"id": "service-1", "name": "Application Load Balancer", "description": "Distributes traffic", "type": "network"},
+    {"id": "service-2", "name": "EC2 Auto Scaling Group", "description": "Application servers", "type": "compute"},
+    {"id": "service-3", "name": "RDS PostgreSQL", "description": "Primary database", "type": "database"},
+    {"id": "service-4", "name": "S3", "description": "Static assets", "type": "storage"}
+]
+
+# name -> (method, path, JSON body)
+SCENARIOS: Dict[str, Tuple[str, str, Dict[str, Any]]] = {
+    "generate": ("POST", "/api/architecture/generate", {
+        "title": "E-commerce Platform",
+        "description": "Online store with user accounts and product catalog",
+        "requirements": ["user auth", "file storage", "database"],
+        "provider": "aws",
+        "optimization_goal": "balanced",
+        "budget": 500,
+        "expected_users": 10000
+    }),
+    "optimize": ("POST", "/api/architecture/optimize", {
+        "provider": "aws",
+        "components": SAMPLE_COMPONENTS,
+        "current_cost": 250.0,
+        "optimization_goal": "cost"
+    }),
+    "validate": ("POST", "/api/architecture/validate", {
+        "provider": "aws",
+        "nodes": SAMPLE_COMPONENTS,
+        "edges": [{"from": "service-1", "to": "service-2"}, {"from": "service-2", "to": "service-3"}]
+    }),
+    "chat": ("POST", "/api/chat", {
+        "question": "Which AWS services should I use for a low-latency API?"
+    }),
+    "code": ("POST", "/api/code/generate", {
+        "architecture": {"name": "E-commerce Platform", "provider": "aws", "components": SAMPLE_COMPONENTS},
+        "code_type": "terraform"
+    })
+}
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list (0 for an empty list)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MiB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return round(peak / (1024 * 1024 if platform.system() == "Darwin" else 1024), 1)
+
+
+class LoopLagMonitor:
+    """
+    Measures event-loop lag: how late a periodic sleep wakes up
+
+    The app runs on the same loop as this monitor, so any blocking work in
+    request handlers shows up as lag.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - started - self.interval))
+
+    def start(self):
+        self.samples = []
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> Dict[str, float]:
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        return {
+            "lag_p99_ms": round(percentile(self.samples, 99) * 1000, 2),
+            "lag_max_ms": round(max(self.samples, default=0.0) * 1000, 2)
+        }
+
+
+async def drive(client, method: str, path: str, body: Dict[str, Any], concurrency: int, requests: int) -> Dict[str, Any]:
+    """
+    Send `requests` requests with at most `concurrency` in flight
+
+    Returns:
+        Latency percentiles (ms), throughput (req/s) and error count
+    """
+    latencies: List[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                ok = response.status_code < 400
+            except Exception:
+                ok = False
+            latencies.append(time.perf_counter() - started)
+            if not ok:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    duration = time.perf_counter() - started
+
+    return {
+        "requests": requests,
+        "errors": errors,
+        "throughput_rps": round(requests / duration, 2) if duration else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2)
+    }
+
+
+async def run_benchmark(
+    endpoints: List[str],
+    concurrency: int,
+    requests: int,
+    model_type: str
+) -> Dict[str, Dict[str, Any]]:
+    """Benchmark each endpoint in turn against the already-configured environment"""
+    import httpx
+    from backend.api.main import app
+    from backend.utils.readiness import get_readiness
+
+    # Build the agent up front so the first measured request is not a cold start
+    get_readiness().get_agent()
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=120) as client:
+        for name in endpoints:
+            method, path, body = SCENARIOS[name]
+            await client.request(method, path, json=body)  # warm-up
+
+            monitor = LoopLagMonitor()
+            monitor.start()
+            stats = await drive(client, method, path, body, concurrency, requests)
+            stats.update(await monitor.stop())
+            stats["peak_rss_mb"] = peak_rss_mb()
+            results[name] = stats
+
+            print(f"   {name:<9} {stats['throughput_rps']:>8.1f} req/s  "
+                  f"p50 {stats['p50_ms']:>8.1f}ms  p95 {stats['p95_ms']:>8.1f}ms  p99 {stats['p99_ms']:>8.1f}ms  "
+                  f"lag p99 {stats['lag_p99_ms']:>7.1f}ms  errors {stats['errors']}")
+
+    return results
+
+
+def compare_to_baseline(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    List regressions versus a saved baseline
+
+    A regression is p95 latency or event-loop lag above (1 + tolerance) x
+    baseline, or throughput below (1 - tolerance) x baseline.
+    """
+    regressions = []
+    for name, stats in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous:
+            continue
+        for metric in ("p95_ms", "lag_p99_ms"):
+            if previous[metric] and stats[metric] > previous[metric] * (1 + tolerance):
+                regressions.append(f"{name}: {metric} {previous[metric]} -> {stats[metric]}")
+        if stats["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput_rps {previous['throughput_rps']} -> {stats['throughput_rps']}")
+    return regressions
+
+
+def main():
+    """Main benchmark function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Skyrchitect API load test against a fake model server')
+    parser.add_argument('--endpoints', default=",".join(SCENARIOS), help='Comma-separated scenarios')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=100, help='Requests per endpoint')
+    parser.add_argument('--model-type', default='bedrock', choices=['bedrock', 'sagemaker'])
+    parser.add_argument('--latency-ms', type=float, default=50.0, help='Fake model time to first token')
+    parser.add_argument('--tokens-per-second', type=float, default=0.0, help='Fake model token rate (0 = instant)')
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    parser.add_argument('--baseline', default=str(BASELINE_PATH), help='Baseline file path')
+    parser.add_argument('--save-baseline', action='store_true', help='Save this run as the baseline')
+    parser.add_argument('--compare', action='store_true', help='Compare with the baseline; exit 1 on regression')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed relative regression')
+    args = parser.parse_args()
+
+    endpoints = [name.strip() for name in args.endpoints.split(",") if name.strip()]
+    unknown = set(endpoints) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown endpoints: {sorted(unknown)}. Choose from {list(SCENARIOS)}")
+
+    fake = FakeModelServer(FakeModelConfig(
+        latency_ms=args.latency_ms,
+        tokens_per_second=args.tokens_per_second,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        seed=0
+    )).start()
+
+    # Must be set before the app builds any boto3 client
+    os.environ.update(fake.environment())
+    os.environ.update({
+        "MODEL_TYPE": args.model_type,
+        "SKYRCHITECT_DATA_DIR": tempfile.mkdtemp(prefix="skyrchitect-bench-"),
+        "AGENT_WARMUP": "false"
+    })
+
+    config = {key: getattr(args, key) for key in (
+        "concurrency", "requests", "model_type", "latency_ms", "tokens_per_second", "error_rate", "throttle_rate"
+    )}
+    print(f"\n{'='*70}")
+    print(f"📈 Skyrchitect load test ({fake.url})")
+    print(f"   {config}")
+    print(f"{'='*70}\n")
+
+    try:
+        results = asyncio.run(run_benchmark(endpoints, args.concurrency, args.requests, args.model_type))
+    finally:
+        fake.stop()
+
+    report = {"config": config, "results": results, "python": platform.python_version()}
+    baseline_path = Path(args.baseline)
+
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(report, indent=2))
+        print(f"\n💾 Baseline saved to {baseline_path}")
+
+    if args.compare:
+        if not baseline_path.exists():
+            print(f"\n⚠️  No baseline at {baseline_path}; run with --save-baseline first")
+            sys.exit(1)
+        regressions = compare_to_baseline(results, json.loads(baseline_path.read_text()), args.tolerance)
+        if regressions:
+            print(f"\n❌ Regressions (tolerance {args.tolerance:.0%}):")
+            for regression in regressions:
+                print(f"   - {regression}")
+            sys.exit(1)
+        print(f"\n✅ No regressions versus {baseline_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Micro-benchmarks for response parsing and UI transformation
+
+Measures time and allocations per call of parse_claude_architecture_response
+and transform_to_ui_format over the corpus in benchmarks/corpus.py, and
+checks transform_to_ui_format against the original three-loop version.
+
+Usage:
+    python -m backend.benchmarks.parser_bench
+    python -m backend.benchmarks.parser_bench --repeat 2000 --json
+"""
+
+import json
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.benchmarks.corpus import build_corpus
+from backend.utils.response_parser import (
+    get_service_icon,
+    parse_claude_architecture_response,
+    transform_to_ui_format
+)
+
+
+def legacy_transform_to_ui_format(
+    architecture_json: Dict[str, Any],
+    provider: str,
+    architecture_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Reference implementation: services walked once for components, once for nodes
+
+    The original derived the id from hash(title); it takes the id as an
+    argument here, like transform_to_ui_format, so both build the same dict.
+    """
+    arch = architecture_json.get('architecture', {})
+    services = arch.get('services', [])
+
+    components = []
+    for idx, service in enumerate(services):
+        components.append({
+            'id': service.get('id', f'comp-{idx+1}'),
+            'name': service.get('name', 'Unknown Service'),
+            'description': service.get('description', ''),
+            'cost': service.get('cost', 0),
+            'icon': get_service_icon(service.get('type', 'service')),
+            'provider': provider
+        })
+
+    nodes = []
+    for idx, service in enumerate(services):
+        position = service.get('position', {})
+        nodes.append({
+            'id': service.get('id', f'node-{idx+1}'),
+            'label': service.get('name', 'Unknown Service'),
+            'subLabel': service.get('type', 'service').capitalize(),
+            'icon': service.get('icon', 'server'),
+            'cost': service.get('cost', 0),
+            'description': service.get('description', ''),
+            'x': position.get('x', 300 + (idx % 2) * 300),
+            'y': position.get('y', 200 + (idx // 2) * 200),
+            'width': 200,
+            'height': 100,
+            'isDragging': False,
+            'type': service.get('type', 'service'),
+            'provider': provider
+        })
+
+    edges = [
+        {'id': f'edge-{idx+1}', 'from': c.get('from', ''), 'to': c.get('to', ''), 'type': c.get('type', 'Connection')}
+        for idx, c in enumerate(arch.get('connections', []))
+    ]
+
+    alternatives = [
+        {
+            'id': f'alt-{idx+1}',
+            'name': alt.get('alternative_name', 'Alternative'),
+            'description': alt.get('description', ''),
+            'cost': alt.get('cost', 0),
+            'icon': 'server',
+            'performance': alt.get('performance', 80),
+            'originalComponentId': alt.get('service_id', '')
+        }
+        for idx, alt in enumerate(arch.get('alternatives', []))
+    ]
+
+    return {
+        'id': architecture_id,
+        'name': arch.get('title', 'Cloud Architecture'),
+        'description': arch.get('description', ''),
+        'provider': provider,
+        'optimizationPreference': 'balanced',
+        'components': components,
+        'alternatives': alternatives,
+        'diagram': {
+            'nodes': nodes,
+            'edges': edges,
+            'viewport': {
+                'zoom': 1,
+                'pan': {'x': 0, 'y': 0},
+                'bounds': {'x': 0, 'y': 0, 'width': 1200, 'height': 800}
+            },
+            'grid': {'size': 20, 'enabled': True, 'snapEnabled': False}
+        }
+    }
+
+
+def measure(fn: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """
+    Time and allocation profile of fn()
+
+    Timing runs without tracemalloc (it slows allocation down); allocations
+    are then measured over a single call.
+    """
+    fn()  # warm-up
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    per_call = (time.perf_counter() - started) / repeat
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    fn()
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stats = after.compare_to(before, "filename")
+    return {
+        "us_per_call": round(per_call * 1e6, 2),
+        "retained_blocks": sum(max(0, s.count_diff) for s in stats),
+        "peak_kib": round(peak / 1024, 1)
+    }
+
+
+def check_transform_equivalence(architecture_json: Dict[str, Any]) -> bool:
+    """True if the single-pass transform matches the reference implementation"""
+    expected = legacy_transform_to_ui_format(architecture_json, "aws", "arch-bench")
+    actual = transform_to_ui_format(architecture_json, "aws", "arch-bench")
+    return actual == expected
+
+
+def run(repeat: int) -> List[Dict[str, Any]]:
+    """Benchmark every corpus case; returns one row per (case, function)"""
+    rows = []
+    for name, response in build_corpus().items():
+        parsed, _ = parse_claude_architecture_response(response)
+        rows.append({
+            "case": name,
+            "function": "parse_claude_architecture_response",
+            "size_kib": round(len(response.encode()) / 1024, 1),
+            "parsed": parsed is not None,
+            **measure(lambda: parse_claude_architecture_response(response), repeat)
+        })
+
+        if parsed is None:
+            continue
+
+        if not check_transform_equivalence(parsed):
+            raise AssertionError(f"transform_to_ui_format differs from the reference on case '{name}'")
+
+        for label, transform in (
+            ("transform_to_ui_format", transform_to_ui_format),
+            ("legacy_transform_to_ui_format", legacy_transform_to_ui_format)
+        ):
+            rows.append({
+                "case": name,
+                "function": label,
+                "size_kib": rows[-1]["size_kib"],
+                "parsed": True,
+                **measure(lambda: transform(parsed, "aws"), repeat)
+            })
+    return rows
+
+
+def main():
+    """Main benchmark function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Parser and UI transform micro-benchmarks')
+    parser.add_argument('--repeat', type=int, default=500, help='Calls per measurement')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    rows = run(args.repeat)
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+
+    print(f"\n{'case':<28} {'function':<36} {'KiB':>7} {'parsed':>7} {'µs/call':>10} {'retained':>8} {'peak KiB':>9}")
+    print("-" * 110)
+    for row in rows:
+        print(f"{row['case']:<28} {row['function']:<36} {row['size_kib']:>7} {str(row['parsed']):>7} "
+              f"{row['us_per_call']:>10} {row['retained_blocks']:>8} {row['peak_kib']:>9}")
+    print("\n✅ transform_to_ui_format matches the reference implementation on all parsed cases")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Request validation benchmark for large diagrams
+
+Compares validation throughput of 1k-node request bodies before and after
+typed diagram models: the generic Dict[str, Any] model (or no model at
+all) fed by json.loads, the typed strict models fed by json.loads (what a
+FastAPI body parameter does), and the typed models validated straight from
+the raw bytes by a reused TypeAdapter (what json_body routes do).
+
+Usage:
+    python -m backend.benchmarks.validation_bench
+    python -m backend.benchmarks.validation_bench --nodes 5000 --repeat 50 --json
+"""
+
+import json
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from pydantic import BaseModel, TypeAdapter
+
+from backend.models.schemas import (
+    CloudProvider,
+    CodeGenerationRequest,
+    DiagramAnalysisRequest
+)
+
+SERVICE_TYPES = ["compute", "storage", "database", "network", "security", "serverless", "analytics", "ml", "cdn"]
+
+
+class LegacyDiagramAnalysisRequest(BaseModel):
+    """DiagramAnalysisRequest as it was: untyped nodes and edges"""
+    provider: CloudProvider
+    nodes: List[Dict[str, Any]]
+    edges: List[Dict[str, Any]]
+    requirements: Optional[str] = None
+
+
+def build_architecture(nodes: int) -> Dict[str, Any]:
+    """UI-format architecture with `nodes` services, chained plus a fan-out edge every 10 nodes"""
+    services = [
+        {"id": f"service-{i}", "name": f"Service {i}", "type": SERVICE_TYPES[i % len(SERVICE_TYPES)],
+         "description": f"Handles workload shard {i}", "cost": round(10 + i * 0.37, 2)}
+        for i in range(nodes)
+    ]
+    edges = [
+        {"id": f"edge-{i}", "from": f"service-{i}", "to": f"service-{i + 1}", "type": "HTTPS"}
+        for i in range(nodes - 1)
+    ]
+    edges += [
+        {"id": f"edge-fan-{i}", "from": "service-0", "to": f"service-{i}", "type": "Event"}
+        for i in range(10, nodes, 10)
+    ]
+    return {
+        "id": "arch-bench",
+        "name": "Benchmark architecture",
+        "description": f"{nodes} services",
+        "provider": "aws",
+        "optimizationPreference": "balanced",
+        "components": [
+            {"id": s["id"], "name": s["name"], "description": s["description"], "cost": s["cost"],
+             "icon": "⚙️", "provider": "aws"}
+            for s in services
+        ],
+        "alternatives": [],
+        "diagram": {
+            "nodes": [
+                {"id": s["id"], "label": s["name"], "subLabel": s["type"].capitalize(), "icon": "server",
+                 "cost": s["cost"], "description": s["description"], "x": 300 + (i % 2) * 300,
+                 "y": 200 + (i // 2) * 200, "width": 200, "height": 100, "isDragging": False,
+                 "type": s["type"], "provider": "aws", "metadata": {"tier": i % 3}}
+                for i, s in enumerate(services)
+            ],
+            "edges": edges,
+            "viewport": {"zoom": 1, "pan": {"x": 0, "y": 0}},
+            "grid": {"size": 20, "enabled": True, "snapEnabled": False}
+        }
+    }
+
+
+def build_bodies(nodes: int) -> Dict[str, bytes]:
+    """Raw JSON bodies of /api/architecture/validate and /api/code/generate"""
+    architecture = build_architecture(nodes)
+    return {
+        "validate": json.dumps({
+            "provider": "aws",
+            "nodes": architecture["diagram"]["nodes"],
+            "edges": architecture["diagram"]["edges"],
+            "requirements": "Highly available"
+        }).encode(),
+        "code_generate": json.dumps({"architecture": architecture, "code_type": "terraform"}).encode()
+    }
+
+
+def strategies(route: str) -> Dict[str, Callable[[bytes], Any]]:
+    """Validation strategies for one route's body, before and after"""
+    if route == "validate":
+        legacy, typed = LegacyDiagramAnalysisRequest, DiagramAnalysisRequest
+        before = ("before: json.loads + Dict[str, Any] model", lambda body: legacy.model_validate(json.loads(body)))
+    else:
+        typed = CodeGenerationRequest
+        before = ("before: json.loads, raw dict", json.loads)
+
+    adapter = TypeAdapter(typed)
+    return dict([
+        before,
+        ("typed strict: json.loads + model_validate", lambda body: typed.model_validate(json.loads(body))),
+        ("typed strict: TypeAdapter per call", lambda body: TypeAdapter(typed).validate_json(body)),
+        ("after: reused TypeAdapter.validate_json", adapter.validate_json)
+    ])
+
+
+def measure(fn: Callable[[bytes], Any], body: bytes, repeat: int) -> Dict[str, float]:
+    """Median time per body over `repeat` calls (after one warm-up call)"""
+    fn(body)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(body)
+        timings.append(time.perf_counter() - started)
+    median = sorted(timings)[len(timings) // 2]
+    return {
+        "ms_per_body": round(median * 1000, 3),
+        "bodies_per_second": round(1 / median, 1),
+        "mib_per_second": round(len(body) / median / 2**20, 1)
+    }
+
+
+def run(nodes: int, repeat: int) -> List[Dict[str, Any]]:
+    """Benchmark every strategy on every route body; returns one row per (route, strategy)"""
+    rows = []
+    for route, body in build_bodies(nodes).items():
+        baseline = None
+        for label, fn in strategies(route).items():
+            result = measure(fn, body, repeat)
+            baseline = baseline or result["ms_per_body"]
+            rows.append({
+                "route": route,
+                "strategy": label,
+                "nodes": nodes,
+                "size_kib": round(len(body) / 1024, 1),
+                **result,
+                "speedup": round(baseline / result["ms_per_body"], 2)
+            })
+    return rows
+
+
+def main():
+    """Main benchmark function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Request validation throughput for large diagrams')
+    parser.add_argument('--nodes', type=int, default=1000, help='Diagram nodes per body')
+    parser.add_argument('--repeat', type=int, default=100, help='Calls per measurement')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    rows = run(args.nodes, args.repeat)
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+
+    print(f"\n{'route':<14} {'strategy':<44} {'KiB':>7} {'ms/body':>9} {'bodies/s':>9} {'MiB/s':>7} {'vs before':>9}")
+    print("-" * 105)
+    for row in rows:
+        print(f"{row['route']:<14} {row['strategy']:<44} {row['size_kib']:>7} {row['ms_per_body']:>9} "
+              f"{row['bodies_per_second']:>9} {row['mib_per_second']:>7} {row['speedup']:>8}x")
+
+
+if __name__ == "__main__":
+    main()
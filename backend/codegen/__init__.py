@@ -0,0 +1 @@
+"""Infrastructure-as-code generation package"""
@@ -0,0 +1,662 @@
+"""
+Infrastructure-as-Code generation engine
+Renders components that have a local template, asks the LLM only for the
+rest (one small, cached request per component) and assembles the module,
+so output size is no longer bounded by a single model response. Components
+are partitioned into dependency-ordered groups whose snippets are generated
+concurrently and can be streamed as one file per group
+"""
+
+import os
+import re
+import json
+import logging
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from backend.codegen.templates import (
+    CLOUDFORMATION,
+    CLOUDFORMATION_COMMON_PARAMETERS,
+    NETWORKED_KINDS,
+    TEMPLATES,
+    TERRAFORM,
+    TERRAFORM_COMMON_VARIABLES,
+    TERRAFORM_HEADER,
+    detect_kind,
+    render,
+    template_params
+)
+from backend.prompts.registry import get_prompt_registry
+from backend.utils.data_dir import get_data_dir
+from backend.utils.cache import cache_key, create_cache
+from backend.utils.usage_metrics import get_usage_metrics
+
+logger = logging.getLogger(__name__)
+
+# Terraform provider blocks for providers without local templates
+TERRAFORM_PROVIDER_HEADERS = {
+    "azure": """terraform {
+  required_providers {
+    azurerm = {
+      source  = "hashicorp/azurerm"
+      version = "~> 3.0"
+    }
+  }
+}
+
+provider "azurerm" {
+  features {}
+}
+
+locals {
+  tags = {
+    Project     = var.project_name
+    Environment = var.environment
+    ManagedBy   = "skyrchitect"
+  }
+}
+""",
+    "gcp": """terraform {
+  required_providers {
+    google = {
+      source  = "hashicorp/google"
+      version = "~> 5.0"
+    }
+  }
+}
+
+provider "google" {
+  region = var.region
+}
+
+locals {
+  tags = {
+    project     = var.project_name
+    environment = var.environment
+    managed-by  = "skyrchitect"
+  }
+}
+""",
+}
+
+CONVENTIONS = {
+    TERRAFORM: (
+        "- HCL for Terraform >= 1.5\n"
+        "- Prefix resource names with var.project_name; set tags = local.tags where supported\n"
+        "- var.project_name and var.environment already exist; declare any other variable you use"
+    ),
+    CLOUDFORMATION: (
+        "- YAML resource entries as they appear under Resources:, indented by two spaces "
+        "(no AWSTemplateFormatVersion, Parameters or Outputs sections)\n"
+        "- Parameters ProjectName and Environment already exist"
+    ),
+}
+
+NETWORK_CONVENTIONS = {
+    TERRAFORM: "- Networking exists: aws_vpc.main, aws_subnet.public[*].id, aws_subnet.private[*].id, var.vpc_cidr",
+    CLOUDFORMATION: "- Networking exists: VPC, PublicSubnet1, PublicSubnet2, PrivateSubnet1, PrivateSubnet2, VpcCidr parameter",
+}
+
+# Dependency order: each group may reference resources of the groups before it
+COMPONENT_GROUPS = ["networking", "data", "compute", "edge"]
+
+KIND_GROUPS = {
+    "vpc": "networking",
+    "rds": "data",
+    "dynamodb": "data",
+    "elasticache": "data",
+    "s3": "data",
+    "sqs": "data",
+    "sns": "data",
+    "ec2": "compute",
+    "lambda": "compute",
+    "cloudwatch": "compute",
+    "alb": "edge",
+    "api_gateway": "edge",
+    "cloudfront": "edge",
+}
+
+# Keyword fallback for components without a template (other providers, unmapped services)
+GROUP_PATTERNS = [
+    ("networking", re.compile(r'\b(vpc|vnet|subnet|network|nat|vpn|transit|route ?53|dns|direct ?connect|peering)\b', re.I)),
+    ("edge", re.compile(r'\b(cdn|front ?door|cloudfront|gateway|load ?balanc\w*|waf|firewall|ingress|cognito|auth\w*|identity)\b', re.I)),
+    ("data", re.compile(r'\b(database|db|sql|storage|bucket|blob|cache|redis|queue|topic|stream|kinesis|kafka|pub/?sub|warehouse|redshift|bigquery|table|cosmos|firestore)\b', re.I)),
+]
+
+_FENCE_PATTERN = re.compile(r'^```[\w-]*\s*\n|\n?```\s*$')
+_BLOCK_START = re.compile(r'^(\w+)(?:\s+"([^"]*)")?(?:\s+"([^"]*)")?\s*\{', re.MULTILINE)
+
+
+def resource_names(name: str) -> Dict[str, str]:
+    """Identifier variants of a component name (snake_case, kebab-case, PascalCase)"""
+    words = re.findall(r'[A-Za-z0-9]+', name.lower()) or ["component"]
+    if words[0][0].isdigit():
+        words.insert(0, "c")
+    return {
+        "name": "_".join(words),
+        "label": "-".join(words),
+        "logical": "".join(word.capitalize() for word in words),
+        "title": name.replace('"', "'")
+    }
+
+
+def component_fingerprint(component: Dict[str, Any]) -> Dict[str, str]:
+    """Fields that determine a component's generated code (not its id, cost or position)"""
+    return {key: str(component.get(key, "")) for key in ("name", "type", "description")}
+
+
+def strip_fences(code: str) -> str:
+    """Remove markdown code fences around model output"""
+    return _FENCE_PATTERN.sub('', code.strip()).strip('\n')
+
+
+def split_terraform_blocks(code: str) -> List[Dict[str, str]]:
+    """
+    Split HCL into top-level blocks by brace matching
+
+    Returns:
+        [{"type": "resource", "name": "aws_s3_bucket.assets" or variable name, "text": ...}]
+    """
+    blocks = []
+    position = 0
+    while True:
+        match = _BLOCK_START.search(code, position)
+        if not match:
+            break
+        depth = 0
+        index = match.end() - 1
+        in_string = False
+        while index < len(code):
+            char = code[index]
+            if in_string:
+                if char == '\\':
+                    index += 1
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char == '{':
+                depth += 1
+            elif char == '}':
+                depth -= 1
+                if depth == 0:
+                    break
+            index += 1
+        labels = [label for label in match.groups()[1:] if label is not None]
+        blocks.append({"type": match.group(1), "name": ".".join(labels), "text": code[match.start():index + 1]})
+        position = index + 1
+    return blocks
+
+
+def parse_llm_snippet(code: str, code_type: str) -> Dict[str, Any]:
+    """
+    Turn a model-written snippet into {"resources", "variables", "outputs"}
+
+    Terraform variable and output blocks are pulled out so the assembler can
+    deduplicate them; provider/terraform blocks are dropped.
+    """
+    code = strip_fences(code)
+
+    if code_type != TERRAFORM:
+        lines = [line for line in code.splitlines() if line.strip() not in ("Resources:", "---")]
+        if lines and not lines[0].startswith(" "):
+            lines = ["  " + line if line else line for line in lines]
+        return {"resources": "\n".join(lines) + "\n", "variables": {}, "outputs": {}}
+
+    resources, variables, outputs = [], {}, {}
+    for block in split_terraform_blocks(code):
+        if block["type"] == "variable":
+            variables[block["name"]] = {"raw": block["text"]}
+        elif block["type"] == "output":
+            outputs[block["name"]] = {"raw": block["text"]}
+        elif block["type"] not in ("terraform", "provider"):
+            resources.append(block["text"])
+    return {"resources": "\n\n".join(resources) + "\n", "variables": variables, "outputs": outputs}
+
+
+def component_group(kind: Optional[str], component: Dict[str, Any]) -> str:
+    """Dependency group of a component (compute when nothing else matches)"""
+    if kind in KIND_GROUPS:
+        return KIND_GROUPS[kind]
+    text = f"{component.get('name', '')} {component.get('type', '')}"
+    for group, pattern in GROUP_PATTERNS:
+        if pattern.search(text):
+            return group
+    return "compute"
+
+
+class SnippetCache:
+    """
+    Cache of LLM-generated snippets keyed by (component fingerprint, code type, provider)
+
+    Backed by utils/cache.py: SQLite at CODEGEN_CACHE_PATH by default, or
+    whatever CODEGEN_CACHE_BACKEND / CACHE_BACKEND selects.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv(
+            "CODEGEN_CACHE_PATH",
+            str(get_data_dir() / "codegen_cache.sqlite3")
+        )
+        self.backend = create_cache("codegen", default_backend="disk", disk_path=self.path)
+
+    @staticmethod
+    def key(component: Dict[str, Any], code_type: str, provider: str, context: str) -> str:
+        """Cache key; context covers anything else the prompt depends on"""
+        return cache_key("codegen", component_fingerprint(component), code_type, provider, context)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self.backend.get(key)
+
+    def put(self, key: str, snippet: Dict[str, Any]):
+        self.backend.set(key, snippet)
+
+
+_bedrock_client = None
+
+
+def invoke_bedrock(prompt: str, max_tokens: int) -> str:
+    """
+    Single Bedrock InvokeModel call (no agent, no conversation history)
+
+    Token usage is recorded, and so charged to the tenant of the calling
+    context (the engine runs each call in a copy of the request context).
+    """
+    global _bedrock_client
+    if _bedrock_client is None:
+        import boto3
+        _bedrock_client = boto3.client('bedrock-runtime', region_name=os.getenv('AWS_DEFAULT_REGION', 'us-west-2'))
+
+    response = _bedrock_client.invoke_model(
+        modelId=os.getenv('BEDROCK_MODEL_ID', 'us.anthropic.claude-sonnet-4-20250514-v1:0'),
+        body=json.dumps({
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": max_tokens,
+            "messages": [{"role": "user", "content": prompt}]
+        })
+    )
+    result = json.loads(response['body'].read())
+    usage = result.get('usage', {})
+    cached = usage.get('cache_read_input_tokens', 0)
+    written = usage.get('cache_creation_input_tokens', 0)
+    get_usage_metrics().record(
+        "generate_code_snippet",
+        input_tokens=usage.get('input_tokens', 0) + cached + written,
+        output_tokens=usage.get('output_tokens', 0),
+        cached_input_tokens=cached,
+        cache_write_tokens=written
+    )
+    return result['content'][0]['text']
+
+
+class CodeGenerationEngine:
+    """
+    Template-first IaC generator
+
+    Components are classified by detect_kind(); AWS components with a
+    template are rendered locally, everything else is generated per
+    component by the LLM and cached. The shared VPC is added once when any
+    component needs it. LLM calls run concurrently (CODEGEN_CONCURRENCY).
+    """
+
+    def __init__(
+        self,
+        llm: Optional[Callable[[str, int], str]] = None,
+        cache: Optional[SnippetCache] = None
+    ):
+        """
+        Args:
+            llm: fn(prompt, max_tokens) -> text for unmapped components
+                (default: Bedrock InvokeModel)
+            cache: Snippet cache (default: SQLite in the data directory)
+        """
+        self.llm = llm or invoke_bedrock
+        self.cache = cache or SnippetCache()
+        self.prompts = get_prompt_registry()
+        self.snippet_max_tokens = int(os.getenv("CODEGEN_SNIPPET_MAX_TOKENS", "1024"))
+        self.concurrency = int(os.getenv("CODEGEN_CONCURRENCY", "4"))
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Thread pool for concurrent LLM snippet calls (created on first use)"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="codegen")
+        return self._executor
+
+    def plan(self, architecture: Dict[str, Any], code_type: str) -> List[Dict[str, Any]]:
+        """
+        Decide how each component is generated
+
+        Returns:
+            [{"component", "kind", "group", "names", "params", "source": "template"|"llm"|"merged"}]
+            in dependency-group order, with the shared network first if any
+            component needs it
+
+        Raises:
+            ValueError: If code_type is neither terraform nor cloudformation
+        """
+        if code_type not in TEMPLATES:
+            raise ValueError(f"Unsupported code type '{code_type}' (terraform or cloudformation)")
+        provider = architecture.get("provider", "aws")
+        use_templates = provider == "aws"
+        seen_names = set()
+        items = []
+
+        for component in architecture.get("components", []):
+            kind = detect_kind(component) if use_templates else None
+            names = resource_names(component.get("name", "component"))
+            while names["name"] in seen_names:
+                names = resource_names(f"{names['title']} {len(seen_names)}")
+            seen_names.add(names["name"])
+            items.append({
+                "component": component,
+                "kind": kind,
+                "group": component_group(kind, component),
+                "names": names,
+                "params": template_params(kind, component) if kind else {},
+                "source": "template" if kind else "llm"
+            })
+
+        # The VPC template defines fixed names (aws_vpc.main / VPC): render it once, first
+        vpc_items = [item for item in items if item["kind"] == "vpc"]
+        for duplicate in vpc_items[1:]:
+            duplicate["source"] = "merged"
+        if not vpc_items and any(item["kind"] in NETWORKED_KINDS for item in items):
+            vpc_items = [{
+                "component": {"name": "Networking (VPC)"},
+                "kind": "vpc",
+                "group": "networking",
+                "names": resource_names("Networking (VPC)"),
+                "params": {},
+                "source": "template"
+            }]
+            items.insert(0, vpc_items[0])
+        elif vpc_items:
+            items.remove(vpc_items[0])
+            items.insert(0, vpc_items[0])
+
+        # Stable sort: input order is kept within a group
+        items.sort(key=lambda item: COMPONENT_GROUPS.index(item["group"]))
+        return items
+
+    def render_template(self, item: Dict[str, Any], code_type: str) -> Dict[str, Any]:
+        """Render one templated component into {"resources", "variables", "outputs"}"""
+        template = TEMPLATES[code_type][item["kind"]]
+        values = {**item["names"], **item["params"]}
+        return {
+            "resources": render(template["resources"], values),
+            "variables": template.get("variables", {}),
+            "outputs": {
+                render(name, values): {
+                    "description": render(spec["description"], values),
+                    "value": render(spec["value"], values)
+                }
+                for name, spec in template.get("outputs", {}).items()
+            }
+        }
+
+    def generate_snippet(self, item: Dict[str, Any], code_type: str, provider: str, has_network: bool) -> Dict[str, Any]:
+        """
+        LLM-generated snippet for an unmapped component (cached)
+
+        Returns:
+            {"resources", "variables", "outputs", "cached": bool}
+        """
+        conventions = CONVENTIONS.get(code_type, CONVENTIONS[TERRAFORM])
+        if has_network:
+            conventions += "\n" + NETWORK_CONVENTIONS.get(code_type, "")
+
+        key = SnippetCache.key(item["component"], code_type, provider, f"{self.prompts.version}|{conventions}")
+        cached = self.cache.get(key)
+        if cached is not None:
+            return {**cached, "cached": True}
+
+        component = item["component"]
+        prompt = self.prompts.render(
+            "codegen_component",
+            code_type=code_type.upper(),
+            provider=provider,
+            component=f"{component.get('name', 'Component')}: {component.get('description', '')}",
+            resource_name=item["names"]["logical" if code_type == CLOUDFORMATION else "name"],
+            conventions=conventions
+        )
+        snippet = parse_llm_snippet(self.llm(prompt, self.snippet_max_tokens), code_type)
+        self.cache.put(key, snippet)
+        return {**snippet, "cached": False}
+
+    def build_snippet(self, item: Dict[str, Any], code_type: str, provider: str, has_network: bool) -> Dict[str, Any]:
+        """Snippet for one planned item (LLM items served from the cache get source "cache")"""
+        if item["source"] == "template":
+            return self.render_template(item, code_type)
+        snippet = self.generate_snippet(item, code_type, provider, has_network)
+        if snippet["cached"]:
+            item["source"] = "cache"
+        return snippet
+
+    def generate(self, architecture: Dict[str, Any], code_type: str = TERRAFORM) -> Dict[str, Any]:
+        """
+        Generate the IaC module for an architecture
+
+        Args:
+            architecture: {"name", "provider", "components": [...]} (UI format)
+            code_type: "terraform" or "cloudformation"
+
+        Returns:
+            {"code", "components": [{"name", "kind", "group", "source"}], "stats"}
+        """
+        code_type = code_type.lower()
+        provider = architecture.get("provider", "aws")
+        items = self.plan(architecture, code_type)
+        has_network = bool(items) and items[0]["kind"] == "vpc"
+
+        active = [item for item in items if item["source"] != "merged"]
+        # Each call runs in its own copy of the request context (e.g. the tenant its tokens are charged to)
+        contexts = [contextvars.copy_context() for _ in active]
+        built = self.executor.map(
+            lambda item, context: context.run(self.build_snippet, item, code_type, provider, has_network),
+            active,
+            contexts
+        )
+        snippets = list(zip(active, built))
+
+        stats = self._stats(items)
+        logger.info(f"✓ IaC plan: {stats}")
+
+        return {
+            "code": self.assemble(architecture, code_type, snippets),
+            "components": self._component_summary(items),
+            "stats": stats
+        }
+
+    async def generate_stream(self, architecture: Dict[str, Any], code_type: str = TERRAFORM) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Generate IaC group by group, yielding each group's file as soon as it is ready
+
+        All groups are generated concurrently; references between groups are
+        resolved by Terraform/CloudFormation, so completion order does not
+        matter. Variables and outputs are merged and deduplicated across
+        groups once every group has finished.
+
+        Yields:
+            {"event": "plan", "groups": {group: [component names]}}
+            {"event": "file", "group", "path", "content", "components"} per group
+                (Terraform: <group>.tf; CloudFormation: a Resources fragment)
+            {"event": "file", "path", "content"} for the merged files
+                (Terraform: main.tf, variables.tf, outputs.tf; CloudFormation: template.yaml)
+            {"event": "done", "components", "stats", "files"}
+        """
+        code_type = code_type.lower()
+        provider = architecture.get("provider", "aws")
+        items = self.plan(architecture, code_type)
+        has_network = bool(items) and items[0]["kind"] == "vpc"
+        loop = asyncio.get_running_loop()
+
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for item in items:
+            if item["source"] != "merged":
+                groups.setdefault(item["group"], []).append(item)
+
+        yield {
+            "event": "plan",
+            "code_type": code_type,
+            "groups": {group: [item["component"].get("name", "") for item in members] for group, members in groups.items()}
+        }
+
+        async def build_group(group: str, members: List[Dict[str, Any]]) -> Tuple[str, List[Tuple[Dict[str, Any], Dict[str, Any]]]]:
+            built = await asyncio.gather(*[
+                loop.run_in_executor(
+                    self.executor,
+                    contextvars.copy_context().run,
+                    self.build_snippet, item, code_type, provider, has_network
+                )
+                for item in members
+            ])
+            return group, list(zip(members, built))
+
+        done: Dict[str, List[Tuple[Dict[str, Any], Dict[str, Any]]]] = {}
+        files = []
+        for next_group in asyncio.as_completed([build_group(group, members) for group, members in groups.items()]):
+            group, snippets = await next_group
+            done[group] = snippets
+            path = f"{group}.tf" if code_type == TERRAFORM else None
+            if path:
+                files.append(path)
+            logger.info(f"✓ IaC group {group}: {len(snippets)} components")
+            yield {
+                "event": "file",
+                "group": group,
+                "path": path,
+                "content": "\n".join(self._sections(snippets)),
+                "components": self._component_summary([item for item, _ in snippets])
+            }
+
+        ordered = [pair for group in COMPONENT_GROUPS for pair in done.get(group, [])]
+        if code_type == TERRAFORM:
+            merged = self.terraform_files(architecture, ordered)
+        else:
+            merged = {"template.yaml": self.assemble(architecture, code_type, ordered)}
+        for path, content in merged.items():
+            files.append(path)
+            yield {"event": "file", "path": path, "content": content}
+
+        stats = self._stats(items)
+        logger.info(f"✓ IaC plan: {stats}")
+        yield {"event": "done", "components": self._component_summary(items), "stats": stats, "files": files}
+
+    @staticmethod
+    def _stats(items: List[Dict[str, Any]]) -> Dict[str, int]:
+        return {source: sum(1 for item in items if item["source"] == source) for source in ("template", "llm", "cache", "merged")}
+
+    @staticmethod
+    def _component_summary(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [
+            {"name": item["component"].get("name", ""), "kind": item["kind"], "group": item["group"], "source": item["source"]}
+            for item in items
+        ]
+
+    @staticmethod
+    def _sections(snippets: List[Any]) -> List[str]:
+        return [
+            f"# --- {item['component'].get('name', 'Component')} ({item['source']}) ---\n{snippet['resources'].rstrip()}\n"
+            for item, snippet in snippets
+        ]
+
+    def merge_definitions(self, architecture: Dict[str, Any], code_type: str, snippets: List[Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Common plus snippet variables/parameters and outputs, first definition wins"""
+        provider = architecture.get("provider", "aws")
+        project = resource_names(architecture.get("name", "skyrchitect"))["label"]
+
+        common = TERRAFORM_COMMON_VARIABLES if code_type == TERRAFORM else CLOUDFORMATION_COMMON_PARAMETERS
+        variables = {name: {**spec, "default": render(spec["default"], {"project": project})} for name, spec in common.items()}
+        if code_type == TERRAFORM and provider == "gcp":
+            variables["region"] = {"description": "GCP region", "type": "string", "default": "us-central1"}
+        outputs: Dict[str, Dict[str, str]] = {}
+        for _, snippet in snippets:
+            for name, spec in snippet["variables"].items():
+                variables.setdefault(name, spec)
+            for name, spec in snippet["outputs"].items():
+                outputs.setdefault(name, spec)
+        return variables, outputs
+
+    def terraform_files(self, architecture: Dict[str, Any], snippets: List[Any]) -> Dict[str, str]:
+        """main.tf (providers), variables.tf and outputs.tf for a multi-file Terraform module"""
+        provider = architecture.get("provider", "aws")
+        variables, outputs = self.merge_definitions(architecture, TERRAFORM, snippets)
+        header = TERRAFORM_HEADER if provider == "aws" else TERRAFORM_PROVIDER_HEADERS.get(provider, "")
+        return {
+            "main.tf": f"# {architecture.get('name', 'Cloud Architecture')} - generated by Skyrchitect\n\n{header}",
+            "variables.tf": "\n".join(self._terraform_variable(name, spec) for name, spec in variables.items()),
+            "outputs.tf": "\n".join(self._terraform_output(name, spec) for name, spec in outputs.items())
+        }
+
+    def assemble(self, architecture: Dict[str, Any], code_type: str, snippets: List[Any]) -> str:
+        """Join snippets into one module with deduplicated variables/parameters and outputs"""
+        provider = architecture.get("provider", "aws")
+        variables, outputs = self.merge_definitions(architecture, code_type, snippets)
+        sections = self._sections(snippets)
+
+        if code_type == TERRAFORM:
+            header = TERRAFORM_HEADER if provider == "aws" else TERRAFORM_PROVIDER_HEADERS.get(provider, "")
+            parts = [f"# {architecture.get('name', 'Cloud Architecture')} - generated by Skyrchitect\n", header]
+            parts += [self._terraform_variable(name, spec) for name, spec in variables.items()]
+            parts += sections
+            parts += [self._terraform_output(name, spec) for name, spec in outputs.items()]
+            return "\n".join(parts)
+
+        lines = [
+            "AWSTemplateFormatVersion: '2010-09-09'",
+            f"Description: {json.dumps(architecture.get('name', 'Cloud Architecture') + ' - generated by Skyrchitect')}",
+            "",
+            "Parameters:"
+        ]
+        for name, spec in variables.items():
+            lines += [
+                f"  {name}:",
+                f"    Type: {spec['type']}",
+                f"    Default: {json.dumps(spec['default'])}",
+                f"    Description: {json.dumps(spec['description'])}"
+            ]
+        lines += ["", "Resources:"] + [section.rstrip("\n").replace("# ---", "  # ---", 1) for section in sections]
+        if outputs:
+            lines += ["", "Outputs:"]
+            for name, spec in outputs.items():
+                lines += [f"  {name}:", f"    Description: {json.dumps(spec['description'])}", f"    Value: {spec['value']}"]
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _terraform_variable(name: str, spec: Dict[str, str]) -> str:
+        if "raw" in spec:
+            return spec["raw"] + "\n"
+        return (
+            f'variable "{name}" {{\n'
+            f'  description = {json.dumps(spec["description"])}\n'
+            f'  type        = {spec["type"]}\n'
+            f'  default     = {json.dumps(spec["default"])}\n'
+            f'}}\n'
+        )
+
+    @staticmethod
+    def _terraform_output(name: str, spec: Dict[str, str]) -> str:
+        if "raw" in spec:
+            return spec["raw"] + "\n"
+        return (
+            f'output "{name}" {{\n'
+            f'  description = {json.dumps(spec["description"])}\n'
+            f'  value       = {spec["value"]}\n'
+            f'}}\n'
+        )
+
+
+# Singleton instance
+_engine: Optional[CodeGenerationEngine] = None
+
+
+def get_codegen_engine() -> CodeGenerationEngine:
+    """Get or create CodeGenerationEngine singleton"""
+    global _engine
+    if _engine is None:
+        _engine = CodeGenerationEngine()
+    return _engine
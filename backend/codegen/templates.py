@@ -0,0 +1,866 @@
+"""
+Local IaC templates for common AWS components
+Each template renders one component's resources, variables and outputs for
+Terraform or CloudFormation; components without a template go to the LLM
+"""
+
+import re
+from string import Template
+from typing import Any, Dict, List, Optional, Tuple
+
+TERRAFORM = "terraform"
+CLOUDFORMATION = "cloudformation"
+
+
+class SnippetTemplate(Template):
+    """string.Template using @{name}, so HCL ${...} and CFN ${...} pass through"""
+    delimiter = "@"
+
+
+# (kind, pattern) in priority order, matched against "<name> <type> <description>"
+COMPONENT_KINDS: List[Tuple[str, "re.Pattern"]] = [
+    (kind, re.compile(pattern, re.IGNORECASE)) for kind, pattern in [
+        ("vpc", r"\bvpc\b|virtual private cloud|\bsubnets?\b"),
+        ("alb", r"load balancer|\balb\b|\belb\b"),
+        ("rds", r"\brds\b|aurora|postgres|mysql|mariadb"),
+        ("dynamodb", r"dynamo"),
+        ("elasticache", r"elasticache|redis|memcached"),
+        ("s3", r"\bs3\b|simple storage"),
+        ("lambda", r"\blambda\b"),
+        ("api_gateway", r"api gateway"),
+        ("cloudfront", r"cloudfront"),
+        ("ec2", r"\bec2\b|auto ?scaling"),
+        ("sqs", r"\bsqs\b|\bqueue\b"),
+        ("sns", r"\bsns\b|notification"),
+        ("cloudwatch", r"cloudwatch"),
+    ]
+]
+
+# Kinds whose resources live in the shared VPC
+NETWORKED_KINDS = {"alb", "rds", "elasticache", "ec2"}
+
+
+def detect_kind(component: Dict[str, Any]) -> Optional[str]:
+    """Template kind for a component, or None if no local template applies"""
+    text = " ".join(str(component.get(key, "")) for key in ("name", "type", "description"))
+    for kind, pattern in COMPONENT_KINDS:
+        if pattern.search(text):
+            return kind
+    return None
+
+
+def template_params(kind: str, component: Dict[str, Any]) -> Dict[str, str]:
+    """Kind-specific template parameters derived from the component"""
+    if kind == "rds":
+        text = f"{component.get('name', '')} {component.get('description', '')}".lower()
+        if "mysql" in text or "mariadb" in text:
+            return {"engine": "mysql", "engine_version": "8.0", "port": "3306"}
+        return {"engine": "postgres", "engine_version": "16", "port": "5432"}
+    return {}
+
+
+# Terraform ---------------------------------------------------------------
+
+TERRAFORM_HEADER = """terraform {
+  required_version = ">= 1.5"
+  required_providers {
+    aws = {
+      source  = "hashicorp/aws"
+      version = "~> 5.0"
+    }
+  }
+}
+
+provider "aws" {
+  region = var.aws_region
+}
+
+locals {
+  tags = {
+    Project     = var.project_name
+    Environment = var.environment
+    ManagedBy   = "skyrchitect"
+  }
+}
+"""
+
+TERRAFORM_COMMON_VARIABLES = {
+    "aws_region": {"description": "AWS region", "type": "string", "default": "us-west-2"},
+    "project_name": {"description": "Name prefix for all resources", "type": "string", "default": "@{project}"},
+    "environment": {"description": "Deployment environment", "type": "string", "default": "dev"},
+}
+
+TERRAFORM_TEMPLATES: Dict[str, Dict[str, Any]] = {
+    "vpc": {
+        "resources": """data "aws_availability_zones" "available" {
+  state = "available"
+}
+
+resource "aws_vpc" "main" {
+  cidr_block           = var.vpc_cidr
+  enable_dns_support   = true
+  enable_dns_hostnames = true
+  tags                 = merge(local.tags, { Name = "${var.project_name}-vpc" })
+}
+
+resource "aws_internet_gateway" "main" {
+  vpc_id = aws_vpc.main.id
+  tags   = local.tags
+}
+
+resource "aws_subnet" "public" {
+  count                   = 2
+  vpc_id                  = aws_vpc.main.id
+  cidr_block              = cidrsubnet(var.vpc_cidr, 8, count.index)
+  availability_zone       = data.aws_availability_zones.available.names[count.index]
+  map_public_ip_on_launch = true
+  tags                    = merge(local.tags, { Name = "${var.project_name}-public-${count.index}" })
+}
+
+resource "aws_subnet" "private" {
+  count             = 2
+  vpc_id            = aws_vpc.main.id
+  cidr_block        = cidrsubnet(var.vpc_cidr, 8, count.index + 10)
+  availability_zone = data.aws_availability_zones.available.names[count.index]
+  tags              = merge(local.tags, { Name = "${var.project_name}-private-${count.index}" })
+}
+
+resource "aws_route_table" "public" {
+  vpc_id = aws_vpc.main.id
+  route {
+    cidr_block = "0.0.0.0/0"
+    gateway_id = aws_internet_gateway.main.id
+  }
+  tags = local.tags
+}
+
+resource "aws_route_table_association" "public" {
+  count          = 2
+  subnet_id      = aws_subnet.public[count.index].id
+  route_table_id = aws_route_table.public.id
+}
+""",
+        "variables": {"vpc_cidr": {"description": "VPC CIDR block", "type": "string", "default": "10.0.0.0/16"}},
+        "outputs": {
+            "vpc_id": {"description": "VPC id", "value": "aws_vpc.main.id"},
+            "private_subnet_ids": {"description": "Private subnet ids", "value": "aws_subnet.private[*].id"},
+        },
+    },
+    "alb": {
+        "resources": """resource "aws_security_group" "@{name}" {
+  name_prefix = "${var.project_name}-@{label}-"
+  vpc_id      = aws_vpc.main.id
+  ingress {
+    from_port   = 443
+    to_port     = 443
+    protocol    = "tcp"
+    cidr_blocks = ["0.0.0.0/0"]
+  }
+  ingress {
+    from_port   = 80
+    to_port     = 80
+    protocol    = "tcp"
+    cidr_blocks = ["0.0.0.0/0"]
+  }
+  egress {
+    from_port   = 0
+    to_port     = 0
+    protocol    = "-1"
+    cidr_blocks = [var.vpc_cidr]
+  }
+  tags = local.tags
+}
+
+resource "aws_lb" "@{name}" {
+  name               = substr("${var.project_name}-@{label}", 0, 32)
+  load_balancer_type = "application"
+  security_groups    = [aws_security_group.@{name}.id]
+  subnets            = aws_subnet.public[*].id
+  drop_invalid_header_fields = true
+  tags               = local.tags
+}
+
+resource "aws_lb_target_group" "@{name}" {
+  name_prefix = "tg-"
+  port        = 80
+  protocol    = "HTTP"
+  target_type = "instance"
+  vpc_id      = aws_vpc.main.id
+  health_check {
+    path = "/health"
+  }
+  tags = local.tags
+}
+
+resource "aws_lb_listener" "@{name}" {
+  load_balancer_arn = aws_lb.@{name}.arn
+  port              = 80
+  protocol          = "HTTP"
+  default_action {
+    type             = "forward"
+    target_group_arn = aws_lb_target_group.@{name}.arn
+  }
+}
+""",
+        "outputs": {"@{name}_dns_name": {"description": "@{title} DNS name", "value": "aws_lb.@{name}.dns_name"}},
+    },
+    "rds": {
+        "resources": """resource "aws_db_subnet_group" "@{name}" {
+  name_prefix = "${var.project_name}-@{label}-"
+  subnet_ids  = aws_subnet.private[*].id
+  tags        = local.tags
+}
+
+resource "aws_security_group" "@{name}" {
+  name_prefix = "${var.project_name}-@{label}-"
+  vpc_id      = aws_vpc.main.id
+  ingress {
+    from_port   = @{port}
+    to_port     = @{port}
+    protocol    = "tcp"
+    cidr_blocks = [var.vpc_cidr]
+  }
+  tags = local.tags
+}
+
+resource "aws_db_instance" "@{name}" {
+  identifier_prefix           = "${var.project_name}-@{label}-"
+  engine                      = "@{engine}"
+  engine_version              = "@{engine_version}"
+  instance_class              = var.db_instance_class
+  allocated_storage           = 20
+  max_allocated_storage       = 100
+  username                    = "dbadmin"
+  manage_master_user_password = true
+  db_subnet_group_name        = aws_db_subnet_group.@{name}.name
+  vpc_security_group_ids      = [aws_security_group.@{name}.id]
+  multi_az                    = var.environment == "prod"
+  storage_encrypted           = true
+  backup_retention_period     = 7
+  deletion_protection         = var.environment == "prod"
+  skip_final_snapshot         = var.environment != "prod"
+  final_snapshot_identifier   = "${var.project_name}-@{label}-final"
+  tags                        = local.tags
+}
+""",
+        "variables": {"db_instance_class": {"description": "RDS instance class", "type": "string", "default": "db.t4g.micro"}},
+        "outputs": {"@{name}_endpoint": {"description": "@{title} endpoint", "value": "aws_db_instance.@{name}.endpoint"}},
+    },
+    "dynamodb": {
+        "resources": """resource "aws_dynamodb_table" "@{name}" {
+  name         = "${var.project_name}-@{label}"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "pk"
+  range_key    = "sk"
+  attribute {
+    name = "pk"
+    type = "S"
+  }
+  attribute {
+    name = "sk"
+    type = "S"
+  }
+  point_in_time_recovery {
+    enabled = true
+  }
+  server_side_encryption {
+    enabled = true
+  }
+  tags = local.tags
+}
+""",
+        "outputs": {"@{name}_table_name": {"description": "@{title} table name", "value": "aws_dynamodb_table.@{name}.name"}},
+    },
+    "elasticache": {
+        "resources": """resource "aws_elasticache_subnet_group" "@{name}" {
+  name       = "${var.project_name}-@{label}"
+  subnet_ids = aws_subnet.private[*].id
+}
+
+resource "aws_security_group" "@{name}" {
+  name_prefix = "${var.project_name}-@{label}-"
+  vpc_id      = aws_vpc.main.id
+  ingress {
+    from_port   = 6379
+    to_port     = 6379
+    protocol    = "tcp"
+    cidr_blocks = [var.vpc_cidr]
+  }
+  tags = local.tags
+}
+
+resource "aws_elasticache_replication_group" "@{name}" {
+  replication_group_id       = substr("${var.project_name}-@{label}", 0, 40)
+  description                = "@{title}"
+  engine                     = "redis"
+  node_type                  = var.cache_node_type
+  num_cache_clusters         = 2
+  automatic_failover_enabled = true
+  subnet_group_name          = aws_elasticache_subnet_group.@{name}.name
+  security_group_ids         = [aws_security_group.@{name}.id]
+  at_rest_encryption_enabled = true
+  transit_encryption_enabled = true
+  tags                       = local.tags
+}
+""",
+        "variables": {"cache_node_type": {"description": "ElastiCache node type", "type": "string", "default": "cache.t4g.micro"}},
+        "outputs": {"@{name}_endpoint": {"description": "@{title} primary endpoint", "value": "aws_elasticache_replication_group.@{name}.primary_endpoint_address"}},
+    },
+    "s3": {
+        "resources": """resource "aws_s3_bucket" "@{name}" {
+  bucket_prefix = "${var.project_name}-@{label}-"
+  tags          = local.tags
+}
+
+resource "aws_s3_bucket_public_access_block" "@{name}" {
+  bucket                  = aws_s3_bucket.@{name}.id
+  block_public_acls       = true
+  block_public_policy     = true
+  ignore_public_acls      = true
+  restrict_public_buckets = true
+}
+
+resource "aws_s3_bucket_versioning" "@{name}" {
+  bucket = aws_s3_bucket.@{name}.id
+  versioning_configuration {
+    status = "Enabled"
+  }
+}
+
+resource "aws_s3_bucket_server_side_encryption_configuration" "@{name}" {
+  bucket = aws_s3_bucket.@{name}.id
+  rule {
+    apply_server_side_encryption_by_default {
+      sse_algorithm = "AES256"
+    }
+  }
+}
+""",
+        "outputs": {"@{name}_bucket": {"description": "@{title} bucket name", "value": "aws_s3_bucket.@{name}.bucket"}},
+    },
+    "lambda": {
+        "resources": """resource "aws_iam_role" "@{name}" {
+  name_prefix = "${var.project_name}-@{label}-"
+  assume_role_policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [{
+      Effect    = "Allow"
+      Principal = { Service = "lambda.amazonaws.com" }
+      Action    = "sts:AssumeRole"
+    }]
+  })
+  tags = local.tags
+}
+
+resource "aws_iam_role_policy_attachment" "@{name}" {
+  role       = aws_iam_role.@{name}.name
+  policy_arn = "arn:aws:iam::aws:policy/service-role/AWSLambdaBasicExecutionRole"
+}
+
+resource "aws_lambda_function" "@{name}" {
+  function_name = "${var.project_name}-@{label}"
+  role          = aws_iam_role.@{name}.arn
+  runtime       = "python3.12"
+  handler       = "app.handler"
+  filename      = var.lambda_package_path
+  memory_size   = 512
+  timeout       = 30
+  tracing_config {
+    mode = "Active"
+  }
+  tags = local.tags
+}
+""",
+        "variables": {"lambda_package_path": {"description": "Path to the Lambda deployment package", "type": "string", "default": "build/lambda.zip"}},
+        "outputs": {"@{name}_arn": {"description": "@{title} function ARN", "value": "aws_lambda_function.@{name}.arn"}},
+    },
+    "api_gateway": {
+        "resources": """resource "aws_apigatewayv2_api" "@{name}" {
+  name          = "${var.project_name}-@{label}"
+  protocol_type = "HTTP"
+  tags          = local.tags
+}
+
+resource "aws_apigatewayv2_stage" "@{name}" {
+  api_id      = aws_apigatewayv2_api.@{name}.id
+  name        = "$default"
+  auto_deploy = true
+  tags        = local.tags
+}
+""",
+        "outputs": {"@{name}_url": {"description": "@{title} invoke URL", "value": "aws_apigatewayv2_stage.@{name}.invoke_url"}},
+    },
+    "cloudfront": {
+        "resources": """resource "aws_cloudfront_distribution" "@{name}" {
+  enabled         = true
+  is_ipv6_enabled = true
+  comment         = "@{title}"
+  origin {
+    domain_name = var.cdn_origin_domain
+    origin_id   = "primary"
+    custom_origin_config {
+      http_port              = 80
+      https_port             = 443
+      origin_protocol_policy = "https-only"
+      origin_ssl_protocols   = ["TLSv1.2"]
+    }
+  }
+  default_cache_behavior {
+    target_origin_id       = "primary"
+    viewer_protocol_policy = "redirect-to-https"
+    allowed_methods        = ["GET", "HEAD", "OPTIONS"]
+    cached_methods         = ["GET", "HEAD"]
+    cache_policy_id        = "658327ea-f89d-4fab-a63d-7e88639e58f6" # Managed-CachingOptimized
+  }
+  restrictions {
+    geo_restriction {
+      restriction_type = "none"
+    }
+  }
+  viewer_certificate {
+    cloudfront_default_certificate = true
+  }
+  tags = local.tags
+}
+""",
+        "variables": {"cdn_origin_domain": {"description": "Origin domain name served by CloudFront", "type": "string", "default": "example.com"}},
+        "outputs": {"@{name}_domain": {"description": "@{title} domain name", "value": "aws_cloudfront_distribution.@{name}.domain_name"}},
+    },
+    "ec2": {
+        "resources": """data "aws_ami" "@{name}" {
+  most_recent = true
+  owners      = ["amazon"]
+  filter {
+    name   = "name"
+    values = ["al2023-ami-*-x86_64"]
+  }
+}
+
+resource "aws_security_group" "@{name}" {
+  name_prefix = "${var.project_name}-@{label}-"
+  vpc_id      = aws_vpc.main.id
+  ingress {
+    from_port   = 80
+    to_port     = 80
+    protocol    = "tcp"
+    cidr_blocks = [var.vpc_cidr]
+  }
+  egress {
+    from_port   = 0
+    to_port     = 0
+    protocol    = "-1"
+    cidr_blocks = ["0.0.0.0/0"]
+  }
+  tags = local.tags
+}
+
+resource "aws_launch_template" "@{name}" {
+  name_prefix            = "${var.project_name}-@{label}-"
+  image_id               = data.aws_ami.@{name}.id
+  instance_type          = var.instance_type
+  vpc_security_group_ids = [aws_security_group.@{name}.id]
+  metadata_options {
+    http_tokens = "required"
+  }
+  tag_specifications {
+    resource_type = "instance"
+    tags          = local.tags
+  }
+}
+
+resource "aws_autoscaling_group" "@{name}" {
+  name_prefix         = "${var.project_name}-@{label}-"
+  min_size            = 1
+  max_size            = 4
+  desired_capacity    = 2
+  vpc_zone_identifier = aws_subnet.private[*].id
+  launch_template {
+    id      = aws_launch_template.@{name}.id
+    version = "$Latest"
+  }
+}
+""",
+        "variables": {"instance_type": {"description": "EC2 instance type", "type": "string", "default": "t3.small"}},
+        "outputs": {"@{name}_asg_name": {"description": "@{title} Auto Scaling group", "value": "aws_autoscaling_group.@{name}.name"}},
+    },
+    "sqs": {
+        "resources": """resource "aws_sqs_queue" "@{name}_dlq" {
+  name                      = "${var.project_name}-@{label}-dlq"
+  message_retention_seconds = 1209600
+  sqs_managed_sse_enabled   = true
+  tags                      = local.tags
+}
+
+resource "aws_sqs_queue" "@{name}" {
+  name                    = "${var.project_name}-@{label}"
+  sqs_managed_sse_enabled = true
+  redrive_policy = jsonencode({
+    deadLetterTargetArn = aws_sqs_queue.@{name}_dlq.arn
+    maxReceiveCount     = 5
+  })
+  tags = local.tags
+}
+""",
+        "outputs": {"@{name}_url": {"description": "@{title} queue URL", "value": "aws_sqs_queue.@{name}.url"}},
+    },
+    "sns": {
+        "resources": """resource "aws_sns_topic" "@{name}" {
+  name              = "${var.project_name}-@{label}"
+  kms_master_key_id = "alias/aws/sns"
+  tags              = local.tags
+}
+""",
+        "outputs": {"@{name}_arn": {"description": "@{title} topic ARN", "value": "aws_sns_topic.@{name}.arn"}},
+    },
+    "cloudwatch": {
+        "resources": """resource "aws_cloudwatch_log_group" "@{name}" {
+  name              = "/${var.project_name}/@{label}"
+  retention_in_days = 30
+  tags              = local.tags
+}
+""",
+    },
+}
+
+
+# CloudFormation ----------------------------------------------------------
+
+CLOUDFORMATION_COMMON_PARAMETERS = {
+    "ProjectName": {"description": "Name prefix for all resources", "type": "String", "default": "@{project}"},
+    "Environment": {"description": "Deployment environment", "type": "String", "default": "dev"},
+}
+
+CLOUDFORMATION_TEMPLATES: Dict[str, Dict[str, Any]] = {
+    "vpc": {
+        "resources": """  VPC:
+    Type: AWS::EC2::VPC
+    Properties:
+      CidrBlock: !Ref VpcCidr
+      EnableDnsSupport: true
+      EnableDnsHostnames: true
+      Tags: [{Key: Name, Value: !Sub "${ProjectName}-vpc"}]
+  InternetGateway:
+    Type: AWS::EC2::InternetGateway
+  GatewayAttachment:
+    Type: AWS::EC2::VPCGatewayAttachment
+    Properties:
+      VpcId: !Ref VPC
+      InternetGatewayId: !Ref InternetGateway
+  PublicSubnet1:
+    Type: AWS::EC2::Subnet
+    Properties:
+      VpcId: !Ref VPC
+      CidrBlock: !Select [0, !Cidr [!Ref VpcCidr, 32, 8]]
+      AvailabilityZone: !Select [0, !GetAZs ""]
+      MapPublicIpOnLaunch: true
+  PublicSubnet2:
+    Type: AWS::EC2::Subnet
+    Properties:
+      VpcId: !Ref VPC
+      CidrBlock: !Select [1, !Cidr [!Ref VpcCidr, 32, 8]]
+      AvailabilityZone: !Select [1, !GetAZs ""]
+      MapPublicIpOnLaunch: true
+  PrivateSubnet1:
+    Type: AWS::EC2::Subnet
+    Properties:
+      VpcId: !Ref VPC
+      CidrBlock: !Select [10, !Cidr [!Ref VpcCidr, 32, 8]]
+      AvailabilityZone: !Select [0, !GetAZs ""]
+  PrivateSubnet2:
+    Type: AWS::EC2::Subnet
+    Properties:
+      VpcId: !Ref VPC
+      CidrBlock: !Select [11, !Cidr [!Ref VpcCidr, 32, 8]]
+      AvailabilityZone: !Select [1, !GetAZs ""]
+  PublicRouteTable:
+    Type: AWS::EC2::RouteTable
+    Properties:
+      VpcId: !Ref VPC
+  PublicRoute:
+    Type: AWS::EC2::Route
+    DependsOn: GatewayAttachment
+    Properties:
+      RouteTableId: !Ref PublicRouteTable
+      DestinationCidrBlock: 0.0.0.0/0
+      GatewayId: !Ref InternetGateway
+  PublicSubnet1RouteTableAssociation:
+    Type: AWS::EC2::SubnetRouteTableAssociation
+    Properties:
+      SubnetId: !Ref PublicSubnet1
+      RouteTableId: !Ref PublicRouteTable
+  PublicSubnet2RouteTableAssociation:
+    Type: AWS::EC2::SubnetRouteTableAssociation
+    Properties:
+      SubnetId: !Ref PublicSubnet2
+      RouteTableId: !Ref PublicRouteTable
+""",
+        "variables": {"VpcCidr": {"description": "VPC CIDR block", "type": "String", "default": "10.0.0.0/16"}},
+        "outputs": {"VpcId": {"description": "VPC id", "value": "!Ref VPC"}},
+    },
+    "alb": {
+        "resources": """  @{logical}SecurityGroup:
+    Type: AWS::EC2::SecurityGroup
+    Properties:
+      GroupDescription: @{title}
+      VpcId: !Ref VPC
+      SecurityGroupIngress:
+        - {IpProtocol: tcp, FromPort: 443, ToPort: 443, CidrIp: 0.0.0.0/0}
+        - {IpProtocol: tcp, FromPort: 80, ToPort: 80, CidrIp: 0.0.0.0/0}
+  @{logical}:
+    Type: AWS::ElasticLoadBalancingV2::LoadBalancer
+    Properties:
+      Type: application
+      Subnets: [!Ref PublicSubnet1, !Ref PublicSubnet2]
+      SecurityGroups: [!Ref @{logical}SecurityGroup]
+  @{logical}TargetGroup:
+    Type: AWS::ElasticLoadBalancingV2::TargetGroup
+    Properties:
+      Port: 80
+      Protocol: HTTP
+      VpcId: !Ref VPC
+      HealthCheckPath: /health
+  @{logical}Listener:
+    Type: AWS::ElasticLoadBalancingV2::Listener
+    Properties:
+      LoadBalancerArn: !Ref @{logical}
+      Port: 80
+      Protocol: HTTP
+      DefaultActions:
+        - {Type: forward, TargetGroupArn: !Ref @{logical}TargetGroup}
+""",
+        "outputs": {"@{logical}DnsName": {"description": "@{title} DNS name", "value": "!GetAtt @{logical}.DNSName"}},
+    },
+    "rds": {
+        "resources": """  @{logical}SubnetGroup:
+    Type: AWS::RDS::DBSubnetGroup
+    Properties:
+      DBSubnetGroupDescription: @{title}
+      SubnetIds: [!Ref PrivateSubnet1, !Ref PrivateSubnet2]
+  @{logical}SecurityGroup:
+    Type: AWS::EC2::SecurityGroup
+    Properties:
+      GroupDescription: @{title}
+      VpcId: !Ref VPC
+      SecurityGroupIngress:
+        - {IpProtocol: tcp, FromPort: @{port}, ToPort: @{port}, CidrIp: !Ref VpcCidr}
+  @{logical}:
+    Type: AWS::RDS::DBInstance
+    DeletionPolicy: Snapshot
+    UpdateReplacePolicy: Snapshot
+    Properties:
+      Engine: @{engine}
+      EngineVersion: "@{engine_version}"
+      DBInstanceClass: !Ref DbInstanceClass
+      AllocatedStorage: "20"
+      MasterUsername: dbadmin
+      ManageMasterUserPassword: true
+      DBSubnetGroupName: !Ref @{logical}SubnetGroup
+      VPCSecurityGroups: [!Ref @{logical}SecurityGroup]
+      StorageEncrypted: true
+      BackupRetentionPeriod: 7
+""",
+        "variables": {"DbInstanceClass": {"description": "RDS instance class", "type": "String", "default": "db.t4g.micro"}},
+        "outputs": {"@{logical}Endpoint": {"description": "@{title} endpoint", "value": "!GetAtt @{logical}.Endpoint.Address"}},
+    },
+    "dynamodb": {
+        "resources": """  @{logical}:
+    Type: AWS::DynamoDB::Table
+    Properties:
+      BillingMode: PAY_PER_REQUEST
+      AttributeDefinitions:
+        - {AttributeName: pk, AttributeType: S}
+        - {AttributeName: sk, AttributeType: S}
+      KeySchema:
+        - {AttributeName: pk, KeyType: HASH}
+        - {AttributeName: sk, KeyType: RANGE}
+      PointInTimeRecoverySpecification: {PointInTimeRecoveryEnabled: true}
+      SSESpecification: {SSEEnabled: true}
+""",
+        "outputs": {"@{logical}TableName": {"description": "@{title} table name", "value": "!Ref @{logical}"}},
+    },
+    "elasticache": {
+        "resources": """  @{logical}SubnetGroup:
+    Type: AWS::ElastiCache::SubnetGroup
+    Properties:
+      Description: @{title}
+      SubnetIds: [!Ref PrivateSubnet1, !Ref PrivateSubnet2]
+  @{logical}SecurityGroup:
+    Type: AWS::EC2::SecurityGroup
+    Properties:
+      GroupDescription: @{title}
+      VpcId: !Ref VPC
+      SecurityGroupIngress:
+        - {IpProtocol: tcp, FromPort: 6379, ToPort: 6379, CidrIp: !Ref VpcCidr}
+  @{logical}:
+    Type: AWS::ElastiCache::ReplicationGroup
+    Properties:
+      ReplicationGroupDescription: @{title}
+      Engine: redis
+      CacheNodeType: !Ref CacheNodeType
+      NumCacheClusters: 2
+      AutomaticFailoverEnabled: true
+      CacheSubnetGroupName: !Ref @{logical}SubnetGroup
+      SecurityGroupIds: [!Ref @{logical}SecurityGroup]
+      AtRestEncryptionEnabled: true
+      TransitEncryptionEnabled: true
+""",
+        "variables": {"CacheNodeType": {"description": "ElastiCache node type", "type": "String", "default": "cache.t4g.micro"}},
+        "outputs": {"@{logical}Endpoint": {"description": "@{title} primary endpoint", "value": "!GetAtt @{logical}.PrimaryEndPoint.Address"}},
+    },
+    "s3": {
+        "resources": """  @{logical}:
+    Type: AWS::S3::Bucket
+    DeletionPolicy: Retain
+    Properties:
+      VersioningConfiguration: {Status: Enabled}
+      PublicAccessBlockConfiguration:
+        BlockPublicAcls: true
+        BlockPublicPolicy: true
+        IgnorePublicAcls: true
+        RestrictPublicBuckets: true
+      BucketEncryption:
+        ServerSideEncryptionConfiguration:
+          - ServerSideEncryptionByDefault: {SSEAlgorithm: AES256}
+""",
+        "outputs": {"@{logical}Name": {"description": "@{title} bucket name", "value": "!Ref @{logical}"}},
+    },
+    "lambda": {
+        "resources": """  @{logical}Role:
+    Type: AWS::IAM::Role
+    Properties:
+      AssumeRolePolicyDocument:
+        Version: "2012-10-17"
+        Statement:
+          - {Effect: Allow, Principal: {Service: lambda.amazonaws.com}, Action: sts:AssumeRole}
+      ManagedPolicyArns:
+        - arn:aws:iam::aws:policy/service-role/AWSLambdaBasicExecutionRole
+  @{logical}:
+    Type: AWS::Lambda::Function
+    Properties:
+      Runtime: python3.12
+      Handler: app.handler
+      Role: !GetAtt @{logical}Role.Arn
+      MemorySize: 512
+      Timeout: 30
+      TracingConfig: {Mode: Active}
+      Code:
+        S3Bucket: !Ref LambdaCodeBucket
+        S3Key: !Ref LambdaCodeKey
+""",
+        "variables": {
+            "LambdaCodeBucket": {"description": "S3 bucket holding Lambda packages", "type": "String", "default": ""},
+            "LambdaCodeKey": {"description": "S3 key of the Lambda package", "type": "String", "default": "lambda.zip"},
+        },
+        "outputs": {"@{logical}Arn": {"description": "@{title} function ARN", "value": "!GetAtt @{logical}.Arn"}},
+    },
+    "api_gateway": {
+        "resources": """  @{logical}:
+    Type: AWS::ApiGatewayV2::Api
+    Properties:
+      Name: !Sub "${ProjectName}-@{label}"
+      ProtocolType: HTTP
+  @{logical}Stage:
+    Type: AWS::ApiGatewayV2::Stage
+    Properties:
+      ApiId: !Ref @{logical}
+      StageName: $default
+      AutoDeploy: true
+""",
+        "outputs": {"@{logical}Endpoint": {"description": "@{title} endpoint", "value": "!GetAtt @{logical}.ApiEndpoint"}},
+    },
+    "cloudfront": {
+        "resources": """  @{logical}:
+    Type: AWS::CloudFront::Distribution
+    Properties:
+      DistributionConfig:
+        Enabled: true
+        Comment: @{title}
+        Origins:
+          - Id: primary
+            DomainName: !Ref CdnOriginDomain
+            CustomOriginConfig: {OriginProtocolPolicy: https-only, OriginSSLProtocols: [TLSv1.2]}
+        DefaultCacheBehavior:
+          TargetOriginId: primary
+          ViewerProtocolPolicy: redirect-to-https
+          CachePolicyId: 658327ea-f89d-4fab-a63d-7e88639e58f6
+""",
+        "variables": {"CdnOriginDomain": {"description": "Origin domain name served by CloudFront", "type": "String", "default": "example.com"}},
+        "outputs": {"@{logical}Domain": {"description": "@{title} domain name", "value": "!GetAtt @{logical}.DomainName"}},
+    },
+    "ec2": {
+        "resources": """  @{logical}SecurityGroup:
+    Type: AWS::EC2::SecurityGroup
+    Properties:
+      GroupDescription: @{title}
+      VpcId: !Ref VPC
+      SecurityGroupIngress:
+        - {IpProtocol: tcp, FromPort: 80, ToPort: 80, CidrIp: !Ref VpcCidr}
+  @{logical}LaunchTemplate:
+    Type: AWS::EC2::LaunchTemplate
+    Properties:
+      LaunchTemplateData:
+        ImageId: !Ref LatestAmiId
+        InstanceType: !Ref InstanceType
+        SecurityGroupIds: [!Ref @{logical}SecurityGroup]
+        MetadataOptions: {HttpTokens: required}
+  @{logical}:
+    Type: AWS::AutoScaling::AutoScalingGroup
+    Properties:
+      MinSize: "1"
+      MaxSize: "4"
+      DesiredCapacity: "2"
+      VPCZoneIdentifier: [!Ref PrivateSubnet1, !Ref PrivateSubnet2]
+      LaunchTemplate:
+        LaunchTemplateId: !Ref @{logical}LaunchTemplate
+        Version: !GetAtt @{logical}LaunchTemplate.LatestVersionNumber
+""",
+        "variables": {
+            "InstanceType": {"description": "EC2 instance type", "type": "String", "default": "t3.small"},
+            "LatestAmiId": {
+                "description": "Amazon Linux 2023 AMI",
+                "type": "AWS::SSM::Parameter::Value<AWS::EC2::Image::Id>",
+                "default": "/aws/service/ami-amazon-linux-latest/al2023-ami-kernel-default-x86_64",
+            },
+        },
+        "outputs": {"@{logical}Name": {"description": "@{title} Auto Scaling group", "value": "!Ref @{logical}"}},
+    },
+    "sqs": {
+        "resources": """  @{logical}DeadLetterQueue:
+    Type: AWS::SQS::Queue
+    Properties:
+      MessageRetentionPeriod: 1209600
+      SqsManagedSseEnabled: true
+  @{logical}:
+    Type: AWS::SQS::Queue
+    Properties:
+      SqsManagedSseEnabled: true
+      RedrivePolicy:
+        deadLetterTargetArn: !GetAtt @{logical}DeadLetterQueue.Arn
+        maxReceiveCount: 5
+""",
+        "outputs": {"@{logical}Url": {"description": "@{title} queue URL", "value": "!Ref @{logical}"}},
+    },
+    "sns": {
+        "resources": """  @{logical}:
+    Type: AWS::SNS::Topic
+    Properties:
+      KmsMasterKeyId: alias/aws/sns
+""",
+        "outputs": {"@{logical}Arn": {"description": "@{title} topic ARN", "value": "!Ref @{logical}"}},
+    },
+    "cloudwatch": {
+        "resources": """  @{logical}:
+    Type: AWS::Logs::LogGroup
+    Properties:
+      LogGroupName: !Sub "/${ProjectName}/@{label}"
+      RetentionInDays: 30
+""",
+    },
+}
+
+TEMPLATES = {TERRAFORM: TERRAFORM_TEMPLATES, CLOUDFORMATION: CLOUDFORMATION_TEMPLATES}
+
+
+def render(text: str, values: Dict[str, str]) -> str:
+    """Substitute @{field} placeholders"""
+    return SnippetTemplate(text).substitute(values)
@@ -0,0 +1 @@
+"""Deployment planning and execution package"""
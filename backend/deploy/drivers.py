@@ -0,0 +1,115 @@
+"""
+Deployment provider drivers
+A driver creates one planned resource at a time; the executor decides order
+and parallelism. Only the local fake driver exists so far
+"""
+
+import os
+import asyncio
+import hashlib
+import logging
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class DeploymentDriver:
+    """Base class for provider drivers"""
+
+    name = "base"
+    # driver_options an API request may set; everything else is server-side
+    request_options: Tuple[str, ...] = ()
+
+    def __init__(self, region: str = "us-west-2", stack_name: str = "skyrchitect-stack", **options: Any):
+        self.region = region
+        self.stack_name = stack_name
+        self.options = options
+
+    async def create(self, resource: Dict[str, Any], dependencies: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Create one resource
+
+        Args:
+            resource: Planned resource ({"id", "name", "kind", "group", ...})
+            dependencies: Outputs of the resources it depends on, by id
+
+        Returns:
+            Resource outputs (physical id, ARN, URL, ...)
+        """
+        raise NotImplementedError
+
+
+class FakeDriver(DeploymentDriver):
+    """
+    Local driver for testing and demos
+
+    Sleeps for the resource's estimated duration scaled by time_scale
+    (DEPLOY_FAKE_TIME_SCALE) and returns deterministic fake identifiers.
+    Resources whose id or kind is listed in fail (DEPLOY_FAKE_FAIL,
+    comma-separated) raise an error. Neither can be set by API requests.
+    """
+
+    name = "fake"
+
+    def __init__(self, time_scale: Optional[float] = None, fail: Optional[list] = None, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.time_scale = time_scale if time_scale is not None else float(os.getenv("DEPLOY_FAKE_TIME_SCALE", "0.01"))
+        if fail is None:
+            fail = [item.strip() for item in os.getenv("DEPLOY_FAKE_FAIL", "").split(",") if item.strip()]
+        self.fail = set(fail)
+
+    async def create(self, resource: Dict[str, Any], dependencies: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        await asyncio.sleep(resource["estimated_seconds"] * self.time_scale)
+        if resource["id"] in self.fail or resource["kind"] in self.fail:
+            raise RuntimeError(f"Simulated failure creating {resource['name']}")
+
+        digest = hashlib.sha256(f"{self.stack_name}/{resource['id']}".encode("utf-8")).hexdigest()[:12]
+        kind = resource["kind"] or "resource"
+        outputs = {
+            "physical_id": f"{kind}-{digest}",
+            "arn": f"arn:aws:{kind}:{self.region}:000000000000:{self.stack_name}/{digest}"
+        }
+        if resource["group"] == "edge":
+            outputs["url"] = f"https://{digest}.{self.stack_name}.{self.region}.example.com"
+        return outputs
+
+
+# Driver factories by name; CloudFormation/Terraform drivers register here
+DRIVERS: Dict[str, Callable[..., DeploymentDriver]] = {
+    "fake": FakeDriver,
+}
+
+
+def register_driver(name: str, factory: Callable[..., DeploymentDriver]):
+    """Make a driver available to get_driver()"""
+    DRIVERS[name] = factory
+
+
+def check_request_options(name: str, options: Dict[str, Any]):
+    """
+    Reject driver_options an API request is not allowed to set
+
+    Raises:
+        ValueError: If the driver is unknown or an option is not in its request_options
+    """
+    if name not in DRIVERS:
+        raise ValueError(f"Unknown deployment driver '{name}' (available: {', '.join(sorted(DRIVERS))})")
+    allowed = getattr(DRIVERS[name], "request_options", ())
+    rejected = sorted(set(options) - set(allowed))
+    if rejected:
+        raise ValueError(
+            f"driver_options not allowed for driver '{name}': {', '.join(rejected)} "
+            f"(allowed: {', '.join(allowed) or 'none'})"
+        )
+
+
+def get_driver(name: str, **options: Any) -> DeploymentDriver:
+    """
+    Create a driver by name
+
+    Raises:
+        ValueError: If no driver is registered under that name
+    """
+    if name not in DRIVERS:
+        raise ValueError(f"Unknown deployment driver '{name}' (available: {', '.join(sorted(DRIVERS))})")
+    return DRIVERS[name](**options)
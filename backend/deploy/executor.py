@@ -0,0 +1,132 @@
+"""
+Deployment executor
+Runs a wave plan against a driver, starting each resource as soon as its
+dependencies are done, and yields progress events
+"""
+
+import os
+import time
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, Optional
+
+from backend.deploy.drivers import DeploymentDriver
+
+logger = logging.getLogger(__name__)
+
+
+async def execute_plan(
+    plan: Dict[str, Any],
+    driver: DeploymentDriver,
+    concurrency: Optional[int] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Execute a plan from plan_deployment()
+
+    Scheduling is dependency-driven rather than wave-by-wave, so a slow
+    resource only delays its own dependents. When a resource fails, its
+    dependents are skipped and everything else still runs.
+
+    Args:
+        plan: Deployment plan
+        driver: Provider driver
+        concurrency: Resources created at once (default DEPLOY_CONCURRENCY or 8)
+
+    Yields:
+        {"event": "started" | "completed" | "failed" | "skipped", "id", "name", "wave", "at", ...}
+        and finally {"event": "done", "status", "elapsed", "completed", "failed", "skipped", "outputs"}
+    """
+    concurrency = concurrency or int(os.getenv("DEPLOY_CONCURRENCY", "8"))
+    resources = {r["id"]: r for r in plan["resources"]}
+    waiting = {rid: set(r["depends_on"]) for rid, r in resources.items()}
+    dependents: Dict[str, list] = {rid: [] for rid in resources}
+    for rid, resource in resources.items():
+        for dep in resource["depends_on"]:
+            dependents[dep].append(rid)
+
+    outputs: Dict[str, Dict[str, Any]] = {}
+    failed, skipped = [], []
+    ready = [rid for rid, deps in waiting.items() if not deps]
+    running: Dict[asyncio.Task, str] = {}
+    started_at: Dict[str, float] = {}
+    start = time.monotonic()
+
+    def event(event_type: str, rid: str, **fields: Any) -> Dict[str, Any]:
+        resource = resources[rid]
+        return {
+            "event": event_type, "id": rid, "name": resource["name"], "wave": resource.get("wave"),
+            "at": round(time.monotonic() - start, 3), **fields
+        }
+
+    def skip_dependents(rid: str):
+        for child in dependents[rid]:
+            if child in waiting:
+                del waiting[child]
+                skipped.append(child)
+                yield event("skipped", child, reason=f"dependency {rid} failed")
+                yield from skip_dependents(child)
+
+    try:
+        while ready or running:
+            while ready and len(running) < concurrency:
+                rid = ready.pop(0)
+                del waiting[rid]
+                started_at[rid] = time.monotonic()
+                dependencies = {dep: outputs[dep] for dep in resources[rid]["depends_on"]}
+                running[asyncio.ensure_future(driver.create(resources[rid], dependencies))] = rid
+                yield event("started", rid, kind=resources[rid]["kind"], estimated_seconds=resources[rid]["estimated_seconds"])
+
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                rid = running.pop(task)
+                elapsed = round(time.monotonic() - started_at[rid], 3)
+                if task.exception() is not None:
+                    failed.append(rid)
+                    logger.error(f"❌ Deploying {resources[rid]['name']} failed: {task.exception()}")
+                    yield event("failed", rid, elapsed=elapsed, error=str(task.exception()))
+                    for skipped_event in skip_dependents(rid):
+                        yield skipped_event
+                    continue
+                outputs[rid] = task.result()
+                yield event("completed", rid, elapsed=elapsed, outputs=outputs[rid])
+                for child in dependents[rid]:
+                    if child in waiting:
+                        waiting[child].discard(rid)
+                        if not waiting[child]:
+                            ready.append(child)
+    finally:
+        for task in running:
+            task.cancel()
+
+    status = "failed" if failed else "succeeded"
+    elapsed = round(time.monotonic() - start, 3)
+    logger.info(f"✓ Deployment {status}: {len(outputs)} created, {len(failed)} failed, {len(skipped)} skipped in {elapsed}s")
+    yield {
+        "event": "done",
+        "status": status,
+        "elapsed": elapsed,
+        "completed": list(outputs),
+        "failed": failed,
+        "skipped": skipped,
+        "outputs": outputs
+    }
+
+
+def format_event(event: Dict[str, Any]) -> Optional[str]:
+    """One deployment log line for an event (None for events without one)"""
+    kind = event["event"]
+    if kind == "started":
+        return f"[INFO] Wave {event['wave']}: creating {event['name']} (~{event['estimated_seconds']}s)"
+    if kind == "completed":
+        return f"[SUCCESS] {event['name']} created in {event['elapsed']}s ({event['outputs'].get('physical_id', '')})"
+    if kind == "failed":
+        return f"[ERROR] {event['name']} failed: {event['error']}"
+    if kind == "skipped":
+        return f"[WARN] {event['name']} skipped: {event['reason']}"
+    if kind == "done":
+        return (
+            f"[{'SUCCESS' if event['status'] == 'succeeded' else 'ERROR'}] Deployment {event['status']} "
+            f"in {event['elapsed']}s ({len(event['completed'])} created, {len(event['failed'])} failed, "
+            f"{len(event['skipped'])} skipped)"
+        )
+    return None
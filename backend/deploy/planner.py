@@ -0,0 +1,171 @@
+"""
+Deployment planner
+Builds a resource dependency DAG from an architecture's components and
+connections and schedules it into maximally parallel waves with estimated
+durations
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.codegen.engine import COMPONENT_GROUPS, component_group
+from backend.codegen.templates import NETWORKED_KINDS, detect_kind
+
+logger = logging.getLogger(__name__)
+
+# Typical provisioning time in seconds per component kind
+ESTIMATED_SECONDS = {
+    "vpc": 90,
+    "alb": 180,
+    "rds": 600,
+    "dynamodb": 30,
+    "elasticache": 480,
+    "s3": 10,
+    "lambda": 30,
+    "api_gateway": 45,
+    "cloudfront": 900,
+    "ec2": 150,
+    "sqs": 10,
+    "sns": 10,
+    "cloudwatch": 15,
+}
+
+# Fallback for components without a known kind
+GROUP_SECONDS = {"networking": 90, "data": 300, "compute": 120, "edge": 180}
+
+
+def build_resource_graph(architecture: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], List[Dict[str, str]]]:
+    """
+    Resources and dependencies of an architecture (UI format)
+
+    Connections become dependencies pointing toward the earlier group
+    (networking, data, compute, edge): "API Gateway -> Lambda" makes the
+    gateway wait for the function, "SQS -> Lambda" makes the function wait
+    for the queue. Within a group the connection direction is used, and a
+    connection that would close a cycle is ignored. Networked resources
+    (ALB, EC2, RDS, ElastiCache) also depend on the networking group, which
+    gets a synthetic VPC if the architecture has none.
+
+    Returns:
+        Tuple of (resources, ignored_edges); each resource is
+        {"id", "name", "kind", "group", "estimated_seconds", "depends_on"}
+    """
+    components = architecture.get("components") or []
+    nodes = (architecture.get("diagram") or {}).get("nodes") or []
+    entries = components or nodes
+
+    resources: List[Dict[str, Any]] = []
+    aliases: Dict[str, str] = {}
+    for idx, entry in enumerate(entries):
+        node = nodes[idx] if components and idx < len(nodes) else {}
+        resource_id = str(entry.get("id") or f"resource-{idx + 1}")
+        descriptor = {
+            "name": entry.get("name") or entry.get("label") or resource_id,
+            "type": entry.get("type") or node.get("type", ""),
+            "description": entry.get("description", "")
+        }
+        kind = detect_kind(descriptor)
+        group = component_group(kind, descriptor)
+        resources.append({
+            "id": resource_id,
+            "name": descriptor["name"],
+            "kind": kind,
+            "group": group,
+            "estimated_seconds": ESTIMATED_SECONDS.get(kind, GROUP_SECONDS[group]),
+            "depends_on": []
+        })
+        aliases[resource_id] = resource_id
+        if node.get("id"):
+            aliases.setdefault(str(node["id"]), resource_id)
+
+    if any(r["kind"] in NETWORKED_KINDS for r in resources) and not any(r["kind"] == "vpc" for r in resources):
+        resources.insert(0, {
+            "id": "network",
+            "name": "Networking (VPC)",
+            "kind": "vpc",
+            "group": "networking",
+            "estimated_seconds": ESTIMATED_SECONDS["vpc"],
+            "depends_on": []
+        })
+        aliases["network"] = "network"
+
+    by_id = {r["id"]: r for r in resources}
+    rank = {r["id"]: COMPONENT_GROUPS.index(r["group"]) for r in resources}
+
+    network_ids = [r["id"] for r in resources if r["group"] == "networking"]
+    for resource in resources:
+        if resource["kind"] in NETWORKED_KINDS:
+            resource["depends_on"] += [n for n in network_ids if n != resource["id"]]
+
+    def reaches(start: str, target: str) -> bool:
+        stack, seen = [start], set()
+        while stack:
+            current = stack.pop()
+            if current == target:
+                return True
+            if current not in seen:
+                seen.add(current)
+                stack.extend(by_id[current]["depends_on"])
+        return False
+
+    ignored = []
+    for edge in (architecture.get("diagram") or {}).get("edges") or architecture.get("connections") or []:
+        source, target = aliases.get(str(edge.get("from", ""))), aliases.get(str(edge.get("to", "")))
+        if source is None or target is None or source == target:
+            continue
+        dependent, dependency = (target, source) if rank[source] < rank[target] else (source, target)
+        if dependency in by_id[dependent]["depends_on"]:
+            continue
+        if reaches(dependency, dependent):
+            ignored.append({"from": source, "to": target, "reason": "cycle"})
+            continue
+        by_id[dependent]["depends_on"].append(dependency)
+
+    if ignored:
+        logger.warning(f"⚠️ Ignored {len(ignored)} connections that would create a dependency cycle")
+    return resources, ignored
+
+
+def plan_deployment(architecture: Dict[str, Any], stack_name: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Topologically ordered wave plan
+
+    Each wave holds every resource whose dependencies are all in earlier
+    waves, so resources within a wave can be created in parallel.
+
+    Returns:
+        {"stack_name", "resources", "waves": [{"wave", "resources", "estimated_seconds"}],
+        "estimated_seconds" (critical path), "sequential_seconds", "ignored_edges"}
+    """
+    resources, ignored = build_resource_graph(architecture)
+    by_id = {r["id"]: r for r in resources}
+
+    remaining = {r["id"]: set(r["depends_on"]) for r in resources}
+    finish: Dict[str, int] = {}
+    waves = []
+    while remaining:
+        ready = [rid for rid, deps in remaining.items() if not deps]
+        if not ready:  # unreachable: build_resource_graph never adds a cycle
+            raise ValueError(f"Dependency cycle between {sorted(remaining)}")
+        for rid in ready:
+            del remaining[rid]
+            by_id[rid]["wave"] = len(waves) + 1
+            finish[rid] = by_id[rid]["estimated_seconds"] + max(
+                (finish[dep] for dep in by_id[rid]["depends_on"]), default=0
+            )
+        for deps in remaining.values():
+            deps.difference_update(ready)
+        waves.append({
+            "wave": len(waves) + 1,
+            "resources": ready,
+            "estimated_seconds": max(by_id[rid]["estimated_seconds"] for rid in ready)
+        })
+
+    return {
+        "stack_name": stack_name or "skyrchitect-stack",
+        "resources": resources,
+        "waves": waves,
+        "estimated_seconds": max(finish.values(), default=0),
+        "sequential_seconds": sum(r["estimated_seconds"] for r in resources),
+        "ignored_edges": ignored
+    }
@@ -0,0 +1,245 @@
+"""
+Batched embedding client for the NVIDIA embedding NIM on SageMaker
+Deduplicates and batches texts, sends batches concurrently, caches vectors
+by text hash (disk, shared memory or Redis) and returns float32 NumPy arrays
+"""
+
+import os
+import json
+import time
+import base64
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from backend.utils.data_dir import get_data_dir
+from backend.utils.cache import cache_key, create_cache
+
+
+class EmbeddingCache:
+    """
+    Cache of embedding vectors keyed by model, input type and text hash
+
+    Backed by utils/cache.py: SQLite at EMBEDDING_CACHE_PATH by default, or
+    whatever EMBEDDING_CACHE_BACKEND / CACHE_BACKEND selects. Vectors are
+    stored as raw float32 bytes.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv(
+            "EMBEDDING_CACHE_PATH",
+            str(get_data_dir() / "embedding_cache.sqlite3")
+        )
+        self.backend = create_cache("embedding", default_backend="disk", disk_path=self.path)
+
+    @staticmethod
+    def key(model: str, input_type: str, text: str) -> str:
+        return cache_key("embedding", model, input_type, text)
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Cached vectors for the keys that have one"""
+        return self.backend.get_many(keys)
+
+    def put_many(self, items: Dict[str, np.ndarray]):
+        self.backend.set_many({key: np.asarray(vector, dtype=np.float32) for key, vector in items.items()})
+
+
+class EmbeddingMetrics:
+    """Thread-safe counters for embedding throughput and cache effectiveness"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.texts = 0
+        self.cache_hits = 0
+        self.batches = 0
+        self.batch_errors = 0
+        self.embedded = 0
+        self.batch_seconds = 0.0
+        self.wall_seconds = 0.0
+
+    def record_call(self, texts: int, cache_hits: int, seconds: float):
+        with self._lock:
+            self.calls += 1
+            self.texts += texts
+            self.cache_hits += cache_hits
+            self.wall_seconds += seconds
+
+    def record_batch(self, size: int, seconds: float, error: bool = False):
+        with self._lock:
+            self.batches += 1
+            self.batch_seconds += seconds
+            if error:
+                self.batch_errors += 1
+            else:
+                self.embedded += size
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "texts": self.texts,
+                "cache_hits": self.cache_hits,
+                "cache_hit_rate": round(self.cache_hits / self.texts, 4) if self.texts else 0.0,
+                "batches": self.batches,
+                "batch_errors": self.batch_errors,
+                "embedded": self.embedded,
+                "avg_batch_ms": round(self.batch_seconds / self.batches * 1000, 1) if self.batches else 0.0,
+                "texts_per_second": round(self.texts / self.wall_seconds, 1) if self.wall_seconds else 0.0,
+                "embedded_per_second": round(self.embedded / self.batch_seconds, 1) if self.batch_seconds else 0.0
+            }
+
+
+class NIMEmbeddingClient:
+    """
+    Embedding NIM client (OpenAI-style /v1/embeddings payload over SageMaker)
+
+    Texts are deduplicated, looked up in the cache, and the misses are sent
+    in batches of EMBEDDING_BATCH_SIZE with up to EMBEDDING_CONCURRENCY
+    batches in flight. Vectors are requested base64-encoded and decoded
+    straight into float32 arrays. Point AWS_ENDPOINT_URL_SAGEMAKER_RUNTIME at
+    benchmarks/fake_model_server.py to run against a local fake endpoint.
+    """
+
+    def __init__(
+        self,
+        endpoint_name: str = None,
+        region_name: str = None,
+        model: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        cache: Optional[EmbeddingCache] = None,
+        normalize: bool = True,
+        client: Any = None
+    ):
+        """
+        Args:
+            endpoint_name: SageMaker endpoint of the embedding NIM
+            region_name: AWS region
+            model: Model name sent in the payload
+            batch_size: Texts per request
+            concurrency: Requests in flight at once
+            cache: Vector cache (default: EmbeddingCache at EMBEDDING_CACHE_PATH;
+                disabled with EMBEDDING_CACHE=false)
+            normalize: L2-normalize returned vectors
+            client: sagemaker-runtime client (stubs in tests)
+        """
+        import boto3
+
+        self.endpoint_name = endpoint_name or os.getenv("EMBEDDING_ENDPOINT_NAME", "nvidia-embedding-endpoint")
+        self.region_name = region_name or os.getenv("AWS_DEFAULT_REGION", "us-west-2")
+        self.model = model or os.getenv("EMBEDDING_MODEL_NAME", "nvidia/llama-3.2-nv-embedqa-1b-v2")
+        self.name = f"nim:{self.model}"
+        self.batch_size = batch_size or int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+        self.concurrency = concurrency or int(os.getenv("EMBEDDING_CONCURRENCY", "4"))
+        if cache is None and os.getenv("EMBEDDING_CACHE", "true").lower() == "true":
+            cache = EmbeddingCache()
+        self.cache = cache
+        self.normalize = normalize
+        self.client = client or boto3.client("sagemaker-runtime", region_name=self.region_name)
+        self.metrics = EmbeddingMetrics()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        print(f"✅ Embedding client: {self.endpoint_name} ({self.model}, batch {self.batch_size} x {self.concurrency})")
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="embed")
+        return self._executor
+
+    @staticmethod
+    def _decode(item: Dict[str, Any]) -> np.ndarray:
+        embedding = item["embedding"]
+        if isinstance(embedding, str):
+            return np.frombuffer(base64.b64decode(embedding), dtype="<f4")
+        # Endpoints that ignore encoding_format return a float list
+        return np.asarray(embedding, dtype=np.float32)
+
+    def _embed_batch(self, texts: List[str], input_type: str) -> np.ndarray:
+        """One endpoint call; returns a (len(texts), dim) float32 array"""
+        body = json.dumps({
+            "input": texts,
+            "model": self.model,
+            "input_type": input_type,
+            "encoding_format": "base64"
+        })
+        started = time.perf_counter()
+        try:
+            response = self.client.invoke_endpoint(
+                EndpointName=self.endpoint_name,
+                ContentType="application/json",
+                Body=body
+            )
+            data = json.loads(response["Body"].read())["data"]
+        except Exception:
+            self.metrics.record_batch(len(texts), time.perf_counter() - started, error=True)
+            raise
+        self.metrics.record_batch(len(texts), time.perf_counter() - started)
+
+        data.sort(key=lambda item: item.get("index", 0))
+        return np.stack([self._decode(item) for item in data])
+
+    def embed(self, texts: List[str], input_type: str = "passage") -> np.ndarray:
+        """
+        Embed texts
+
+        Args:
+            texts: Texts to embed
+            input_type: "query" for search queries, "passage" for indexed documents
+
+        Returns:
+            (len(texts), dim) float32 array, in input order
+        """
+        started = time.perf_counter()
+        unique = list(dict.fromkeys(texts))
+        keys = {text: EmbeddingCache.key(self.model, input_type, text) for text in unique}
+        vectors: Dict[str, np.ndarray] = {}
+
+        if self.cache is not None:
+            cached = self.cache.get_many(list(keys.values()))
+            vectors = {text: cached[key] for text, key in keys.items() if key in cached}
+        cache_hits = sum(1 for text in texts if text in vectors)
+
+        missing = [text for text in unique if text not in vectors]
+        if missing:
+            batches = [missing[i:i + self.batch_size] for i in range(0, len(missing), self.batch_size)]
+            if len(batches) == 1:
+                results = [self._embed_batch(batches[0], input_type)]
+            else:
+                results = list(self.executor.map(lambda batch: self._embed_batch(batch, input_type), batches))
+
+            fresh = {}
+            for batch, matrix in zip(batches, results):
+                if self.normalize:
+                    matrix = matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+                for text, vector in zip(batch, matrix):
+                    fresh[text] = vector
+            if self.cache is not None:
+                self.cache.put_many({keys[text]: vector for text, vector in fresh.items()})
+            vectors.update(fresh)
+
+        result = np.stack([vectors[text] for text in texts]) if texts else np.zeros((0, 0), dtype=np.float32)
+        self.metrics.record_call(len(texts), cache_hits, time.perf_counter() - started)
+        return result.astype(np.float32, copy=False)
+
+
+# Singleton instance
+_embedding_client: Optional[NIMEmbeddingClient] = None
+
+
+def get_embedding_client() -> NIMEmbeddingClient:
+    """Get or create the NIMEmbeddingClient singleton"""
+    global _embedding_client
+    if _embedding_client is None:
+        _embedding_client = NIMEmbeddingClient()
+    return _embedding_client
+
+
+def embedding_metrics() -> Dict[str, Any]:
+    """Throughput metrics of the embedding client (disabled until first used)"""
+    if _embedding_client is None:
+        return {"enabled": False}
+    return {"enabled": True, "endpoint": _embedding_client.endpoint_name, **_embedding_client.metrics.snapshot()}
@@ -0,0 +1,266 @@
+"""
+Client-side load balancer for several NIM endpoints
+Routes each request to the endpoint/variant with the fewest outstanding
+requests weighted by recent latency, sends a fixed share to canary
+variants and ejects endpoints that keep failing
+"""
+
+import os
+import json
+import time
+import random
+import threading
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.utils.endpoint_scaling import capacity_control_enabled, get_capacity_controller
+
+# Errors caused by the request itself; they do not count against the endpoint
+CLIENT_ERROR_CODES = {"ValidationError", "ValidationException"}
+
+
+class EndpointTarget:
+    """One endpoint (optionally one production variant of it) in the pool"""
+
+    def __init__(
+        self,
+        endpoint: str,
+        region: Optional[str] = None,
+        variant: Optional[str] = None,
+        weight: float = 1.0,
+        canary: float = 0.0
+    ):
+        """
+        Args:
+            endpoint: SageMaker endpoint name
+            region: AWS region (default AWS_DEFAULT_REGION)
+            variant: Production variant to pin with TargetVariant
+            weight: Relative capacity; load is divided by it when comparing targets
+            canary: Fixed share of traffic (0-1) for a canary target; 0 for regular targets
+        """
+        self.endpoint = endpoint
+        self.region = region or os.getenv("AWS_DEFAULT_REGION", "us-west-2")
+        self.variant = variant
+        self.weight = max(float(weight), 0.01)
+        self.canary = float(canary)
+        self.outstanding = 0
+        self.latency_ewma: Optional[float] = None
+        self.requests = 0
+        self.errors = 0
+        self.consecutive_failures = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+
+    @property
+    def name(self) -> str:
+        suffix = f"/{self.variant}" if self.variant else ""
+        return f"{self.region}:{self.endpoint}{suffix}"
+
+    def available(self, now: float) -> bool:
+        return now >= self.ejected_until
+
+    def score(self, default_latency: float) -> float:
+        """Expected wait: (outstanding + 1) x latency, per unit of capacity"""
+        latency = self.latency_ewma if self.latency_ewma is not None else default_latency
+        return (self.outstanding + 1) * latency / self.weight
+
+    def snapshot(self, now: float) -> Dict[str, Any]:
+        return {
+            "endpoint": self.endpoint,
+            "region": self.region,
+            "variant": self.variant,
+            "weight": self.weight,
+            "canary": self.canary,
+            "outstanding": self.outstanding,
+            "latency_ewma_ms": round(self.latency_ewma * 1000, 1) if self.latency_ewma is not None else None,
+            "requests": self.requests,
+            "errors": self.errors,
+            "ejections": self.ejections,
+            "ejected_for": round(max(0.0, self.ejected_until - now), 1)
+        }
+
+
+def parse_pool_spec(spec: str) -> List[EndpointTarget]:
+    """
+    Targets from NIM_ENDPOINT_POOL
+
+    Accepts a JSON list of {"endpoint", "region", "variant", "weight", "canary"}
+    or a comma-separated list of endpoint[@region] names.
+    """
+    spec = spec.strip()
+    if spec.startswith("["):
+        return [EndpointTarget(**entry) for entry in json.loads(spec)]
+
+    targets = []
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        endpoint, _, region = item.partition("@")
+        targets.append(EndpointTarget(endpoint, region or None))
+    return targets
+
+
+class EndpointPool:
+    """
+    Least-outstanding-requests balancer over NIM endpoints
+
+    Each request goes to a canary target with probability equal to its
+    canary share; otherwise to the regular target with the lowest
+    (outstanding + 1) x EWMA latency / weight. A target that fails
+    NIM_EJECT_AFTER_FAILURES times in a row is ejected for
+    NIM_EJECT_SECONDS, doubling on each repeated ejection (up to 10x).
+    A failed request is retried on another target (NIM_POOL_RETRIES).
+    """
+
+    def __init__(
+        self,
+        targets: List[EndpointTarget],
+        client_factory: Optional[Callable[[str], Any]] = None,
+        alpha: Optional[float] = None,
+        eject_after: Optional[int] = None,
+        eject_seconds: Optional[float] = None,
+        retries: Optional[int] = None
+    ):
+        """
+        Args:
+            targets: Endpoints/variants to balance across
+            client_factory: fn(region) -> sagemaker-runtime client (stubs in tests)
+            alpha: EWMA smoothing factor for latency
+            eject_after: Consecutive failures before ejection
+            eject_seconds: Base ejection time
+            retries: Extra attempts on other targets after a failure
+        """
+        if not targets:
+            raise ValueError("Endpoint pool needs at least one target")
+        self.targets = targets
+        self.alpha = alpha or float(os.getenv("NIM_EWMA_ALPHA", "0.3"))
+        self.eject_after = eject_after or int(os.getenv("NIM_EJECT_AFTER_FAILURES", "3"))
+        self.eject_seconds = eject_seconds or float(os.getenv("NIM_EJECT_SECONDS", "30"))
+        self.retries = retries if retries is not None else int(os.getenv("NIM_POOL_RETRIES", "1"))
+        self._client_factory = client_factory or self._boto3_client
+        self._clients: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _boto3_client(region: str) -> Any:
+        import boto3
+        return boto3.client("sagemaker-runtime", region_name=region)
+
+    def client(self, region: str) -> Any:
+        """sagemaker-runtime client for a region (one per region, shared by its targets)"""
+        with self._lock:
+            if region not in self._clients:
+                self._clients[region] = self._client_factory(region)
+            return self._clients[region]
+
+    def choose(self, exclude: Optional[set] = None) -> EndpointTarget:
+        """Pick a target and count the request as outstanding on it"""
+        now = time.monotonic()
+        with self._lock:
+            candidates = [t for t in self.targets if t.available(now) and id(t) not in (exclude or ())]
+            if not candidates:
+                # Everything is ejected (or excluded): fail open to the target that recovers first
+                fallback = [t for t in self.targets if id(t) not in (exclude or ())] or self.targets
+                candidates = [min(fallback, key=lambda t: t.ejected_until)]
+
+            target = None
+            roll = random.random()
+            for canary in (t for t in candidates if t.canary):
+                roll -= canary.canary
+                if roll < 0:
+                    target = canary
+                    break
+
+            if target is None:
+                regular = [t for t in candidates if not t.canary] or candidates
+                # Targets without a latency sample yet are assumed as fast as the best one
+                known = [t.latency_ewma for t in regular if t.latency_ewma is not None]
+                default_latency = min(known) if known else 1.0
+                best = min(t.score(default_latency) for t in regular)
+                target = random.choice([t for t in regular if t.score(default_latency) == best])
+
+            target.outstanding += 1
+            target.requests += 1
+            return target
+
+    def complete(self, target: EndpointTarget, latency: Optional[float], error: Optional[Exception] = None):
+        """Record the outcome of a request sent to target"""
+        with self._lock:
+            target.outstanding -= 1
+            if error is None:
+                target.consecutive_failures = 0
+                if latency is not None:
+                    target.latency_ewma = latency if target.latency_ewma is None else (
+                        self.alpha * latency + (1 - self.alpha) * target.latency_ewma
+                    )
+                return
+
+            target.errors += 1
+            target.consecutive_failures += 1
+            if target.consecutive_failures >= self.eject_after:
+                target.ejections += 1
+                duration = self.eject_seconds * min(2 ** (target.ejections - 1), 10)
+                target.ejected_until = time.monotonic() + duration
+                target.consecutive_failures = 0
+                print(f"⚠️ Ejected {target.name} for {duration:.0f}s after {self.eject_after} failures: {error}")
+
+    def invoke(self, body: str, content_type: str = "application/json") -> Dict[str, Any]:
+        """
+        Send one request through the pool
+
+        Args:
+            body: JSON request body
+            content_type: Request content type
+
+        Returns:
+            Decoded JSON response
+        """
+        tried: set = set()
+        last_error: Optional[Exception] = None
+
+        for _ in range(1 + self.retries):
+            target = self.choose(exclude=tried)
+            tried.add(id(target))
+            params = {"EndpointName": target.endpoint, "ContentType": content_type, "Body": body}
+            if target.variant:
+                params["TargetVariant"] = target.variant
+
+            started = time.monotonic()
+            try:
+                slot = (
+                    get_capacity_controller(target.endpoint, target.region).slot()
+                    if capacity_control_enabled() else nullcontext()
+                )
+                with slot:
+                    response = self.client(target.region).invoke_endpoint(**params)
+                    result = json.loads(response["Body"].read().decode())
+            except Exception as e:
+                code = getattr(e, "response", {}).get("Error", {}).get("Code", "")
+                if code in CLIENT_ERROR_CODES:
+                    self.complete(target, None)
+                    raise
+                self.complete(target, None, e)
+                last_error = e
+                continue
+
+            self.complete(target, time.monotonic() - started)
+            return result
+
+        raise last_error
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Per-target load, latency and health"""
+        now = time.monotonic()
+        with self._lock:
+            return [t.snapshot(now) for t in self.targets]
+
+
+# Singleton instance
+_endpoint_pool: Optional[EndpointPool] = None
+
+
+def get_endpoint_pool() -> Optional[EndpointPool]:
+    """Get or create the EndpointPool singleton (None unless NIM_ENDPOINT_POOL is set)"""
+    global _endpoint_pool
+    if _endpoint_pool is None and os.getenv("NIM_ENDPOINT_POOL"):
+        _endpoint_pool = EndpointPool(parse_pool_spec(os.getenv("NIM_ENDPOINT_POOL")))
+        print(f"✅ NIM endpoint pool: {', '.join(t.name for t in _endpoint_pool.targets)}")
+    return _endpoint_pool
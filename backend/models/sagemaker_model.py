@@ -3,8 +3,13 @@
 import boto3
 import json
 import os
+from contextlib import nullcontext
 from typing import Optional, Dict, Any, List
 
+from backend.utils.usage_metrics import get_usage_metrics
+from backend.utils.endpoint_scaling import capacity_control_enabled, get_capacity_controller
+from backend.models.endpoint_pool import get_endpoint_pool
+
 class SageMakerNIMModel:
     """
     Strands-compatible model that calls SageMaker endpoint with Llama 3.1 Nemotron NIM
@@ -18,7 +23,8 @@ class SageMakerNIMModel:
         region_name: str = None,
         temperature: float = 0.7,
         max_tokens: int = 4096,
-        streaming: bool = False
+        streaming: bool = False,
+        system_prompt: Optional[str] = None
     ):
         """
         Initialize SageMaker NIM Model
@@ -29,6 +35,8 @@ class SageMakerNIMModel:
             temperature: Sampling temperature (0.0 to 1.0)
             max_tokens: Maximum tokens to generate
             streaming: Enable streaming responses (not yet supported)
+            system_prompt: Static system prompt sent as the first message of
+                every request, so the NIM can reuse its KV cache for it
         """
         self.endpoint_name = endpoint_name or os.getenv(
             "SAGEMAKER_ENDPOINT_NAME",
@@ -38,6 +46,11 @@ class SageMakerNIMModel:
         self.temperature = temperature
         self.max_tokens = max_tokens
         self.streaming = streaming
+        self.system_prompt = system_prompt
+        self.last_usage: Dict[str, int] = {}
+        # How a JSON Schema is passed to the NIM: "nvext" (nvext.guided_json)
+        # or "response_format" (OpenAI json_schema response format)
+        self.guided_decoding = os.getenv("NIM_GUIDED_DECODING", "nvext")
 
         # Initialize SageMaker runtime client
         self.runtime = boto3.client(
@@ -45,6 +58,16 @@ class SageMakerNIMModel:
             region_name=self.region_name
         )
 
+        # Several endpoints/variants behind a client-side balancer (NIM_ENDPOINT_POOL);
+        # the pool applies the capacity limiter per endpoint itself
+        self.pool = get_endpoint_pool()
+
+        # Optional capacity-aware limiter (queues requests, scales from zero on demand)
+        self.capacity = (
+            get_capacity_controller(self.endpoint_name, self.region_name)
+            if capacity_control_enabled() and self.pool is None else None
+        )
+
         print(f"✅ SageMaker NIM Model initialized: {self.endpoint_name} in {self.region_name}")
 
     def __call__(self, prompt: str, **kwargs) -> str:
@@ -63,12 +86,12 @@ class SageMakerNIMModel:
         try:
             # Prepare request payload (NVIDIA NIM format compatible with Llama)
             payload = {
-                "messages": [
+                "messages": self._with_system_prompt([
                     {
                         "role": "user",
                         "content": prompt
                     }
-                ],
+                ]),
                 "temperature": kwargs.get("temperature", self.temperature),
                 "max_tokens": kwargs.get("max_tokens", self.max_tokens),
                 "top_p": kwargs.get("top_p", 0.9),
@@ -79,16 +102,10 @@ class SageMakerNIMModel:
             print(f"   Prompt length: {len(prompt)} chars")
 
             # Invoke SageMaker endpoint
-            response = self.runtime.invoke_endpoint(
-                EndpointName=self.endpoint_name,
-                ContentType='application/json',
-                Body=json.dumps(payload)
-            )
-
-            # Parse response
-            result = json.loads(response['Body'].read().decode())
+            result = self._invoke(payload)
 
             print(f"📥 Received response from SageMaker")
+            self._record_usage(kwargs.get("operation", "nim"), result)
 
             # Extract text from NVIDIA NIM response format
             # Format: {"choices": [{"message": {"content": "..."}}]}
@@ -108,8 +125,48 @@ class SageMakerNIMModel:
             print(f"❌ Error calling SageMaker endpoint: {e}")
             raise RuntimeError(f"SageMaker inference failed: {str(e)}")
 
+    def _with_system_prompt(self, messages: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """Prepend the static system prompt unless the caller supplied one"""
+        if not self.system_prompt or (messages and messages[0].get("role") == "system"):
+            return messages
+        return [{"role": "system", "content": self.system_prompt}] + messages
+
+    def _invoke(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a payload to the endpoint (or the endpoint pool) and decode the JSON response"""
+        body = json.dumps(payload)
+        if self.pool is not None:
+            return self.pool.invoke(body)
+
+        # Concurrency slot from the capacity controller (no-op when disabled)
+        with self.capacity.slot() if self.capacity else nullcontext():
+            response = self.runtime.invoke_endpoint(
+                EndpointName=self.endpoint_name,
+                ContentType='application/json',
+                Body=body
+            )
+            return json.loads(response['Body'].read().decode())
+
+    def _record_usage(self, operation: str, result: Dict[str, Any]):
+        """Record token usage (including KV-cached prompt tokens) if the NIM reported it"""
+        usage = result.get("usage")
+        if usage:
+            self.last_usage = get_usage_metrics().record_openai(operation, usage)
+
+    def _guided_json_params(self, schema: Dict[str, Any]) -> Dict[str, Any]:
+        """Request parameters that constrain decoding to a JSON Schema"""
+        if self.guided_decoding == "response_format":
+            return {
+                "response_format": {
+                    "type": "json_schema",
+                    "json_schema": {"name": schema.get("title", "response"), "schema": schema}
+                }
+            }
+        return {"nvext": {"guided_json": schema}}
+
     def get_model_id(self) -> str:
         """Get model identifier for logging"""
+        if self.pool is not None:
+            return f"sagemaker:pool[{','.join(t.name for t in self.pool.targets)}]"
         return f"sagemaker:{self.endpoint_name}"
 
     def invoke_with_messages(self, messages: List[Dict[str, str]], **kwargs) -> str:
@@ -118,26 +175,25 @@ class SageMakerNIMModel:
 
         Args:
             messages: List of {"role": "user/assistant", "content": "..."}
-            **kwargs: Additional parameters
+            **kwargs: Additional parameters (temperature, max_tokens, top_p,
+                operation name for usage metrics, guided_json schema to
+                constrain decoding)
 
         Returns:
             Generated text
         """
         try:
             payload = {
-                "messages": messages,
+                "messages": self._with_system_prompt(messages),
                 "temperature": kwargs.get("temperature", self.temperature),
                 "max_tokens": kwargs.get("max_tokens", self.max_tokens),
                 "top_p": kwargs.get("top_p", 0.9),
             }
+            if kwargs.get("guided_json"):
+                payload.update(self._guided_json_params(kwargs["guided_json"]))
 
-            response = self.runtime.invoke_endpoint(
-                EndpointName=self.endpoint_name,
-                ContentType='application/json',
-                Body=json.dumps(payload)
-            )
-
-            result = json.loads(response['Body'].read().decode())
+            result = self._invoke(payload)
+            self._record_usage(kwargs.get("operation", "nim"), result)
 
             if 'choices' in result and len(result['choices']) > 0:
                 return result['choices'][0]['message']['content']
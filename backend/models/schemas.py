@@ -1,7 +1,8 @@
 """Pydantic models for API requests/responses"""
 
-from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field
+from typing import List, Literal, Optional, Dict, Any
+from typing_extensions import Annotated, NotRequired, TypedDict
+from pydantic import BaseModel, ConfigDict, Field, Strict, field_validator, with_config
 from enum import Enum
 
 
@@ -32,6 +33,78 @@ class OptimizationGoal(str, Enum):
     BALANCED = "balanced"
 
 
+# Diagram Models
+# Typed views of the UI architecture format (see transform_to_ui_format).
+# TypedDicts, so validated bodies are plain dicts the codegen and deploy
+# engines use directly. Strict: numbers and flags must be JSON numbers and
+# booleans, not strings. Fields the UI adds on top (metadata, ...) are kept.
+# Cost and description come from model output, so they stay lax: older
+# stored architectures may carry "12.5" or null there.
+
+ModelCost = Optional[Annotated[float, Strict(False)]]
+
+@with_config(ConfigDict(strict=True, extra="allow"))
+class DiagramNode(TypedDict):
+    """Service node on the diagram canvas"""
+    id: str
+    label: NotRequired[str]
+    subLabel: NotRequired[str]
+    icon: NotRequired[str]
+    cost: NotRequired[ModelCost]
+    description: NotRequired[Optional[str]]
+    x: NotRequired[float]
+    y: NotRequired[float]
+    width: NotRequired[float]
+    height: NotRequired[float]
+    isDragging: NotRequired[bool]
+    type: NotRequired[str]
+    provider: NotRequired[Optional[str]]
+
+
+# Functional syntax: "from" is a Python keyword
+DiagramEdge = with_config(ConfigDict(strict=True, extra="allow"))(TypedDict("DiagramEdge", {
+    "id": NotRequired[str],
+    "from": str,
+    "to": str,
+    "type": NotRequired[str],
+    "label": NotRequired[Optional[str]]
+}))
+DiagramEdge.__doc__ = "Connection between two diagram nodes"
+
+
+@with_config(ConfigDict(strict=True, extra="allow"))
+class DiagramData(TypedDict):
+    """Diagram nodes, edges and canvas settings"""
+    nodes: List[DiagramNode]
+    edges: List[DiagramEdge]
+    viewport: NotRequired[Dict[str, Any]]
+    grid: NotRequired[Dict[str, Any]]
+
+
+@with_config(ConfigDict(strict=True, extra="allow"))
+class ArchitectureComponent(TypedDict):
+    """Component of a UI architecture"""
+    id: NotRequired[str]
+    name: str
+    description: NotRequired[Optional[str]]
+    cost: NotRequired[ModelCost]
+    icon: NotRequired[str]
+    type: NotRequired[Optional[str]]
+    provider: NotRequired[Optional[str]]
+
+
+@with_config(ConfigDict(strict=True, extra="allow"))
+class UIArchitecture(TypedDict):
+    """Architecture in UI format: components, alternatives and diagram"""
+    id: NotRequired[str]
+    name: NotRequired[str]
+    description: NotRequired[str]
+    provider: NotRequired[str]
+    components: NotRequired[List[ArchitectureComponent]]
+    alternatives: NotRequired[List[Dict[str, Any]]]
+    diagram: NotRequired[DiagramData]
+
+
 # Request Models
 
 class ArchitectureRequirement(BaseModel):
@@ -46,24 +119,79 @@ class ArchitectureRequirement(BaseModel):
     )
     budget: Optional[float] = Field(None, description="Monthly budget in USD")
     expected_users: Optional[int] = Field(None, description="Expected number of users")
+    defer_reasoning: bool = Field(
+        False,
+        description="Return only the architecture now; fetch the explanation from /api/architecture/{reasoning_id}/reasoning"
+    )
 
 
 class ComponentOptimizationRequest(BaseModel):
     """Request to optimize existing components"""
     provider: CloudProvider
-    components: List[Dict[str, Any]] = Field(..., description="Current components")
-    current_cost: float = Field(..., description="Current monthly cost")
+    components: List[Dict[str, Any]] = Field(default=[], description="Current components (or use architecture_id)")
+    current_cost: Optional[float] = Field(None, description="Current monthly cost (defaults to the stored architecture's)")
     optimization_goal: OptimizationGoal
+    architecture_id: Optional[str] = Field(None, description="Stored architecture to optimize instead of sending components")
+    version: Optional[int] = Field(None, description="Architecture version (latest if omitted)")
 
 
 class DiagramAnalysisRequest(BaseModel):
     """Request to analyze architecture diagram"""
     provider: CloudProvider
-    nodes: List[Dict[str, Any]]
-    edges: List[Dict[str, Any]]
+    nodes: List[DiagramNode]
+    edges: List[DiagramEdge]
     requirements: Optional[str] = None
 
 
+class CodeGenerationRequest(BaseModel):
+    """Infrastructure-as-code request for an inline or stored architecture"""
+    architecture: Optional[UIArchitecture] = None
+    architecture_id: Optional[str] = Field(None, description="Stored architecture to use instead of an inline one")
+    version: Optional[int] = Field(None, description="Architecture version (latest if omitted)")
+    code_type: Literal["terraform", "cloudformation"] = Field("terraform", description="IaC format")
+
+    @field_validator("code_type", mode="before")
+    @classmethod
+    def lowercase_code_type(cls, value: Any) -> Any:
+        """Accept any casing of the code type (e.g. Terraform)"""
+        return value.lower() if isinstance(value, str) else value
+
+
+class DeploymentConfig(BaseModel):
+    """Deployment target and driver settings"""
+    model_config = ConfigDict(extra="allow")
+
+    provider: Optional[str] = Field(None, description="Defaults to the architecture's provider")
+    region: str = "us-west-2"
+    stack_name: str = "skyrchitect-stack"
+    driver: Optional[str] = Field(None, description="Deployment driver (default DEPLOY_DRIVER)")
+    driver_options: Dict[str, Any] = Field({}, description="Options the driver accepts from requests (see request_options)")
+
+
+class DeploymentRequest(BaseModel):
+    """Deployment of an inline or stored architecture"""
+    architecture: Optional[UIArchitecture] = None
+    architecture_id: Optional[str] = Field(None, description="Stored architecture to use instead of an inline one")
+    version: Optional[int] = Field(None, description="Architecture version (latest if omitted)")
+    config: DeploymentConfig = Field(default_factory=DeploymentConfig)
+
+
+class ChatRequest(BaseModel):
+    """Chat question for the AI agent"""
+    question: str = Field(..., min_length=1, description="User's question")
+    context: Optional[str] = Field(None, description="Optional context about their architecture")
+    session_id: Optional[str] = Field(
+        None,
+        max_length=128,
+        description="Conversation id from a previous response; a new session is started if omitted"
+    )
+
+
+class ArchitectureUpdate(BaseModel):
+    """New version of a stored architecture"""
+    data: Dict[str, Any] = Field(..., description="Architecture in UI format")
+
+
 # Response Models
 
 class CloudService(BaseModel):
@@ -134,5 +262,62 @@ class HealthCheck(BaseModel):
     model_id: str
 
 
+# Structured Output Models
+# Mirror the architecture JSON the agents are asked to produce; the JSON
+# Schema derived from ArchitectureDocument constrains NIM decoding.
+
+class ServicePosition(BaseModel):
+    """Diagram position of a service node"""
+    x: int = Field(..., ge=0)
+    y: int = Field(..., ge=0)
+
+
+class ArchitectureService(BaseModel):
+    """Service in a generated architecture"""
+    id: str = Field(..., description="Unique id, e.g. service-1")
+    name: str
+    type: str = Field(..., description="compute, storage, database, network, security, serverless, analytics, ml, monitoring or cdn")
+    cost: float = Field(..., ge=0, description="Estimated monthly cost in USD")
+    description: str = ""
+    icon: str = "server"
+    position: Optional[ServicePosition] = None
+
+
+class ArchitectureConnection(BaseModel):
+    """Directed connection between two services"""
+    model_config = ConfigDict(populate_by_name=True)
+
+    from_service: str = Field(..., alias="from", description="Source service id")
+    to_service: str = Field(..., alias="to", description="Target service id")
+    type: str = Field("Connection", description="Protocol or relationship, e.g. HTTPS")
+
+
+class ArchitectureAlternative(BaseModel):
+    """Cheaper or different alternative for one service"""
+    service_id: str
+    alternative_name: str
+    cost: float = Field(..., ge=0)
+    savings: float = 0
+    performance: int = Field(100, ge=0, le=100, description="Relative performance, 0-100")
+    description: str = ""
+
+
+class ArchitectureSpec(BaseModel):
+    """Architecture body: services, connections and alternatives"""
+    title: str
+    description: str = ""
+    provider: CloudProvider
+    total_cost: float = Field(..., ge=0)
+    services: List[ArchitectureService] = Field(..., min_length=1)
+    connections: List[ArchitectureConnection] = []
+    alternatives: List[ArchitectureAlternative] = []
+
+
+class ArchitectureDocument(BaseModel):
+    """Complete structured architecture response"""
+    architecture: ArchitectureSpec
+    reasoning: str = Field("", description="Markdown: overview, security, cost breakdown, optimizations, implementation steps")
+
+
 # Allow forward references
 CloudService.model_rebuild()
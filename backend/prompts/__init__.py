@@ -0,0 +1 @@
+"""Prompt templates package"""
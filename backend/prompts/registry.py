@@ -0,0 +1,141 @@
+"""
+Prompt Registry for Skyrchitect AI
+Loads versioned prompt templates once and precompiles them for fast rendering
+"""
+
+import os
+import re
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+TEMPLATES_DIR = Path(__file__).parent / "templates"
+DEFAULT_PROMPT_VERSION = "v1"
+
+# {{field}} placeholders; single braces are left alone so JSON examples need no escaping
+_FIELD_PATTERN = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+class PromptTemplate:
+    """
+    A prompt template compiled into literal and field segments
+
+    Parsing happens once at load time; render() is a single join over the
+    precompiled segments.
+    """
+
+    def __init__(self, name: str, version: str, text: str):
+        self.name = name
+        self.version = version
+        self.text = text
+
+        segments = []
+        fields = []
+        position = 0
+        for match in _FIELD_PATTERN.finditer(text):
+            segments.append((True, text[position:match.start()]))
+            segments.append((False, match.group(1)))
+            fields.append(match.group(1))
+            position = match.end()
+        segments.append((True, text[position:]))
+
+        self._segments: Tuple[Tuple[bool, str], ...] = tuple(
+            segment for segment in segments if not segment[0] or segment[1]
+        )
+        self.fields: Tuple[str, ...] = tuple(dict.fromkeys(fields))
+
+    @property
+    def is_static(self) -> bool:
+        """True if the template has no fields (safe to cache as a prompt prefix)"""
+        return not self.fields
+
+    def render(self, **values) -> str:
+        """
+        Render the template
+
+        Args:
+            **values: Field values; every field in the template is required
+
+        Returns:
+            Rendered prompt text
+        """
+        missing = [field for field in self.fields if field not in values]
+        if missing:
+            raise KeyError(f"Prompt '{self.name}' ({self.version}) missing fields: {missing}")
+
+        return "".join(
+            text if is_literal else str(values[text])
+            for is_literal, text in self._segments
+        )
+
+
+class PromptRegistry:
+    """Versioned prompt templates loaded from backend/prompts/templates/<version>/"""
+
+    def __init__(self, version: Optional[str] = None, templates_dir: Path = TEMPLATES_DIR):
+        self.version = version or os.getenv("PROMPT_VERSION", DEFAULT_PROMPT_VERSION)
+        self.templates_dir = templates_dir / self.version
+
+        if not self.templates_dir.is_dir():
+            raise ValueError(f"Unknown prompt version '{self.version}' (no {self.templates_dir})")
+
+        self._templates: Dict[str, PromptTemplate] = {}
+        for path in sorted(self.templates_dir.glob("*.txt")):
+            text = path.read_text(encoding="utf-8").rstrip("\n")
+            self._templates[path.stem] = PromptTemplate(path.stem, self.version, text)
+
+        self._system_prompts: Dict[Tuple[bool, bool, bool], str] = {}
+
+    def get(self, name: str) -> PromptTemplate:
+        """Get a compiled template by name"""
+        try:
+            return self._templates[name]
+        except KeyError:
+            raise KeyError(f"Prompt '{name}' not found in version {self.version}")
+
+    def render(self, name: str, **values) -> str:
+        """Render a template by name"""
+        return self.get(name).render(**values)
+
+    def system_prompt(self, compact: bool = False, structured: bool = False, tools: bool = True) -> str:
+        """
+        Get the agent system prompt
+
+        The result is rendered once and then reused byte-for-byte, which is
+        what makes it cacheable as a prefix (Bedrock cache points, NIM KV
+        prefix reuse).
+
+        Args:
+            compact: Use the shorter node positioning rules (small models)
+            structured: Omit the JSON format instructions; the output shape
+                is enforced by a JSON Schema instead
+            tools: List the agent tools and tell the model to use them; turn
+                off for backends that run the model without tools
+
+        Returns:
+            Static system prompt text
+        """
+        key = (compact, structured, tools)
+        if key not in self._system_prompts:
+            rules = "positioning_rules_compact" if compact else "positioning_rules"
+            if structured:
+                prompt = self.render("system_structured", positioning_rules=self.render(rules))
+            else:
+                prompt = self.render(
+                    "system",
+                    positioning_rules=self.render(rules),
+                    tools="\n" + self.render("tools") + "\n" if tools else ""
+                )
+            self._system_prompts[key] = prompt
+        return self._system_prompts[key]
+
+
+# Singleton instance
+_registry: Optional[PromptRegistry] = None
+
+
+def get_prompt_registry() -> PromptRegistry:
+    """Get or create PromptRegistry singleton"""
+    global _registry
+    if _registry is None:
+        _registry = PromptRegistry()
+    return _registry
@@ -0,0 +1 @@
+"""Embedding-based architecture retrieval package"""
@@ -0,0 +1,68 @@
+"""
+Text embedders for architecture retrieval
+The NVIDIA embedding NIM on SageMaker in production; a deterministic
+feature-hashing embedder locally and in tests
+"""
+
+import os
+import re
+import hashlib
+from typing import List
+
+import numpy as np
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+class HashingEmbedder:
+    """
+    Deterministic bag-of-words embedder (signed feature hashing)
+
+    Unigrams and bigrams are hashed into `dim` buckets with blake2b, so the
+    same text gives the same vector in every process. No model or network
+    is needed; similarity is lexical, which is enough for tests and for
+    running without an embedding endpoint.
+    """
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def _features(self, text: str) -> List[str]:
+        tokens = _TOKEN_PATTERN.findall(text.lower())
+        return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    def embed(self, texts: List[str], input_type: str = "passage") -> np.ndarray:
+        """
+        Embed texts
+
+        Args:
+            texts: Texts to embed
+            input_type: "query" or "passage" (ignored; kept for interface parity)
+
+        Returns:
+            (len(texts), dim) float32 array of L2-normalized vectors
+        """
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+                vectors[row, digest % self.dim] += 1.0 if digest >> 63 else -1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+def get_embedder():
+    """
+    Embedder selected by RAG_EMBEDDER
+
+    "nim" uses the batched, cached embedding NIM client
+    (models/embedding_model.py); "hashing" (the default) needs nothing.
+    """
+    kind = os.getenv("RAG_EMBEDDER", "hashing").lower()
+    if kind == "nim":
+        from backend.models.embedding_model import get_embedding_client
+        return get_embedding_client()
+    if kind == "hashing":
+        return HashingEmbedder(int(os.getenv("RAG_HASHING_DIM", "512")))
+    raise ValueError(f"Unknown RAG_EMBEDDER '{kind}' (expected 'hashing' or 'nim')")
@@ -0,0 +1,218 @@
+"""
+Local vector index for architecture retrieval
+Exact NumPy search for small collections, HNSW (hnswlib, optional) for
+large ones; vectors are persisted as .npy and memory-mapped on load
+"""
+
+import os
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    import hnswlib
+except ImportError:  # optional: exact search is used at every size
+    hnswlib = None
+
+
+class VectorIndex:
+    """
+    Inner-product index over L2-normalized float32 vectors (cosine similarity)
+
+    Saved vectors are reopened with mmap_mode="r", so a large index costs no
+    load time and pages in on demand. Added vectors are buffered and folded
+    into the matrix on the next search or save. At RAG_HNSW_THRESHOLD vectors
+    or more, an HNSW graph is built (and persisted) when hnswlib is installed.
+    """
+
+    def __init__(self, dim: int, embedder_name: str, path: Optional[str] = None):
+        """
+        Args:
+            dim: Vector dimension
+            embedder_name: Embedder that produced the vectors; a saved index
+                built by a different embedder is discarded
+            path: Directory to persist to (None keeps the index in memory)
+        """
+        self.dim = dim
+        self.embedder_name = embedder_name
+        self.path = Path(path) if path else None
+        self.hnsw_threshold = int(os.getenv("RAG_HNSW_THRESHOLD", "20000"))
+        self._vectors = np.zeros((0, dim), dtype=np.float32)
+        self._pending: List[np.ndarray] = []
+        self._ids: List[str] = []
+        self._metadata: List[Dict[str, Any]] = []
+        self._rows: Dict[str, int] = {}
+        self._hnsw = None
+        self._hnsw_count = 0
+        self._lock = threading.Lock()
+
+        if self.path is not None:
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._rows
+
+    def _load(self):
+        manifest_path = self.path / "index.json"
+        vectors_path = self.path / "vectors.npy"
+        if not manifest_path.exists() or not vectors_path.exists():
+            return
+
+        manifest = json.loads(manifest_path.read_text())
+        if manifest.get("embedder") != self.embedder_name or manifest.get("dim") != self.dim:
+            logger.warning(f"⚠️ Ignoring vector index at {self.path}: built with {manifest.get('embedder')}")
+            return
+
+        vectors = np.load(vectors_path, mmap_mode="r")
+        if len(vectors) != len(manifest["ids"]):
+            logger.warning(f"⚠️ Ignoring vector index at {self.path}: vectors and ids disagree")
+            return
+
+        self._vectors = vectors
+        self._ids = manifest["ids"]
+        self._metadata = manifest["metadata"]
+        self._rows = {item_id: row for row, item_id in enumerate(self._ids)}
+
+        hnsw_path = self.path / "hnsw.bin"
+        if hnswlib is not None and hnsw_path.exists() and manifest.get("hnsw_count") == len(self._ids):
+            self._hnsw = hnswlib.Index(space="ip", dim=self.dim)
+            self._hnsw.load_index(str(hnsw_path), max_elements=len(self._ids))
+            self._hnsw_count = len(self._ids)
+
+        logger.info(f"✓ Vector index: {len(self._ids)} vectors from {self.path}")
+
+    def add(self, ids: List[str], vectors: np.ndarray, metadata: List[Dict[str, Any]]) -> int:
+        """
+        Add vectors; ids already in the index are skipped
+
+        Args:
+            ids: Item ids
+            vectors: (len(ids), dim) normalized vectors
+            metadata: Per-item metadata returned with search results
+
+        Returns:
+            Number of items added
+        """
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        with self._lock:
+            keep = []
+            for row, item_id in enumerate(ids):
+                if item_id in self._rows:
+                    continue
+                self._rows[item_id] = len(self._ids)
+                self._ids.append(item_id)
+                self._metadata.append(metadata[row])
+                keep.append(row)
+            if keep:
+                self._pending.append(vectors[keep])
+            return len(keep)
+
+    def _matrix(self) -> np.ndarray:
+        """All vectors as one matrix (call with the lock held)"""
+        if self._pending:
+            self._vectors = np.concatenate([self._vectors, *self._pending])
+            self._pending = []
+        return self._vectors
+
+    def _hnsw_index(self, vectors: np.ndarray):
+        """HNSW graph covering every vector, or None below the threshold (call with the lock held)"""
+        if hnswlib is None or len(vectors) < self.hnsw_threshold:
+            return None
+        if self._hnsw is None:
+            self._hnsw = hnswlib.Index(space="ip", dim=self.dim)
+            self._hnsw.init_index(max_elements=len(vectors) * 2, ef_construction=200, M=16)
+            self._hnsw_count = 0
+        if self._hnsw_count < len(vectors):
+            if len(vectors) > self._hnsw.get_max_elements():
+                self._hnsw.resize_index(len(vectors) * 2)
+            self._hnsw.add_items(
+                np.asarray(vectors[self._hnsw_count:]),
+                np.arange(self._hnsw_count, len(vectors))
+            )
+            self._hnsw_count = len(vectors)
+        return self._hnsw
+
+    def search(
+        self,
+        vector: np.ndarray,
+        k: int = 3,
+        where: Optional[Callable[[Dict[str, Any]], bool]] = None
+    ) -> List[Tuple[str, float, Dict[str, Any]]]:
+        """
+        Top-k most similar items
+
+        Args:
+            vector: Normalized query vector
+            k: Number of results
+            where: Optional metadata filter
+
+        Returns:
+            (id, cosine similarity, metadata) tuples, best first
+        """
+        query = np.asarray(vector, dtype=np.float32).reshape(self.dim)
+        with self._lock:
+            vectors = self._matrix()
+            if not len(vectors) or k <= 0:
+                return []
+
+            hnsw = self._hnsw_index(vectors)
+            if hnsw is not None:
+                # Over-fetch so the metadata filter still leaves k results
+                fetch = min(len(vectors), k * 8 if where else k)
+                hnsw.set_ef(max(fetch, 50))
+                labels, distances = hnsw.knn_query(query, k=fetch)
+                candidates = [(int(row), 1.0 - float(d)) for row, d in zip(labels[0], distances[0])]
+            else:
+                scores = vectors @ query
+                if where is not None:
+                    allowed = np.fromiter((where(m) for m in self._metadata), dtype=bool, count=len(scores))
+                    scores = np.where(allowed, scores, -np.inf)
+                top = min(k, len(scores))
+                rows = np.argpartition(-scores, top - 1)[:top]
+                rows = rows[np.argsort(-scores[rows])]
+                candidates = [(int(row), float(scores[row])) for row in rows if np.isfinite(scores[row])]
+
+            results = []
+            for row, score in candidates:
+                if where is not None and not where(self._metadata[row]):
+                    continue
+                results.append((self._ids[row], score, self._metadata[row]))
+                if len(results) == k:
+                    break
+            return results
+
+    def save(self):
+        """Persist vectors, ids/metadata and the HNSW graph (atomic file replacement)"""
+        if self.path is None:
+            return
+        self.path.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            vectors = self._matrix()
+            hnsw = self._hnsw_index(vectors)
+
+            vectors_tmp = self.path / "vectors.tmp.npy"
+            np.save(vectors_tmp, np.asarray(vectors))
+            manifest_tmp = self.path / "index.json.tmp"
+            manifest_tmp.write_text(json.dumps({
+                "embedder": self.embedder_name,
+                "dim": self.dim,
+                "ids": self._ids,
+                "metadata": self._metadata,
+                "hnsw_count": self._hnsw_count if hnsw is not None else 0
+            }))
+            if hnsw is not None:
+                hnsw.save_index(str(self.path / "hnsw.bin"))
+            os.replace(vectors_tmp, self.path / "vectors.npy")
+            os.replace(manifest_tmp, self.path / "index.json")
+
+            # Reopen memory-mapped so the in-memory copy can be released
+            self._vectors = np.load(self.path / "vectors.npy", mmap_mode="r")
@@ -0,0 +1,249 @@
+"""
+Architecture retriever for Skyrchitect
+Finds reference and previously generated architectures similar to a
+request and renders them as few-shot context for generation
+"""
+
+import os
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from backend.prompts.registry import get_prompt_registry
+from backend.retrieval.embeddings import get_embedder
+from backend.retrieval.index import VectorIndex
+from backend.utils.data_dir import get_data_dir
+from backend.utils.architecture_store import get_architecture_store
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_CORPUS = Path(__file__).parent / "reference_architectures.json"
+
+# Service fields the model does not need to see in an example (layout only)
+_EXAMPLE_DROP_FIELDS = ("position", "icon")
+
+
+def rag_enabled() -> bool:
+    """True if RAG_ENABLED turns on few-shot retrieval for generation"""
+    return os.getenv("RAG_ENABLED", "false").lower() == "true"
+
+
+def query_text(title: str, description: str, requirements: Optional[List[str]] = None) -> str:
+    """
+    Normalized text embedded for a generation request
+
+    Case, whitespace and the order (or repetition) of requirements do not
+    change the result, so equivalent requests embed (and cache) identically.
+    """
+    def clean(text: str) -> str:
+        return " ".join(text.split()).lower()
+
+    cleaned = sorted({clean(r) for r in requirements or []} - {""})
+    return ". ".join(filter(None, [clean(title), clean(description), *cleaned]))
+
+
+def document_text(architecture: Dict[str, Any], tags: Optional[List[str]] = None) -> str:
+    """Text embedded for an architecture: what it is for, then what it is made of"""
+    services = ", ".join(
+        f"{s.get('name', '')} ({s.get('type', '')})" for s in architecture.get("services", [])
+    )
+    return ". ".join(filter(None, [
+        architecture.get("title", ""),
+        architecture.get("description", ""),
+        ", ".join(tags or []),
+        services
+    ]))
+
+
+def compact_example(architecture: Dict[str, Any]) -> Dict[str, Any]:
+    """Architecture without layout fields or alternatives, for use in a prompt"""
+    return {
+        "title": architecture.get("title"),
+        "description": architecture.get("description"),
+        "provider": architecture.get("provider"),
+        "total_cost": architecture.get("total_cost"),
+        "services": [
+            {k: v for k, v in service.items() if k not in _EXAMPLE_DROP_FIELDS}
+            for service in architecture.get("services", [])
+        ],
+        "connections": architecture.get("connections", [])
+    }
+
+
+class ArchitectureRetriever:
+    """
+    Top-k similar architectures from a local vector index
+
+    The index is seeded with the bundled reference corpus and grows with
+    every generated architecture (keyed by its content-derived id, so
+    regenerating the same design does not add a duplicate).
+    """
+
+    def __init__(self, embedder=None, index_dir: Optional[str] = None, corpus_path: Path = REFERENCE_CORPUS):
+        """
+        Args:
+            embedder: Object with embed(texts, input_type) -> normalized float32 array
+            index_dir: Directory to persist the index in (RAG_INDEX_DIR by default)
+            corpus_path: Reference architectures to seed the index with
+        """
+        self.embedder = embedder or get_embedder()
+        self.top_k = int(os.getenv("RAG_TOP_K", "2"))
+        self.min_score = float(os.getenv("RAG_MIN_SCORE", "0.2"))
+        index_dir = index_dir or os.getenv("RAG_INDEX_DIR", str(get_data_dir() / "rag_index"))
+
+        dim = self.embedder.embed(["dimension probe"], input_type="query").shape[1]
+        self.index = VectorIndex(dim, self.embedder.name, index_dir)
+        self._save_lock = threading.Lock()
+        self._seed(corpus_path)
+
+    def _seed(self, corpus_path: Path):
+        """Embed reference architectures missing from the index"""
+        references = json.loads(corpus_path.read_text(encoding="utf-8"))
+        missing = [ref for ref in references if ref["id"] not in self.index]
+        if not missing:
+            return
+
+        vectors = self.embedder.embed(
+            [document_text(ref["architecture"], ref.get("tags")) for ref in missing],
+            input_type="passage"
+        )
+        self.index.add(
+            [ref["id"] for ref in missing],
+            vectors,
+            [
+                {
+                    "source": "reference",
+                    "provider": ref["architecture"].get("provider"),
+                    "architecture": compact_example(ref["architecture"])
+                }
+                for ref in missing
+            ]
+        )
+        self.save()
+        logger.info(f"✓ Seeded retrieval index with {len(missing)} reference architectures")
+
+    def save(self):
+        with self._save_lock:
+            self.index.save()
+
+    def search(self, query: str, provider: Optional[str] = None, k: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Most similar architectures for a request
+
+        Args:
+            query: Request text (see query_text)
+            provider: Only return architectures for this cloud provider
+            k: Number of results (RAG_TOP_K by default)
+
+        Returns:
+            [{"id", "score", "source", "architecture"}] best first, above RAG_MIN_SCORE
+        """
+        vector = self.embedder.embed([query], input_type="query")[0]
+        where = (lambda meta: meta.get("provider") == provider) if provider else None
+        return [
+            {"id": item_id, "score": round(score, 4), "source": meta["source"], "architecture": meta["architecture"]}
+            for item_id, score, meta in self.index.search(vector, k or self.top_k, where)
+            if score >= self.min_score
+        ]
+
+    def nearest(self, query: str, provider: Optional[str] = None, min_score: float = 0.0) -> Optional[Dict[str, Any]]:
+        """
+        Closest architecture to use as a draft
+
+        Generated architectures are loaded in full (positions included) from
+        the architecture store, at their latest version.
+
+        Args:
+            query: Request text (see query_text)
+            provider: Cloud provider of the request
+            min_score: Minimum cosine similarity
+
+        Returns:
+            {"id", "score", "source", "architecture_json"} or None
+        """
+        results = self.search(query, provider, k=1)
+        if not results or results[0]["score"] < min_score:
+            return None
+
+        best = results[0]
+        architecture_json = {"architecture": best["architecture"]}
+        if best["source"] == "generated":
+            stored = get_architecture_store().get(best["id"])
+            if stored and stored.get("document"):
+                architecture_json = stored["document"]
+        return {"id": best["id"], "score": best["score"], "source": best["source"], "architecture_json": architecture_json}
+
+    def add_generated(
+        self,
+        architecture_id: str,
+        architecture_json: Dict[str, Any],
+        provider: Optional[str] = None
+    ) -> bool:
+        """
+        Index a generated architecture so later requests can retrieve it
+
+        Args:
+            architecture_id: Content-derived id from the architecture store
+            architecture_json: Parsed model output ({"architecture": {...}})
+            provider: Requested cloud provider (defaults to the one in the output)
+
+        Returns:
+            True if it was added (False if already indexed or empty)
+        """
+        architecture = architecture_json.get("architecture", architecture_json)
+        if architecture_id in self.index or not architecture.get("services"):
+            return False
+
+        vector = self.embedder.embed([document_text(architecture)], input_type="passage")
+        added = self.index.add(
+            [architecture_id],
+            vector,
+            [{
+                "source": "generated",
+                "provider": (provider or architecture.get("provider") or "").lower(),
+                "architecture": compact_example(architecture)
+            }]
+        )
+        if added:
+            self.save()
+        return bool(added)
+
+    def few_shot_context(self, query: str, provider: Optional[str] = None) -> str:
+        """
+        Prompt block with the most similar architectures, or "" if none are close enough
+
+        Args:
+            query: Request text (see query_text)
+            provider: Cloud provider of the request
+
+        Returns:
+            Rendered reference_examples prompt
+        """
+        results = self.search(query, provider)
+        if not results:
+            return ""
+
+        logger.info(
+            "🔎 Few-shot references: " + ", ".join(f"{r['id']} ({r['score']:.2f})" for r in results)
+        )
+        examples = "\n\n".join(
+            json.dumps({"architecture": r["architecture"]}, separators=(',', ':'))
+            for r in results
+        )
+        return get_prompt_registry().render("reference_examples", examples=examples)
+
+
+# Singleton instance
+_retriever: Optional[ArchitectureRetriever] = None
+_retriever_lock = threading.Lock()
+
+
+def get_architecture_retriever() -> ArchitectureRetriever:
+    """Get or create the ArchitectureRetriever singleton"""
+    global _retriever
+    with _retriever_lock:
+        if _retriever is None:
+            _retriever = ArchitectureRetriever()
+        return _retriever
@@ -0,0 +1,110 @@
+"""
+Architecture deltas for draft-from-retrieval generation
+The model edits a retrieved draft by returning only the changes; this module
+parses those changes and applies them to the draft
+"""
+
+import copy
+from typing import Any, Dict, Optional, Tuple
+
+from backend.utils.response_parser import _monthly_cost, extract_json_from_response
+
+DELTA_KEYS = (
+    "title", "description", "remove_services", "update_services",
+    "add_services", "remove_connections", "add_connections"
+)
+
+
+def parse_delta(response: str) -> Optional[Dict[str, Any]]:
+    """
+    Extract a delta from a model response
+
+    Args:
+        response: Model output containing a JSON block ({"delta": {...}} or the delta itself)
+
+    Returns:
+        Delta dict, or None if the response has no recognizable delta
+    """
+    document = extract_json_from_response(response)
+    if not isinstance(document, dict):
+        return None
+    if isinstance(document.get("delta"), dict):
+        # An empty delta means the draft already fits
+        return document["delta"]
+    if not any(key in document for key in DELTA_KEYS):
+        return None
+    return document
+
+
+def apply_delta(architecture_json: Dict[str, Any], delta: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, int]]:
+    """
+    Apply a delta to an architecture
+
+    Removed services take their connections with them; connections to
+    unknown services are dropped; total_cost is recomputed from the
+    service costs. Malformed entries (e.g. bare ids where objects belong)
+    are skipped.
+
+    Args:
+        architecture_json: Draft ({"architecture": {...}}); not modified
+        delta: Changes from parse_delta
+
+    Returns:
+        (refined architecture JSON, count of each kind of change applied)
+    """
+    architecture = copy.deepcopy(architecture_json.get("architecture", architecture_json))
+    services = {s["id"]: s for s in architecture.get("services", []) if "id" in s}
+    changes = {"removed": 0, "updated": 0, "added": 0, "connections_removed": 0, "connections_added": 0}
+
+    for field in ("title", "description"):
+        if delta.get(field):
+            architecture[field] = delta[field]
+
+    for service_id in delta.get("remove_services") or []:
+        if isinstance(service_id, str) and services.pop(service_id, None) is not None:
+            changes["removed"] += 1
+
+    for update in delta.get("update_services") or []:
+        if not isinstance(update, dict):
+            continue
+        target = services.get(update.get("id"))
+        if target is not None:
+            target.update({k: v for k, v in update.items() if k != "id"})
+            changes["updated"] += 1
+
+    for service in delta.get("add_services") or []:
+        if not isinstance(service, dict):
+            continue
+        service = dict(service)
+        if not service.get("id") or service["id"] in services:
+            service["id"] = f"service-{len(services) + 1}"
+            while service["id"] in services:
+                service["id"] += "a"
+        services[service["id"]] = service
+        changes["added"] += 1
+
+    removed_links = {
+        (c.get("from"), c.get("to")) for c in delta.get("remove_connections") or [] if isinstance(c, dict)
+    }
+    connections = []
+    for connection in architecture.get("connections", []):
+        if (connection.get("from"), connection.get("to")) in removed_links:
+            changes["connections_removed"] += 1
+        elif connection.get("from") in services and connection.get("to") in services:
+            connections.append(connection)
+    for connection in delta.get("add_connections") or []:
+        if isinstance(connection, dict) and connection.get("from") in services and connection.get("to") in services:
+            connections.append(connection)
+            changes["connections_added"] += 1
+
+    architecture["services"] = list(services.values())
+    architecture["connections"] = connections
+    architecture["total_cost"] = round(sum(_monthly_cost(s.get("cost", 0)) for s in services.values()), 2)
+
+    # Alternatives for services that no longer exist are meaningless
+    if "alternatives" in architecture:
+        architecture["alternatives"] = [
+            a for a in architecture["alternatives"] if isinstance(a, dict) and a.get("service_id") in services
+        ]
+
+    return {"architecture": architecture}, changes
@@ -0,0 +1,205 @@
+"""
+Architecture Store for Skyrchitect
+Persists generated architectures under stable content-derived ids, with a
+version history, so follow-up calls can reference an id instead of
+re-sending the whole architecture
+"""
+
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from backend.utils.data_dir import get_data_dir
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(data: Dict[str, Any]) -> str:
+    """SHA-256 of the canonical JSON of a document"""
+    canonical = json.dumps(data, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class ArchitectureStore:
+    """
+    SQLite-backed store of architectures and their versions
+
+    Version 1 is the generated architecture; every save with different
+    content adds a version. Saving content identical to the latest version
+    is a no-op, so retried or duplicate requests do not grow the history.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv(
+            "ARCHITECTURE_DB_PATH",
+            str(get_data_dir() / "architectures.sqlite3")
+        )
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS architectures (
+                architecture_id TEXT PRIMARY KEY,
+                latest_version INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS architecture_versions (
+                architecture_id TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                content_hash TEXT NOT NULL,
+                data TEXT NOT NULL,
+                document TEXT,
+                requirements TEXT,
+                reasoning TEXT,
+                source TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (architecture_id, version)
+            );
+        """)
+        self._conn.commit()
+        logger.info(f"✓ Architecture store: {self.path}")
+
+    def save(
+        self,
+        architecture_id: str,
+        data: Dict[str, Any],
+        document: Optional[Dict[str, Any]] = None,
+        requirements: Optional[str] = None,
+        reasoning: Optional[str] = None,
+        source: str = "generate"
+    ) -> Dict[str, Any]:
+        """
+        Save an architecture as a new version (unless unchanged)
+
+        Args:
+            architecture_id: Stable architecture id
+            data: Architecture in UI format
+            document: Architecture JSON as returned by the model
+            requirements: Requirements it was generated for
+            reasoning: Markdown reasoning, if already available
+            source: What produced this version (generate, update, ...)
+
+        Returns:
+            {"architecture_id", "version", "created"}
+        """
+        digest = content_hash(data)
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT v.version, v.content_hash FROM architectures a "
+                "JOIN architecture_versions v ON v.architecture_id = a.architecture_id AND v.version = a.latest_version "
+                "WHERE a.architecture_id = ?",
+                (architecture_id,)
+            ).fetchone()
+
+            if row and row[1] == digest:
+                if reasoning is not None:
+                    self._conn.execute(
+                        "UPDATE architecture_versions SET reasoning = ? "
+                        "WHERE architecture_id = ? AND version = ? AND reasoning IS NULL",
+                        (reasoning, architecture_id, row[0])
+                    )
+                    self._conn.commit()
+                return {"architecture_id": architecture_id, "version": row[0], "created": False}
+
+            version = row[0] + 1 if row else 1
+            self._conn.execute(
+                "INSERT INTO architecture_versions "
+                "(architecture_id, version, content_hash, data, document, requirements, reasoning, source, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    architecture_id, version, digest, json.dumps(data),
+                    json.dumps(document) if document is not None else None,
+                    requirements, reasoning, source, now
+                )
+            )
+            self._conn.execute(
+                "INSERT INTO architectures (architecture_id, latest_version, created_at, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(architecture_id) DO UPDATE SET latest_version = excluded.latest_version, "
+                "updated_at = excluded.updated_at",
+                (architecture_id, version, now, now)
+            )
+            self._conn.commit()
+
+        return {"architecture_id": architecture_id, "version": version, "created": True}
+
+    def get(self, architecture_id: str, version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Load an architecture version (latest by default)
+
+        Returns:
+            {"architecture_id", "version", "data", "document", "requirements",
+            "reasoning", "source", "created_at"} or None
+        """
+        with self._lock:
+            if version is None:
+                row = self._conn.execute(
+                    "SELECT latest_version FROM architectures WHERE architecture_id = ?",
+                    (architecture_id,)
+                ).fetchone()
+                if row is None:
+                    return None
+                version = row[0]
+
+            row = self._conn.execute(
+                "SELECT version, data, document, requirements, reasoning, source, created_at "
+                "FROM architecture_versions WHERE architecture_id = ? AND version = ?",
+                (architecture_id, version)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        return {
+            "architecture_id": architecture_id,
+            "version": row[0],
+            "data": json.loads(row[1]),
+            "document": json.loads(row[2]) if row[2] else None,
+            "requirements": row[3],
+            "reasoning": row[4],
+            "source": row[5],
+            "created_at": row[6]
+        }
+
+    def versions(self, architecture_id: str) -> List[Dict[str, Any]]:
+        """Version history (metadata only), oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT version, content_hash, source, created_at, reasoning IS NOT NULL "
+                "FROM architecture_versions WHERE architecture_id = ? ORDER BY version",
+                (architecture_id,)
+            ).fetchall()
+
+        return [
+            {"version": r[0], "content_hash": r[1], "source": r[2], "created_at": r[3], "has_reasoning": bool(r[4])}
+            for r in rows
+        ]
+
+    def set_reasoning(self, architecture_id: str, reasoning: str, version: Optional[int] = None):
+        """Attach generated reasoning to a version (latest by default)"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE architecture_versions SET reasoning = ? WHERE architecture_id = ? AND version = "
+                "COALESCE(?, (SELECT latest_version FROM architectures WHERE architecture_id = ?))",
+                (reasoning, architecture_id, version, architecture_id)
+            )
+            self._conn.commit()
+
+
+# Singleton instance
+_architecture_store: Optional[ArchitectureStore] = None
+
+
+def get_architecture_store() -> ArchitectureStore:
+    """Get or create ArchitectureStore singleton"""
+    global _architecture_store
+    if _architecture_store is None:
+        _architecture_store = ArchitectureStore()
+    return _architecture_store
@@ -0,0 +1,332 @@
+"""
+Shared cache backends for Skyrchitect
+One interface over an in-process LRU, SQLite (on disk, or in /dev/shm to
+share between the workers of one host) and Redis (across hosts), with
+msgpack-encoded values and one key scheme for every cache
+"""
+
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import msgpack
+import numpy as np
+
+from backend.utils.data_dir import get_data_dir
+
+logger = logging.getLogger(__name__)
+
+# Bump to invalidate every cache at once when value layouts change
+KEY_VERSION = "v1"
+KEY_PREFIX = "skyrchitect"
+
+_NDARRAY_EXT = 1
+
+
+def cache_key(namespace: str, *parts: Any) -> str:
+    """
+    Cache key: "skyrchitect:v1:<namespace>:<sha256 of the parts>"
+
+    Parts are hashed as canonical JSON, so dicts with the same content give
+    the same key in every worker and on every host.
+    """
+    material = json.dumps(parts, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    digest = hashlib.sha256(material.encode("utf-8")).hexdigest()
+    return f"{KEY_PREFIX}:{KEY_VERSION}:{namespace}:{digest}"
+
+
+def _encode_ext(value: Any):
+    if isinstance(value, np.ndarray):
+        header = msgpack.packb([value.dtype.str, list(value.shape)])
+        return msgpack.ExtType(_NDARRAY_EXT, header + np.ascontiguousarray(value).tobytes())
+    raise TypeError(f"Cannot cache value of type {type(value).__name__}")
+
+
+def _decode_ext(code: int, data: bytes):
+    if code == _NDARRAY_EXT:
+        unpacker = msgpack.Unpacker()
+        unpacker.feed(data)
+        dtype, shape = unpacker.unpack()
+        return np.frombuffer(data[unpacker.tell():], dtype=np.dtype(dtype)).reshape(shape)
+    return msgpack.ExtType(code, data)
+
+
+def pack(value: Any) -> bytes:
+    """msgpack-encode a value (NumPy arrays are stored as raw bytes)"""
+    return msgpack.packb(value, use_bin_type=True, default=_encode_ext)
+
+
+def unpack(data: bytes) -> Any:
+    """Decode a value written by pack()"""
+    return msgpack.unpackb(data, raw=False, ext_hook=_decode_ext, strict_map_key=False)
+
+
+class CacheBackend:
+    """
+    Base class: get/set with optional TTL, batch variants and hit counters
+
+    Subclasses implement _get_many, _set_many and delete.
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    def _get_many(self, keys: List[str]) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def _set_many(self, items: Dict[str, Any], ttl: Optional[float]):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Values of the keys that are cached"""
+        keys = list(keys)
+        found = self._get_many(keys) if keys else {}
+        with self._stats_lock:
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.get_many([key]).get(key)
+
+    def set_many(self, items: Dict[str, Any], ttl: Optional[float] = None):
+        """
+        Cache values
+
+        Args:
+            items: key -> msgpack-serializable value (NumPy arrays allowed)
+            ttl: Seconds until expiry (None: never, subject to eviction)
+        """
+        if not items:
+            return
+        self._set_many(items, ttl)
+        with self._stats_lock:
+            self.writes += len(items)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        self.set_many({key: value}, ttl)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": self.name,
+                "hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+class LRUCache(CacheBackend):
+    """In-process LRU (one worker). Values are kept as objects, not serialized."""
+
+    name = "lru"
+
+    def __init__(self, max_entries: int = 1024):
+        super().__init__()
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_many(self, keys: List[str]) -> Dict[str, Any]:
+        now = time.time()
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                value, expires = entry
+                if expires is not None and expires <= now:
+                    del self._entries[key]
+                    continue
+                self._entries.move_to_end(key)
+                found[key] = value
+        return found
+
+    def _set_many(self, items: Dict[str, Any], ttl: Optional[float]):
+        expires = time.time() + ttl if ttl else None
+        with self._lock:
+            for key, value in items.items():
+                self._entries[key] = (value, expires)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class SQLiteCache(CacheBackend):
+    """
+    msgpack values in a SQLite file shared by every process that opens it
+
+    On disk it persists across restarts; in /dev/shm (tmpfs) it is a
+    shared-memory store for the workers of one host. Reads go through
+    SQLite's memory-mapped I/O. Past max_entries the least recently
+    written entries are evicted.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str, max_entries: Optional[int] = None):
+        super().__init__()
+        self.path = path
+        self.max_entries = max_entries or int(os.getenv("CACHE_SQLITE_MAX_ENTRIES", "100000"))
+        self._writes_since_trim = 0
+        self._lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA mmap_size=268435456")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+            "expires_at REAL, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_updated ON cache (updated_at)")
+        self._conn.commit()
+
+    def _get_many(self, keys: List[str]) -> Dict[str, Any]:
+        now = time.time()
+        found = {}
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, value, expires_at FROM cache WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                for key, value, expires in rows:
+                    if expires is None or expires > now:
+                        found[key] = value
+        return {key: unpack(value) for key, value in found.items()}
+
+    def _set_many(self, items: Dict[str, Any], ttl: Optional[float]):
+        now = time.time()
+        expires = now + ttl if ttl else None
+        rows = [(key, pack(value), expires, now) for key, value in items.items()]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, updated_at) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._writes_since_trim += len(rows)
+            if self._writes_since_trim >= 1000:
+                self._trim(now)
+            self._conn.commit()
+
+    def _trim(self, now: float):
+        """Drop expired entries and the oldest ones past max_entries (call with the lock held)"""
+        self._writes_since_trim = 0
+        self._conn.execute("DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        self._conn.execute(
+            "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+
+class RedisCache(CacheBackend):
+    """msgpack values in Redis (or any Redis-protocol server), shared across hosts"""
+
+    name = "redis"
+
+    def __init__(self, url: Optional[str] = None, client: Any = None):
+        super().__init__()
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url or os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+        self.client = client
+
+    def _get_many(self, keys: List[str]) -> Dict[str, Any]:
+        return {key: unpack(value) for key, value in zip(keys, self.client.mget(keys)) if value is not None}
+
+    def _set_many(self, items: Dict[str, Any], ttl: Optional[float]):
+        pipeline = self.client.pipeline(transaction=False)
+        for key, value in items.items():
+            pipeline.set(key, pack(value), px=int(ttl * 1000) if ttl else None)
+        pipeline.execute()
+
+    def delete(self, key: str):
+        self.client.delete(key)
+
+
+def shm_dir() -> Path:
+    """Directory for shared-memory caches: CACHE_SHM_DIR, else /dev/shm, else the data dir"""
+    configured = os.getenv("CACHE_SHM_DIR")
+    if configured:
+        return Path(configured)
+    return Path("/dev/shm/skyrchitect") if Path("/dev/shm").is_dir() else get_data_dir() / "shm"
+
+
+def create_cache(
+    namespace: str,
+    default_backend: str = "lru",
+    disk_path: Optional[str] = None,
+    max_entries: int = 1024
+) -> CacheBackend:
+    """
+    Cache backend for one namespace
+
+    The backend is <NAMESPACE>_CACHE_BACKEND, else CACHE_BACKEND, else
+    default_backend: "lru" (in-process), "disk" (SQLite at disk_path),
+    "shm" (SQLite in shared memory, one host) or "redis" (REDIS_URL).
+
+    Args:
+        namespace: Cache name (also the key namespace, see cache_key)
+        default_backend: Backend when neither variable is set
+        disk_path: SQLite file for the "disk" backend
+        max_entries: Size bound for "lru" (SQLite backends use CACHE_SQLITE_MAX_ENTRIES)
+    """
+    backend = (
+        os.getenv(f"{namespace.upper()}_CACHE_BACKEND") or os.getenv("CACHE_BACKEND") or default_backend
+    ).lower()
+
+    if backend == "lru":
+        cache = LRUCache(max_entries)
+    elif backend == "disk":
+        cache = SQLiteCache(disk_path or str(get_data_dir() / f"{namespace}_cache.sqlite3"))
+        cache.name = "disk"
+    elif backend == "shm":
+        cache = SQLiteCache(str(shm_dir() / f"{namespace}.sqlite3"))
+        cache.name = "shm"
+    elif backend == "redis":
+        cache = RedisCache()
+    else:
+        raise ValueError(f"Unknown cache backend '{backend}' for {namespace} (expected lru, disk, shm or redis)")
+
+    _caches[namespace] = cache
+    logger.info(f"✓ {namespace} cache: {cache.name}")
+    return cache
+
+
+# Caches created so far, for metrics
+_caches: Dict[str, CacheBackend] = {}
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Hit/miss counters of every cache in this worker"""
+    return {namespace: cache.stats() for namespace, cache in _caches.items()}
@@ -0,0 +1,309 @@
+"""
+Conversation Store for Skyrchitect AI chat
+Persists chat sessions and keeps each turn's context bounded with a sliding
+window of recent messages plus a rolling summary of older ones
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.utils.data_dir import get_data_dir
+
+logger = logging.getLogger(__name__)
+
+# Rough token estimate used for window sizing (no tokenizer dependency)
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of a text"""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+class ConversationStore:
+    """
+    Base class for session storage backends
+
+    A session is a rolling summary plus the messages that have not been
+    folded into it yet. Backends only ever load that unsummarized tail, so
+    reads stay the same size however long the conversation gets.
+    """
+
+    def load(self, session_id: str) -> Dict[str, Any]:
+        """
+        Load a session
+
+        Returns:
+            {"summary": str, "messages": [{"id", "role", "content"}, ...]}
+        """
+        raise NotImplementedError
+
+    def append(self, session_id: str, role: str, content: str) -> int:
+        """Append a message and return its id"""
+        raise NotImplementedError
+
+    def save_summary(self, session_id: str, summary: str, summarized_upto: int):
+        """Replace the summary; messages with id <= summarized_upto are dropped from the window"""
+        raise NotImplementedError
+
+    def delete(self, session_id: str):
+        """Delete a session"""
+        raise NotImplementedError
+
+
+class InMemoryConversationStore(ConversationStore):
+    """Process-local store (lost on restart; useful for development)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, Dict[str, Any]] = {}
+        self._next_id = 1
+
+    def load(self, session_id: str) -> Dict[str, Any]:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return {"summary": "", "messages": []}
+            return {"summary": session["summary"], "messages": list(session["messages"])}
+
+    def append(self, session_id: str, role: str, content: str) -> int:
+        with self._lock:
+            session = self._sessions.setdefault(session_id, {"summary": "", "messages": []})
+            message_id = self._next_id
+            self._next_id += 1
+            session["messages"].append({"id": message_id, "role": role, "content": content})
+            return message_id
+
+    def save_summary(self, session_id: str, summary: str, summarized_upto: int):
+        with self._lock:
+            session = self._sessions.setdefault(session_id, {"summary": "", "messages": []})
+            session["summary"] = summary
+            session["messages"] = [m for m in session["messages"] if m["id"] > summarized_upto]
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+
+class SQLiteConversationStore(ConversationStore):
+    """SQLite-backed store; the full transcript is kept, only the window is loaded"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv(
+            "CONVERSATION_DB_PATH",
+            str(get_data_dir() / "conversations.sqlite3")
+        )
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                summary TEXT NOT NULL DEFAULT '',
+                summarized_upto INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS messages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_messages_session ON messages (session_id, id);
+        """)
+        self._conn.commit()
+        logger.info(f"✓ Conversation store: {self.path}")
+
+    def load(self, session_id: str) -> Dict[str, Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary, summarized_upto FROM sessions WHERE session_id = ?",
+                (session_id,)
+            ).fetchone()
+            summary, summarized_upto = row if row else ("", 0)
+            rows = self._conn.execute(
+                "SELECT id, role, content FROM messages WHERE session_id = ? AND id > ? ORDER BY id",
+                (session_id, summarized_upto)
+            ).fetchall()
+
+        return {
+            "summary": summary,
+            "messages": [{"id": r[0], "role": r[1], "content": r[2]} for r in rows]
+        }
+
+    def append(self, session_id: str, role: str, content: str) -> int:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO sessions (session_id, updated_at) VALUES (?, ?) "
+                "ON CONFLICT(session_id) DO UPDATE SET updated_at = excluded.updated_at",
+                (session_id, now)
+            )
+            cursor = self._conn.execute(
+                "INSERT INTO messages (session_id, role, content, created_at) VALUES (?, ?, ?, ?)",
+                (session_id, role, content, now)
+            )
+            self._conn.commit()
+            return cursor.lastrowid
+
+    def save_summary(self, session_id: str, summary: str, summarized_upto: int):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO sessions (session_id, summary, summarized_upto, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(session_id) DO UPDATE SET summary = excluded.summary, "
+                "summarized_upto = excluded.summarized_upto, updated_at = excluded.updated_at",
+                (session_id, summary, summarized_upto, time.time())
+            )
+            self._conn.commit()
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            self._conn.commit()
+
+
+class ConversationManager:
+    """
+    Bounded chat context on top of a ConversationStore
+
+    Each turn sends: rolling summary + at most `max_messages` recent messages
+    (and at most `max_tokens` of them). When the window overflows, the oldest
+    messages are folded into the summary until only `keep_messages` remain.
+    """
+
+    def __init__(
+        self,
+        store: ConversationStore,
+        max_messages: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+        keep_messages: Optional[int] = None,
+        max_summary_chars: int = 2000
+    ):
+        self.store = store
+        self.max_messages = max_messages or int(os.getenv("CHAT_WINDOW_MESSAGES", "12"))
+        self.max_tokens = max_tokens or int(os.getenv("CHAT_WINDOW_TOKENS", "3000"))
+        self.keep_messages = keep_messages or int(os.getenv("CHAT_KEEP_MESSAGES", "4"))
+        self.max_summary_chars = max_summary_chars
+
+    @staticmethod
+    def new_session_id() -> str:
+        """Generate a session id"""
+        return uuid.uuid4().hex
+
+    def get_context(self, session_id: str) -> Dict[str, Any]:
+        """
+        Get the bounded context for the next turn
+
+        Returns:
+            {"summary": str, "messages": [{"role", "content"}, ...]}
+        """
+        session = self.store.load(session_id)
+        messages = session["messages"]
+
+        # Hard cap in case summarization has fallen behind
+        budget = self.max_tokens
+        window = []
+        for message in reversed(messages[-self.max_messages:]):
+            budget -= estimate_tokens(message["content"])
+            if budget < 0 and window:
+                break
+            window.append({"role": message["role"], "content": message["content"]})
+        window.reverse()
+
+        # Keep user/assistant alternation starting from a user message
+        while window and window[0]["role"] != "user":
+            window.pop(0)
+
+        return {"summary": session["summary"], "messages": window}
+
+    def record_turn(self, session_id: str, question: str, answer: str):
+        """Store a completed question/answer pair"""
+        self.store.append(session_id, "user", question)
+        self.store.append(session_id, "assistant", answer)
+
+    def needs_summary(self, session_id: str) -> bool:
+        """True if the unsummarized window has outgrown its limits"""
+        messages = self.store.load(session_id)["messages"]
+        tokens = sum(estimate_tokens(m["content"]) for m in messages)
+        return len(messages) > self.max_messages or tokens > self.max_tokens
+
+    def compact(self, session_id: str, summarizer: Callable[[str, List[Dict[str, str]]], str]) -> bool:
+        """
+        Fold the oldest messages into the rolling summary
+
+        Args:
+            session_id: Session to compact
+            summarizer: fn(previous_summary, messages) -> new summary
+
+        Returns:
+            True if a new summary was written
+        """
+        session = self.store.load(session_id)
+        messages = session["messages"]
+        if len(messages) <= self.keep_messages:
+            return False
+
+        # Fold whole user/assistant pairs so the kept window starts with a user message
+        fold = messages[:len(messages) - self.keep_messages]
+        if fold[-1]["role"] == "user":
+            fold = fold[:-1]
+        if not fold:
+            return False
+
+        summary = summarizer(
+            session["summary"],
+            [{"role": m["role"], "content": m["content"]} for m in fold]
+        ).strip()[:self.max_summary_chars]
+
+        self.store.save_summary(session_id, summary, fold[-1]["id"])
+        logger.info(f"🗜️ Summarized {len(fold)} messages for session {session_id[:8]}")
+        return True
+
+
+def build_chat_messages(summary: str, messages: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """
+    Turn a bounded context into a message list for the model
+
+    The summary goes first as its own user/assistant pair: it only changes
+    when the window is compacted, so the prefix stays cache-friendly.
+    """
+    chat = []
+    if summary:
+        chat.append({"role": "user", "content": f"Summary of our conversation so far:\n{summary}"})
+        chat.append({"role": "assistant", "content": "Understood, I'll keep that in mind."})
+    chat.extend(messages)
+    return chat
+
+
+def format_transcript(messages: List[Dict[str, str]]) -> str:
+    """Render messages as a plain 'User:/Assistant:' transcript for summarization"""
+    return "\n\n".join(
+        f"{'User' if m['role'] == 'user' else 'Assistant'}: {m['content']}"
+        for m in messages
+    )
+
+
+# Singleton instance
+_conversation_manager: Optional[ConversationManager] = None
+
+
+def get_conversation_manager() -> ConversationManager:
+    """Get or create ConversationManager singleton (CONVERSATION_STORE=sqlite|memory)"""
+    global _conversation_manager
+    if _conversation_manager is None:
+        backend = os.getenv("CONVERSATION_STORE", "sqlite").lower()
+        if backend == "memory":
+            store: ConversationStore = InMemoryConversationStore()
+        elif backend == "sqlite":
+            store = SQLiteConversationStore()
+        else:
+            raise ValueError(f"Unknown CONVERSATION_STORE: {backend}. Use 'sqlite' or 'memory'")
+        _conversation_manager = ConversationManager(store)
+    return _conversation_manager
@@ -0,0 +1,19 @@
+"""
+Local data directory for Skyrchitect AI
+Holds SQLite databases and on-disk caches when no external store is configured
+"""
+
+import os
+from pathlib import Path
+
+
+def get_data_dir() -> Path:
+    """
+    Get (and create) the local data directory
+
+    Returns:
+        Path from SKYRCHITECT_DATA_DIR, defaulting to ./data
+    """
+    data_dir = Path(os.getenv("SKYRCHITECT_DATA_DIR", "data"))
+    data_dir.mkdir(parents=True, exist_ok=True)
+    return data_dir
@@ -0,0 +1,246 @@
+"""
+Diagram Preprocessing for Skyrchitect AI
+Rasterizes uploaded PDFs page by page, normalizes and downsizes images, and
+generates thumbnails in a process pool, caching results by content hash
+"""
+
+import os
+import json
+import shutil
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, AsyncIterator, BinaryIO, Dict, Optional
+
+from backend.utils.data_dir import get_data_dir
+from backend.utils.s3_storage import hash_stream
+
+logger = logging.getLogger(__name__)
+
+PDF_CONTENT_TYPES = {"application/pdf", "application/x-pdf"}
+
+
+def _normalize_image(image, output_dir: str, stem: str, max_dimension: int, thumbnail_dimension: int) -> Dict[str, Any]:
+    """
+    Normalize a PIL image and write the page image and its thumbnail
+
+    Runs inside a worker process.
+    """
+    from PIL import Image, ImageOps
+
+    image = ImageOps.exif_transpose(image)
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+
+    image_path = os.path.join(output_dir, f"{stem}.png")
+    image.save(image_path, "PNG", optimize=True)
+
+    thumbnail = image.copy()
+    thumbnail.thumbnail((thumbnail_dimension, thumbnail_dimension), Image.LANCZOS)
+    thumbnail_path = os.path.join(output_dir, f"{stem}.thumb.jpg")
+    thumbnail.save(thumbnail_path, "JPEG", quality=80)
+
+    return {
+        "width": image.width,
+        "height": image.height,
+        "image": os.path.basename(image_path),
+        "thumbnail": os.path.basename(thumbnail_path),
+        "bytes": os.path.getsize(image_path)
+    }
+
+
+def render_pdf_page(
+    pdf_path: str,
+    page_number: int,
+    output_dir: str,
+    dpi: int,
+    max_dimension: int,
+    thumbnail_dimension: int
+) -> Dict[str, Any]:
+    """
+    Rasterize one PDF page (1-based) with poppler and normalize it
+
+    Only this page is decoded, so worker memory stays at one page per process.
+    """
+    from pdf2image import convert_from_path
+
+    images = convert_from_path(pdf_path, dpi=dpi, first_page=page_number, last_page=page_number)
+    result = _normalize_image(images[0], output_dir, f"page-{page_number:04d}", max_dimension, thumbnail_dimension)
+    return {"page": page_number, **result}
+
+
+def render_image(path: str, output_dir: str, max_dimension: int, thumbnail_dimension: int) -> Dict[str, Any]:
+    """Normalize a single uploaded image (treated as page 1)"""
+    from PIL import Image
+
+    with Image.open(path) as image:
+        image.load()
+        result = _normalize_image(image, output_dir, "page-0001", max_dimension, thumbnail_dimension)
+    return {"page": 1, **result}
+
+
+def count_pdf_pages(pdf_path: str) -> int:
+    """Count PDF pages without rendering them"""
+    from PyPDF2 import PdfReader
+
+    return len(PdfReader(pdf_path).pages)
+
+
+class DiagramPreprocessor:
+    """
+    Preprocess uploaded diagrams off the API worker
+
+    Rendering runs in a ProcessPoolExecutor; pages are submitted a few at a
+    time and yielded in order as they finish. Results live under
+    <data dir>/diagrams/<sha256>/ with a manifest, so a repeated upload of
+    the same file is served from disk.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        max_workers: Optional[int] = None,
+        dpi: Optional[int] = None,
+        max_dimension: Optional[int] = None,
+        thumbnail_dimension: Optional[int] = None,
+        max_pages: Optional[int] = None
+    ):
+        self.cache_dir = cache_dir or get_data_dir() / "diagrams"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_workers = max_workers or int(os.getenv("DIAGRAM_WORKERS", os.cpu_count() or 2))
+        self.dpi = dpi or int(os.getenv("DIAGRAM_PDF_DPI", 150))
+        self.max_dimension = max_dimension or int(os.getenv("DIAGRAM_MAX_DIMENSION", 2048))
+        self.thumbnail_dimension = thumbnail_dimension or int(os.getenv("DIAGRAM_THUMBNAIL_DIMENSION", 256))
+        self.max_pages = max_pages or int(os.getenv("DIAGRAM_MAX_PAGES", 100))
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        """Process pool, created on first use"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def output_dir(self, digest: str) -> Path:
+        """Cache directory for a diagram"""
+        return self.cache_dir / digest
+
+    def load_manifest(self, digest: str) -> Optional[Dict[str, Any]]:
+        """Get the manifest of a fully processed diagram, or None"""
+        manifest_path = self.output_dir(digest) / "manifest.json"
+        if not manifest_path.exists():
+            return None
+        return json.loads(manifest_path.read_text())
+
+    async def process(
+        self,
+        fileobj: BinaryIO,
+        filename: str,
+        content_type: str = "image/png"
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Preprocess a diagram, yielding events as pages become available
+
+        Yields:
+            {"event": "start", ...}, then one {"event": "page", ...} per page
+            in page order, then {"event": "done", ...}
+        """
+        loop = asyncio.get_running_loop()
+        digest, size = await loop.run_in_executor(None, hash_stream, fileobj)
+
+        lock = self._locks.setdefault(digest, asyncio.Lock())
+        async with lock:
+            manifest = self.load_manifest(digest)
+            if manifest is not None:
+                logger.info(f"✓ Diagram {digest[:12]} served from preprocessing cache")
+                yield {"event": "start", "sha256": digest, "pages": len(manifest["pages"]), "cached": True}
+                for page in manifest["pages"]:
+                    yield {"event": "page", "sha256": digest, **page}
+                yield {"event": "done", "sha256": digest, "pages": len(manifest["pages"]), "cached": True}
+                return
+
+            output_dir = self.output_dir(digest)
+            output_dir.mkdir(parents=True, exist_ok=True)
+            is_pdf = content_type in PDF_CONTENT_TYPES or filename.lower().endswith(".pdf")
+            source_path = output_dir / ("source.pdf" if is_pdf else "source")
+
+            # Workers read the file from disk; nothing large is pickled across processes
+            await loop.run_in_executor(None, self._copy_source, fileobj, source_path)
+
+            if is_pdf:
+                page_count = await loop.run_in_executor(self.executor, count_pdf_pages, str(source_path))
+                if page_count > self.max_pages:
+                    raise ValueError(f"PDF has {page_count} pages; the limit is {self.max_pages}")
+            else:
+                page_count = 1
+
+            yield {"event": "start", "sha256": digest, "pages": page_count, "size": size, "cached": False}
+
+            pages = []
+            async for page in self._render_pages(str(source_path), str(output_dir), page_count, is_pdf):
+                pages.append(page)
+                yield {"event": "page", "sha256": digest, **page}
+
+            manifest = {"sha256": digest, "filename": filename, "content_type": content_type, "pages": pages}
+            manifest_tmp = output_dir / "manifest.json.tmp"
+            manifest_tmp.write_text(json.dumps(manifest))
+            os.replace(manifest_tmp, output_dir / "manifest.json")
+
+            yield {"event": "done", "sha256": digest, "pages": page_count, "cached": False}
+
+    async def _render_pages(self, source_path: str, output_dir: str, page_count: int, is_pdf: bool) -> AsyncIterator[Dict[str, Any]]:
+        """Render pages with a bounded number in flight, yielding them in order"""
+        loop = asyncio.get_running_loop()
+
+        def submit(page_number: int) -> asyncio.Future:
+            if is_pdf:
+                return loop.run_in_executor(
+                    self.executor, render_pdf_page, source_path, page_number, output_dir,
+                    self.dpi, self.max_dimension, self.thumbnail_dimension
+                )
+            return loop.run_in_executor(
+                self.executor, render_image, source_path, output_dir,
+                self.max_dimension, self.thumbnail_dimension
+            )
+
+        window = self.max_workers * 2
+        pending = []
+        next_page = 1
+        try:
+            while next_page <= page_count or pending:
+                while next_page <= page_count and len(pending) < window:
+                    pending.append(submit(next_page))
+                    next_page += 1
+                yield await pending.pop(0)
+        finally:
+            for future in pending:
+                future.cancel()
+
+    @staticmethod
+    def _copy_source(fileobj: BinaryIO, source_path: Path):
+        """Stream the upload to the cache directory"""
+        fileobj.seek(0)
+        with open(source_path, "wb") as out:
+            shutil.copyfileobj(fileobj, out, 1024 * 1024)
+
+
+# Singleton instance
+_preprocessor: Optional[DiagramPreprocessor] = None
+
+
+def get_diagram_preprocessor() -> DiagramPreprocessor:
+    """Get or create DiagramPreprocessor singleton"""
+    global _preprocessor
+    if _preprocessor is None:
+        _preprocessor = DiagramPreprocessor()
+    return _preprocessor
@@ -0,0 +1,366 @@
+"""
+Endpoint scaling for the NIM on SageMaker
+Registers Application Auto Scaling target tracking on invocations per
+instance, bounds in-flight requests by the endpoint's current capacity and,
+optionally, scales to zero after an idle period and back up on demand
+"""
+
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+SCALABLE_DIMENSION = "sagemaker:variant:DesiredInstanceCount"
+
+# Endpoint states in which the endpoint serves requests
+SERVING_STATUSES = ("InService", "Updating", "SystemUpdating")
+
+
+def scalable_resource_id(endpoint_name: str, variant_name: str = "AllTraffic") -> str:
+    """Application Auto Scaling resource id of an endpoint variant"""
+    return f"endpoint/{endpoint_name}/variant/{variant_name}"
+
+
+def register_autoscaling(
+    autoscaling_client: Any,
+    endpoint_name: str,
+    variant_name: str = "AllTraffic",
+    min_capacity: int = 1,
+    max_capacity: int = 4,
+    target_invocations: float = 20.0,
+    scale_in_cooldown: int = 300,
+    scale_out_cooldown: int = 60
+) -> str:
+    """
+    Register a variant as a scalable target with a target-tracking policy
+
+    Args:
+        autoscaling_client: boto3 'application-autoscaling' client
+        endpoint_name: SageMaker endpoint
+        variant_name: Production variant
+        min_capacity: Minimum instances (SageMaker variants need at least 1)
+        max_capacity: Maximum instances
+        target_invocations: Target SageMakerVariantInvocationsPerInstance (per minute)
+        scale_in_cooldown: Seconds between scale-in activities
+        scale_out_cooldown: Seconds between scale-out activities
+
+    Returns:
+        Scaling policy ARN
+    """
+    resource_id = scalable_resource_id(endpoint_name, variant_name)
+    autoscaling_client.register_scalable_target(
+        ServiceNamespace="sagemaker",
+        ResourceId=resource_id,
+        ScalableDimension=SCALABLE_DIMENSION,
+        MinCapacity=min_capacity,
+        MaxCapacity=max_capacity
+    )
+    response = autoscaling_client.put_scaling_policy(
+        PolicyName=f"{endpoint_name}-invocations-per-instance",
+        ServiceNamespace="sagemaker",
+        ResourceId=resource_id,
+        ScalableDimension=SCALABLE_DIMENSION,
+        PolicyType="TargetTrackingScaling",
+        TargetTrackingScalingPolicyConfiguration={
+            "TargetValue": float(target_invocations),
+            "PredefinedMetricSpecification": {"PredefinedMetricType": "SageMakerVariantInvocationsPerInstance"},
+            "ScaleInCooldown": scale_in_cooldown,
+            "ScaleOutCooldown": scale_out_cooldown
+        }
+    )
+    logger.info(f"✓ Autoscaling {resource_id}: {min_capacity}-{max_capacity} instances, "
+                f"target {target_invocations} invocations/instance/min")
+    return response["PolicyARN"]
+
+
+def deregister_autoscaling(autoscaling_client: Any, endpoint_name: str, variant_name: str = "AllTraffic"):
+    """Remove the scalable target (and its policies); missing targets are ignored"""
+    try:
+        autoscaling_client.deregister_scalable_target(
+            ServiceNamespace="sagemaker",
+            ResourceId=scalable_resource_id(endpoint_name, variant_name),
+            ScalableDimension=SCALABLE_DIMENSION
+        )
+    except Exception as e:
+        logger.info(f"No scalable target to remove for {endpoint_name}: {e}")
+
+
+class CapacityTimeout(RuntimeError):
+    """A request waited longer than the queue timeout for endpoint capacity"""
+
+
+class CapacityUnavailable(RuntimeError):
+    """The endpoint's capacity cannot be read (e.g. describe_endpoint is denied)"""
+
+
+class EndpointCapacityController:
+    """
+    Capacity-aware concurrency limiter and scale-to-zero controller
+
+    In-flight requests are capped at instances x NIM_CONCURRENCY_PER_INSTANCE;
+    excess requests queue. The instance count is refreshed from
+    describe_endpoint in the background, so autoscaling activity widens or
+    narrows the limit.
+
+    Classic SageMaker variants cannot run zero instances, so scale-to-zero
+    deletes the endpoint (model and endpoint config are kept) after
+    NIM_SCALE_TO_ZERO_IDLE_SECONDS without requests. The next request
+    recreates it from the latest config and waits in the queue until it is
+    in service (up to NIM_QUEUE_TIMEOUT_SECONDS).
+    """
+
+    def __init__(
+        self,
+        endpoint_name: Optional[str] = None,
+        region_name: Optional[str] = None,
+        sagemaker_client: Any = None,
+        autoscaling_client: Any = None,
+        per_instance_concurrency: Optional[int] = None,
+        idle_seconds: Optional[float] = None,
+        queue_timeout: Optional[float] = None,
+        refresh_seconds: Optional[float] = None,
+        start: bool = True
+    ):
+        """
+        Args:
+            endpoint_name: Endpoint to control (default SAGEMAKER_ENDPOINT_NAME)
+            region_name: AWS region
+            sagemaker_client, autoscaling_client: Preconfigured clients (stubs in tests)
+            per_instance_concurrency: Concurrent requests per instance
+            idle_seconds: Idle time before scaling to zero (0 disables)
+            queue_timeout: Longest a request waits for capacity
+            refresh_seconds: Interval of the background capacity refresh
+            start: Start the background refresh/idle thread
+        """
+        self.endpoint_name = endpoint_name or os.getenv("SAGEMAKER_ENDPOINT_NAME", "llama-nemotron-endpoint")
+        region_name = region_name or os.getenv("AWS_DEFAULT_REGION", "us-west-2")
+        if sagemaker_client is None or autoscaling_client is None:
+            import boto3
+            sagemaker_client = sagemaker_client or boto3.client("sagemaker", region_name=region_name)
+            autoscaling_client = autoscaling_client or boto3.client("application-autoscaling", region_name=region_name)
+        self.sagemaker = sagemaker_client
+        self.autoscaling = autoscaling_client
+
+        self.per_instance_concurrency = per_instance_concurrency or int(os.getenv("NIM_CONCURRENCY_PER_INSTANCE", "4"))
+        self.idle_seconds = idle_seconds if idle_seconds is not None else float(os.getenv("NIM_SCALE_TO_ZERO_IDLE_SECONDS", "0"))
+        self.queue_timeout = queue_timeout if queue_timeout is not None else float(os.getenv("NIM_QUEUE_TIMEOUT_SECONDS", "900"))
+        self.refresh_seconds = refresh_seconds or float(os.getenv("NIM_CAPACITY_REFRESH_SECONDS", "30"))
+
+        # Re-registered after a scale-up from zero (NIM_AUTOSCALING_MAX_INSTANCES=0 disables)
+        self.autoscaling_settings = {
+            "min_capacity": int(os.getenv("NIM_AUTOSCALING_MIN_INSTANCES", "1")),
+            "max_capacity": int(os.getenv("NIM_AUTOSCALING_MAX_INSTANCES", "0")),
+            "target_invocations": float(os.getenv("NIM_AUTOSCALING_TARGET_INVOCATIONS", "20"))
+        }
+
+        self.status = "Unknown"
+        self.error: Optional[str] = None
+        self.instances = 0
+        self.config_name: Optional[str] = None
+        self.in_flight = 0
+        self.queued = 0
+        self.scale_events = {"scale_to_zero": 0, "scale_from_zero": 0}
+        self.last_activity = time.monotonic()
+        self._scaling_up = False
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+
+        self.refresh()
+        if start:
+            threading.Thread(target=self._run, name=f"capacity-{self.endpoint_name}", daemon=True).start()
+
+    @property
+    def limit(self) -> int:
+        """Concurrent requests the endpoint can take right now"""
+        if self.status not in SERVING_STATUSES:
+            return 0
+        return self.instances * self.per_instance_concurrency
+
+    def refresh(self):
+        """Read status and instance count from describe_endpoint"""
+        try:
+            endpoint = self.sagemaker.describe_endpoint(EndpointName=self.endpoint_name)
+            status = endpoint["EndpointStatus"]
+            instances = sum(
+                variant.get("CurrentInstanceCount", 0) for variant in endpoint.get("ProductionVariants", [])
+            )
+            config_name = endpoint.get("EndpointConfigName")
+        except Exception as e:
+            if "Could not find" not in str(e):
+                logger.warning(f"⚠️ Could not refresh capacity of {self.endpoint_name}: {e}")
+                with self._cond:
+                    # Keep the last known capacity; without one, waiting cannot help
+                    self.error = str(e)
+                    if self.status in ("Unknown", "Unreachable"):
+                        self.status = "Unreachable"
+                        self._cond.notify_all()
+                return
+            status, instances, config_name = "Deleted", 0, None
+
+        with self._cond:
+            self.error = None
+            self.status = status
+            self.instances = instances
+            self.config_name = config_name or self.config_name
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """
+        Hold one unit of endpoint concurrency for the duration of a call
+
+        Raises:
+            CapacityTimeout: If no capacity became available within queue_timeout
+            CapacityUnavailable: If the endpoint's capacity cannot be read at all
+        """
+        deadline = time.monotonic() + self.queue_timeout
+        with self._cond:
+            self.queued += 1
+            try:
+                while self.in_flight >= self.limit:
+                    if self.status == "Unreachable":
+                        raise CapacityUnavailable(f"Cannot read capacity of {self.endpoint_name}: {self.error}")
+                    if self.limit == 0:
+                        self._request_scale_up()
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise CapacityTimeout(
+                            f"No capacity on {self.endpoint_name} after {self.queue_timeout:.0f}s (status {self.status})"
+                        )
+                    self._cond.wait(min(remaining, 5.0))
+            finally:
+                self.queued -= 1
+            self.in_flight += 1
+            self.last_activity = time.monotonic()
+
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.in_flight -= 1
+                self.last_activity = time.monotonic()
+                self._cond.notify()
+
+    def scale_to_zero(self) -> bool:
+        """Delete the endpoint (keeping model and config) if it is idle"""
+        with self._cond:
+            if self.status != "InService" or self.in_flight or self.queued:
+                return False
+            self.status = "Deleting"
+            self.instances = 0
+
+        deregister_autoscaling(self.autoscaling, self.endpoint_name)
+        self.sagemaker.delete_endpoint(EndpointName=self.endpoint_name)
+        self.scale_events["scale_to_zero"] += 1
+        logger.info(f"💤 {self.endpoint_name} idle for {self.idle_seconds:.0f}s, scaled to zero "
+                    f"(config {self.config_name} kept)")
+        return True
+
+    def scale_up(self):
+        """Recreate the endpoint from its last config and wait until it serves"""
+        delay = min(5.0, self.refresh_seconds)
+        try:
+            while not self._stop.is_set():
+                self.refresh()
+                if self.status in SERVING_STATUSES and self.instances:
+                    break
+                if self.status == "Deleted":
+                    config_name = self.config_name or self._latest_config()
+                    if config_name is None:
+                        raise RuntimeError(f"No endpoint config found for {self.endpoint_name}")
+                    logger.info(f"⏫ Recreating {self.endpoint_name} from {config_name}")
+                    self.sagemaker.create_endpoint(EndpointName=self.endpoint_name, EndpointConfigName=config_name)
+                    self.scale_events["scale_from_zero"] += 1
+                elif self.status in ("Failed", "OutOfService"):
+                    raise RuntimeError(f"{self.endpoint_name} is {self.status}")
+                elif self.status == "Unreachable":
+                    raise RuntimeError(f"Cannot read status of {self.endpoint_name}: {self.error}")
+                self._stop.wait(delay)
+                delay = min(delay * 1.6, 30.0)
+
+            if self.autoscaling_settings["max_capacity"]:
+                register_autoscaling(self.autoscaling, self.endpoint_name, **self.autoscaling_settings)
+            logger.info(f"✓ {self.endpoint_name} serving again with {self.instances} instances")
+        except Exception as e:
+            logger.error(f"❌ Scale-up of {self.endpoint_name} failed: {e}")
+        finally:
+            with self._cond:
+                self._scaling_up = False
+                self._cond.notify_all()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current capacity and queue state"""
+        with self._cond:
+            return {
+                "endpoint": self.endpoint_name,
+                "status": self.status,
+                "error": self.error,
+                "instances": self.instances,
+                "limit": self.limit,
+                "in_flight": self.in_flight,
+                "queued": self.queued,
+                "scaling_up": self._scaling_up,
+                "idle_seconds": round(time.monotonic() - self.last_activity, 1),
+                "scale_to_zero_after": self.idle_seconds or None,
+                **self.scale_events
+            }
+
+    def stop(self):
+        """Stop the background thread"""
+        self._stop.set()
+
+    def _request_scale_up(self):
+        """Start a scale-up in the background (called with the condition held)"""
+        if self._scaling_up:
+            return
+        self._scaling_up = True
+        threading.Thread(target=self.scale_up, name=f"scale-up-{self.endpoint_name}", daemon=True).start()
+
+    def _latest_config(self) -> Optional[str]:
+        """Newest endpoint config named after the endpoint (e.g. after a restart while at zero)"""
+        configs = self.sagemaker.list_endpoint_configs(
+            NameContains=self.endpoint_name, SortBy="CreationTime", SortOrder="Descending"
+        ).get("EndpointConfigs", [])
+        return configs[0]["EndpointConfigName"] if configs else None
+
+    def _run(self):
+        """Refresh capacity periodically and scale to zero when idle"""
+        while not self._stop.wait(self.refresh_seconds):
+            if not self._scaling_up:
+                self.refresh()
+            idle = time.monotonic() - self.last_activity
+            if self.idle_seconds and idle > self.idle_seconds:
+                try:
+                    self.scale_to_zero()
+                except Exception as e:
+                    logger.error(f"❌ Scale-to-zero of {self.endpoint_name} failed: {e}")
+
+
+# Controllers by endpoint name
+_controllers: Dict[str, EndpointCapacityController] = {}
+_controllers_lock = threading.Lock()
+
+
+def capacity_control_enabled() -> bool:
+    """True if NIM calls go through the capacity controller (NIM_CAPACITY_CONTROL)"""
+    return os.getenv("NIM_CAPACITY_CONTROL", "false").lower() == "true"
+
+
+def get_capacity_controller(endpoint_name: Optional[str] = None, region_name: Optional[str] = None) -> EndpointCapacityController:
+    """Get or create the EndpointCapacityController for an endpoint"""
+    endpoint_name = endpoint_name or os.getenv("SAGEMAKER_ENDPOINT_NAME", "llama-nemotron-endpoint")
+    with _controllers_lock:
+        if endpoint_name not in _controllers:
+            _controllers[endpoint_name] = EndpointCapacityController(endpoint_name, region_name)
+        return _controllers[endpoint_name]
+
+
+def capacity_snapshots() -> Dict[str, Dict[str, Any]]:
+    """Snapshots of every controller created so far"""
+    with _controllers_lock:
+        controllers = list(_controllers.values())
+    return {controller.endpoint_name: controller.snapshot() for controller in controllers}
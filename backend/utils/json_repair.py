@@ -0,0 +1,320 @@
+"""
+Tolerant JSON repair for model output
+Fixes the defects LLMs commonly produce (trailing commas, unquoted keys,
+single quotes, Python literals, comments, raw newlines in strings, missing
+commas) and closes structures cut off by max_tokens, in a single linear pass
+"""
+
+import json
+import re
+from typing import Any, List, Optional, Tuple
+
+_NUMBER_PATTERN = re.compile(r'-?(0|[1-9]\d*)(\.\d+)?([eE][+-]?\d+)?$')
+_ARCHITECTURE_START = re.compile(r'\{\s*["\']?architecture["\']?\s*:')
+
+_LITERALS = {
+    "true": "true", "false": "false", "null": "null",
+    "True": "true", "False": "false", "None": "null"
+}
+
+_JSON_ESCAPES = set('"\\/bfnrt')
+_HEX_DIGITS = set('0123456789abcdefABCDEF')
+
+# Token kinds
+_OPEN, _CLOSE, _COLON, _COMMA, _STRING, _NUMBER, _WORD = range(7)
+
+
+def _tokenize(text: str, start: int) -> Tuple[List[Tuple[int, str, bool]], bool]:
+    """
+    Scan one JSON-ish value starting at text[start]
+
+    Returns:
+        Tuple of (tokens as (kind, text, complete), reached_end_of_input)
+    """
+    tokens: List[Tuple[int, str, bool]] = []
+    depth = 0
+    i = start
+    n = len(text)
+
+    while i < n:
+        ch = text[i]
+
+        if ch in ' \t\r\n':
+            i += 1
+        elif ch == '{' or ch == '[':
+            tokens.append((_OPEN, ch, True))
+            depth += 1
+            i += 1
+        elif ch == '}' or ch == ']':
+            tokens.append((_CLOSE, ch, True))
+            depth -= 1
+            i += 1
+            if depth == 0:
+                return tokens, False
+        elif ch == ':':
+            tokens.append((_COLON, ch, True))
+            i += 1
+        elif ch == ',':
+            tokens.append((_COMMA, ch, True))
+            i += 1
+        elif ch == '"' or ch == "'":
+            quote = ch
+            chunks = []
+            i += 1
+            complete = False
+            while i < n:
+                c = text[i]
+                if c == '\\':
+                    if i + 1 == n:
+                        # Cut right after a backslash: drop the dangling escape
+                        i += 1
+                        break
+                    nxt = text[i + 1]
+                    if nxt == 'u':
+                        digits = text[i + 2:i + 6]
+                        if len(digits) == 4 and all(d in _HEX_DIGITS for d in digits):
+                            chunks.append(text[i:i + 6])
+                            i += 6
+                        elif i + 2 + len(digits) == n and all(d in _HEX_DIGITS for d in digits):
+                            # Cut inside \uXXXX: drop the incomplete escape
+                            i = n
+                        else:
+                            # \u without four hex digits: keep the backslash literally
+                            chunks.append('\\\\' + nxt)
+                            i += 2
+                        continue
+                    if nxt == "'":
+                        chunks.append("'")
+                    elif nxt in _JSON_ESCAPES:
+                        chunks.append(c + nxt)
+                    else:
+                        # Invalid escape such as \d: keep the backslash literally
+                        chunks.append('\\\\' + nxt)
+                    i += 2
+                elif c == quote:
+                    complete = True
+                    i += 1
+                    break
+                elif c == '"':
+                    chunks.append('\\"')
+                    i += 1
+                elif c == '\n':
+                    chunks.append('\\n')
+                    i += 1
+                elif c == '\r':
+                    chunks.append('\\r')
+                    i += 1
+                elif c == '\t':
+                    chunks.append('\\t')
+                    i += 1
+                else:
+                    chunks.append(c)
+                    i += 1
+            tokens.append((_STRING, ''.join(chunks), complete))
+        elif ch == '-' or ch == '+' or ch == '.' or ch.isdigit():
+            j = i
+            while j < n and (text[j].isdigit() or text[j] in '+-.eE'):
+                j += 1
+            tokens.append((_NUMBER, text[i:j], j < n))
+            i = j
+        elif ch == '/' and i + 1 < n and text[i + 1] in '/*':
+            if text[i + 1] == '/':
+                end = text.find('\n', i)
+                i = n if end == -1 else end + 1
+            else:
+                end = text.find('*/', i + 2)
+                i = n if end == -1 else end + 2
+        elif ch.isalpha() or ch == '_' or ch == '$':
+            j = i
+            while j < n and (text[j].isalnum() or text[j] in '_$-'):
+                j += 1
+            tokens.append((_WORD, text[i:j], j < n))
+            i = j
+        else:
+            # Stray characters (backticks, markdown) inside a structure are dropped
+            i += 1
+
+    return tokens, True
+
+
+def _normalize_number(raw: str) -> Optional[str]:
+    """Coerce a number token into JSON syntax, or None if it is not salvageable"""
+    number = raw.lstrip('+')
+    if number.startswith('.'):
+        number = '0' + number
+    number = number.rstrip('.eE+-')
+    if _NUMBER_PATTERN.match(number):
+        return number
+    try:
+        return json.dumps(float(number))
+    except ValueError:
+        return None
+
+
+def repair_json(text: str, start: Optional[int] = None) -> Tuple[Optional[Any], bool]:
+    """
+    Parse a JSON object or array from model output, repairing it if needed
+
+    Parsing stops where the top-level value closes, so trailing prose (even
+    prose containing braces) is ignored. If the input ends first, the value
+    is treated as truncated: the dangling member is dropped and every open
+    string, array and object is closed.
+
+    Args:
+        text: Model output containing a JSON value
+        start: Index of the opening brace/bracket (default: first one found)
+
+    Returns:
+        Tuple of (parsed value or None, truncated flag)
+    """
+    if start is None:
+        starts = [pos for pos in (text.find('{'), text.find('[')) if pos != -1]
+        if not starts:
+            return None, False
+        start = min(starts)
+
+    tokens, truncated = _tokenize(text, start)
+
+    out: List[str] = []
+    # Frames: [closer, state, member_start]. States: 'first' (nothing yet),
+    # 'next' (separator seen), 'comma' (value done, separator pending),
+    # 'colon' (key done), 'value' (key and colon done)
+    stack: List[list] = []
+
+    def begin_member(frame: list):
+        """Emit the separator (inserting a missing comma) and mark where the member starts"""
+        if frame[1] in ('next', 'comma'):
+            out.append(',')
+            frame[2] = len(out) - 1
+        else:
+            frame[2] = len(out)
+
+    def drop_member(frame: list):
+        """Remove the member being built, including its separator"""
+        del out[frame[2]:]
+        frame[1] = 'first' if out[-1] in '{[' else 'comma'
+
+    def close(frame: list):
+        if frame[1] in ('colon', 'value'):
+            drop_member(frame)
+        out.append(frame[0])
+
+    def after_value():
+        if stack:
+            stack[-1][1] = 'comma'
+
+    last_index = len(tokens) - 1
+    for index, (kind, value, complete) in enumerate(tokens):
+        at_cut = truncated and index == last_index
+        frame = stack[-1] if stack else None
+
+        if kind == _OPEN:
+            if frame is not None:
+                if frame[0] == '}' and frame[1] in ('first', 'next', 'comma'):
+                    # An object or array cannot be a key
+                    continue
+                if frame[0] == ']':
+                    begin_member(frame)
+            stack.append(['}' if value == '{' else ']', 'first', len(out)])
+            out.append(value)
+
+        elif kind == _CLOSE:
+            if frame is None:
+                break
+            close(stack.pop())
+            after_value()
+            if not stack:
+                break
+
+        elif kind == _COMMA:
+            if frame is None:
+                continue
+            if frame[1] == 'comma':
+                frame[1] = 'next'
+            elif frame[1] in ('colon', 'value'):
+                # Key without a value
+                drop_member(frame)
+                frame[1] = 'next' if frame[1] == 'comma' else 'first'
+
+        elif kind == _COLON:
+            if frame is not None and frame[1] == 'colon':
+                out.append(':')
+                frame[1] = 'value'
+
+        else:
+            if frame is None:
+                continue
+
+            if frame[0] == '}' and frame[1] in ('first', 'next', 'comma'):
+                if kind == _NUMBER:
+                    continue
+                begin_member(frame)
+                out.append(json.dumps(value) if kind == _WORD else f'"{value}"')
+                frame[1] = 'colon'
+                if at_cut or not complete:
+                    drop_member(frame)
+                continue
+
+            if frame[1] == 'colon':
+                # Missing colon between key and value
+                out.append(':')
+                frame[1] = 'value'
+            if frame[0] == ']':
+                begin_member(frame)
+
+            if kind == _STRING:
+                token = f'"{value}"'
+            elif kind == _NUMBER:
+                token = _normalize_number(value)
+                if at_cut and token != value:
+                    token = None
+            else:
+                token = _LITERALS.get(value)
+                if token is None and not at_cut:
+                    token = json.dumps(value)
+
+            if token is None:
+                drop_member(frame)
+                continue
+
+            out.append(token)
+            after_value()
+
+    while stack:
+        close(stack.pop())
+        after_value()
+
+    try:
+        return json.loads(''.join(out)), truncated
+    except json.JSONDecodeError:
+        return None, truncated
+
+
+def find_json_start(response: str) -> Optional[int]:
+    """
+    Locate the architecture JSON in a model response
+
+    Prefers a ```json fence, then an object opening with an "architecture"
+    key, then the first brace.
+    """
+    fence = response.find('```json')
+    if fence != -1:
+        brace = response.find('{', fence)
+        if brace != -1:
+            return brace
+
+    match = _ARCHITECTURE_START.search(response)
+    if match:
+        return match.start()
+
+    brace = response.find('{')
+    return brace if brace != -1 else None
+
+
+def is_truncated_json(response: str) -> bool:
+    """True if the response's JSON value is cut off before it closes"""
+    start = find_json_start(response)
+    if start is None:
+        return False
+    _, truncated = _tokenize(response, start)
+    return truncated
@@ -0,0 +1,71 @@
+"""
+Payload Size Metrics for Skyrchitect AI
+Tracks response bytes per route before and after compression
+"""
+
+import threading
+from typing import Any, Dict, Optional
+
+
+class PayloadMetrics:
+    """Thread-safe per-route response size counters"""
+
+    FIELDS = ("responses", "raw_bytes", "sent_bytes", "compressed", "streamed")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_route: Dict[str, Dict[str, int]] = {}
+        self._by_encoding: Dict[str, int] = {}
+
+    def record(self, route: str, raw_bytes: int, sent_bytes: int, encoding: Optional[str] = None, streamed: bool = False):
+        """
+        Record one response
+
+        Args:
+            route: Route path template (e.g. '/api/architectures/{architecture_id}')
+            raw_bytes: Body size before compression
+            sent_bytes: Body size on the wire
+            encoding: Content-Encoding applied, if any
+            streamed: True for streaming responses (never compressed here)
+        """
+        with self._lock:
+            totals = self._by_route.setdefault(route, dict.fromkeys(self.FIELDS, 0))
+            totals["responses"] += 1
+            totals["raw_bytes"] += raw_bytes
+            totals["sent_bytes"] += sent_bytes
+            totals["compressed"] += 1 if encoding else 0
+            totals["streamed"] += 1 if streamed else 0
+            key = encoding or "identity"
+            self._by_encoding[key] = self._by_encoding.get(key, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Totals, per-route counters with average sizes, and responses per encoding"""
+        with self._lock:
+            by_route = {route: dict(totals) for route, totals in self._by_route.items()}
+            by_encoding = dict(self._by_encoding)
+
+        totals = dict.fromkeys(self.FIELDS, 0)
+        for route, counters in by_route.items():
+            for field in self.FIELDS:
+                totals[field] += counters[field]
+            counters["avg_raw_bytes"] = counters["raw_bytes"] // counters["responses"]
+            counters["avg_sent_bytes"] = counters["sent_bytes"] // counters["responses"]
+
+        return {
+            "totals": totals,
+            "compression_ratio": round(totals["sent_bytes"] / totals["raw_bytes"], 4) if totals["raw_bytes"] else 1.0,
+            "by_encoding": by_encoding,
+            "by_route": by_route
+        }
+
+
+# Singleton instance
+_payload_metrics: Optional[PayloadMetrics] = None
+
+
+def get_payload_metrics() -> PayloadMetrics:
+    """Get or create PayloadMetrics singleton"""
+    global _payload_metrics
+    if _payload_metrics is None:
+        _payload_metrics = PayloadMetrics()
+    return _payload_metrics
@@ -0,0 +1,347 @@
+"""
+Multi-tenant rate limiting for Skyrchitect
+Identifies tenants by API key, limits each tenant's request rate with a
+token bucket and caps the model tokens it can use per (UTC) day
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from contextvars import ContextVar
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Tenant of the request being handled; model usage is charged to it
+current_tenant: ContextVar[Optional[str]] = ContextVar("current_tenant", default=None)
+
+ANONYMOUS_TENANT = "anonymous"
+
+
+def rate_limit_enabled() -> bool:
+    """True if RATE_LIMIT_ENABLED turns on the tenant middleware"""
+    return os.getenv("RATE_LIMIT_ENABLED", "false").lower() == "true"
+
+
+class TenantPolicy:
+    """Limits for one tenant"""
+
+    def __init__(self, name: str, rate: float, burst: Optional[int] = None, daily_tokens: int = 0):
+        """
+        Args:
+            name: Tenant name (used in metrics and store keys)
+            rate: Sustained requests per second
+            burst: Bucket size, i.e. requests allowed at once (default: 2 x rate, at least 1)
+            daily_tokens: Model input + output tokens per UTC day (0: unlimited)
+        """
+        self.name = name
+        self.rate = float(rate)
+        self.burst = int(burst) if burst else max(1, int(self.rate * 2))
+        self.daily_tokens = int(daily_tokens)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"rate": self.rate, "burst": self.burst, "daily_tokens": self.daily_tokens}
+
+
+def default_policy(name: str = ANONYMOUS_TENANT) -> TenantPolicy:
+    """Policy for tenants without their own limits (RATE_LIMIT_DEFAULT_*)"""
+    return TenantPolicy(
+        name,
+        rate=float(os.getenv("RATE_LIMIT_DEFAULT_RPS", "2")),
+        burst=int(os.getenv("RATE_LIMIT_DEFAULT_BURST", "10")),
+        daily_tokens=int(os.getenv("RATE_LIMIT_DEFAULT_DAILY_TOKENS", "0"))
+    )
+
+
+def load_tenants(spec: Optional[str] = None) -> Dict[str, TenantPolicy]:
+    """
+    Tenants by API key
+
+    Args:
+        spec: JSON object {"<api key>": {"name", "rate", "burst", "daily_tokens"}};
+            defaults to RATE_LIMIT_TENANTS, or the file named by RATE_LIMIT_TENANTS_FILE
+
+    Returns:
+        API key -> TenantPolicy (missing limits fall back to the defaults)
+    """
+    if spec is None:
+        path = os.getenv("RATE_LIMIT_TENANTS_FILE")
+        spec = open(path, encoding="utf-8").read() if path else os.getenv("RATE_LIMIT_TENANTS", "{}")
+
+    defaults = default_policy()
+    tenants = {}
+    for api_key, entry in json.loads(spec).items():
+        tenants[api_key] = TenantPolicy(
+            entry.get("name", api_key[:8]),
+            rate=entry.get("rate", defaults.rate),
+            burst=entry.get("burst", defaults.burst),
+            daily_tokens=entry.get("daily_tokens", defaults.daily_tokens)
+        )
+    return tenants
+
+
+def seconds_until_utc_midnight(now: Optional[float] = None) -> int:
+    now = time.time() if now is None else now
+    return int(86400 - now % 86400) + 1
+
+
+class MemoryLimitStore:
+    """In-process buckets and token counters (one worker; also the stand-in for Redis in tests)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._usage: Dict[str, Tuple[int, float]] = {}
+
+    def take(self, key: str, rate: float, burst: int, now: float) -> float:
+        """
+        Take one token from a bucket
+
+        Returns:
+            0.0 if a token was taken, else seconds until one is available
+        """
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (float(burst), now))
+            tokens = min(float(burst), tokens + (now - updated) * rate)
+            if tokens >= 1.0:
+                self._buckets[key] = (tokens - 1.0, now)
+                return 0.0
+            self._buckets[key] = (tokens, now)
+            return (1.0 - tokens) / rate if rate > 0 else float(seconds_until_utc_midnight(now))
+
+    def add_usage(self, key: str, tokens: int, ttl: int) -> int:
+        """Add tokens to a counter that expires ttl seconds from now; returns the new total"""
+        now = time.time()
+        with self._lock:
+            total, expires = self._usage.get(key, (0, 0.0))
+            if expires <= now:
+                total = 0
+            total += tokens
+            self._usage[key] = (total, now + ttl)
+            return total
+
+    def get_usage(self, key: str) -> int:
+        with self._lock:
+            total, expires = self._usage.get(key, (0, 0.0))
+            return total if expires > time.time() else 0
+
+
+# Refill-and-take in one atomic step: KEYS[1] = bucket hash; ARGV = rate, burst, now
+_TAKE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or burst
+local updated = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 60)
+return tostring(wait)
+"""
+
+
+class RedisLimitStore:
+    """
+    Buckets and token counters in Redis (or any Redis-protocol server), shared by all workers
+
+    Bucket refills are done in a Lua script, so concurrent workers cannot
+    both spend the same token.
+    """
+
+    def __init__(self, url: Optional[str] = None, prefix: str = "skyrchitect:ratelimit:"):
+        import redis
+
+        self.url = url or os.getenv("REDIS_URL", "redis://localhost:6379/0")
+        self.prefix = prefix
+        self.client = redis.Redis.from_url(self.url)
+        self._take = self.client.register_script(_TAKE_SCRIPT)
+
+    def take(self, key: str, rate: float, burst: int, now: float) -> float:
+        return float(self._take(keys=[self.prefix + key], args=[rate, burst, now]))
+
+    def add_usage(self, key: str, tokens: int, ttl: int) -> int:
+        pipeline = self.client.pipeline()
+        pipeline.incrby(self.prefix + key, tokens)
+        pipeline.expire(self.prefix + key, ttl)
+        total, _ = pipeline.execute()
+        return int(total)
+
+    def get_usage(self, key: str) -> int:
+        value = self.client.get(self.prefix + key)
+        return int(value) if value else 0
+
+
+def create_limit_store():
+    """Store selected by RATE_LIMIT_BACKEND ("memory" or "redis")"""
+    backend = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+    if backend == "redis":
+        return RedisLimitStore()
+    if backend == "memory":
+        return MemoryLimitStore()
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND '{backend}' (expected 'memory' or 'redis')")
+
+
+class RateLimitExceeded(Exception):
+    """A request was rejected; carries the HTTP status and Retry-After seconds"""
+
+    def __init__(self, status: int, detail: str, retry_after: Optional[int] = None):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class TenantLimiter:
+    """
+    Admission control per tenant
+
+    A request is admitted if its tenant's bucket has a token and the tenant
+    has not used up its daily token budget. Model usage recorded in
+    UsageMetrics while a request is handled is charged to its tenant, so the
+    budget counts real input + output tokens (a request that is already
+    running is allowed to finish).
+    """
+
+    def __init__(
+        self,
+        tenants: Optional[Dict[str, TenantPolicy]] = None,
+        store=None,
+        require_key: Optional[bool] = None
+    ):
+        """
+        Args:
+            tenants: API key -> policy (default: load_tenants())
+            store: MemoryLimitStore or RedisLimitStore (default: RATE_LIMIT_BACKEND)
+            require_key: Reject requests without a known API key (RATE_LIMIT_REQUIRE_KEY)
+        """
+        self.tenants = tenants if tenants is not None else load_tenants()
+        self.policies = {policy.name: policy for policy in self.tenants.values()}
+        self.anonymous = self.policies.get(ANONYMOUS_TENANT) or default_policy()
+        self.store = store or create_limit_store()
+        self.require_key = require_key if require_key is not None else (
+            os.getenv("RATE_LIMIT_REQUIRE_KEY", "false").lower() == "true"
+        )
+        self.header = os.getenv("RATE_LIMIT_API_KEY_HEADER", "x-api-key").lower()
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Dict[str, int]] = {}
+
+    def identify(self, headers: Mapping[str, str]) -> TenantPolicy:
+        """
+        Tenant of a request, from the API key header or an Authorization bearer token
+
+        Raises:
+            RateLimitExceeded: 401 for an unknown key, or a missing key with require_key
+        """
+        api_key = headers.get(self.header)
+        if not api_key:
+            scheme, _, token = headers.get("authorization", "").partition(" ")
+            api_key = token.strip() if scheme.lower() == "bearer" else None
+
+        if api_key:
+            policy = self.tenants.get(api_key)
+            if policy is None:
+                raise RateLimitExceeded(401, "Unknown API key")
+            return policy
+        if self.require_key:
+            raise RateLimitExceeded(401, f"API key required ({self.header} header)")
+        return self.anonymous
+
+    def _count(self, tenant: str, **increments: int):
+        with self._lock:
+            counters = self._metrics.setdefault(tenant, {
+                "requests": 0, "rejected_rate": 0, "rejected_budget": 0,
+                "calls": 0, "input_tokens": 0, "output_tokens": 0
+            })
+            for field, value in increments.items():
+                counters[field] += value
+
+    @staticmethod
+    def _usage_key(tenant: str, now: float) -> str:
+        return f"tokens:{tenant}:{time.strftime('%Y-%m-%d', time.gmtime(now))}"
+
+    def admit(self, policy: TenantPolicy):
+        """
+        Admit a request or raise
+
+        Raises:
+            RateLimitExceeded: 429 when the bucket is empty or the daily budget is used up
+        """
+        now = time.time()
+        if policy.daily_tokens and self.store.get_usage(self._usage_key(policy.name, now)) >= policy.daily_tokens:
+            self._count(policy.name, rejected_budget=1)
+            raise RateLimitExceeded(
+                429,
+                f"Daily token budget of {policy.daily_tokens:,} exhausted for tenant '{policy.name}'",
+                seconds_until_utc_midnight(now)
+            )
+
+        wait = self.store.take(f"bucket:{policy.name}", policy.rate, policy.burst, now)
+        if wait > 0:
+            self._count(policy.name, rejected_rate=1)
+            raise RateLimitExceeded(
+                429,
+                f"Rate limit of {policy.rate:g} requests/s exceeded for tenant '{policy.name}'",
+                max(1, int(wait + 0.999))
+            )
+        self._count(policy.name, requests=1)
+
+    def record_usage(self, operation: str, usage: Mapping[str, int]):
+        """UsageMetrics listener: charge a model call to the current tenant"""
+        tenant = current_tenant.get()
+        if tenant is None:
+            return
+        tokens = usage.get("input_tokens", 0) + usage.get("output_tokens", 0)
+        self._count(
+            tenant,
+            calls=1,
+            input_tokens=usage.get("input_tokens", 0),
+            output_tokens=usage.get("output_tokens", 0)
+        )
+        now = time.time()
+        self.store.add_usage(self._usage_key(tenant, now), tokens, seconds_until_utc_midnight(now))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Per-tenant limits, counters (this worker) and tokens used today (shared store)"""
+        now = time.time()
+        with self._lock:
+            metrics = {tenant: dict(counters) for tenant, counters in self._metrics.items()}
+
+        tenants = {}
+        for name in sorted(set(self.policies) | set(metrics) | {self.anonymous.name}):
+            policy = self.policies.get(name, self.anonymous)
+            used = self.store.get_usage(self._usage_key(name, now))
+            tenants[name] = {
+                **policy.to_dict(),
+                **metrics.get(name, {}),
+                "tokens_today": used,
+                "budget_remaining": max(0, policy.daily_tokens - used) if policy.daily_tokens else None
+            }
+        return {"backend": type(self.store).__name__, "tenants": tenants}
+
+
+# Singleton instance
+_tenant_limiter: Optional[TenantLimiter] = None
+
+
+def get_tenant_limiter() -> TenantLimiter:
+    """Get or create the TenantLimiter singleton (and hook it into usage metrics)"""
+    global _tenant_limiter
+    if _tenant_limiter is None:
+        from backend.utils.usage_metrics import get_usage_metrics
+
+        _tenant_limiter = TenantLimiter()
+        get_usage_metrics().add_listener(_tenant_limiter.record_usage)
+        logger.info(
+            f"✓ Tenant rate limiting: {len(_tenant_limiter.tenants)} API keys, "
+            f"{type(_tenant_limiter.store).__name__}"
+        )
+    return _tenant_limiter
@@ -0,0 +1,181 @@
+"""
+Lazy agent initialization and readiness tracking for Skyrchitect AI
+Keeps heavy imports (strands, boto3, agent prompts) off the startup path,
+warms the agent up in the background and serves cached health state
+"""
+
+import os
+import threading
+import time
+import logging
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Measured from the first import of this module, which main.py does at load
+PROCESS_START = time.perf_counter()
+
+STATUS_COLD = "cold"
+STATUS_WARMING = "warming"
+STATUS_READY = "ready"
+STATUS_FAILED = "failed"
+
+
+def get_model_type() -> str:
+    """Get the configured backend ('sagemaker' or 'bedrock')"""
+    return os.getenv("MODEL_TYPE", "sagemaker").lower()
+
+
+def get_model_id(model_type: Optional[str] = None) -> str:
+    """Get the model identifier reported by health checks"""
+    model_type = model_type or get_model_type()
+    if model_type == "sagemaker":
+        return f"sagemaker:{os.getenv('SAGEMAKER_ENDPOINT_NAME', 'llama-nemotron-endpoint')}"
+    return os.getenv("BEDROCK_MODEL_ID", "anthropic.claude-3-5-sonnet-20241022-v2:0")
+
+
+def load_agent(model_type: str) -> Any:
+    """
+    Import and construct the agent for a backend
+
+    The agent modules pull in strands, boto3 and the system prompts, so they
+    are only imported here, on first use.
+
+    Args:
+        model_type: 'sagemaker' (NVIDIA NIMs) or 'bedrock' (Claude)
+
+    Returns:
+        Architecture agent singleton for that backend
+    """
+    if model_type == "sagemaker":
+        from backend.agents.architecture_agent_sagemaker import get_architecture_agent_sagemaker
+        return get_architecture_agent_sagemaker()
+    if model_type == "bedrock":
+        from backend.agents.architecture_agent import get_architecture_agent
+        return get_architecture_agent()
+    raise ValueError(f"Unknown MODEL_TYPE: {model_type}. Use 'sagemaker' or 'bedrock'")
+
+
+class ReadinessState:
+    """
+    Cached agent lifecycle state shared by the API and its health probes
+
+    The agent moves cold -> warming -> ready (or failed). Probes only read
+    this state; they never construct the agent or call the model.
+    """
+
+    def __init__(self, model_type: Optional[str] = None):
+        self.model_type = model_type or get_model_type()
+        self.status = STATUS_COLD
+        self.error: Optional[str] = None
+        self.warmed_up = False
+        self.phases: Dict[str, float] = {}
+        self._agent: Any = None
+        self._lock = threading.Lock()
+        self._warmup_thread: Optional[threading.Thread] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status == STATUS_READY
+
+    def mark_phase(self, name: str, seconds: Optional[float] = None):
+        """
+        Record a startup phase duration
+
+        Args:
+            name: Phase name (e.g. 'app_import', 'agent_init')
+            seconds: Duration; defaults to time elapsed since process start
+        """
+        if seconds is None:
+            seconds = time.perf_counter() - PROCESS_START
+        self.phases[name] = round(seconds, 4)
+
+    def get_agent(self) -> Any:
+        """
+        Get the agent, constructing it on first use
+
+        Returns:
+            Architecture agent for the configured backend
+
+        Raises:
+            Exception: If the agent cannot be constructed
+        """
+        agent = self._agent
+        if agent is not None:
+            return agent
+
+        with self._lock:
+            if self._agent is None:
+                self.status = STATUS_WARMING
+                started = time.perf_counter()
+                try:
+                    self._agent = load_agent(self.model_type)
+                except Exception as e:
+                    self.status = STATUS_FAILED
+                    self.error = str(e)
+                    raise
+                self.mark_phase("agent_init", time.perf_counter() - started)
+                self.status = STATUS_READY
+                self.error = None
+                logger.info(f"✅ {self.model_type} agent initialized in {self.phases['agent_init']:.2f}s")
+            return self._agent
+
+    def warm_up(self):
+        """Construct the agent and send one tiny inference to the model endpoint"""
+        try:
+            agent = self.get_agent()
+        except Exception as e:
+            logger.error(f"❌ Failed to initialize agent: {e}")
+            logger.warning("   Agent will be initialized on first request")
+            return
+
+        if os.getenv("AGENT_WARMUP_INFERENCE", "true").lower() != "true":
+            return
+
+        started = time.perf_counter()
+        try:
+            agent.warm_up()
+            self.warmed_up = True
+            self.mark_phase("warmup_inference", time.perf_counter() - started)
+            logger.info(f"🔥 Warm-up inference completed in {self.phases['warmup_inference']:.2f}s")
+        except Exception as e:
+            # The agent is still usable; the first real request pays the cold start
+            logger.warning(f"⚠️ Warm-up inference failed: {e}")
+
+    def start_warm_up(self) -> Optional[threading.Thread]:
+        """Run warm_up() on a daemon thread so startup does not wait for it"""
+        if self._warmup_thread is not None or self._agent is not None:
+            return self._warmup_thread
+
+        self._warmup_thread = threading.Thread(
+            target=self.warm_up,
+            name="agent-warmup",
+            daemon=True
+        )
+        self._warmup_thread.start()
+        return self._warmup_thread
+
+    def startup_report(self) -> Dict[str, Any]:
+        """Get startup timings and current agent state"""
+        return {
+            "status": self.status,
+            "model_type": self.model_type,
+            "model_id": get_model_id(self.model_type),
+            "agent_ready": self.ready,
+            "warmed_up": self.warmed_up,
+            "error": self.error,
+            "uptime_seconds": round(time.perf_counter() - PROCESS_START, 3),
+            "phases": dict(self.phases)
+        }
+
+
+# Singleton instance
+_readiness: Optional[ReadinessState] = None
+
+
+def get_readiness() -> ReadinessState:
+    """Get or create ReadinessState singleton"""
+    global _readiness
+    if _readiness is None:
+        _readiness = ReadinessState()
+    return _readiness
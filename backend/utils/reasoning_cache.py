@@ -0,0 +1,106 @@
+"""
+Reasoning Cache for two-phase architecture generation
+Phase one returns only the architecture JSON; the markdown explanation is
+generated on demand, at most once per architecture, and cached
+"""
+
+import os
+import asyncio
+import logging
+from typing import Any, Callable, Dict, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from backend.utils.cache import cache_key, create_cache
+
+logger = logging.getLogger(__name__)
+
+
+class ReasoningCache:
+    """
+    Pending and generated architecture explanations
+
+    Each entry holds what phase two needs (requirements and architecture
+    JSON) and, once generated, the reasoning. Entries live in a utils/cache.py
+    backend: an in-process LRU by default, or a shm/Redis backend
+    (REASONING_CACHE_BACKEND / CACHE_BACKEND) so that every worker sees ids
+    registered and explanations generated by the others. Concurrent requests
+    for the same architecture in one worker share a single model call.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        """
+        Args:
+            max_entries: Architectures kept by the LRU backend (default REASONING_CACHE_SIZE or 256)
+        """
+        self.max_entries = max_entries or int(os.getenv("REASONING_CACHE_SIZE", "256"))
+        self.ttl = float(os.getenv("REASONING_CACHE_TTL_SECONDS", "86400"))
+        self.backend = create_cache("reasoning", default_backend="lru", max_entries=self.max_entries)
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    @staticmethod
+    def key(reasoning_id: str) -> str:
+        return cache_key("reasoning", reasoning_id)
+
+    def register(self, reasoning_id: str, requirements: str, architecture_json: Dict[str, Any]):
+        """Remember an architecture whose reasoning may be requested later"""
+        if self.backend.get(self.key(reasoning_id)) is not None:
+            return
+        self.backend.set(
+            self.key(reasoning_id),
+            {"requirements": requirements, "architecture_json": architecture_json, "reasoning": None},
+            self.ttl
+        )
+
+    def get(self, reasoning_id: str) -> Optional[Dict[str, Any]]:
+        """Get an entry (None if unknown or evicted)"""
+        return self.backend.get(self.key(reasoning_id))
+
+    async def get_or_generate(
+        self,
+        reasoning_id: str,
+        generate: Callable[[str, Dict[str, Any]], str]
+    ) -> Optional[str]:
+        """
+        Return cached reasoning, generating it on first request
+
+        Args:
+            reasoning_id: Id returned by phase one
+            generate: Blocking fn(requirements, architecture_json) -> reasoning,
+                run in the threadpool
+
+        Returns:
+            Markdown reasoning, or None if the id is unknown
+        """
+        entry = self.get(reasoning_id)
+        if entry is None:
+            return None
+        if entry["reasoning"] is not None:
+            return entry["reasoning"]
+
+        future = self._inflight.get(reasoning_id)
+        if future is None:
+            future = asyncio.ensure_future(
+                run_in_threadpool(generate, entry["requirements"], entry["architecture_json"])
+            )
+            self._inflight[reasoning_id] = future
+            future.add_done_callback(lambda _: self._inflight.pop(reasoning_id, None))
+
+        reasoning = await asyncio.shield(future)
+        if entry["reasoning"] is None:
+            self.backend.set(self.key(reasoning_id), {**entry, "reasoning": reasoning}, self.ttl)
+            entry["reasoning"] = reasoning
+        logger.info(f"✓ Reasoning generated for {reasoning_id} ({len(reasoning)} chars)")
+        return reasoning
+
+
+# Singleton instance
+_reasoning_cache: Optional[ReasoningCache] = None
+
+
+def get_reasoning_cache() -> ReasoningCache:
+    """Get or create ReasoningCache singleton"""
+    global _reasoning_cache
+    if _reasoning_cache is None:
+        _reasoning_cache = ReasoningCache()
+    return _reasoning_cache
@@ -5,8 +5,29 @@ Extracts JSON structure and markdown reasoning from hybrid responses
 
 import json
 import re
+import hashlib
 from typing import Dict, Any, Optional, Tuple
 
+from backend.utils.json_repair import repair_json, find_json_start
+
+# Compiled once; these run on every generate request over responses of tens of KB
+JSON_FENCE_PATTERN = re.compile(r'```json\s*(\{.*?\})\s*```', re.DOTALL)
+JSON_FENCE_BLOCK_PATTERN = re.compile(r'```json\s*\{.*?\}\s*```', re.DOTALL)
+RAW_ARCHITECTURE_PATTERN = re.compile(r'\{[\s\S]*"architecture"[\s\S]*\}')
+
+SERVICE_ICONS = {
+    'compute': '💻',
+    'storage': '💾',
+    'database': '🗄️',
+    'serverless': 'λ',
+    'network': '🌐',
+    'security': '🔒',
+    'analytics': '📊',
+    'ml': '🤖',
+    'monitoring': '📈',
+    'cdn': '🚀'
+}
+
 
 def extract_json_from_response(response: str) -> Optional[Dict[str, Any]]:
     """
@@ -19,8 +40,7 @@ def extract_json_from_response(response: str) -> Optional[Dict[str, Any]]:
         Parsed JSON dict or None if not found
     """
     # Try to find JSON block in markdown code fence
-    json_pattern = r'```json\s*(\{.*?\})\s*```'
-    match = re.search(json_pattern, response, re.DOTALL)
+    match = JSON_FENCE_PATTERN.search(response)
 
     if match:
         try:
@@ -28,11 +48,9 @@ def extract_json_from_response(response: str) -> Optional[Dict[str, Any]]:
             return json.loads(json_str)
         except json.JSONDecodeError as e:
             print(f"JSON decode error: {e}")
-            return None
 
     # Try to find raw JSON object
-    json_pattern_raw = r'\{[\s\S]*"architecture"[\s\S]*\}'
-    match = re.search(json_pattern_raw, response)
+    match = RAW_ARCHITECTURE_PATTERN.search(response)
 
     if match:
         try:
@@ -40,9 +58,48 @@ def extract_json_from_response(response: str) -> Optional[Dict[str, Any]]:
         except json.JSONDecodeError:
             pass
 
+    # Malformed or truncated JSON: repair it in one pass instead of retrying
+    start = find_json_start(response)
+    if start is None:
+        return None
+
+    repaired, truncated = repair_json(response, start)
+    if isinstance(repaired, dict):
+        print(f"⚠️ Repaired {'truncated' if truncated else 'malformed'} JSON in model response")
+        return repaired
+
     return None
 
 
+def stitch_continuation(partial: str, tail: str, min_overlap: int = 8, max_overlap: int = 400) -> str:
+    """
+    Append a continuation to a truncated response
+
+    Models asked to continue sometimes reopen the code fence or repeat the
+    last few characters; both are removed before joining.
+
+    Args:
+        partial: Truncated response
+        tail: Continuation returned by the model
+        min_overlap: Shortest repeated prefix treated as a repeat (shorter
+            matches are usually coincidence, e.g. a closing quote)
+        max_overlap: Longest repeated prefix of the tail to look for
+
+    Returns:
+        Combined response
+    """
+    tail = tail.lstrip()
+    if tail.startswith('```json'):
+        tail = tail[len('```json'):].lstrip('\n')
+
+    for size in range(min(max_overlap, len(tail), len(partial)), min_overlap - 1, -1):
+        if partial.endswith(tail[:size]):
+            tail = tail[size:]
+            break
+
+    return partial + tail
+
+
 def extract_markdown_reasoning(response: str) -> str:
     """
     Extract markdown reasoning from response (everything after JSON block)
@@ -54,8 +111,7 @@ def extract_markdown_reasoning(response: str) -> str:
         Markdown reasoning text
     """
     # Remove JSON block
-    json_pattern = r'```json\s*\{.*?\}\s*```'
-    reasoning = re.sub(json_pattern, '', response, flags=re.DOTALL)
+    reasoning = JSON_FENCE_BLOCK_PATTERN.sub('', response)
 
     return reasoning.strip()
 
@@ -76,13 +132,44 @@ def parse_claude_architecture_response(response: str) -> Tuple[Optional[Dict], s
     return architecture_json, markdown_reasoning
 
 
-def transform_to_ui_format(architecture_json: Dict[str, Any], provider: str) -> Dict[str, Any]:
+def architecture_fingerprint(architecture_json: Dict[str, Any]) -> str:
+    """
+    Deterministic content hash of an architecture
+
+    Independent of key order, process and PYTHONHASHSEED, so every worker
+    derives the same value for the same architecture.
+
+    Args:
+        architecture_json: Parsed architecture JSON
+
+    Returns:
+        16 hex characters of the SHA-256 of the canonical JSON
+    """
+    canonical = json.dumps(architecture_json, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+def _monthly_cost(value: Any) -> float:
+    """Cost from model output as a number; models sometimes quote it or send null"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def transform_to_ui_format(
+    architecture_json: Dict[str, Any],
+    provider: str,
+    architecture_id: Optional[str] = None
+) -> Dict[str, Any]:
     """
     Transform Claude's JSON to Skyrchitect UI format
 
     Args:
         architecture_json: Parsed architecture JSON from Claude
         provider: Cloud provider (aws, azure, gcp)
+        architecture_id: Id of the UI architecture; routes that persist it
+            pass arch-<architecture_fingerprint>, computed once there
 
     Returns:
         Architecture dict in UI format
@@ -92,38 +179,39 @@ def transform_to_ui_format(architecture_json: Dict[str, Any], provider: str) ->
     connections = arch.get('connections', [])
     alternatives = arch.get('alternatives', [])
 
-    # Transform services to components
+    # Transform services to components and diagram nodes in a single pass
     components = []
+    nodes = []
     for idx, service in enumerate(services):
+        has_id = 'id' in service
+        name = service.get('name', 'Unknown Service')
+        description = service.get('description') or ''
+        cost = _monthly_cost(service.get('cost', 0))
+        service_type = service.get('type', 'service')
+        position = service.get('position', {})
+
         components.append({
-            'id': service.get('id', f'comp-{idx+1}'),
-            'name': service.get('name', 'Unknown Service'),
-            'description': service.get('description', ''),
-            'cost': service.get('cost', 0),
-            'icon': get_service_icon(service.get('type', 'service')),
+            'id': service['id'] if has_id else f'comp-{idx+1}',
+            'name': name,
+            'description': description,
+            'cost': cost,
+            'icon': get_service_icon(service_type),
             'provider': provider
         })
 
-    # Transform services to diagram nodes
-    nodes = []
-    for idx, service in enumerate(services):
-        position = service.get('position', {})
-        x = position.get('x', 300 + (idx % 2) * 300)
-        y = position.get('y', 200 + (idx // 2) * 200)
-
         nodes.append({
-            'id': service.get('id', f'node-{idx+1}'),
-            'label': service.get('name', 'Unknown Service'),
-            'subLabel': service.get('type', 'service').capitalize(),
+            'id': service['id'] if has_id else f'node-{idx+1}',
+            'label': name,
+            'subLabel': service_type.capitalize(),
             'icon': service.get('icon', 'server'),
-            'cost': service.get('cost', 0),
-            'description': service.get('description', ''),
-            'x': x,
-            'y': y,
+            'cost': cost,
+            'description': description,
+            'x': position.get('x', 300 + (idx % 2) * 300),
+            'y': position.get('y', 200 + (idx // 2) * 200),
             'width': 200,
             'height': 100,
             'isDragging': False,
-            'type': service.get('type', 'service'),
+            'type': service_type,
             'provider': provider
         })
 
@@ -143,15 +231,15 @@ def transform_to_ui_format(architecture_json: Dict[str, Any], provider: str) ->
         alt_components.append({
             'id': f'alt-{idx+1}',
             'name': alt.get('alternative_name', 'Alternative'),
-            'description': alt.get('description', ''),
-            'cost': alt.get('cost', 0),
+            'description': alt.get('description') or '',
+            'cost': _monthly_cost(alt.get('cost', 0)),
             'icon': 'server',
             'performance': alt.get('performance', 80),
             'originalComponentId': alt.get('service_id', '')
         })
 
     return {
-        'id': f'arch-{hash(arch.get("title", "architecture")) % 10000}',
+        'id': architecture_id,
         'name': arch.get('title', 'Cloud Architecture'),
         'description': arch.get('description', ''),
         'provider': provider,
@@ -185,17 +273,4 @@ def get_service_icon(service_type: str) -> str:
     Returns:
         Emoji icon
     """
-    icons = {
-        'compute': '💻',
-        'storage': '💾',
-        'database': '🗄️',
-        'serverless': 'λ',
-        'network': '🌐',
-        'security': '🔒',
-        'analytics': '📊',
-        'ml': '🤖',
-        'monitoring': '📈',
-        'cdn': '🚀'
-    }
-
-    return icons.get(service_type.lower(), '⚙️')
+    return SERVICE_ICONS.get(service_type.lower(), '⚙️')
@@ -1,26 +1,81 @@
 """
 S3 Storage Utility for Skyrchitect AI
 Handles uploading and managing architecture diagram images in S3
+
+Diagrams are content-addressed: the object key is the SHA-256 of the file,
+so re-uploading the same diagram is a no-op, and large files go up as
+parallel multipart uploads streamed from the source file.
 """
 
+import io
 import os
+import hashlib
+import threading
 import boto3
+from botocore.exceptions import ClientError
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional
+from typing import Any, BinaryIO, Dict, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Read size for hashing and single-part uploads
+CHUNK_SIZE = 1024 * 1024
+
+# S3 requires multipart parts of at least 5 MiB (except the last one)
+MIN_PART_SIZE = 5 * 1024 * 1024
+
+
+def hash_stream(fileobj: BinaryIO, chunk_size: int = CHUNK_SIZE) -> Tuple[str, int]:
+    """
+    SHA-256 a file object chunk by chunk, then rewind it
+
+    Args:
+        fileobj: Seekable binary file object
+        chunk_size: Bytes per read
+
+    Returns:
+        Tuple of (hex digest, size in bytes)
+    """
+    digest = hashlib.sha256()
+    size = 0
+    fileobj.seek(0)
+    for chunk in iter(lambda: fileobj.read(chunk_size), b""):
+        digest.update(chunk)
+        size += len(chunk)
+    fileobj.seek(0)
+    return digest.hexdigest(), size
+
+
+def content_key(digest: str) -> str:
+    """S3 key for a diagram with the given SHA-256 digest"""
+    return f"diagrams/sha256/{digest[:2]}/{digest}"
+
 
 class S3Storage:
     """S3 bucket manager for storing uploaded architecture diagrams"""
 
-    def __init__(self):
-        self.s3_client = boto3.client(
+    def __init__(self, s3_client=None, bucket_name: Optional[str] = None):
+        self.s3_client = s3_client or boto3.client(
             's3',
             region_name=os.getenv('AWS_DEFAULT_REGION', 'us-west-2')
         )
-        self.bucket_name = os.getenv('S3_DIAGRAMS_BUCKET', 'skyrchitect-diagrams')
+        self.bucket_name = bucket_name or os.getenv('S3_DIAGRAMS_BUCKET', 'skyrchitect-diagrams')
+
+        # Files at or above the threshold use multipart upload
+        self.multipart_threshold = max(
+            int(os.getenv('S3_MULTIPART_THRESHOLD', 16 * 1024 * 1024)),
+            MIN_PART_SIZE
+        )
+        self.part_size = max(int(os.getenv('S3_MULTIPART_PART_SIZE', 8 * 1024 * 1024)), MIN_PART_SIZE)
+        self.max_workers = int(os.getenv('S3_UPLOAD_WORKERS', 4))
+
+        # LRU of digests known to exist in the bucket (skips the HEAD request)
+        self.known_hashes_size = int(os.getenv('S3_KNOWN_HASHES', 4096))
+        self._known_hashes: "OrderedDict[str, None]" = OrderedDict()
+        self._known_lock = threading.Lock()
 
         # Create bucket if it doesn't exist
         self._ensure_bucket_exists()
@@ -51,15 +106,23 @@ class S3Storage:
                     VersioningConfiguration={'Status': 'Enabled'}
                 )
 
-                # Set lifecycle policy to delete old versions after 90 days
+                # Set lifecycle policy to delete old versions after 90 days and
+                # clean up parts of abandoned multipart uploads
                 self.s3_client.put_bucket_lifecycle_configuration(
                     Bucket=self.bucket_name,
                     LifecycleConfiguration={
                         'Rules': [
                             {
-                                'Id': 'DeleteOldVersions',
+                                'ID': 'DeleteOldVersions',
+                                'Filter': {'Prefix': ''},
                                 'Status': 'Enabled',
                                 'NoncurrentVersionExpiration': {'NoncurrentDays': 90}
+                            },
+                            {
+                                'ID': 'AbortIncompleteMultipartUploads',
+                                'Filter': {'Prefix': ''},
+                                'Status': 'Enabled',
+                                'AbortIncompleteMultipartUpload': {'DaysAfterInitiation': 1}
                             }
                         ]
                     }
@@ -89,39 +152,165 @@ class S3Storage:
         Returns:
             S3 URL of the uploaded file, or None if upload fails
         """
+        result = self.upload_diagram_stream(
+            io.BytesIO(file_content),
+            filename,
+            content_type=content_type,
+            metadata=metadata
+        )
+        return result['url'] if result else None
+
+    def upload_diagram_stream(
+        self,
+        fileobj: BinaryIO,
+        filename: str,
+        content_type: str = 'image/png',
+        metadata: Optional[dict] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Upload a diagram from a seekable file object under its content hash
+
+        The file is read twice in chunks (hash, then upload) and never held
+        in memory as a whole. If an object with the same SHA-256 already
+        exists, nothing is uploaded.
+
+        Args:
+            fileobj: Seekable binary file object (e.g. UploadFile.file)
+            filename: Original filename
+            content_type: MIME type of the file
+            metadata: Additional metadata to store
+
+        Returns:
+            Dict with url, key, sha256, size and deduplicated flag, or None if upload fails
+        """
         try:
-            # Generate unique key with timestamp
-            timestamp = datetime.utcnow().strftime('%Y%m%d-%H%M%S')
-            file_extension = filename.split('.')[-1] if '.' in filename else 'png'
-            s3_key = f"diagrams/{timestamp}-{filename}"
+            digest, size = hash_stream(fileobj)
+            s3_key = content_key(digest)
+            s3_url = f"s3://{self.bucket_name}/{s3_key}"
+            result = {'url': s3_url, 'key': s3_key, 'sha256': digest, 'size': size}
+
+            if self.object_exists(s3_key):
+                logger.info(f"✓ Diagram already in S3, skipping upload: {s3_url}")
+                return {**result, 'deduplicated': True}
 
             # Prepare metadata
-            s3_metadata = metadata or {}
+            timestamp = datetime.utcnow().strftime('%Y%m%d-%H%M%S')
+            s3_metadata = dict(metadata or {})
             s3_metadata.update({
-                'original-filename': filename,
-                'upload-timestamp': timestamp
+                'original-filename': filename.encode('ascii', 'replace').decode(),
+                'upload-timestamp': timestamp,
+                'sha256': digest
             })
 
-            # Upload to S3
-            self.s3_client.put_object(
-                Bucket=self.bucket_name,
-                Key=s3_key,
-                Body=file_content,
-                ContentType=content_type,
-                Metadata=s3_metadata,
-                ServerSideEncryption='AES256'  # Encrypt at rest
-            )
+            extra_args = {
+                'ContentType': content_type,
+                'Metadata': s3_metadata,
+                'ServerSideEncryption': 'AES256'  # Encrypt at rest
+            }
 
-            # Generate S3 URL
-            s3_url = f"s3://{self.bucket_name}/{s3_key}"
+            if size >= self.multipart_threshold:
+                self._multipart_upload(fileobj, s3_key, extra_args)
+            else:
+                self.s3_client.put_object(
+                    Bucket=self.bucket_name,
+                    Key=s3_key,
+                    Body=fileobj.read(),
+                    **extra_args
+                )
 
-            logger.info(f"✓ Diagram uploaded to S3: {s3_url}")
-            return s3_url
+            self._remember(digest)
+            logger.info(f"✓ Diagram uploaded to S3: {s3_url} ({size} bytes)")
+            return {**result, 'deduplicated': False}
 
         except Exception as e:
             logger.error(f"❌ Failed to upload diagram to S3: {e}")
             return None
 
+    def object_exists(self, s3_key: str) -> bool:
+        """
+        Check whether a content-addressed object exists (LRU first, then HEAD)
+
+        Args:
+            s3_key: S3 object key
+
+        Returns:
+            True if the object is known or found in the bucket
+        """
+        digest = s3_key.rsplit('/', 1)[-1]
+        with self._known_lock:
+            if digest in self._known_hashes:
+                self._known_hashes.move_to_end(digest)
+                return True
+
+        try:
+            self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_key)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return False
+            raise
+
+        self._remember(digest)
+        return True
+
+    def _remember(self, digest: str):
+        """Add a digest to the known-objects LRU"""
+        with self._known_lock:
+            self._known_hashes[digest] = None
+            self._known_hashes.move_to_end(digest)
+            while len(self._known_hashes) > self.known_hashes_size:
+                self._known_hashes.popitem(last=False)
+
+    def _multipart_upload(self, fileobj: BinaryIO, s3_key: str, extra_args: Dict[str, Any]):
+        """
+        Upload a file as parallel multipart parts
+
+        Parts are read sequentially and uploaded by a thread pool; at most
+        max_workers parts are in memory at once.
+        """
+        upload_id = self.s3_client.create_multipart_upload(
+            Bucket=self.bucket_name,
+            Key=s3_key,
+            **extra_args
+        )['UploadId']
+
+        def upload_part(part_number: int, body: bytes) -> Dict[str, Any]:
+            response = self.s3_client.upload_part(
+                Bucket=self.bucket_name,
+                Key=s3_key,
+                UploadId=upload_id,
+                PartNumber=part_number,
+                Body=body
+            )
+            return {'PartNumber': part_number, 'ETag': response['ETag']}
+
+        try:
+            parts = []
+            in_flight = []
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                part_number = 1
+                for body in iter(lambda: fileobj.read(self.part_size), b""):
+                    in_flight.append(executor.submit(upload_part, part_number, body))
+                    part_number += 1
+                    if len(in_flight) >= self.max_workers:
+                        parts.append(in_flight.pop(0).result())
+                parts.extend(future.result() for future in in_flight)
+
+            self.s3_client.complete_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=s3_key,
+                UploadId=upload_id,
+                MultipartUpload={'Parts': sorted(parts, key=lambda p: p['PartNumber'])}
+            )
+            logger.info(f"✓ Multipart upload complete: {s3_key} ({len(parts)} parts)")
+
+        except Exception:
+            self.s3_client.abort_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=s3_key,
+                UploadId=upload_id
+            )
+            raise
+
     def get_presigned_url(self, s3_key: str, expiration: int = 3600) -> Optional[str]:
         """
         Generate a presigned URL for accessing the diagram
@@ -0,0 +1,75 @@
+"""
+Structured architecture output
+JSON Schema for grammar-guided decoding and Pydantic validation of the result
+"""
+
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from pydantic import ValidationError
+
+from backend.models.schemas import ArchitectureDocument
+from backend.utils.json_repair import repair_json
+
+logger = logging.getLogger(__name__)
+
+_architecture_schema: Optional[Dict[str, Any]] = None
+
+
+def get_architecture_schema() -> Dict[str, Any]:
+    """JSON Schema of ArchitectureDocument (built once, reused on every request)"""
+    global _architecture_schema
+    if _architecture_schema is None:
+        _architecture_schema = ArchitectureDocument.model_json_schema(by_alias=True)
+    return _architecture_schema
+
+
+def parse_architecture_document(data: Any) -> Optional[ArchitectureDocument]:
+    """
+    Validate structured model output
+
+    Guided decoding makes the first attempt succeed; the repair pass only
+    matters when the endpoint ignored the schema or hit max_tokens.
+
+    Args:
+        data: JSON text, or an already-decoded dict (Bedrock tool input)
+
+    Returns:
+        Validated document, or None if it does not match the schema
+    """
+    try:
+        if isinstance(data, dict):
+            return ArchitectureDocument.model_validate(data)
+        return ArchitectureDocument.model_validate_json(data)
+    except ValidationError as e:
+        if isinstance(data, dict):
+            logger.warning(f"⚠️ Structured output failed validation: {e.error_count()} errors")
+            return None
+
+    repaired, _ = repair_json(data)
+    if not isinstance(repaired, dict):
+        logger.warning("⚠️ Structured output is not a JSON object")
+        return None
+
+    try:
+        return ArchitectureDocument.model_validate(repaired)
+    except ValidationError as e:
+        logger.warning(f"⚠️ Structured output failed validation: {e.error_count()} errors")
+        return None
+
+
+def to_architecture_json(document: ArchitectureDocument) -> Tuple[Dict[str, Any], str]:
+    """
+    Split a document into the {"architecture": ...} dict and markdown reasoning
+
+    Returns:
+        Tuple of (architecture_json, markdown_reasoning), the same shape as
+        parse_claude_architecture_response
+    """
+    architecture_json = document.model_dump(
+        mode="json",
+        by_alias=True,
+        exclude_none=True,
+        exclude={"reasoning"}
+    )
+    return architecture_json, document.reasoning
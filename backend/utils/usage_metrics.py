@@ -0,0 +1,137 @@
+"""
+Token Usage Metrics for Skyrchitect AI
+Tracks model input/output tokens and how many input tokens were served from
+the prompt cache (Bedrock cache points, NIM KV prefix reuse)
+"""
+
+import threading
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+
+class UsageMetrics:
+    """Thread-safe per-operation token counters"""
+
+    FIELDS = ("calls", "input_tokens", "cached_input_tokens", "cache_write_tokens", "output_tokens")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_operation: Dict[str, Dict[str, int]] = {}
+        self._listeners: List[Callable[[str, Dict[str, int]], None]] = []
+
+    def add_listener(self, listener: Callable[[str, Dict[str, int]], None]):
+        """Call listener(operation, usage) after every recorded model call"""
+        self._listeners.append(listener)
+
+    def record(
+        self,
+        operation: str,
+        input_tokens: int,
+        output_tokens: int,
+        cached_input_tokens: int = 0,
+        cache_write_tokens: int = 0
+    ) -> Dict[str, int]:
+        """
+        Record token usage for one model call
+
+        Args:
+            operation: Operation name (e.g. 'generate_architecture')
+            input_tokens: Total input tokens, cached or not
+            output_tokens: Generated tokens
+            cached_input_tokens: Input tokens read from the prompt cache
+            cache_write_tokens: Input tokens written to the prompt cache
+
+        Returns:
+            The recorded usage
+        """
+        usage = {
+            "calls": 1,
+            "input_tokens": input_tokens,
+            "cached_input_tokens": cached_input_tokens,
+            "cache_write_tokens": cache_write_tokens,
+            "output_tokens": output_tokens
+        }
+
+        with self._lock:
+            totals = self._by_operation.setdefault(operation, dict.fromkeys(self.FIELDS, 0))
+            for field, value in usage.items():
+                totals[field] += value
+
+        for listener in self._listeners:
+            listener(operation, usage)
+
+        return usage
+
+    def record_bedrock(self, operation: str, usage: Mapping[str, int]) -> Dict[str, int]:
+        """
+        Record a Bedrock/Strands usage block
+
+        Bedrock reports cache reads and writes separately from inputTokens.
+        """
+        cached = usage.get("cacheReadInputTokens", 0)
+        written = usage.get("cacheWriteInputTokens", 0)
+        return self.record(
+            operation,
+            input_tokens=usage.get("inputTokens", 0) + cached + written,
+            output_tokens=usage.get("outputTokens", 0),
+            cached_input_tokens=cached,
+            cache_write_tokens=written
+        )
+
+    def record_openai(self, operation: str, usage: Mapping[str, Any]) -> Dict[str, int]:
+        """
+        Record an OpenAI-style usage block (NVIDIA NIM)
+
+        prompt_tokens already includes prompt_tokens_details.cached_tokens.
+        """
+        details = usage.get("prompt_tokens_details") or {}
+        return self.record(
+            operation,
+            input_tokens=usage.get("prompt_tokens", 0),
+            output_tokens=usage.get("completion_tokens", 0),
+            cached_input_tokens=details.get("cached_tokens", 0)
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get totals, per-operation counters and the cache hit ratio"""
+        with self._lock:
+            by_operation = {name: dict(totals) for name, totals in self._by_operation.items()}
+
+        totals = dict.fromkeys(self.FIELDS, 0)
+        for counters in by_operation.values():
+            for field in self.FIELDS:
+                totals[field] += counters[field]
+
+        input_tokens = totals["input_tokens"]
+        return {
+            "totals": totals,
+            "uncached_input_tokens": input_tokens - totals["cached_input_tokens"],
+            "cache_hit_ratio": round(totals["cached_input_tokens"] / input_tokens, 4) if input_tokens else 0.0,
+            "by_operation": by_operation
+        }
+
+    def reset(self):
+        """Clear all counters"""
+        with self._lock:
+            self._by_operation.clear()
+
+
+def usage_delta(before: Mapping[str, int], after: Mapping[str, int]) -> Dict[str, int]:
+    """
+    Difference between two cumulative usage blocks
+
+    Strands accumulates usage over the agent's lifetime; this turns it into
+    the usage of a single invocation.
+    """
+    return {key: value - before.get(key, 0) for key, value in after.items()}
+
+
+# Singleton instance
+_usage_metrics: Optional[UsageMetrics] = None
+
+
+def get_usage_metrics() -> UsageMetrics:
+    """Get or create UsageMetrics singleton"""
+    global _usage_metrics
+    if _usage_metrics is None:
+        _usage_metrics = UsageMetrics()
+    return _usage_metrics
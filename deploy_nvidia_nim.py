@@ -5,8 +5,12 @@ NVIDIA-AWS Hackathon: Deploy NVIDIA Llama NIM from AWS Marketplace to SageMaker
 
 This script deploys:
 - Llama 3.1 Nemotron Nano 8B V1 NIM (Reasoning Model)
+- Optionally a NeMo Retriever embedding NIM (--models llm,embedding)
 
-From AWS Marketplace to Amazon SageMaker endpoint.
+From AWS Marketplace to Amazon SageMaker endpoints. Endpoints are deployed
+concurrently, each step is skipped when its resource already exists (so an
+interrupted run can simply be repeated), readiness is polled with
+exponential backoff, and the time spent in each phase is reported.
 
 Requirements:
 - AWS Account with SageMaker access
@@ -20,13 +24,21 @@ Author: Claude Code for NVIDIA-AWS Hackathon
 Date: November 2025
 """
 
+import asyncio
 import boto3
+import hashlib
 import json
 import os
+import random
 import sys
 import time
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, List, Optional
+
+from botocore.exceptions import ClientError
+
+from backend.utils.endpoint_scaling import deregister_autoscaling, register_autoscaling
 
 # Configuration
 AWS_REGION = os.getenv("AWS_DEFAULT_REGION", "us-west-2")
@@ -48,17 +60,91 @@ LLAMA_ENDPOINT_NAME = "nvidia-llama-nemotron-endpoint"
 LLAMA_INSTANCE_TYPE = "ml.g5.12xlarge"  # Recommended by NVIDIA
 LLAMA_INSTANCE_COUNT = 1
 
+EMBEDDING_ENDPOINT_NAME = os.getenv("EMBEDDING_ENDPOINT_NAME", "nvidia-embedding-endpoint")
+EMBEDDING_INSTANCE_TYPE = os.getenv("EMBEDDING_INSTANCE_TYPE", "ml.g5.xlarge")
+
+# NIMs this script can deploy. The embedding package ARN depends on your
+# Marketplace subscription, so it is only taken from EMBEDDING_MODEL_PACKAGE_ARN.
+NIM_MODELS = {
+    "llm": {
+        "title": "Llama 3.1 Nemotron Nano 8B V1",
+        "endpoint_name": LLAMA_ENDPOINT_NAME,
+        "instance_type": LLAMA_INSTANCE_TYPE,
+        "instance_count": LLAMA_INSTANCE_COUNT,
+        "package_key": "llama-nemotron",
+        "package_env": "LLAMA_MODEL_PACKAGE_ARN",
+        "test_payload": {
+            "messages": [{"role": "user", "content": "What is cloud architecture?"}],
+            "max_tokens": 100,
+            "temperature": 0.7
+        }
+    },
+    "embedding": {
+        "title": "NeMo Retriever Embedding",
+        "endpoint_name": EMBEDDING_ENDPOINT_NAME,
+        "instance_type": EMBEDDING_INSTANCE_TYPE,
+        "instance_count": 1,
+        "package_key": "embedding",
+        "package_env": "EMBEDDING_MODEL_PACKAGE_ARN",
+        "test_payload": {
+            "input": ["What is cloud architecture?"],
+            "model": os.getenv("EMBEDDING_MODEL_NAME", "nvidia/llama-3.2-nv-embedqa-1b-v2"),
+            "input_type": "query"
+        }
+    }
+}
+
 # IAM Role Configuration
 SAGEMAKER_ROLE_NAME = "SageMakerExecutionRole-NvidiaHackathon"
 
+# Readiness polling: exponential backoff between these bounds (seconds)
+POLL_MIN_SECONDS = float(os.getenv("NIM_POLL_MIN_SECONDS", "5"))
+POLL_MAX_SECONDS = float(os.getenv("NIM_POLL_MAX_SECONDS", "30"))
 
-class NVIDIANIMDeployer:
-    """Deploy NVIDIA Llama NIM from AWS Marketplace to SageMaker"""
 
-    def __init__(self, region: str = AWS_REGION):
-        """Initialize AWS clients"""
+def say(message: str):
+    """print() for concurrent phases: one write per line, so lines do not interleave"""
+    sys.stdout.write(message + "\n")
+    sys.stdout.flush()
+
+
+def is_not_found(error: ClientError) -> bool:
+    """True if a SageMaker describe_* call failed because the resource does not exist"""
+    message = error.response.get("Error", {}).get("Message", "")
+    return "Could not find" in message or "does not exist" in message
+
+
+def backoff_delays(min_delay: float = POLL_MIN_SECONDS, max_delay: float = POLL_MAX_SECONDS):
+    """Endless exponential backoff with +/-10% jitter"""
+    delay = min_delay
+    while True:
+        yield delay * random.uniform(0.9, 1.1)
+        delay = min(max_delay, delay * 1.6)
+
+
+class NVIDIANIMDeployer:
+    """Deploy NVIDIA NIMs from AWS Marketplace to SageMaker"""
+
+    def __init__(
+        self,
+        region: str = AWS_REGION,
+        sm_client: Any = None,
+        iam_client: Any = None,
+        runtime_client: Any = None,
+        autoscaling_client: Any = None
+    ):
+        """
+        Initialize AWS clients
+
+        Args:
+            region: AWS region
+            sm_client, iam_client, runtime_client, autoscaling_client: Preconfigured clients
+                (e.g. moto or stubbed); created from the region when omitted
+        """
         self.region = region
         self.account_id = AWS_ACCOUNT_ID
+        self.timings: Dict[str, Dict[str, float]] = {}
+        self.deployed: List[str] = []
 
         print(f"\n{'='*70}")
         print(f"🚀 NVIDIA-AWS Hackathon: NIM Deployment to SageMaker")
@@ -69,14 +155,33 @@ class NVIDIANIMDeployer:
         print(f"   Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
 
         # Initialize boto3 clients
-        self.sm_client = boto3.client('sagemaker', region_name=region)
-        self.iam_client = boto3.client('iam', region_name=region)
+        self.sm_client = sm_client or boto3.client('sagemaker', region_name=region)
+        self.iam_client = iam_client or boto3.client('iam', region_name=region)
+        self.runtime_client = runtime_client or boto3.client('sagemaker-runtime', region_name=region)
+        self.autoscaling_client = autoscaling_client or boto3.client('application-autoscaling', region_name=region)
 
-        # Get model package ARN for this region
         if region not in MODEL_PACKAGE_ARNS:
             raise ValueError(f"Region {region} not configured. Supported: {list(MODEL_PACKAGE_ARNS.keys())}")
 
-        self.model_arn = MODEL_PACKAGE_ARNS[region]["llama-nemotron"]
+    def model_package_arn(self, key: str) -> str:
+        """Marketplace model package ARN for a NIM in this region"""
+        spec = NIM_MODELS[key]
+        arn = os.getenv(spec["package_env"]) or MODEL_PACKAGE_ARNS[self.region].get(spec["package_key"])
+        if not arn:
+            raise ValueError(
+                f"No model package ARN for '{key}' in {self.region}: subscribe in AWS Marketplace "
+                f"and set {spec['package_env']}"
+            )
+        return arn
+
+    @contextmanager
+    def phase(self, key: str, name: str):
+        """Record how long a deployment phase took"""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.timings.setdefault(key, {})[name] = time.monotonic() - start
 
     def get_or_create_execution_role(self) -> str:
         """Get existing or create new SageMaker execution role"""
@@ -86,7 +191,7 @@ class NVIDIANIMDeployer:
 
         try:
             # Check if role exists
-            self.iam_client.get_role(RoleName=SAGEMAKER_ROLE_NAME)
+            role_arn = self.iam_client.get_role(RoleName=SAGEMAKER_ROLE_NAME)['Role']['Arn']
             print(f"✅ Found existing role: {role_arn}\n")
             return role_arn
         except self.iam_client.exceptions.NoSuchEntityException:
@@ -123,191 +228,264 @@ class NVIDIANIMDeployer:
                     PolicyArn=policy
                 )
 
-            print(f"✅ Created role: {role_arn}")
-            print("⏳ Waiting 15 seconds for role to propagate...")
-            time.sleep(15)
-            print()
-
-            return role_arn
-
-    def create_model(self, model_name: str, model_package_arn: str, role_arn: str) -> str:
-        """Create SageMaker model from Marketplace model package"""
-        print(f"📦 Creating SageMaker model: {model_name}...")
-        print(f"   Model Package ARN: {model_package_arn}")
+            # No fixed propagation sleep: create_model retries until SageMaker can assume the role
+            print(f"✅ Created role: {response['Role']['Arn']}\n")
+            return response['Role']['Arn']
 
+    def ensure_model(self, model_name: str, model_package_arn: str, role_arn: str) -> str:
+        """Create SageMaker model from Marketplace model package (reuse if it exists)"""
         try:
-            response = self.sm_client.create_model(
-                ModelName=model_name,
-                PrimaryContainer={
-                    'ModelPackageName': model_package_arn
-                },
-                ExecutionRoleArn=role_arn,
-                EnableNetworkIsolation=True  # Security best practice
-            )
-
-            print(f"✅ Created model: {response['ModelArn']}\n")
-            return response['ModelArn']
-
-        except self.sm_client.exceptions.ResourceInUse:
-            print(f"⚠️  Model {model_name} already exists, using existing model\n")
-            return f"arn:aws:sagemaker:{self.region}:{self.account_id}:model/{model_name}"
-
-    def create_endpoint_config(self, config_name: str, model_name: str,
-                              instance_type: str, instance_count: int) -> str:
-        """Create SageMaker endpoint configuration"""
-        print(f"⚙️  Creating endpoint configuration: {config_name}...")
-        print(f"   Instance Type: {instance_type}")
-        print(f"   Instance Count: {instance_count}")
+            arn = self.sm_client.describe_model(ModelName=model_name)['ModelArn']
+            say(f"♻️  Model {model_name} already exists")
+            return arn
+        except ClientError as e:
+            if not is_not_found(e):
+                raise
+
+        say(f"📦 Creating SageMaker model: {model_name}...")
+        say(f"   Model Package ARN: {model_package_arn}")
+
+        # A freshly created role can take a few seconds before SageMaker may assume it
+        delays = backoff_delays(2, 10)
+        deadline = time.monotonic() + 90
+        while True:
+            try:
+                response = self.sm_client.create_model(
+                    ModelName=model_name,
+                    PrimaryContainer={
+                        'ModelPackageName': model_package_arn
+                    },
+                    ExecutionRoleArn=role_arn,
+                    EnableNetworkIsolation=True  # Security best practice
+                )
+                say(f"✅ Created model: {response['ModelArn']}")
+                return response['ModelArn']
+            except ClientError as e:
+                if "assume" not in str(e).lower() or time.monotonic() > deadline:
+                    raise
+                time.sleep(next(delays))
+
+    def ensure_endpoint_config(self, endpoint_name: str, model_name: str,
+                               instance_type: str, instance_count: int) -> str:
+        """
+        Create SageMaker endpoint configuration (reuse if it exists)
+
+        The config name includes a hash of its settings, so changed settings
+        produce a new config and the endpoint is updated rather than left stale.
+
+        Returns:
+            Endpoint config name
+        """
+        variants = [
+            {
+                'VariantName': 'AllTraffic',
+                'ModelName': model_name,
+                'InitialInstanceCount': instance_count,
+                'InstanceType': instance_type,
+                'InitialVariantWeight': 1.0
+            }
+        ]
+        digest = hashlib.sha256(json.dumps(variants, sort_keys=True).encode()).hexdigest()[:8]
+        config_name = f"{endpoint_name}-config-{digest}"
 
         try:
-            response = self.sm_client.create_endpoint_config(
-                EndpointConfigName=config_name,
-                ProductionVariants=[
-                    {
-                        'VariantName': 'AllTraffic',
-                        'ModelName': model_name,
-                        'InitialInstanceCount': instance_count,
-                        'InstanceType': instance_type,
-                        'InitialVariantWeight': 1.0
-                    }
-                ]
-            )
-
-            print(f"✅ Created endpoint config: {response['EndpointConfigArn']}\n")
-            return response['EndpointConfigArn']
+            self.sm_client.describe_endpoint_config(EndpointConfigName=config_name)
+            say(f"♻️  Endpoint config {config_name} already exists")
+            return config_name
+        except ClientError as e:
+            if not is_not_found(e):
+                raise
+
+        say(f"⚙️  Creating endpoint configuration: {config_name} ({instance_count}x {instance_type})")
+        self.sm_client.create_endpoint_config(
+            EndpointConfigName=config_name,
+            ProductionVariants=variants
+        )
+        return config_name
 
-        except self.sm_client.exceptions.ResourceInUse:
-            print(f"⚠️  Endpoint config {config_name} already exists, using existing config\n")
-            return f"arn:aws:sagemaker:{self.region}:{self.account_id}:endpoint-config/{config_name}"
+    def ensure_endpoint(self, endpoint_name: str, config_name: str) -> str:
+        """
+        Create, update or resume a SageMaker endpoint
 
-    def create_endpoint(self, endpoint_name: str, config_name: str) -> str:
-        """Create SageMaker endpoint"""
-        print(f"🚀 Creating SageMaker endpoint: {endpoint_name}...")
-        print(f"   This will take 10-15 minutes...")
+        - missing: create it
+        - Creating/Updating: leave it, the caller waits
+        - Failed: delete and recreate
+        - otherwise on a different config: update it
 
+        Returns:
+            Endpoint ARN
+        """
         try:
-            response = self.sm_client.create_endpoint(
-                EndpointName=endpoint_name,
-                EndpointConfigName=config_name
-            )
-
-            print(f"✅ Endpoint creation initiated: {response['EndpointArn']}")
-            return response['EndpointArn']
-
-        except self.sm_client.exceptions.ResourceInUse:
-            print(f"⚠️  Endpoint {endpoint_name} already exists")
-            return f"arn:aws:sagemaker:{self.region}:{self.account_id}:endpoint/{endpoint_name}"
+            endpoint = self.sm_client.describe_endpoint(EndpointName=endpoint_name)
+        except ClientError as e:
+            if not is_not_found(e):
+                raise
+            endpoint = None
+
+        if endpoint is not None:
+            status = endpoint['EndpointStatus']
+            if status == 'Failed':
+                say(f"♻️  Endpoint {endpoint_name} is Failed ({endpoint.get('FailureReason', 'unknown')}), recreating")
+                self.sm_client.delete_endpoint(EndpointName=endpoint_name)
+                self.sm_client.get_waiter('endpoint_deleted').wait(
+                    EndpointName=endpoint_name,
+                    WaiterConfig={'Delay': 5, 'MaxAttempts': 120}
+                )
+            elif status in ('Creating', 'Updating', 'SystemUpdating'):
+                say(f"♻️  Endpoint {endpoint_name} is already {status}, resuming wait")
+                return endpoint['EndpointArn']
+            elif endpoint['EndpointConfigName'] == config_name:
+                say(f"♻️  Endpoint {endpoint_name} is already {status} with {config_name}")
+                return endpoint['EndpointArn']
+            else:
+                say(f"🔄 Updating endpoint {endpoint_name} to {config_name}")
+                self.sm_client.update_endpoint(EndpointName=endpoint_name, EndpointConfigName=config_name)
+                return endpoint['EndpointArn']
+
+        say(f"🚀 Creating SageMaker endpoint: {endpoint_name}...")
+        response = self.sm_client.create_endpoint(
+            EndpointName=endpoint_name,
+            EndpointConfigName=config_name
+        )
+        say(f"✅ Endpoint creation initiated: {response['EndpointArn']}")
+        return response['EndpointArn']
 
-    def wait_for_endpoint(self, endpoint_name: str, timeout_minutes: int = 20) -> bool:
-        """Wait for endpoint to be in service"""
-        print(f"\n⏳ Waiting for endpoint {endpoint_name} to be in service...")
-        print(f"   Timeout: {timeout_minutes} minutes")
-        print(f"   Status updates every 30 seconds...\n")
+    async def wait_for_endpoint(self, endpoint_name: str, timeout_minutes: int = 20) -> bool:
+        """Wait for endpoint to be in service, polling with exponential backoff"""
+        say(f"⏳ Waiting for endpoint {endpoint_name} to be in service (timeout {timeout_minutes} min)...")
 
-        start_time = time.time()
+        start_time = time.monotonic()
         timeout_seconds = timeout_minutes * 60
+        delays = backoff_delays()
+        last_status = None
 
         while True:
-            elapsed = time.time() - start_time
+            elapsed = time.monotonic() - start_time
             if elapsed > timeout_seconds:
-                print(f"❌ Timeout waiting for endpoint after {timeout_minutes} minutes")
+                say(f"❌ Timeout waiting for {endpoint_name} after {timeout_minutes} minutes")
                 return False
 
             try:
-                response = self.sm_client.describe_endpoint(EndpointName=endpoint_name)
-                status = response['EndpointStatus']
-
-                elapsed_min = int(elapsed / 60)
-                elapsed_sec = int(elapsed % 60)
-                print(f"   [{elapsed_min:02d}:{elapsed_sec:02d}] Status: {status}")
-
-                if status == 'InService':
-                    print(f"\n✅ Endpoint {endpoint_name} is now in service!\n")
-                    return True
-                elif status in ['Failed', 'RollingBack']:
-                    print(f"\n❌ Endpoint deployment failed with status: {status}")
-                    if 'FailureReason' in response:
-                        print(f"   Failure reason: {response['FailureReason']}")
-                    return False
-
-                time.sleep(30)
-
+                response = await asyncio.to_thread(self.sm_client.describe_endpoint, EndpointName=endpoint_name)
             except Exception as e:
-                print(f"❌ Error checking endpoint status: {e}")
+                say(f"❌ Error checking endpoint status: {e}")
                 return False
 
-    def deploy(self, role_arn: str, wait: bool = True) -> Optional[str]:
-        """Deploy Llama 3.1 Nemotron Nano 8B NIM"""
-        print(f"\n{'='*70}")
-        print(f"🤖 Deploying Llama 3.1 Nemotron Nano 8B V1 NIM")
-        print(f"{'='*70}\n")
+            status = response['EndpointStatus']
+            if status != last_status:
+                say(f"   [{int(elapsed // 60):02d}:{int(elapsed % 60):02d}] {endpoint_name}: {status}")
+                last_status = status
+
+            if status == 'InService':
+                say(f"✅ Endpoint {endpoint_name} is now in service!")
+                return True
+            if status in ('Failed', 'RollingBack', 'OutOfService'):
+                say(f"❌ Endpoint {endpoint_name} deployment failed with status: {status}")
+                if 'FailureReason' in response:
+                    say(f"   Failure reason: {response['FailureReason']}")
+                return False
 
-        model_name = f"{LLAMA_ENDPOINT_NAME}-model"
-        config_name = f"{LLAMA_ENDPOINT_NAME}-config"
+            await asyncio.sleep(min(next(delays), max(0.0, timeout_seconds - elapsed)))
 
-        # Create model
-        self.create_model(
-            model_name=model_name,
-            model_package_arn=self.model_arn,
-            role_arn=role_arn
-        )
+    async def deploy_model(self, key: str, role_arn: str, wait: bool = True,
+                           test: bool = True, timeout_minutes: int = 20,
+                           autoscaling: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """
+        Deploy one NIM: model -> endpoint config -> endpoint -> wait -> test -> autoscaling
 
-        # Create endpoint config
-        self.create_endpoint_config(
-            config_name=config_name,
-            model_name=model_name,
-            instance_type=LLAMA_INSTANCE_TYPE,
-            instance_count=LLAMA_INSTANCE_COUNT
-        )
+        Every step is idempotent, so rerunning after an interruption resumes
+        where the previous run stopped.
 
-        # Create endpoint
-        endpoint_arn = self.create_endpoint(
-            endpoint_name=LLAMA_ENDPOINT_NAME,
-            config_name=config_name
-        )
+        Returns:
+            Endpoint ARN, or None if the endpoint did not become ready
+        """
+        spec = NIM_MODELS[key]
+        endpoint_name = spec["endpoint_name"]
+        model_name = f"{endpoint_name}-model"
+        say(f"🤖 [{key}] Deploying {spec['title']} NIM to {endpoint_name}")
 
-        # Wait for endpoint
-        if wait:
-            success = self.wait_for_endpoint(LLAMA_ENDPOINT_NAME)
-            if not success:
-                return None
+        try:
+            with self.phase(key, "model"):
+                await asyncio.to_thread(self.ensure_model, model_name, self.model_package_arn(key), role_arn)
 
-        return endpoint_arn
+            with self.phase(key, "endpoint_config"):
+                config_name = await asyncio.to_thread(
+                    self.ensure_endpoint_config, endpoint_name, model_name,
+                    spec["instance_type"], spec["instance_count"]
+                )
 
-    def test_endpoint(self) -> bool:
-        """Test Llama Nemotron endpoint with sample inference"""
-        print(f"\n{'='*70}")
-        print(f"🧪 Testing Llama 3.1 Nemotron Endpoint")
-        print(f"{'='*70}\n")
+            with self.phase(key, "endpoint"):
+                endpoint_arn = await asyncio.to_thread(self.ensure_endpoint, endpoint_name, config_name)
+        except (ClientError, ValueError) as e:
+            say(f"❌ [{key}] Deployment failed: {e}")
+            return None
 
-        runtime = boto3.client('sagemaker-runtime', region_name=self.region)
+        if wait:
+            with self.phase(key, "wait"):
+                if not await self.wait_for_endpoint(endpoint_name, timeout_minutes):
+                    return None
+            if test:
+                with self.phase(key, "test"):
+                    await asyncio.to_thread(self.test_endpoint, key)
+            if autoscaling:
+                with self.phase(key, "autoscaling"):
+                    await asyncio.to_thread(
+                        register_autoscaling, self.autoscaling_client, endpoint_name,
+                        min_capacity=spec["instance_count"], **autoscaling
+                    )
+
+        self.deployed.append(key)
+        return endpoint_arn
 
-        test_payload = {
-            "messages": [
-                {"role": "user", "content": "What is cloud architecture?"}
-            ],
-            "max_tokens": 100,
-            "temperature": 0.7
-        }
+    async def deploy_all(self, keys: List[str], wait: bool = True, test: bool = True,
+                         timeout_minutes: int = 20,
+                         autoscaling: Optional[Dict[str, Any]] = None) -> Dict[str, Optional[str]]:
+        """
+        Deploy several NIMs concurrently; the shared role is resolved once first
+
+        Args:
+            autoscaling: {"max_capacity", "target_invocations"} to register
+                target-tracking autoscaling once each endpoint is in service
+        """
+        with self.phase("shared", "role"):
+            role_arn = await asyncio.to_thread(self.get_or_create_execution_role)
+
+        results = await asyncio.gather(*[
+            self.deploy_model(key, role_arn, wait=wait, test=test, timeout_minutes=timeout_minutes,
+                              autoscaling=autoscaling)
+            for key in keys
+        ])
+        return dict(zip(keys, results))
+
+    def test_endpoint(self, key: str = "llm") -> bool:
+        """Test a NIM endpoint with a sample inference"""
+        spec = NIM_MODELS[key]
+        endpoint_name = spec["endpoint_name"]
 
         try:
-            print(f"📤 Sending test request to {LLAMA_ENDPOINT_NAME}...")
-            response = runtime.invoke_endpoint(
-                EndpointName=LLAMA_ENDPOINT_NAME,
+            say(f"📤 Sending test request to {endpoint_name}...")
+            response = self.runtime_client.invoke_endpoint(
+                EndpointName=endpoint_name,
                 ContentType='application/json',
-                Body=json.dumps(test_payload)
+                Body=json.dumps(spec["test_payload"])
             )
 
             result = json.loads(response['Body'].read().decode())
-            print(f"✅ Endpoint test successful!")
-            print(f"\n📝 Response preview:")
-            print(f"   {str(result)[:200]}...\n")
+            say(f"✅ Endpoint test successful ({endpoint_name}): {str(result)[:200]}...")
             return True
 
         except Exception as e:
-            print(f"❌ Endpoint test failed: {e}\n")
+            say(f"❌ Endpoint test failed ({endpoint_name}): {e}")
             return False
 
+    def print_timings(self):
+        """Print the time spent in each deployment phase"""
+        print(f"\n⏱️  Phase timings:")
+        for key, phases in self.timings.items():
+            total = sum(phases.values())
+            detail = ", ".join(f"{name} {seconds:.1f}s" for name, seconds in phases.items())
+            print(f"   {key:<10} {total:7.1f}s  ({detail})")
+
     def generate_summary(self):
         """Print deployment summary"""
         print(f"\n{'='*70}")
@@ -317,12 +495,15 @@ class NVIDIANIMDeployer:
         print(f"📊 Deployment Summary:")
         print(f"   Region: {self.region}")
         print(f"   Account: {self.account_id}")
-        print(f"\n🤖 Llama 3.1 Nemotron Nano 8B V1:")
-        print(f"   Endpoint: {LLAMA_ENDPOINT_NAME}")
-        print(f"   Instance: {LLAMA_INSTANCE_TYPE}")
-        print(f"   Status: InService")
+        for key in self.deployed:
+            spec = NIM_MODELS[key]
+            print(f"\n🤖 {spec['title']}:")
+            print(f"   Endpoint: {spec['endpoint_name']}")
+            print(f"   Instance: {spec['instance_type']}")
+            print(f"   Status: InService")
+        self.print_timings()
         print(f"\n💰 Cost Estimation:")
-        print(f"   ~$8/hour while endpoint is running")
+        print(f"   ~$8/hour for the Llama endpoint while it is running")
         print(f"\n🎯 Hackathon Compliance:")
         print(f"   ✅ llama-3.1-nemotron-nano-8B-v1 (Reasoning Model)")
         print(f"   ✅ Deployed as NVIDIA NIM")
@@ -337,33 +518,36 @@ class NVIDIANIMDeployer:
         print(f"\n{'='*70}\n")
 
 
-def cleanup_endpoint(region: str = AWS_REGION):
-    """Delete SageMaker endpoint to stop charges"""
+def cleanup_endpoint(region: str = AWS_REGION, keys: Optional[List[str]] = None,
+                     sm_client: Any = None, autoscaling_client: Any = None):
+    """Delete SageMaker endpoints, their configs and models to stop charges"""
     print(f"\n{'='*70}")
     print(f"🧹 Cleaning Up SageMaker Endpoint")
     print(f"{'='*70}\n")
 
-    sm_client = boto3.client('sagemaker', region_name=region)
+    sm_client = sm_client or boto3.client('sagemaker', region_name=region)
+    autoscaling_client = autoscaling_client or boto3.client('application-autoscaling', region_name=region)
 
-    try:
-        print(f"🗑️  Deleting endpoint: {LLAMA_ENDPOINT_NAME}...")
-        sm_client.delete_endpoint(EndpointName=LLAMA_ENDPOINT_NAME)
-        print(f"✅ Deleted endpoint: {LLAMA_ENDPOINT_NAME}")
+    for key in keys or ["llm"]:
+        endpoint_name = NIM_MODELS[key]["endpoint_name"]
+        try:
+            config_name = sm_client.describe_endpoint(EndpointName=endpoint_name)['EndpointConfigName']
+            deregister_autoscaling(autoscaling_client, endpoint_name)
+            print(f"🗑️  Deleting endpoint: {endpoint_name}...")
+            sm_client.delete_endpoint(EndpointName=endpoint_name)
+            print(f"✅ Deleted endpoint: {endpoint_name}")
 
-        # Also delete endpoint config
-        config_name = f"{LLAMA_ENDPOINT_NAME}-config"
-        print(f"🗑️  Deleting endpoint config: {config_name}...")
-        sm_client.delete_endpoint_config(EndpointConfigName=config_name)
-        print(f"✅ Deleted endpoint config: {config_name}")
+            print(f"🗑️  Deleting endpoint config: {config_name}...")
+            sm_client.delete_endpoint_config(EndpointConfigName=config_name)
+            print(f"✅ Deleted endpoint config: {config_name}")
 
-        # Also delete model
-        model_name = f"{LLAMA_ENDPOINT_NAME}-model"
-        print(f"🗑️  Deleting model: {model_name}...")
-        sm_client.delete_model(ModelName=model_name)
-        print(f"✅ Deleted model: {model_name}\n")
+            model_name = f"{endpoint_name}-model"
+            print(f"🗑️  Deleting model: {model_name}...")
+            sm_client.delete_model(ModelName=model_name)
+            print(f"✅ Deleted model: {model_name}\n")
 
-    except Exception as e:
-        print(f"⚠️  Could not delete {LLAMA_ENDPOINT_NAME}: {e}\n")
+        except Exception as e:
+            print(f"⚠️  Could not delete {endpoint_name}: {e}\n")
 
     print(f"✅ Cleanup complete!\n")
 
@@ -372,41 +556,56 @@ def main():
     """Main deployment function"""
     import argparse
 
-    parser = argparse.ArgumentParser(description='Deploy NVIDIA Llama NIM to SageMaker')
+    parser = argparse.ArgumentParser(description='Deploy NVIDIA NIMs to SageMaker')
     parser.add_argument('--cleanup', action='store_true', help='Delete endpoint instead of deploying')
     parser.add_argument('--no-wait', action='store_true', help='Do not wait for endpoint to be in service')
     parser.add_argument('--test-only', action='store_true', help='Only run test on existing endpoint')
     parser.add_argument('--region', default=AWS_REGION, help='AWS region')
+    parser.add_argument('--models', default='llm',
+                        help=f"Comma-separated NIMs to deploy concurrently ({', '.join(NIM_MODELS)})")
+    parser.add_argument('--timeout-minutes', type=int, default=20, help='Readiness timeout per endpoint')
+    parser.add_argument('--max-instances', type=int, default=0,
+                        help='Register autoscaling up to this many instances (0: fixed instance count)')
+    parser.add_argument('--target-invocations', type=float, default=20.0,
+                        help='Autoscaling target: invocations per instance per minute')
 
     args = parser.parse_args()
+    keys = [key.strip() for key in args.models.split(',') if key.strip()]
+    unknown = [key for key in keys if key not in NIM_MODELS]
+    if unknown:
+        parser.error(f"unknown models: {', '.join(unknown)} (choose from {', '.join(NIM_MODELS)})")
 
     if args.cleanup:
-        cleanup_endpoint(region=args.region)
+        cleanup_endpoint(region=args.region, keys=keys)
         return
 
     # Initialize deployer
     deployer = NVIDIANIMDeployer(region=args.region)
 
     if args.test_only:
-        # Test existing endpoint
-        deployer.test_endpoint()
+        # Test existing endpoints
+        for key in keys:
+            deployer.test_endpoint(key)
         return
 
-    # Get or create IAM role
-    role_arn = deployer.get_or_create_execution_role()
-
-    # Deploy NIM
+    # Deploy NIMs (role first, then all endpoints concurrently)
     wait_for_endpoint = not args.no_wait
-    endpoint_arn = deployer.deploy(role_arn, wait=wait_for_endpoint)
-
-    if not endpoint_arn:
-        print("\n❌ Deployment failed - check errors above")
+    autoscaling = (
+        {"max_capacity": args.max_instances, "target_invocations": args.target_invocations}
+        if args.max_instances else None
+    )
+    if autoscaling and not wait_for_endpoint:
+        print("⚠️  --max-instances needs the endpoint in service; autoscaling is skipped with --no-wait")
+    results = asyncio.run(deployer.deploy_all(
+        keys, wait=wait_for_endpoint, timeout_minutes=args.timeout_minutes, autoscaling=autoscaling
+    ))
+
+    failed = [key for key, endpoint_arn in results.items() if not endpoint_arn]
+    if failed:
+        deployer.print_timings()
+        print(f"\n❌ Deployment failed for {', '.join(failed)} - check errors above")
         sys.exit(1)
 
-    # If we waited, test the endpoint
-    if wait_for_endpoint:
-        deployer.test_endpoint()
-
     # Print summary
     deployer.generate_summary()
 
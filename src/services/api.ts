@@ -50,6 +50,8 @@ export interface HealthCheck {
 
 class SkyrchitectAPI {
   private baseURL: string;
+  // Chat session returned by the first reply; sent on every later turn
+  private chatSessionId: string | null = null;
 
   constructor(baseURL: string = API_BASE_URL) {
     this.baseURL = baseURL;
@@ -159,7 +161,7 @@ class SkyrchitectAPI {
   }
 
   /**
-   * Chat with AI agent
+   * Chat with AI agent (continues the current session, if any)
    */
   async chat(question: string, context?: string): Promise<AgentResponse> {
     const response = await fetch(`${this.baseURL}/api/chat`, {
@@ -167,7 +169,7 @@ class SkyrchitectAPI {
       headers: {
         'Content-Type': 'application/json',
       },
-      body: JSON.stringify({ question, context }),
+      body: JSON.stringify({ question, context, session_id: this.chatSessionId ?? undefined }),
     });
 
     if (!response.ok) {
@@ -175,7 +177,22 @@ class SkyrchitectAPI {
       throw new Error(`Chat failed: ${error}`);
     }
 
-    return response.json();
+    const result: AgentResponse = await response.json();
+    if (result.data?.session_id) {
+      this.chatSessionId = result.data.session_id;
+    }
+    return result;
+  }
+
+  /**
+   * End the current chat session; the next chat() starts a new one
+   */
+  async resetChat(): Promise<void> {
+    const sessionId = this.chatSessionId;
+    this.chatSessionId = null;
+    if (sessionId) {
+      await fetch(`${this.baseURL}/api/chat/${encodeURIComponent(sessionId)}`, { method: 'DELETE' });
+    }
   }
 
   /**